@@ -0,0 +1,110 @@
+#!/usr/bin/env node
+/**
+ * Throughput benchmark: single process vs cluster mode
+ *
+ * Starts the server once per worker count (CLUSTER_WORKERS=1, then N), waits
+ * for port 8001, drives it with a fixed number of concurrent clients for a
+ * fixed duration and reports requests/second and latency percentiles.
+ *
+ * Needs the database the server normally uses. Stop any running instance first.
+ *
+ * Usage:
+ *   TOKEN=<jwt> node benchmarks/clusterThroughput.js [workers=4] [seconds=15] [concurrency=32]
+ *   BENCH_PATH=/api/orders?limit=200   endpoint to hit (default; CPU-heavy JSON)
+ */
+
+const { spawn } = require('child_process');
+const path = require('path');
+
+const WORKERS = Number(process.argv[2]) || 4;
+const SECONDS = Number(process.argv[3]) || 15;
+const CONCURRENCY = Number(process.argv[4]) || 32;
+const BASE = 'http://localhost:8001';
+const BENCH_PATH = process.env.BENCH_PATH || '/api/orders?limit=200';
+const TOKEN = process.env.TOKEN;
+
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+
+async function waitForServer(timeoutMs = 120000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        try {
+            await fetch(`${BASE}/api/products/weights`);
+            return;
+        } catch (e) {
+            await sleep(500);
+        }
+    }
+    throw new Error('server did not start');
+}
+
+function startServer(workers) {
+    const child = spawn(process.execPath, ['index.js'], {
+        cwd: path.resolve(__dirname, '..'),
+        env: { ...process.env, CLUSTER_WORKERS: String(workers) },
+        stdio: ['ignore', 'ignore', 'inherit']
+    });
+    return child;
+}
+
+async function stopServer(child) {
+    const exited = new Promise(r => child.once('exit', r));
+    child.kill('SIGTERM');
+    await Promise.race([exited, sleep(5000)]);
+    await sleep(1000); // let the port free up
+}
+
+async function drive(seconds = SECONDS) {
+    const headers = TOKEN ? { Authorization: `Bearer ${TOKEN}` } : {};
+    const latencies = [];
+    let errors = 0;
+    const deadline = Date.now() + seconds * 1000;
+
+    const client = async () => {
+        while (Date.now() < deadline) {
+            const start = process.hrtime.bigint();
+            try {
+                const res = await fetch(`${BASE}${BENCH_PATH}`, { headers });
+                await res.arrayBuffer();
+                if (res.status >= 400) errors++;
+            } catch (e) {
+                errors++;
+            }
+            latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+        }
+    };
+    await Promise.all(Array.from({ length: CONCURRENCY }, client));
+
+    latencies.sort((a, b) => a - b);
+    const pct = (p) => latencies[Math.min(latencies.length - 1, Math.floor(latencies.length * p))] || 0;
+    return { rps: latencies.length / seconds, p50: pct(0.5), p99: pct(0.99), errors, total: latencies.length };
+}
+
+async function main() {
+    if (!TOKEN) console.warn('TOKEN not set — authenticated endpoints will return 401 (still measured)');
+    console.log(`GET ${BENCH_PATH} — ${CONCURRENCY} concurrent clients, ${SECONDS}s per run\n`);
+
+    const results = [];
+    for (const workers of [1, WORKERS]) {
+        const child = startServer(workers);
+        try {
+            await waitForServer();
+            await sleep(workers > 1 ? 3000 : 1000); // let workers come up
+            await drive(2); // warm-up
+            const r = await drive();
+            results.push({ workers, ...r });
+            console.log(`workers=${workers}: ${r.rps.toFixed(0)} req/s  p50=${r.p50.toFixed(1)}ms  p99=${r.p99.toFixed(1)}ms  errors=${r.errors}/${r.total}`);
+        } finally {
+            await stopServer(child);
+        }
+    }
+
+    if (results.length === 2 && results[0].rps > 0) {
+        console.log(`\nSpeed-up: ${(results[1].rps / results[0].rps).toFixed(2)}x with ${WORKERS} workers`);
+    }
+}
+
+main().catch((err) => {
+    console.error(err.message);
+    process.exit(1);
+});
@@ -0,0 +1,51 @@
+#!/usr/bin/env node
+/**
+ * Cold-start benchmark: time from `node` launch to the model layer being usable
+ *
+ * Each scenario runs in a fresh process (median of N runs), so require-time
+ * work is measured the way an ops script or a restarting server pays for it.
+ * "all models" is what every `require('./src/models')` used to cost when the
+ * loader glob-scanned and constructed every model up front.
+ *
+ * No database needed — nothing connects.
+ *
+ * Usage: node benchmarks/coldStart.js [runs=15]
+ */
+
+const { spawnSync } = require('child_process');
+const path = require('path');
+
+const RUNS = Number(process.argv[2]) || 15;
+const ROOT = path.resolve(__dirname, '..');
+
+const SCENARIOS = [
+    ['node (baseline)', ''],
+    ['models, none used', "require('./src/models')"],
+    ['models, one group', "require('./src/models').order"],
+    ['all models (old eager load)', "require('./src/models').loadAllModels()"],
+    ['server module graph', "require('./src/services'); require('./src/controller')"]
+];
+
+function runOnce(code) {
+    const start = process.hrtime.bigint();
+    const result = spawnSync(process.execPath, ['-e', code], { cwd: ROOT, stdio: ['ignore', 'ignore', 'pipe'] });
+    const ms = Number(process.hrtime.bigint() - start) / 1e6;
+    if (result.status !== 0) throw new Error(result.stderr.toString().split('\n').slice(0, 5).join('\n'));
+    return ms;
+}
+
+const median = (values) => {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.floor(sorted.length / 2)];
+};
+
+console.log(`scenario                     | median ms (${RUNS} runs)`);
+for (const [label, code] of SCENARIOS) {
+    try {
+        runOnce(code); // warm the filesystem cache
+        const times = Array.from({ length: RUNS }, () => runOnce(code));
+        console.log(`${label.padEnd(28)} | ${median(times).toFixed(1).padStart(8)}`);
+    } catch (error) {
+        console.log(`${label.padEnd(28)} | failed: ${error.message}`);
+    }
+}
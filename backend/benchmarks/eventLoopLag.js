@@ -0,0 +1,78 @@
+#!/usr/bin/env node
+/**
+ * Event-loop lag benchmark: CSV export inline vs on the worker pool
+ *
+ * Simulates the billing counter while a large export is formatted: a 5 ms
+ * "bill" tick runs throughout, and perf_hooks.monitorEventLoopDelay records
+ * how long the loop was blocked. Inline formatting stalls every tick until
+ * the export finishes; the worker pool keeps ticks on schedule.
+ *
+ * Usage: node benchmarks/eventLoopLag.js [rows=200000] [exports=4]
+ */
+
+process.env.WORKER_POOL_THRESHOLD = process.env.WORKER_POOL_THRESHOLD || '2000';
+
+const { monitorEventLoopDelay } = require('perf_hooks');
+const tasks = require('../src/workers/tasks');
+const { runTask } = require('../src/services/workerPool');
+
+const ROWS = Number(process.argv[2]) || 200000;
+const EXPORTS = Number(process.argv[3]) || 4;
+const TICK_MS = 5;
+
+function buildRows(count) {
+    return Array.from({ length: count }, (_, i) => [
+        `INV-${100000 + i}`,
+        '2026-04-01',
+        i % 3 === 0 ? 'Sharma Traders, Pune' : `Customer ${i}`,
+        i % 2 ? '27ABCDE1234F1Z5' : '',
+        (i * 13.37).toFixed(2),
+        'Cash',
+        i % 11 === 0 ? 'said "urgent"' : ''
+    ]);
+}
+
+async function measure(label, runExports) {
+    const histogram = monitorEventLoopDelay({ resolution: 1 });
+    let ticks = 0;
+    const ticker = setInterval(() => { ticks++; }, TICK_MS);
+
+    histogram.enable();
+    const start = process.hrtime.bigint();
+    await runExports();
+    const ms = Number(process.hrtime.bigint() - start) / 1e6;
+    histogram.disable();
+    clearInterval(ticker);
+
+    const lag = (v) => (v / 1e6).toFixed(1);
+    console.log(
+        `${label.padEnd(8)} | ${ms.toFixed(0).padStart(8)} | ${String(ticks).padStart(5)}/${String(Math.floor(ms / TICK_MS)).padEnd(5)} | ` +
+        `${lag(histogram.percentile(50)).padStart(7)} | ${lag(histogram.percentile(99)).padStart(7)} | ${lag(histogram.max).padStart(7)}`
+    );
+}
+
+async function main() {
+    const headers = ['Invoice', 'Date', 'Customer', 'GSTIN', 'Amount', 'Mode', 'Notes'];
+    const rows = buildRows(ROWS);
+    console.log(`${EXPORTS} concurrent exports × ${ROWS} rows, ${TICK_MS} ms billing tick\n`);
+    console.log('mode     | total ms | ticks/expected | p50 lag | p99 lag | max lag (ms)');
+
+    // Warm up the pool so thread start-up is not counted
+    await runTask('csv', { headers, rows: rows.slice(0, 10) }, { size: Infinity });
+
+    await measure('inline', async () => {
+        for (let i = 0; i < EXPORTS; i++) {
+            await new Promise(r => setImmediate(r));
+            tasks.csv({ headers, rows });
+        }
+    });
+
+    await measure('pool', () => Promise.all(
+        Array.from({ length: EXPORTS }, () => runTask('csv', { headers, rows }, { size: rows.length }))
+    ));
+}
+
+main().catch((err) => {
+    console.error(err.message);
+    process.exit(1);
+});
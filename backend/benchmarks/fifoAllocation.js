@@ -0,0 +1,59 @@
+#!/usr/bin/env node
+/**
+ * Micro-benchmark: FIFO allocation engine vs the nested order/payment loop
+ *
+ * The old reconstructFifo allocator scanned every payment from the start for
+ * each invoice (O(n·m)); utils/fifoAllocation walks both lists once (O(n+m)).
+ *
+ * Usage: node benchmarks/fifoAllocation.js
+ */
+
+const { allocateFifo } = require('../src/utils/fifoAllocation');
+
+const SIZES = [100, 1000, 10000, 50000];
+
+function nestedLoopAllocate(invoices, receipts) {
+    const allocations = [];
+    const remaining = {};
+    for (const r of receipts) remaining[r.id] = Number(r.amount);
+
+    for (const invoice of invoices) {
+        let open = Number(invoice.open);
+        if (open <= 0) continue;
+        for (const r of receipts) {
+            const available = remaining[r.id] || 0;
+            if (available <= 0.01) continue;
+            const amount = Math.round(Math.min(available, open) * 100) / 100;
+            if (amount <= 0) continue;
+            allocations.push({ paymentId: r.id, orderId: invoice.id, amount });
+            remaining[r.id] -= amount;
+            open -= amount;
+            if (open <= 0.01) break;
+        }
+    }
+    return allocations;
+}
+
+function build(count) {
+    const invoices = Array.from({ length: count }, (_, i) => ({ id: `inv-${i}`, open: 500 + (i % 7) * 125.5 }));
+    const receipts = Array.from({ length: count }, (_, i) => ({ id: `rcpt-${i}`, amount: 300 + (i % 5) * 210.25 }));
+    return { invoices, receipts };
+}
+
+function time(fn) {
+    const start = process.hrtime.bigint();
+    const result = fn();
+    return { ms: Number(process.hrtime.bigint() - start) / 1e6, result };
+}
+
+console.log('invoices=receipts | engine ms | nested ms | speed-up');
+for (const size of SIZES) {
+    const { invoices, receipts } = build(size);
+    const engine = time(() => allocateFifo(invoices, receipts));
+    const nested = size <= 10000 ? time(() => nestedLoopAllocate(invoices, receipts)) : null;
+    console.log(
+        `${String(size).padStart(17)} | ${engine.ms.toFixed(2).padStart(9)} | ` +
+        `${nested ? nested.ms.toFixed(2).padStart(9) : '  skipped'} | ` +
+        `${nested ? (nested.ms / engine.ms).toFixed(1) + 'x' : '-'}`
+    );
+}
@@ -0,0 +1,97 @@
+#!/usr/bin/env node
+/**
+ * Throughput benchmark: bulk past-sales import vs one POST /orders per bill
+ *
+ * Runs against a live server. Generates N bills dated yesterday, imports them
+ * via POST /api/orders/bulk (CSV) and, optionally, creates a smaller sample
+ * one bill at a time through POST /api/orders for comparison.
+ *
+ * NOTE: writes real orders — point it at a scratch database.
+ *
+ * Usage:
+ *   API_URL=http://localhost:9000/api TOKEN=<jwt> node benchmarks/orderImport.js [bills] [sequentialSample]
+ */
+
+const API_URL = process.env.API_URL || 'http://localhost:9000/api';
+const TOKEN = process.env.TOKEN;
+
+const BILLS = Number(process.argv[2]) || 2000;
+const SEQUENTIAL_SAMPLE = process.argv[3] !== undefined ? Number(process.argv[3]) : 100;
+const ITEMS_PER_BILL = 3;
+
+const yesterday = () => {
+    const d = new Date(Date.now() - 24 * 60 * 60 * 1000);
+    return `${String(d.getDate()).padStart(2, '0')}-${String(d.getMonth() + 1).padStart(2, '0')}-${d.getFullYear()}`;
+};
+
+function buildBill(i, orderDate) {
+    const orderItems = [];
+    for (let j = 0; j < ITEMS_PER_BILL; j++) {
+        orderItems.push({ name: `Bench Item ${j}`, quantity: 2, productPrice: 50, totalPrice: 100, type: 'non-weighted' });
+    }
+    return {
+        billRef: `BENCH-${i}`,
+        orderDate,
+        customerName: `Bench Customer ${i % 50}`,
+        paidAmount: i % 3 === 0 ? 0 : ITEMS_PER_BILL * 100,
+        orderItems
+    };
+}
+
+function toCSV(bills) {
+    const lines = ['billRef,orderDate,customerName,paidAmount,name,quantity,productPrice,totalPrice,type'];
+    for (const b of bills) {
+        for (const item of b.orderItems) {
+            lines.push([b.billRef, b.orderDate, b.customerName, b.paidAmount, item.name, item.quantity, item.productPrice, item.totalPrice, item.type].join(','));
+        }
+    }
+    return lines.join('\n');
+}
+
+async function post(path, body, contentType) {
+    const res = await fetch(`${API_URL}${path}`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${TOKEN}`, 'Content-Type': contentType },
+        body
+    });
+    const json = await res.json();
+    if (res.status >= 300) throw new Error(`${path} → ${res.status}: ${json.message}`);
+    return json;
+}
+
+async function main() {
+    if (!TOKEN) {
+        console.error('TOKEN env var is required (admin JWT)');
+        process.exit(1);
+    }
+
+    const orderDate = yesterday();
+    const bills = Array.from({ length: BILLS }, (_, i) => buildBill(i, orderDate));
+
+    console.log(`Bulk import: ${BILLS} bills x ${ITEMS_PER_BILL} items`);
+    let start = Date.now();
+    const result = await post('/orders/bulk', toCSV(bills), 'text/csv');
+    const bulkMs = Date.now() - start;
+    const bulkRate = (BILLS / bulkMs) * 1000;
+    console.log(`  ${bulkMs}ms end-to-end → ${bulkRate.toFixed(0)} bills/s (server: ${result.data.billsPerSecond} bills/s)`);
+    console.log(`  invoices ${result.data.firstInvoice} → ${result.data.lastInvoice}, ledger batches: ${result.data.ledgerBatches}`);
+
+    if (SEQUENTIAL_SAMPLE > 0) {
+        console.log(`Sequential POST /orders: ${SEQUENTIAL_SAMPLE} bills`);
+        start = Date.now();
+        for (let i = 0; i < SEQUENTIAL_SAMPLE; i++) {
+            const { billRef, ...bill } = buildBill(i, orderDate);
+            bill.subTotal = bill.total = ITEMS_PER_BILL * 100;
+            await post('/orders', JSON.stringify(bill), 'application/json');
+        }
+        const seqMs = Date.now() - start;
+        const seqRate = (SEQUENTIAL_SAMPLE / seqMs) * 1000;
+        console.log(`  ${seqMs}ms → ${seqRate.toFixed(0)} bills/s`);
+        console.log(`Speed-up: ${(bulkRate / seqRate).toFixed(1)}x`);
+    }
+}
+
+main().catch((err) => {
+    console.error(err.message);
+    process.exit(1);
+});
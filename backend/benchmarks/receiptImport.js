@@ -0,0 +1,73 @@
+#!/usr/bin/env node
+/**
+ * Throughput benchmark: bulk receipt import with FIFO allocation
+ *
+ * Runs against a live server. Imports N unpaid bills for a set of customers
+ * (via /orders/bulk), then imports N receipts for the same customers via
+ * POST /api/payments/bulk?allocate=fifo and reports receipts/second.
+ *
+ * NOTE: writes real orders and payments — point it at a scratch database.
+ *
+ * Usage:
+ *   API_URL=http://localhost:9000/api TOKEN=<jwt> node benchmarks/receiptImport.js [receipts] [customers]
+ */
+
+const API_URL = process.env.API_URL || 'http://localhost:9000/api';
+const TOKEN = process.env.TOKEN;
+
+const RECEIPTS = Number(process.argv[2]) || 5000;
+const CUSTOMERS = Number(process.argv[3]) || 200;
+
+const yesterday = () => {
+    const d = new Date(Date.now() - 24 * 60 * 60 * 1000);
+    return `${String(d.getDate()).padStart(2, '0')}-${String(d.getMonth() + 1).padStart(2, '0')}-${d.getFullYear()}`;
+};
+
+async function post(path, body, contentType) {
+    const res = await fetch(`${API_URL}${path}`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${TOKEN}`, 'Content-Type': contentType },
+        body
+    });
+    const json = await res.json();
+    if (res.status >= 300) throw new Error(`${path} → ${res.status}: ${json.message}`);
+    return json;
+}
+
+async function main() {
+    if (!TOKEN) {
+        console.error('TOKEN env var is required (admin JWT)');
+        process.exit(1);
+    }
+
+    const date = yesterday();
+    const runId = Date.now().toString(36);
+    const customer = (i) => `Bench Receipt ${runId} ${i % CUSTOMERS}`;
+
+    // Seed one unpaid ₹500 bill per receipt so FIFO has work to do
+    const billLines = ['billRef,orderDate,customerName,paidAmount,name,quantity,productPrice,totalPrice,type'];
+    for (let i = 0; i < RECEIPTS; i++) {
+        billLines.push(`B${i},${date},${customer(i)},0,Bench Item,5,100,500,non-weighted`);
+    }
+    console.log(`Seeding ${RECEIPTS} unpaid bills across ${CUSTOMERS} customers...`);
+    await post('/orders/bulk', billLines.join('\n'), 'text/csv');
+
+    // Receipts of ₹300 — each settles part of one bill and spills into the next
+    const receiptLines = ['paymentDate,partyName,amount,referenceNumber'];
+    for (let i = 0; i < RECEIPTS; i++) {
+        receiptLines.push(`${date},${customer(i)},300,UTR${runId}${i}`);
+    }
+
+    console.log(`Bulk receipt import: ${RECEIPTS} receipts (allocate=fifo)`);
+    const start = Date.now();
+    const result = await post('/payments/bulk?allocate=fifo', receiptLines.join('\n'), 'text/csv');
+    const ms = Date.now() - start;
+    const d = result.data;
+    console.log(`  ${ms}ms end-to-end → ${((RECEIPTS / ms) * 1000).toFixed(0)} receipts/s (server: ${d.receiptsPerSecond}/s)`);
+    console.log(`  allocations: ${d.allocationCount} (₹${d.allocatedAmount}), invoices settled: ${d.invoicesSettled}, on account: ₹${d.onAccountAmount}`);
+}
+
+main().catch((err) => {
+    console.error(err.message);
+    process.exit(1);
+});
@@ -0,0 +1,137 @@
+/**
+ * Stock movements under concurrent billing: correctness and throughput
+ *
+ * 1. Single-product contention — CONCURRENCY clients each remove 1 unit
+ *    OPS times from the same product. The old read-modify-write path
+ *    (read currentStock, compute in JS, write back) loses updates; the
+ *    atomic UPDATE ... RETURNING path must end at exactly start − total.
+ * 2. Bills — CONCURRENCY clients post 8-line bills over a small shared set of
+ *    products, one removeStock per line vs one applyMovements per bill.
+ *    Product sets overlap between clients; applyMovements locks in productId
+ *    order, so the bills queue instead of deadlocking.
+ *
+ * Creates scratch products named BENCH_STOCK_* and deletes them afterwards.
+ * NOTE: needs the database the server normally uses — point it at a scratch copy.
+ *
+ * Usage: node benchmarks/stockContention.js [concurrency=16] [ops=50]
+ */
+
+const assert = require('assert');
+const uuidv4 = require('uuid/v4');
+const db = require('../src/models');
+const DAO = require('../src/dao');
+const stock = require('../src/services/stock');
+
+const CONCURRENCY = Number(process.argv[2]) || 16;
+const OPS = Number(process.argv[3]) || 50;
+const PRODUCTS = 12;
+const LINES_PER_BILL = 8;
+const START_STOCK = 1e6;
+
+// The pre-atomic removeStock: three statements and a lost-update window
+async function legacyRemoveStock(productId, quantity, transactionData) {
+    const current = await DAO.stock.getStockByProductId(productId);
+    const previousStock = current?.currentStock || 0;
+    const newStock = Math.max(0, previousStock - quantity);
+    await DAO.stock.upsertStock(productId, { currentStock: newStock, lastUpdated: new Date() });
+    await DAO.stock.createStockTransaction({ productId, type: 'out', quantity, previousStock, newStock, ...transactionData });
+}
+
+async function createProducts(count) {
+    const products = Array.from({ length: count }, (_, i) => ({
+        id: uuidv4(), name: `BENCH_STOCK_${i}_${Date.now()}`, pricePerKg: 100, type: 'weighted'
+    }));
+    await db.product.bulkCreate(products);
+    await db.stock.bulkCreate(products.map(p => ({ productId: p.id, currentStock: START_STOCK, lastUpdated: new Date() })));
+    return products.map(p => p.id);
+}
+
+async function currentStock(productId) {
+    return Number((await DAO.stock.getStockByProductId(productId)).currentStock);
+}
+
+async function runClients(work) {
+    const start = process.hrtime.bigint();
+    await Promise.all(Array.from({ length: CONCURRENCY }, (_, client) => work(client)));
+    return Number(process.hrtime.bigint() - start) / 1e9;
+}
+
+const transactionData = { referenceType: 'benchmark', notes: 'stockContention', transactionDate: new Date().toISOString().slice(0, 10) };
+
+async function singleProduct(label, remove) {
+    const [productId] = await createProducts(1);
+    const seconds = await runClients(async () => {
+        for (let i = 0; i < OPS; i++) await remove(productId, 1, transactionData);
+    });
+    const expected = START_STOCK - CONCURRENCY * OPS;
+    const actual = await currentStock(productId);
+    console.log(`${label.padEnd(28)} ${String(Math.round(CONCURRENCY * OPS / seconds)).padStart(8)} ops/s   ` +
+        `final ${actual} (expected ${expected}, lost ${actual - expected})`);
+    return { productId, lost: actual - expected };
+}
+
+function billLines(client, bill, productIds) {
+    // Each bill takes LINES_PER_BILL products, starting at a different offset per client
+    return Array.from({ length: LINES_PER_BILL }, (_, line) => ({
+        productId: productIds[(client * 3 + bill + line) % productIds.length],
+        quantity: 0.5
+    }));
+}
+
+async function bills(label, post) {
+    const productIds = await createProducts(PRODUCTS);
+    const seconds = await runClients(async (client) => {
+        for (let bill = 0; bill < OPS; bill++) {
+            await db.sequelize.transaction((transaction) => post(billLines(client, bill, productIds), transaction));
+        }
+    });
+
+    const expected = new Map(productIds.map(id => [id, START_STOCK]));
+    for (let client = 0; client < CONCURRENCY; client++) {
+        for (let bill = 0; bill < OPS; bill++) {
+            for (const line of billLines(client, bill, productIds)) {
+                expected.set(line.productId, expected.get(line.productId) - line.quantity);
+            }
+        }
+    }
+    for (const [productId, value] of expected) {
+        assert.strictEqual(await currentStock(productId), value, `${label}: stock drifted for ${productId}`);
+    }
+    console.log(`${label.padEnd(28)} ${String(Math.round(CONCURRENCY * OPS / seconds)).padStart(8)} bills/s  stock exact`);
+    return productIds;
+}
+
+async function cleanup(productIds) {
+    await db.stockTransaction.destroy({ where: { productId: productIds } });
+    await db.stock.destroy({ where: { productId: productIds } });
+    await db.product.destroy({ where: { id: productIds } });
+}
+
+async function main() {
+    await db.sequelize.authenticate();
+    console.log(`${CONCURRENCY} concurrent clients × ${OPS} operations\n`);
+    const scratch = [];
+
+    const legacy = await singleProduct('read-modify-write (old)', legacyRemoveStock);
+    const atomic = await singleProduct('atomic UPDATE ... RETURNING', stock.removeStock);
+    scratch.push(legacy.productId, atomic.productId);
+    assert.strictEqual(atomic.lost, 0, 'atomic removeStock lost updates');
+
+    console.log('');
+    // Lines sorted by productId so the per-line path does not deadlock either
+    scratch.push(...await bills('bill, removeStock per line', async (lines, transaction) => {
+        const sorted = [...lines].sort((a, b) => (a.productId < b.productId ? -1 : 1));
+        for (const line of sorted) await stock.removeStock(line.productId, line.quantity, transactionData, transaction);
+    }));
+    scratch.push(...await bills('bill, applyMovements', (lines, transaction) =>
+        stock.applyMovements('out', lines, transactionData, transaction)));
+
+    await cleanup(scratch);
+}
+
+main()
+    .then(() => db.sequelize.close())
+    .catch((error) => {
+        console.error(error);
+        process.exit(1);
+    });
@@ -0,0 +1,71 @@
+#!/usr/bin/env node
+/**
+ * Bytes on the wire for the heaviest API responses, per content encoding
+ *
+ * Requests each endpoint with Accept-Encoding identity, gzip and br and counts
+ * the raw (still-encoded) bytes received, plus time to last byte. Run it
+ * against a build before and after a pipeline change to compare.
+ *
+ * Usage:
+ *   TOKEN=<jwt> node benchmarks/wireBytes.js [baseUrl=http://localhost:8001]
+ */
+
+const http = require('http');
+const https = require('https');
+
+const BASE = process.argv[2] || 'http://localhost:8001';
+const TOKEN = process.env.TOKEN;
+
+const ENDPOINTS = [
+    '/api/customers/with-balance',
+    '/api/orders?limit=500',
+    '/api/products',
+    '/api/export/tally/sales',
+    '/api/export/tally/outstanding'
+];
+const ENCODINGS = ['identity', 'gzip', 'br'];
+
+function fetchRaw(url, encoding) {
+    const client = url.startsWith('https') ? https : http;
+    const headers = { 'Accept-Encoding': encoding };
+    if (TOKEN) headers.Authorization = `Bearer ${TOKEN}`;
+
+    return new Promise((resolve, reject) => {
+        const start = process.hrtime.bigint();
+        client.get(url, { headers }, (res) => {
+            let bytes = 0;
+            res.on('data', chunk => { bytes += chunk.length; });
+            res.on('end', () => resolve({
+                status: res.statusCode,
+                bytes,
+                encoding: res.headers['content-encoding'] || 'identity',
+                ms: Number(process.hrtime.bigint() - start) / 1e6
+            }));
+        }).on('error', reject);
+    });
+}
+
+const kb = (n) => `${(n / 1024).toFixed(1)} KB`;
+
+async function main() {
+    if (!TOKEN) console.warn('TOKEN not set — authenticated endpoints will return 401\n');
+    console.log('endpoint                          | requested | sent as  | status |      size | ratio |     ms');
+
+    for (const endpoint of ENDPOINTS) {
+        let identityBytes = null;
+        for (const encoding of ENCODINGS) {
+            const r = await fetchRaw(`${BASE}${endpoint}`, encoding);
+            if (encoding === 'identity') identityBytes = r.bytes;
+            const ratio = identityBytes ? `${(identityBytes / r.bytes).toFixed(1)}x` : '-';
+            console.log(
+                `${endpoint.padEnd(33)} | ${encoding.padEnd(9)} | ${r.encoding.padEnd(8)} | ${String(r.status).padStart(6)} | ` +
+                `${kb(r.bytes).padStart(9)} | ${ratio.padStart(5)} | ${r.ms.toFixed(0).padStart(6)}`
+            );
+        }
+    }
+}
+
+main().catch((err) => {
+    console.error(err.message);
+    process.exit(1);
+});
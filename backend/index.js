@@ -3,109 +3,107 @@ const router = express.Router();
 const logger = require('morgan');
 const cors = require('cors');
 const db = require('./src/models');
-const compression = require('compression');
+const compression = require('./src/middleware/compression');
 const cookieParser = require('cookie-parser');
-const bodyParser = require('body-parser');
+const { parseBody, bodyErrorHandler } = require('./src/middleware/bodyLimits');
+const { requestMetrics, bindMetricsContext } = require('./src/middleware/requestMetrics');
+const { queryBudget } = require('./src/middleware/queryBudget');
 const path = require('path');
+const clusterMode = require('./src/cluster');
+
+const FRONTEND_BUILD = path.resolve(__dirname, '..', 'frontend', 'build');
 
 const app = express();
 
+// Order matters: compression must wrap every response, and bodies must be
+// parsed before the API router sees the request.
 app.use(cors());
 app.use(logger('dev'));
-
-app.use(bodyParser.json({ limit: '100mb'}));
-app.use(bodyParser.urlencoded({ limit: '100mb', extended: false }));
+app.use(compression());
+app.use(cookieParser());
 
 require('./src/routes')(router);
-app.use('/api', router);
-app.use(express.json({limit: '100mb'}));
-app.use(express.urlencoded({ limit: '100mb', extended: false, parameterLimit: 5000 }));
-app.use(cookieParser());
-app.use(compression());
+app.use('/api', requestMetrics, queryBudget, parseBody, bindMetricsContext, router, bodyErrorHandler);
 
-// Serve static files from the React app
-app.use(express.static(path.resolve(__dirname, '..', 'frontend', 'build')));
+// Unknown API routes get a JSON 404 instead of the React app
+app.use('/api', (req, res) => {
+  res.status(404).send({ status: 404, message: `Not found: ${req.method} ${req.originalUrl}` });
+});
+
+// Serve static files from the React app. Hashed build assets (static/js,
+// static/css, static/media) never change under the same name; index.html
+// must always be revalidated so a deploy is picked up immediately.
+app.use(express.static(FRONTEND_BUILD, {
+  index: false,
+  setHeaders: (res, filePath) => {
+    if (filePath.startsWith(path.join(FRONTEND_BUILD, 'static'))) {
+      res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+    } else {
+      res.setHeader('Cache-Control', 'no-cache');
+    }
+  }
+}));
 
 // The "catchall" handler: for any request that doesn't match one above, send back React's index.html file.
 app.get('*', (req, res) => {
-  if (!req.url.startsWith('/api')) {
-    res.sendFile(path.resolve(__dirname, '..', 'frontend', 'build', 'index.html'));
-  }
+  res.setHeader('Cache-Control', 'no-cache');
+  res.sendFile(path.join(FRONTEND_BUILD, 'index.html'));
 });
 
 const PORT = 8001;
 
-app.listen(PORT, async () => {
-  try {
-    await db.sequelize.authenticate();
-    console.log('Connection has been established successfully.');
-
-    await db.sequelize.sync({ force: false });
-    console.log('Database Synced Successfully');
-
-    // Safe column migrations — adds missing columns without breaking existing ones
-    try {
-      await db.sequelize.query(`ALTER TABLE customers ADD COLUMN IF NOT EXISTS notes TEXT DEFAULT NULL`);
-    } catch (e) { /* column may already exist */ }
-
-    // Add paymentMode column to orders (CASH/CREDIT) — prevents double-counting in Day Start
-    try {
-      await db.sequelize.query(`DO $$ BEGIN CREATE TYPE "enum_orders_paymentMode" AS ENUM ('CASH', 'CREDIT'); EXCEPTION WHEN duplicate_object THEN null; END $$;`);
-      await db.sequelize.query(`ALTER TABLE orders ADD COLUMN IF NOT EXISTS "paymentMode" "enum_orders_paymentMode" NOT NULL DEFAULT 'CREDIT'`);
+// One-off database boot tasks — run once, by the leader, before serving traffic
+async function bootDatabase() {
+  await db.sequelize.authenticate();
+  console.log('Connection has been established successfully.');
 
-      // Step 1: Fix misclassified orders — any order with linked customer receipts (non-PAY-TOGGLE) is CREDIT
-      const [fixedToCredit] = await db.sequelize.query(`
-        UPDATE orders SET "paymentMode" = 'CREDIT'
-        WHERE "paymentMode" = 'CASH'
-          AND "isDeleted" = false
-          AND EXISTS (
-            SELECT 1 FROM payments
-            WHERE payments."referenceId"::text = orders.id::text
-              AND payments."referenceType" = 'order'
-              AND payments."partyType" = 'customer'
-              AND (payments."isDeleted" = false OR payments."isDeleted" IS NULL)
-              AND (payments."paymentNumber" IS NULL OR payments."paymentNumber" NOT LIKE 'PAY-TOGGLE-%')
-          )
-        RETURNING id
-      `);
-      if (fixedToCredit.length > 0) console.log(`[MIGRATION] Fixed ${fixedToCredit.length} misclassified CASH→CREDIT orders (had linked receipts)`);
+  // Versioned schema migrations (src/migrations) — a cheap check when up to date
+  const { ran } = await require('./src/services/migrationRunner').migrate();
+  console.log(`Database schema up to date${ran.length ? ` (${ran.length} migrations applied)` : ''}`);
+}
 
-      // Step 2: Backfill remaining CREDIT→CASH for orders that are paid at POS with NO linked receipts
-      const [backfilled] = await db.sequelize.query(`
-        UPDATE orders SET "paymentMode" = 'CASH'
-        WHERE "paymentMode" = 'CREDIT'
-          AND "paymentStatus" = 'paid'
-          AND "paidAmount" >= "total"
-          AND "isDeleted" = false
-          AND NOT EXISTS (
-            SELECT 1 FROM payments
-            WHERE payments."referenceId"::text = orders.id::text
-              AND payments."referenceType" = 'order'
-              AND payments."partyType" = 'customer'
-              AND (payments."isDeleted" = false OR payments."isDeleted" IS NULL)
-              AND (payments."paymentNumber" IS NULL OR payments."paymentNumber" NOT LIKE 'PAY-TOGGLE-%')
-          )
-        RETURNING id
-      `);
-      if (backfilled.length > 0) console.log(`[MIGRATION] Backfilled ${backfilled.length} orders as CASH mode (paid at POS, no receipts)`);
-    } catch (e) { console.warn('[MIGRATION] paymentMode:', e.message); }
+// Leader-only duties: cron jobs, data backfills and the serial scale reader
+function startLeaderDuties() {
+  // Start scheduled jobs (async, non-blocking)
+  try {
+    require('./src/scheduler').init(db);
+  } catch (e) {
+    console.warn('[SCHEDULER] Skipped — ' + e.message);
+  }
 
-    // Add ORDER_PAYMENT_STATUS and CONFIRM_LINK to audit_logs action enum
-    try {
-      await db.sequelize.query("ALTER TYPE enum_audit_logs_action ADD VALUE IF NOT EXISTS 'ORDER_PAYMENT_STATUS'");
-      await db.sequelize.query("ALTER TYPE enum_audit_logs_action ADD VALUE IF NOT EXISTS 'CONFIRM_LINK'");
-    } catch (e) { /* values may already exist */ }
+  // Resumable data backfills, in the background (src/services/backfillJobs.js)
+  require('./src/services/backfillJobs').runPending();
 
-    // Start scheduled jobs (async, non-blocking)
+  const scaleReader = require('./src/services/scaleReader');
+  scaleReader.start();
+  if (clusterMode.isClustered()) {
+    scaleReader.onReading(reading => clusterMode.broadcast(scaleReader.toMessage(reading)));
+  }
+}
+
+if (clusterMode.isSupervisor()) {
+  bootDatabase()
+    .then(() => {
+      startLeaderDuties();
+      clusterMode.forkWorkers({
+        onWorkerOnline: (worker) => worker.send(require('./src/services/scaleReader').toMessage())
+      });
+    })
+    .catch((err) => {
+      console.error('Error during server startup:', err);
+      process.exit(1);
+    });
+} else {
+  app.listen(PORT, async () => {
     try {
-      require('./src/scheduler').init(db);
-    } catch (e) {
-      console.warn('[SCHEDULER] Skipped — ' + e.message);
+      if (clusterMode.isLeader()) {
+        await bootDatabase();
+        startLeaderDuties();
+      }
+      console.log(`Server started on port: ${PORT}${clusterMode.isClustered() ? ` (worker ${process.pid})` : ''}`);
+    } catch (err) {
+      console.error('Error during server startup:', err);
+      process.exit(1);
     }
-
-    console.log(`Server started on port: ${PORT}`);
-  } catch (err) {
-    console.error('Error during server startup:', err);
-    process.exit(1);
-  }
-});
+  });
+}
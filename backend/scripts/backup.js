@@ -0,0 +1,103 @@
+#!/usr/bin/env node
+/**
+ * Database backup CLI — the same subsystem as /api/data-audit/backups
+ *
+ *   full                 parallel directory-format dump (+ base backup when WAL archiving is on)
+ *   incremental          record the WAL archived since the last backup
+ *   auto                 full when one is due (BACKUP_FULL_EVERY_DAYS), incremental otherwise
+ *   verify [id]          re-check checksums (default: newest backup)
+ *   benchmark [id] [jobs...]
+ *                        time pg_restore into a scratch database, once per job count
+ *                        (default: newest full, BACKUP_JOBS)
+ *   list                 stored backups, newest first
+ *   prune                keep the newest BACKUP_RETAIN_FULLS fulls and their WAL
+ *   setup-wal            turn on WAL archiving into BACKUP_DIR/wal (superuser; needs a restart)
+ *
+ * Usage: node scripts/backup.js <command> [args]
+ */
+
+const fs = require('fs');
+const db = require('../src/models');
+const backups = require('../src/services/dbBackup');
+
+const [command = 'auto', ...args] = process.argv.slice(2);
+
+const mb = (bytes) => `${(bytes / 1048576).toFixed(1)} MB`;
+const seconds = (ms) => `${(ms / 1000).toFixed(1)}s`;
+
+const newest = (type) => {
+    const found = backups.listBackups().find(b => !type || b.type === type);
+    if (!found) throw new Error(`No ${type ? `${type} ` : ''}backup found in ${backups.BACKUP_DIR}`);
+    return found.id;
+};
+
+function printBackup(b) {
+    const detail = b.type === 'full'
+        ? `${b.compression}, ${b.jobs} jobs, dump ${seconds(b.dumpMs)}${b.base ? `, base ${seconds(b.base.durationMs)}` : ', no base backup'}`
+        : `${b.fileCount} WAL segments on ${b.parentId}`;
+    console.log(`${b.id}  ${b.type.padEnd(11)} ${mb(b.bytes).padStart(10)}  ${seconds(b.durationMs).padStart(7)}  ${detail}`);
+}
+
+async function setupWal() {
+    const wal = await backups.walSettings();
+    fs.mkdirSync(backups.WAL_DIR, { recursive: true });
+    await db.sequelize.query("ALTER SYSTEM SET wal_level = 'replica'");
+    await db.sequelize.query("ALTER SYSTEM SET archive_mode = 'on'");
+    await db.sequelize.query(`ALTER SYSTEM SET archive_command = '${wal.recommended.archive_command.replace(/'/g, "''")}'`);
+    await db.sequelize.query('SELECT pg_reload_conf()');
+
+    console.log(`WAL archive: ${backups.WAL_DIR} (must be writable by the postgres user)`);
+    console.log(`restore_command for point-in-time recovery: ${wal.recommended.restore_command}`);
+    if (wal.archiveMode === 'off' || wal.walLevel === 'minimal') {
+        console.log('Restart PostgreSQL for archive_mode/wal_level to take effect, then take a full backup.');
+    } else {
+        console.log('archive_command reloaded. Take a full backup next.');
+    }
+}
+
+async function main() {
+    switch (command) {
+        case 'full':
+        case 'incremental':
+        case 'auto':
+            printBackup(await backups.createBackup(command));
+            break;
+        case 'verify': {
+            const result = await backups.verifyBackup(args[0] || newest());
+            console.log(`${result.id}: ${result.ok ? 'OK' : 'FAILED'} (${result.filesChecked} files)`);
+            result.problems.forEach(problem => console.log(`  ${problem}`));
+            if (!result.ok) process.exitCode = 1;
+            break;
+        }
+        case 'benchmark': {
+            const id = args[0] && !/^\d+$/.test(args[0]) ? args.shift() : newest('full');
+            const jobCounts = args.length ? args.map(Number) : [backups.JOBS];
+            for (const jobs of jobCounts) {
+                const r = await backups.benchmarkRestore(id, { jobs });
+                console.log(`${id}  jobs=${String(jobs).padEnd(2)}  ${seconds(r.durationMs).padStart(7)}  `
+                    + `${mb(r.dumpBytes)} dump → ${mb(r.restoredBytes)} restored  (${r.restoredMBps} MB/s)`);
+            }
+            break;
+        }
+        case 'list':
+            backups.listBackups().forEach(printBackup);
+            break;
+        case 'prune': {
+            const result = await backups.prune();
+            console.log(`Kept ${result.kept.length} fulls; removed ${result.removed.length} backups and ${result.walSegmentsRemoved} WAL segments`);
+            break;
+        }
+        case 'setup-wal':
+            await setupWal();
+            break;
+        default:
+            throw new Error(`Unknown command "${command}" — see the header of scripts/backup.js`);
+    }
+}
+
+main()
+    .catch((err) => {
+        console.error(`ERROR: ${err.message}`);
+        process.exitCode = 1;
+    })
+    .finally(() => db.sequelize.close());
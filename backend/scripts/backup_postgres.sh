@@ -1,30 +1,34 @@
 #!/bin/bash
 # PostgreSQL Backup Script
-BACKUP_DIR="/app/backups/postgres"
-TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-BACKUP_FILE="$BACKUP_DIR/backup_$TIMESTAMP.sql.gz"
-RETENTION_DAYS=7
+# Full parallel dump when one is due, WAL incremental otherwise (see scripts/backup.js),
+# then checksum verification and retention.
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+export BACKUP_DIR="${BACKUP_DIR:-/app/backups/postgres}"
+export DB_USER="${DB_USER:-Rishabh}"
+export PASSWORD="${PASSWORD:-yttriumR}"
+export DATABASE_NAME="${DATABASE_NAME:-customerInvoice}"
+TYPE="${1:-auto}"
 
-echo "Starting PostgreSQL backup at $(date)"
+echo "Starting PostgreSQL backup ($TYPE) at $(date)"
 
-# Create backup
-PGPASSWORD=yttriumR pg_dump -h 127.0.0.1 -U Rishabh customerInvoice | gzip > "$BACKUP_FILE"
+cd "$SCRIPT_DIR/.." || exit 1
 
-if [ $? -eq 0 ]; then
-    echo "Backup created: $BACKUP_FILE"
-    echo "Size: $(du -h "$BACKUP_FILE" | cut -f1)"
-else
+if ! node scripts/backup.js "$TYPE"; then
     echo "ERROR: Backup failed!"
     exit 1
 fi
 
-# Remove old backups
-find "$BACKUP_DIR" -name "backup_*.sql.gz" -mtime +$RETENTION_DAYS -delete
-echo "Cleaned up backups older than $RETENTION_DAYS days"
+if ! node scripts/backup.js verify; then
+    echo "ERROR: Backup failed verification!"
+    exit 1
+fi
+
+# Keep the newest BACKUP_RETAIN_FULLS fulls (default 7) and the WAL they need
+node scripts/backup.js prune
 
 # List recent backups
 echo ""
 echo "Recent backups:"
-ls -lht "$BACKUP_DIR"/*.sql.gz 2>/dev/null | head -5
+node scripts/backup.js list | head -10
 
 echo "Backup completed at $(date)"
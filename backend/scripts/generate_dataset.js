@@ -0,0 +1,583 @@
+#!/usr/bin/env node
+/**
+ * Synthetic shop history for performance testing
+ *
+ * Generates a multi-year history the way the POS would have written it:
+ * customers (Zipf-skewed — a few regulars place most bills), products,
+ * suppliers, bills with line items, cash and credit sales, receipts with
+ * allocations to their bills, payment-status toggles, purchase bills with
+ * supplier payments, the matching journal batches / ledger entries, and the
+ * audit trail. Every journal batch balances and every order's
+ * paidAmount / dueAmount / paymentStatus agrees with its receipts, so
+ * reports and reconciliation run against it unchanged.
+ *
+ * Rows are built in memory per chunk and written with one
+ * `INSERT ... SELECT * FROM unnest($1::type[], ...)` per table — one round
+ * trip per table per chunk, no per-row statements. A million bills load in
+ * a few minutes on a laptop Postgres.
+ *
+ * The output is deterministic for a given --seed and --end date.
+ *
+ * Usage:
+ *   node scripts/generate_dataset.js [--orders=200000] [--years=3] [--customers=N]
+ *        [--suppliers=25] [--seed=42] [--end=YYYY-MM-DD] [--chunk=5000] [--truncate]
+ *
+ *   --truncate  empty the transactional tables first (refused in production)
+ */
+
+const db = require('../src/models');
+const { migrate } = require('../src/services/migrationRunner');
+const LedgerService = require('../src/services/ledgerService');
+
+const args = Object.fromEntries(process.argv.slice(2).map((arg) => {
+    const [key, value] = arg.replace(/^--/, '').split('=');
+    return [key, value === undefined ? true : value];
+}));
+
+const ORDERS = Number(args.orders) || 200000;
+const YEARS = Number(args.years) || 3;
+const CUSTOMERS = Number(args.customers) || Math.max(200, Math.round(ORDERS / 40));
+const SUPPLIERS = Number(args.suppliers) || 25;
+const SEED = Number(args.seed) || 42;
+const CHUNK = Number(args.chunk) || 5000;
+const END = args.end ? new Date(`${args.end}T00:00:00Z`) : new Date(new Date().toISOString().slice(0, 10) + 'T00:00:00Z');
+const DAY_MS = 24 * 60 * 60 * 1000;
+const IST_OPEN_UTC_MS = (3 * 60 + 30) * 60 * 1000; // 09:00 IST
+const SHOP_HOURS_MS = 12 * 60 * 60 * 1000;
+
+// Tables emptied by --truncate, and the insert order (parents first)
+const TABLES = [
+    'orders', 'orderItems', 'payments', 'receipt_allocations',
+    'purchaseBills', 'purchaseItems', 'journal_batches', 'ledger_entries', 'audit_logs'
+];
+const MASTER_TABLES = ['customers', 'suppliers', 'products'];
+
+const COLUMNS = {
+    customers: ['id', 'name', 'mobile', 'address', 'openingBalance', 'currentBalance', 'createdAt', 'updatedAt'],
+    suppliers: ['id', 'name', 'mobile', 'address', 'gstin', 'openingBalance', 'currentBalance', 'createdAt', 'updatedAt'],
+    products: ['id', 'name', 'pricePerKg', 'type', 'createdAt', 'updatedAt'],
+    accounts: ['id', 'code', 'name', 'type', 'subType', 'parentId', 'partyId', 'partyType', 'isActive', 'isSystemAccount', 'createdAt', 'updatedAt'],
+    orders: ['id', 'orderNumber', 'orderDate', 'customerName', 'customerMobile', 'placeOfSupply', 'subTotal', 'total', 'tax', 'taxPercent',
+        'paidAmount', 'dueAmount', 'paymentStatus', 'paymentMode', 'customerId', 'createdBy', 'createdByName', 'modifiedByName', 'isDeleted',
+        'createdAt', 'updatedAt'],
+    orderItems: ['id', 'name', 'quantity', 'productPrice', 'totalPrice', 'type', 'sortOrder', 'orderId', 'createdAt', 'updatedAt'],
+    payments: ['id', 'paymentNumber', 'paymentDate', 'partyId', 'partyName', 'partyType', 'amount', 'referenceType', 'referenceId',
+        'referenceNumber', 'isDeleted', 'createdAt', 'updatedAt'],
+    receipt_allocations: ['id', 'paymentId', 'orderId', 'amount', 'allocatedBy', 'allocatedByName', 'isDeleted', 'createdAt', 'updatedAt'],
+    purchaseBills: ['id', 'billNumber', 'billDate', 'supplierId', 'subTotal', 'tax', 'taxPercent', 'total', 'paidAmount', 'dueAmount',
+        'paymentStatus', 'isDeleted', 'createdAt', 'updatedAt'],
+    purchaseItems: ['id', 'purchaseBillId', 'name', 'quantity', 'price', 'totalPrice', 'type', 'createdAt', 'updatedAt'],
+    journal_batches: ['id', 'batchNumber', 'referenceType', 'referenceId', 'description', 'transactionDate', 'totalDebit', 'totalCredit',
+        'isBalanced', 'isPosted', 'isReversed', 'createdBy', 'createdAt', 'updatedAt'],
+    ledger_entries: ['id', 'batchId', 'accountId', 'debit', 'credit', 'narration', 'createdAt', 'updatedAt'],
+    audit_logs: ['id', 'userId', 'userName', 'userRole', 'action', 'entityType', 'entityId', 'entityName', 'oldValues', 'newValues',
+        'description', 'createdAt', 'updatedAt']
+};
+
+const BATCH_PREFIX = {
+    INVOICE: 'JV-INV', PAYMENT: 'JV-PAY', PURCHASE: 'JV-PUR', INVOICE_CASH: 'JV-CSH', PAYMENT_TOGGLE: 'JV-TGL'
+};
+
+const FIRST_NAMES = ['Ramesh', 'Suresh', 'Anita', 'Priya', 'Mahesh', 'Sunita', 'Vijay', 'Kavita', 'Rajesh', 'Meena', 'Sanjay', 'Asha',
+    'Prakash', 'Rekha', 'Anil', 'Lata', 'Deepak', 'Neha', 'Ganesh', 'Pooja', 'Sachin', 'Swati', 'Nitin', 'Varsha'];
+const LAST_NAMES = ['Patil', 'Shah', 'Joshi', 'Kulkarni', 'Deshmukh', 'Jain', 'Mehta', 'Pawar', 'Shinde', 'Gupta', 'Agarwal', 'More',
+    'Jadhav', 'Kale', 'Bhosale', 'Chavan'];
+const TRADE_SUFFIXES = ['Traders', 'Steel Centre', 'Enterprises', 'Caterers', 'Hotel', 'Mess', 'Bhandar', 'Stores'];
+const PRODUCT_NAMES = ['Thali', 'Vati', 'Glass', 'Tope', 'Patila', 'Kadai', 'Tiffin', 'Dabba', 'Parat', 'Bucket', 'Ladle', 'Spoon Set',
+    'Plate', 'Cooker', 'Handi', 'Tawa', 'Jug', 'Lota', 'Kalash', 'Pooja Thali'];
+const PRODUCT_GRADES = ['Regular', 'Heavy', 'Mirror', 'Matt'];
+
+// ── Deterministic randomness ────────────────────────────────────────────────
+
+function mulberry32(seed) {
+    let a = seed >>> 0;
+    return () => {
+        a = (a + 0x6D2B79F5) >>> 0;
+        let t = a;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+const random = mulberry32(SEED);
+const int = (min, max) => min + Math.floor(random() * (max - min + 1));
+const pick = (list) => list[Math.floor(random() * list.length)];
+const chance = (p) => random() < p;
+const round2 = (n) => Math.round(n * 100) / 100;
+const round3 = (n) => Math.round(n * 1000) / 1000;
+
+const hex = (n, width) => n.toString(16).padStart(width, '0');
+function uuid() {
+    const a = (random() * 4294967296) >>> 0;
+    const b = (random() * 4294967296) >>> 0;
+    const c = (random() * 4294967296) >>> 0;
+    const d = (random() * 4294967296) >>> 0;
+    return `${hex(a, 8)}-${hex(b >>> 16, 4)}-4${hex(b & 0xfff, 3)}-${hex(0x8000 | (c >>> 18), 4)}-${hex(c & 0xffff, 4)}${hex(d, 8)}`;
+}
+
+/**
+ * Zipf sampler over ranks 0..n-1: rank k is drawn with weight 1 / (k+1)^s.
+ */
+function zipf(n, s) {
+    const cumulative = new Float64Array(n);
+    let total = 0;
+    for (let k = 0; k < n; k++) {
+        total += 1 / Math.pow(k + 1, s);
+        cumulative[k] = total;
+    }
+    return () => {
+        const target = random() * total;
+        let lo = 0;
+        let hi = n - 1;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (cumulative[mid] < target) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    };
+}
+
+// ── Dates ───────────────────────────────────────────────────────────────────
+
+const pad2 = (n) => String(n).padStart(2, '0');
+const ddmmyyyy = (d) => `${pad2(d.getUTCDate())}-${pad2(d.getUTCMonth() + 1)}-${d.getUTCFullYear()}`;
+const isoDate = (d) => d.toISOString().slice(0, 10);
+const financialYear = (d) => {
+    const start = d.getUTCMonth() >= 3 ? d.getUTCFullYear() : d.getUTCFullYear() - 1;
+    return `${start}-${pad2((start + 1) % 100)}`;
+};
+
+/**
+ * Orders per day: weekends busier, festive season (Oct–Nov) and wedding
+ * season (Apr–May) busier still, and the shop grows ~20% a year. Counts are
+ * apportioned from cumulative weights so they sum to exactly `total`.
+ */
+function dailyOrderCounts(days, total) {
+    const weights = days.map((day, i) => {
+        const weekday = day.getUTCDay();
+        const month = day.getUTCMonth();
+        let w = weekday === 0 ? 1.4 : weekday === 6 ? 1.2 : 1;
+        if (month === 9 || month === 10) w *= 1.6;
+        if (month === 3 || month === 4) w *= 1.25;
+        return w * (1 + 0.2 * (i / 365));
+    });
+    const sum = weights.reduce((a, b) => a + b, 0);
+    const counts = [];
+    let cumulative = 0;
+    let assigned = 0;
+    for (const w of weights) {
+        cumulative += w;
+        const upTo = Math.round((cumulative / sum) * total);
+        counts.push(upTo - assigned);
+        assigned = upTo;
+    }
+    return counts;
+}
+
+// ── Chunked unnest writer ───────────────────────────────────────────────────
+
+class ChunkWriter {
+    constructor(client) {
+        this.client = client;
+        this.types = new Map();
+        this.rows = {};
+        this.totals = {};
+    }
+
+    add(table, row) {
+        (this.rows[table] = this.rows[table] || []).push(row);
+    }
+
+    async columnTypes(table) {
+        if (!this.types.has(table)) {
+            const { rows } = await this.client.query(`
+                SELECT a.attname AS name, format_type(a.atttypid, a.atttypmod) AS type
+                FROM pg_attribute a
+                WHERE a.attrelid = $1::regclass AND a.attnum > 0 AND NOT a.attisdropped
+            `, [`"${table}"`]);
+            this.types.set(table, new Map(rows.map(r => [r.name, r.type])));
+        }
+        return this.types.get(table);
+    }
+
+    async insert(table, rows) {
+        const columns = COLUMNS[table];
+        const types = await this.columnTypes(table);
+        const missing = columns.filter(name => !types.has(name));
+        if (missing.length) throw new Error(`${table} is missing column(s) ${missing.join(', ')} — run the migrations first`);
+        const arrays = columns.map((_, c) => rows.map(row => row[c]));
+        const unnest = columns.map((name, c) => `$${c + 1}::${types.get(name)}[]`).join(', ');
+        await this.client.query(
+            `INSERT INTO "${table}" (${columns.map(c => `"${c}"`).join(', ')}) SELECT * FROM unnest(${unnest})`,
+            arrays
+        );
+        this.totals[table] = (this.totals[table] || 0) + rows.length;
+    }
+
+    async flush(order = Object.keys(this.rows)) {
+        await this.client.query('BEGIN');
+        try {
+            for (const table of order) {
+                if (this.rows[table] && this.rows[table].length) await this.insert(table, this.rows[table]);
+            }
+            await this.client.query('COMMIT');
+        } catch (error) {
+            await this.client.query('ROLLBACK');
+            throw error;
+        }
+        this.rows = {};
+    }
+}
+
+// ── Generators ──────────────────────────────────────────────────────────────
+
+function buildMasters(writer, ctx) {
+    const created = new Date(ctx.days[0].getTime() - 30 * DAY_MS).toISOString();
+
+    for (let i = 0; i < CUSTOMERS; i++) {
+        // Low ranks are the regulars — give them trade names
+        const name = i < CUSTOMERS * 0.02
+            ? `${pick(LAST_NAMES)} ${pick(TRADE_SUFFIXES)} ${i + 1}`
+            : `${pick(FIRST_NAMES)} ${pick(LAST_NAMES)} ${i + 1}`;
+        const customer = { id: uuid(), name, mobile: `9${String(100000000 + i * 7).padStart(9, '0')}`, accountId: uuid(), regular: i < CUSTOMERS * 0.02 };
+        ctx.customers.push(customer);
+        writer.add('customers', [customer.id, name, customer.mobile, `${int(1, 999)}, Market Road`, 0, 0, created, created]);
+        writer.add('accounts', [customer.accountId, `1300-${String(ctx.nextCustomerCode++).padStart(3, '0')}`, name, 'ASSET',
+            'RECEIVABLE', ctx.system['1300'], customer.id, 'customer', true, false, created, created]);
+    }
+
+    for (let i = 0; i < SUPPLIERS; i++) {
+        const name = `${pick(LAST_NAMES)} Metal Works ${i + 1}`;
+        const supplier = { id: uuid(), name, accountId: uuid(), bills: 0 };
+        ctx.suppliers.push(supplier);
+        writer.add('suppliers', [supplier.id, name, `8${String(200000000 + i * 13).padStart(9, '0')}`, 'Industrial Estate',
+            `27ABCDE${String(1000 + i).slice(-4)}F1Z${i % 10}`, 0, 0, created, created]);
+        writer.add('accounts', [supplier.accountId, `2100-${String(ctx.nextSupplierCode++).padStart(3, '0')}`, name, 'LIABILITY',
+            'PAYABLE', ctx.system['2100'], supplier.id, 'supplier', true, false, created, created]);
+    }
+
+    for (const base of PRODUCT_NAMES) {
+        for (const grade of PRODUCT_GRADES) {
+            const weighted = chance(0.7);
+            const product = {
+                id: uuid(),
+                name: `${base} ${grade}`,
+                type: weighted ? 'weighted' : 'non-weighted',
+                price: weighted ? int(24, 180) * 5 : int(4, 500) * 5
+            };
+            ctx.products.push(product);
+            writer.add('products', [product.id, product.name, product.price, product.type, created, created]);
+        }
+    }
+}
+
+function journal(writer, ctx, { referenceType, referenceId, description, at, amount, debitAccount, creditAccount, narration }) {
+    const batchId = uuid();
+    const timestamp = at.toISOString();
+    const batchNumber = `${BATCH_PREFIX[referenceType]}-${isoDate(at).replace(/-/g, '')}-${(ctx.batchSeq++).toString(36).toUpperCase().padStart(6, '0')}`;
+    writer.add('journal_batches', [batchId, batchNumber, referenceType, referenceId, description, isoDate(at), amount, amount,
+        true, true, false, ctx.admin.id, timestamp, timestamp]);
+    writer.add('ledger_entries', [uuid(), batchId, debitAccount, amount, 0, narration, timestamp, timestamp]);
+    writer.add('ledger_entries', [uuid(), batchId, creditAccount, 0, amount, narration, timestamp, timestamp]);
+}
+
+function audit(writer, ctx, { action, entityType, entityId, entityName, oldValues = null, newValues = null, description, at }) {
+    const timestamp = at.toISOString();
+    writer.add('audit_logs', [uuid(), ctx.admin.id, ctx.admin.name, 'admin', action, entityType, entityId, entityName,
+        oldValues && JSON.stringify(oldValues), newValues && JSON.stringify(newValues), description, timestamp, timestamp]);
+}
+
+function receipt(writer, ctx, { customer, order, amount, at }) {
+    const id = uuid();
+    const paymentNumber = `PAY-${(ctx.paymentSeq++).toString(16).toUpperCase().padStart(8, '0')}`;
+    const timestamp = at.toISOString();
+    writer.add('payments', [id, paymentNumber, ddmmyyyy(at), customer.id, customer.name, 'customer', amount, 'order', order.id,
+        order.orderNumber, false, timestamp, timestamp]);
+    writer.add('receipt_allocations', [uuid(), id, order.id, amount, ctx.admin.id, ctx.admin.name, false, timestamp, timestamp]);
+    journal(writer, ctx, {
+        referenceType: 'PAYMENT', referenceId: id, description: `Receipt ${paymentNumber} — ${customer.name}`, at, amount,
+        debitAccount: ctx.system['1100'], creditAccount: customer.accountId, narration: `Receipt ${paymentNumber}`
+    });
+    audit(writer, ctx, {
+        action: 'CREATE', entityType: 'PAYMENT', entityId: id, entityName: paymentNumber,
+        newValues: { amount, partyName: customer.name, referenceNumber: order.orderNumber },
+        description: `Receipt ${paymentNumber} of ${amount} against ${order.orderNumber}`, at
+    });
+}
+
+function generateOrder(writer, ctx, day, at) {
+    const customer = ctx.customers[ctx.sampleCustomer()];
+    const fy = financialYear(day);
+    const number = (ctx.invoiceNumbers[fy] || 0) + 1;
+    ctx.invoiceNumbers[fy] = number;
+
+    const order = { id: uuid(), orderNumber: `INV/${fy}/${String(number).padStart(4, '0')}` };
+    const timestamp = at.toISOString();
+
+    let subTotal = 0;
+    const itemCount = pick([1, 1, 2, 2, 2, 3, 3, 4, 5, 6, 8]);
+    for (let i = 0; i < itemCount; i++) {
+        const product = pick(ctx.products);
+        const quantity = product.type === 'weighted' ? round3(0.2 + random() * 4.8) : int(1, 6);
+        const totalPrice = round2(quantity * product.price);
+        subTotal += totalPrice;
+        writer.add('orderItems', [uuid(), product.name, quantity, product.price, totalPrice, product.type, i, order.id, timestamp, timestamp]);
+    }
+    subTotal = round2(subTotal);
+    const taxPercent = pick([0, 0, 0, 0, 0, 0, 0, 5, 5, 18]);
+    const tax = round2(subTotal * taxPercent / 100);
+    const total = round2(subTotal + tax);
+
+    // Regulars buy on credit far more often than walk-in trade
+    const paymentMode = chance(customer.regular ? 0.7 : 0.35) ? 'CREDIT' : 'CASH';
+    let paidAmount = paymentMode === 'CASH' ? total : 0;
+    let dueAmount = total - paidAmount;
+    let paymentStatus = paymentMode === 'CASH' ? 'paid' : 'unpaid';
+    let modifiedByName = null;
+    let toggled = false;
+
+    journal(writer, ctx, {
+        referenceType: 'INVOICE', referenceId: order.id, description: `Invoice ${order.orderNumber} — ${customer.name}`, at, amount: total,
+        debitAccount: customer.accountId, creditAccount: ctx.system['4100'], narration: `Invoice ${order.orderNumber}`
+    });
+    if (paymentMode === 'CASH') {
+        journal(writer, ctx, {
+            referenceType: 'INVOICE_CASH', referenceId: order.id, description: `Cash received for Invoice ${order.orderNumber} — ${customer.name}`,
+            at, amount: total, debitAccount: ctx.system['1100'], creditAccount: customer.accountId, narration: `Cash: Invoice ${order.orderNumber}`
+        });
+    }
+    audit(writer, ctx, {
+        action: 'CREATE', entityType: 'ORDER', entityId: order.id, entityName: order.orderNumber,
+        newValues: { orderNumber: order.orderNumber, customerName: customer.name, total, paymentMode },
+        description: `Created bill ${order.orderNumber} for ${customer.name}`, at
+    });
+
+    if (paymentMode === 'CREDIT') {
+        // Settlement happens later; anything dated after --end has not happened yet
+        const fate = random();
+        const later = (maxDays) => new Date(at.getTime() + int(1, maxDays) * DAY_MS + int(0, SHOP_HOURS_MS / 60000) * 60000);
+        if (fate < 0.55) {
+            const when = later(45);
+            if (when < ctx.end) {
+                receipt(writer, ctx, { customer, order, amount: total, at: when });
+                paidAmount = total;
+            }
+        } else if (fate < 0.75) {
+            let when = at;
+            for (let i = int(1, 2); i > 0; i--) {
+                when = new Date(when.getTime() + int(3, 40) * DAY_MS);
+                if (when >= ctx.end) break;
+                const amount = round2(total * (0.3 + random() * 0.15));
+                receipt(writer, ctx, { customer, order, amount, at: when });
+                paidAmount = round2(paidAmount + amount);
+            }
+        } else if (fate < 0.8) {
+            const when = later(30);
+            if (when < ctx.end) {
+                // Toggle marks the bill paid without a receipt (paidAmount unchanged)
+                journal(writer, ctx, {
+                    referenceType: 'PAYMENT_TOGGLE', referenceId: order.id, at: when, amount: total,
+                    description: `Payment received (toggled) for Invoice ${order.orderNumber} — ${customer.name} [by ${ctx.admin.name}]`,
+                    debitAccount: ctx.system['1100'], creditAccount: customer.accountId, narration: `Payment received: Invoice ${order.orderNumber}`
+                });
+                audit(writer, ctx, {
+                    action: 'ORDER_PAYMENT_STATUS', entityType: 'ORDER', entityId: order.id, entityName: order.orderNumber,
+                    oldValues: { paymentStatus: 'unpaid', paidAmount: 0, dueAmount: total, paymentMode },
+                    newValues: { paymentStatus: 'paid', paidAmount: 0, dueAmount: 0, paymentMode },
+                    description: `Toggle: ${order.orderNumber} | unpaid → paid | paymentMode: ${paymentMode} | by ${ctx.admin.name}`, at: when
+                });
+                modifiedByName = ctx.admin.name;
+                toggled = true;
+                ctx.toggles++;
+            }
+        }
+        dueAmount = toggled ? 0 : round2(total - paidAmount);
+        paymentStatus = dueAmount <= 0 ? 'paid' : paidAmount > 0 ? 'partial' : 'unpaid';
+    }
+
+    writer.add('orders', [order.id, order.orderNumber, ddmmyyyy(day), customer.name, customer.mobile, '27-Maharashtra', subTotal, total,
+        tax, taxPercent, paidAmount, dueAmount, paymentStatus, paymentMode, customer.id, ctx.admin.id, ctx.admin.name, modifiedByName,
+        false, timestamp, timestamp]);
+}
+
+function generatePurchase(writer, ctx, day) {
+    const supplier = pick(ctx.suppliers);
+    const at = new Date(day.getTime() + IST_OPEN_UTC_MS + int(0, 120) * 60000);
+    const timestamp = at.toISOString();
+    const bill = { id: uuid(), billNumber: `PB-${isoDate(day).replace(/-/g, '')}-${++supplier.bills}-${ctx.suppliers.indexOf(supplier) + 1}` };
+
+    let subTotal = 0;
+    for (let i = int(1, 5); i > 0; i--) {
+        const product = pick(ctx.products);
+        const quantity = product.type === 'weighted' ? int(20, 200) : int(10, 100);
+        const price = round2(product.price * 0.75);
+        const totalPrice = round2(quantity * price);
+        subTotal += totalPrice;
+        writer.add('purchaseItems', [uuid(), bill.id, product.name, quantity, price, totalPrice, product.type, timestamp, timestamp]);
+    }
+    subTotal = round2(subTotal);
+    const tax = round2(subTotal * 0.18);
+    const total = round2(subTotal + tax);
+    const fate = random();
+    const paidAmount = fate < 0.5 ? total : fate < 0.7 ? round2(total * 0.5) : 0;
+    const dueAmount = round2(total - paidAmount);
+
+    writer.add('purchaseBills', [bill.id, bill.billNumber, ddmmyyyy(day), supplier.id, subTotal, tax, 18, total, paidAmount, dueAmount,
+        dueAmount <= 0 ? 'paid' : paidAmount > 0 ? 'partial' : 'unpaid', false, timestamp, timestamp]);
+    journal(writer, ctx, {
+        referenceType: 'PURCHASE', referenceId: bill.id, description: `Purchase Bill ${bill.billNumber} — ${supplier.name}`, at, amount: total,
+        debitAccount: ctx.system['5300'], creditAccount: supplier.accountId, narration: `Purchase Bill ${bill.billNumber}`
+    });
+
+    if (paidAmount > 0) {
+        const paymentId = uuid();
+        const paymentNumber = `PAY-${(ctx.paymentSeq++).toString(16).toUpperCase().padStart(8, '0')}`;
+        writer.add('payments', [paymentId, paymentNumber, ddmmyyyy(day), supplier.id, supplier.name, 'supplier', paidAmount, 'purchase',
+            bill.id, bill.billNumber, false, timestamp, timestamp]);
+        journal(writer, ctx, {
+            referenceType: 'PAYMENT', referenceId: paymentId, description: `Payment ${paymentNumber} — ${supplier.name}`, at, amount: paidAmount,
+            debitAccount: supplier.accountId, creditAccount: ctx.system['1100'], narration: `Payment for ${bill.billNumber}`
+        });
+    }
+}
+
+// ── Setup / finish ──────────────────────────────────────────────────────────
+
+async function prepare(client) {
+    if (args.truncate) {
+        if (process.env.NODE_ENV === 'production') {
+            throw new Error('--truncate is refused when NODE_ENV=production');
+        }
+        await client.query(`TRUNCATE ${[...TABLES, ...MASTER_TABLES].map(t => `"${t}"`).join(', ')} CASCADE`);
+        await client.query('DELETE FROM accounts WHERE "partyId" IS NOT NULL');
+        return;
+    }
+    const { rows } = await client.query('SELECT EXISTS (SELECT 1 FROM orders) AS "hasOrders"');
+    if (rows[0].hasOrders) {
+        throw new Error('orders is not empty — rerun with --truncate to replace the existing data');
+    }
+}
+
+async function nextPartyCode(client, prefix) {
+    const { rows } = await client.query(
+        `SELECT COALESCE(MAX(NULLIF(split_part(code, '-', 2), '')::int), 0) AS last FROM accounts WHERE code LIKE $1`,
+        [`${prefix}-%`]
+    );
+    return rows[0].last + 1;
+}
+
+async function finish(client, ctx) {
+    console.log('Recomputing party balances and invoice sequence...');
+    await client.query(`
+        UPDATE customers c SET "currentBalance" = t.due
+        FROM (SELECT "customerId", ROUND(SUM("dueAmount")::numeric, 2) AS due FROM orders GROUP BY "customerId") t
+        WHERE t."customerId" = c.id
+    `);
+    await client.query(`
+        UPDATE suppliers s SET "currentBalance" = t.due
+        FROM (SELECT "supplierId", ROUND(SUM("dueAmount")::numeric, 2) AS due FROM "purchaseBills" GROUP BY "supplierId") t
+        WHERE t."supplierId" = s.id
+    `);
+
+    // Continue numbering after the generated bills of the current financial year
+    const lastDay = ctx.days[ctx.days.length - 1];
+    const fy = financialYear(lastDay);
+    const values = { currentNumber: ctx.invoiceNumbers[fy] || 0, dailyNumber: 0, lastDate: isoDate(lastDay), lastFinancialYear: fy };
+    const sequence = await db.invoiceSequence.findOne();
+    if (sequence) await sequence.update(values);
+    else await db.invoiceSequence.create({ id: uuid(), prefix: 'INV', ...values });
+
+    await client.query(`ANALYZE ${[...TABLES, ...MASTER_TABLES, 'accounts'].map(t => `"${t}"`).join(', ')}`);
+}
+
+async function generate() {
+    const started = Date.now();
+    console.log(`\n=== Synthetic dataset: ${ORDERS} orders, ${CUSTOMERS} customers, ${YEARS} years to ${isoDate(END)}, seed ${SEED} ===\n`);
+
+    await db.sequelize.authenticate();
+    await migrate();
+    await new LedgerService(db).initializeChartOfAccounts();
+
+    const admin = await db.user.findOne({ where: { username: 'admin' } });
+    const client = await db.sequelize.connectionManager.getConnection();
+    try {
+        await client.query('SET synchronous_commit TO off');
+        await prepare(client);
+
+        const { rows: systemRows } = await client.query(
+            "SELECT code, id FROM accounts WHERE code IN ('1100', '1300', '2100', '4100', '5300')"
+        );
+        const firstDay = new Date(END.getTime() - Math.round(YEARS * 365) * DAY_MS);
+        const days = [];
+        for (let t = firstDay.getTime(); t < END.getTime(); t += DAY_MS) days.push(new Date(t));
+
+        const ctx = {
+            admin: { id: admin ? admin.id : null, name: admin ? admin.name : 'Administrator' },
+            system: Object.fromEntries(systemRows.map(r => [r.code, r.id])),
+            end: END,
+            days,
+            customers: [],
+            suppliers: [],
+            products: [],
+            sampleCustomer: zipf(CUSTOMERS, 1.07),
+            invoiceNumbers: {},
+            nextCustomerCode: await nextPartyCode(client, '1300'),
+            nextSupplierCode: await nextPartyCode(client, '2100'),
+            batchSeq: 1,
+            paymentSeq: 1,
+            toggles: 0
+        };
+
+        const writer = new ChunkWriter(client);
+        buildMasters(writer, ctx);
+        await writer.flush([...MASTER_TABLES, 'accounts']);
+
+        const counts = dailyOrderCounts(days, ORDERS);
+        let pending = 0;
+        let generated = 0;
+        for (let d = 0; d < days.length; d++) {
+            const day = days[d];
+            // Bills spread over shop hours, in order
+            const offsets = Array.from({ length: counts[d] }, () => Math.floor(random() * SHOP_HOURS_MS)).sort((a, b) => a - b);
+            for (const offset of offsets) {
+                generateOrder(writer, ctx, day, new Date(day.getTime() + IST_OPEN_UTC_MS + offset));
+            }
+            for (let p = chance(0.3) ? int(1, 3) : 0; p > 0; p--) generatePurchase(writer, ctx, day);
+            audit(writer, ctx, {
+                action: 'LOGIN', entityType: 'AUTH', entityId: ctx.admin.id, entityName: 'admin',
+                description: 'LOGIN: Success', at: new Date(day.getTime() + IST_OPEN_UTC_MS - 10 * 60000)
+            });
+
+            pending += counts[d];
+            generated += counts[d];
+            if (pending >= CHUNK || d === days.length - 1) {
+                await writer.flush(TABLES);
+                pending = 0;
+                const seconds = (Date.now() - started) / 1000;
+                process.stdout.write(`\r  ${generated}/${ORDERS} orders — ${isoDate(day)} — ${Math.round(generated / seconds)} orders/s   `);
+            }
+        }
+        console.log('\n');
+
+        await finish(client, ctx);
+
+        console.log('Rows written:');
+        for (const [table, count] of Object.entries(writer.totals)) {
+            console.log(`  ${table.padEnd(20)} ${count}`);
+        }
+        console.log(`  ${'(toggles)'.padEnd(20)} ${ctx.toggles}`);
+        console.log(`\nDone in ${((Date.now() - started) / 1000).toFixed(1)}s`);
+    } finally {
+        db.sequelize.connectionManager.releaseConnection(client);
+    }
+}
+
+generate()
+    .then(() => db.sequelize.close())
+    .then(() => process.exit(0))
+    .catch((error) => {
+        console.error('\nDataset generation failed:', error.message);
+        process.exit(1);
+    });
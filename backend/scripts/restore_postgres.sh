@@ -1,24 +1,32 @@
 #!/bin/bash
 # PostgreSQL Restore Script
-BACKUP_DIR="/app/backups/postgres"
+# Accepts a stored full backup (directory or id), a custom-format .dump
+# downloaded from /api/data-audit/backup, or a legacy .sql.gz.
+# For point-in-time recovery from base/ + WAL, see restore_command from
+# `node scripts/backup.js setup-wal`.
+BACKUP_DIR="${BACKUP_DIR:-/app/backups/postgres}"
+JOBS="${BACKUP_JOBS:-4}"
 
 if [ -z "$1" ]; then
-    echo "Usage: $0 <backup_file.sql.gz>"
+    echo "Usage: $0 <full_backup_id | backup_dir | file.dump | file.sql.gz>"
     echo ""
     echo "Available backups:"
+    ls -d "$BACKUP_DIR"/full_* 2>/dev/null
     ls -lht "$BACKUP_DIR"/*.sql.gz 2>/dev/null
     exit 1
 fi
 
-BACKUP_FILE="$1"
+BACKUP="$1"
+[ -d "$BACKUP_DIR/$BACKUP" ] && BACKUP="$BACKUP_DIR/$BACKUP"
+[ -d "$BACKUP/dump" ] && BACKUP="$BACKUP/dump"
 
-if [ ! -f "$BACKUP_FILE" ]; then
-    echo "ERROR: Backup file not found: $BACKUP_FILE"
+if [ ! -e "$BACKUP" ]; then
+    echo "ERROR: Backup not found: $BACKUP"
     exit 1
 fi
 
 echo "WARNING: This will DROP and recreate the customerInvoice database!"
-echo "Backup file: $BACKUP_FILE"
+echo "Backup: $BACKUP"
 read -p "Are you sure you want to continue? (yes/no): " confirm
 
 if [ "$confirm" != "yes" ]; then
@@ -29,13 +37,21 @@ fi
 echo "Starting restore at $(date)"
 
 # Drop and recreate database
-PGPASSWORD=yttriumR psql -h 127.0.0.1 -U Rishabh postgres << EOF
+PGPASSWORD=yttriumR psql -h 127.0.0.1 -U Rishabh postgres << EOF2
 DROP DATABASE IF EXISTS "customerInvoice";
 CREATE DATABASE "customerInvoice" OWNER "Rishabh";
-EOF
-
-# Restore from backup
-gunzip -c "$BACKUP_FILE" | PGPASSWORD=yttriumR psql -h 127.0.0.1 -U Rishabh customerInvoice
+EOF2
+
+# Restore from backup: directory/custom format in parallel, plain SQL through psql
+case "$BACKUP" in
+    *.sql.gz)
+        gunzip -c "$BACKUP" | PGPASSWORD=yttriumR psql -h 127.0.0.1 -U Rishabh customerInvoice
+        ;;
+    *)
+        PGPASSWORD=yttriumR pg_restore -h 127.0.0.1 -U Rishabh -d customerInvoice \
+            --jobs="$JOBS" --no-owner --no-acl --exit-on-error "$BACKUP"
+        ;;
+esac
 
 if [ $? -eq 0 ]; then
     echo "Restore completed successfully at $(date)"
@@ -0,0 +1,81 @@
+/**
+ * Cluster Mode
+ *
+ * CLUSTER_WORKERS=N runs N HTTP worker processes sharing port 8001, so CPU work
+ * in one request (CSV export, bcrypt, large JSON responses) no longer stalls
+ * bill creation in another. CLUSTER_WORKERS=auto uses one worker per CPU.
+ * Unset or 1 keeps the original single-process server.
+ *
+ * The primary process is the leader: it runs one-off boot tasks, cron jobs
+ * and the serial scale reader (a device can only be opened once), and relays
+ * scale readings to workers over IPC. It does not serve HTTP.
+ */
+
+const cluster = require('cluster');
+const os = require('os');
+
+const RESTART_DELAY_MS = 1000;
+
+function workerCount() {
+    const configured = process.env.CLUSTER_WORKERS;
+    if (configured === 'auto') return os.cpus().length;
+    return Math.max(1, Number(configured) || 1);
+}
+
+const isClustered = () => workerCount() > 1;
+
+/** True for the process that owns cron jobs and the scale reader. */
+const isLeader = () => !isClustered() || cluster.isPrimary;
+
+/** True when this process should run the cluster supervisor instead of HTTP. */
+const isSupervisor = () => isClustered() && cluster.isPrimary;
+
+/**
+ * Send a message to every live worker.
+ */
+function broadcast(message) {
+    for (const worker of Object.values(cluster.workers || {})) {
+        if (worker && worker.isConnected()) worker.send(message);
+    }
+}
+
+/**
+ * Fork the HTTP workers and keep them running.
+ * @param {Object} options
+ * @param {Function} options.onWorkerOnline - (worker) => void, e.g. to send initial state
+ */
+function forkWorkers({ onWorkerOnline } = {}) {
+    const count = workerCount();
+    let shuttingDown = false;
+
+    cluster.on('online', (worker) => {
+        console.log(`[CLUSTER] Worker ${worker.process.pid} online`);
+        if (onWorkerOnline) onWorkerOnline(worker);
+    });
+
+    cluster.on('exit', (worker, code, signal) => {
+        if (shuttingDown) return;
+        console.warn(`[CLUSTER] Worker ${worker.process.pid} exited (${signal || code}) — restarting`);
+        setTimeout(() => cluster.fork(), RESTART_DELAY_MS);
+    });
+
+    const shutdown = () => {
+        shuttingDown = true;
+        for (const worker of Object.values(cluster.workers || {})) worker.kill();
+        process.exit(0);
+    };
+    process.on('SIGINT', shutdown);
+    process.on('SIGTERM', shutdown);
+
+    console.log(`[CLUSTER] Leader ${process.pid} starting ${count} workers`);
+    for (let i = 0; i < count; i++) cluster.fork();
+}
+
+module.exports = {
+    workerCount,
+    isClustered,
+    isLeader,
+    isSupervisor,
+    broadcast,
+    forkWorkers
+};
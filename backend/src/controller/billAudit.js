@@ -1,6 +1,7 @@
 const db = require('../models');
 const Services = require('../services');
 const telegram = require('../services/telegramAlert');
+const auditReport = require('../services/auditReport');
 
 module.exports = {
     // Log item removal from bill (called by frontend silently)
@@ -170,11 +171,20 @@ module.exports = {
             if (!weightLogIds || !weightLogIds.length) {
                 return res.status(400).json({ status: 400, message: 'weightLogIds required' });
             }
-            await db.weightLog.update(
+            // By id alone: a bill saved from the outbox can consume weights fetched
+            // days earlier. Each partition of weight_logs answers from its primary key.
+            const ids = [...new Set(weightLogIds)];
+            const [updated] = await db.weightLog.update(
                 { consumed: true, orderId: orderId || null, orderNumber: orderNumber || null },
-                { where: { id: { [db.Sequelize.Op.in]: weightLogIds } } }
+                { where: { id: { [db.Sequelize.Op.in]: ids } } }
             );
-            return res.status(200).json({ status: 200, message: `${weightLogIds.length} weight(s) marked consumed` });
+            if (updated !== ids.length) {
+                return res.status(404).json({
+                    status: 404,
+                    message: `${updated} of ${ids.length} weight(s) marked consumed; the rest were not found`
+                });
+            }
+            return res.status(200).json({ status: 200, message: `${updated} weight(s) marked consumed` });
         } catch (error) {
             return res.status(500).json({ status: 500, message: error.message });
         }
@@ -248,6 +258,23 @@ module.exports = {
         }
     },
 
+    // Download the same full audit report as a single document (txt or html)
+    downloadFullAuditReport: async (req, res) => {
+        try {
+            const { startDate, endDate } = req.query;
+            const format = req.query.format === 'html' ? 'html' : 'text';
+            await auditReport.generateFullAuditReport({ startDate, endDate }, auditReport.httpSink(res, { format }));
+        } catch (error) {
+            // Mid-stream: abort the connection so the client sees a failed
+            // download, not a truncated report
+            if (res.headersSent) {
+                console.error('Audit report download failed:', error.message);
+                return res.destroy();
+            }
+            return res.status(500).json({ status: 500, message: error.message });
+        }
+    },
+
     // Get weight logs with unmatched filter
     getWeightLogs: async (req, res) => {
         try {
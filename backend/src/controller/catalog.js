@@ -0,0 +1,41 @@
+const Services = require('../services');
+const Validations = require('../validations');
+
+// GET /catalog/<name>?since=<version> — 304 when the client's copy is current
+const getCatalog = (name) => async (req, res) => {
+    try {
+        const { error, value } = Validations.catalog.validateCatalogQuery(req.query);
+        if (error) {
+            return res.status(400).send({
+                status: 400,
+                message: error.details[0].message
+            });
+        }
+
+        const state = await Services.catalog.getCatalogState(name, value.since);
+        res.set('ETag', `W/"${name}-${state.full ? 'full' : value.since}-${state.version}"`);
+        res.set('Cache-Control', 'private, no-cache');
+        if (req.fresh) {
+            return res.status(304).end();
+        }
+
+        const response = await Services.catalog.getCatalog(name, value.since, state);
+
+        return res.status(200).send({
+            status: 200,
+            message: 'Catalog fetched successfully',
+            data: response
+        });
+    } catch (error) {
+        console.error(`Get ${name} catalog error:`, error);
+        return res.status(500).send({
+            status: 500,
+            message: error.message || error
+        });
+    }
+};
+
+module.exports = {
+    getProductCatalog: getCatalog('products'),
+    getCustomerCatalog: getCatalog('customers')
+};
@@ -62,10 +62,17 @@ module.exports = {
         }
     },
 
-    // List customers with debit/credit/balance
+    // List customers with debit/credit/balance (?customerId= for just one)
     listCustomersWithBalance: async (req, res) => {
         try {
-            const response = await Services.customer.listCustomersWithBalance(req.query);
+            const { error, value } = Validations.customer.validateListWithBalanceObj(req.query);
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+            const response = await Services.customer.listCustomersWithBalance(value);
 
             return res.status(200).send({
                 status: 200,
@@ -1,22 +1,20 @@
 const Services = require('../services');
+const Validations = require('../validations');
 const moment = require('moment-timezone');
 
 module.exports = {
     // Get audit logs with filters
     getAuditLogs: async (req, res) => {
         try {
-            const filters = {
-                userId: req.query.userId,
-                action: req.query.action,
-                entityType: req.query.entityType,
-                entityId: req.query.entityId,
-                startDate: req.query.startDate,
-                endDate: req.query.endDate,
-                limit: parseInt(req.query.limit) || 100,
-                offset: parseInt(req.query.offset) || 0
-            };
+            const { error, value } = Validations.auditLog.validateListAuditLogs(req.query);
+            if (error) {
+                return res.status(400).json({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
 
-            const logs = await Services.auditLog.getAuditLogs(filters);
+            const logs = await Services.auditLog.getAuditLogs(value);
             
             return res.status(200).json({
                 status: 200,
@@ -35,8 +33,15 @@ module.exports = {
     getEntityHistory: async (req, res) => {
         try {
             const { entityType, entityId } = req.params;
+            const { error, value } = Validations.auditLog.validateAuditPage(req.query);
+            if (error) {
+                return res.status(400).json({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
             
-            const logs = await Services.auditLog.getEntityHistory(entityType, entityId);
+            const logs = await Services.auditLog.getEntityHistory(entityType, entityId, value);
             
             return res.status(200).json({
                 status: 200,
@@ -75,9 +80,16 @@ module.exports = {
     // Get recent deletions
     getRecentDeletions: async (req, res) => {
         try {
-            const days = parseInt(req.query.days) || 30;
+            const { error, value } = Validations.auditLog.validateAuditPage(req.query);
+            if (error) {
+                return res.status(400).json({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+            const { days = 30, ...page } = value;
             
-            const deletions = await Services.auditLog.getRecentDeletions(days);
+            const deletions = await Services.auditLog.getRecentDeletions(days, page);
             
             return res.status(200).json({
                 status: 200,
@@ -282,6 +294,62 @@ module.exports = {
         }
     },
 
+    // Schema migration and data backfill progress (admin only)
+    getMigrationStatus: async (req, res) => {
+        try {
+            const [migrations, backfills] = await Promise.all([
+                Services.migrationRunner.status(),
+                Services.backfillJobs.getStatus()
+            ]);
+
+            return res.status(200).json({
+                status: 200,
+                data: { migrations, backfills }
+            });
+        } catch (error) {
+            console.error('Get migration status error:', error);
+            return res.status(500).json({
+                status: 500,
+                message: error.message
+            });
+        }
+    },
+
+    // Re-run a data backfill from the start, in the background (admin only)
+    rerunBackfill: async (req, res) => {
+        try {
+            const { name } = req.params;
+            const jobs = await Services.backfillJobs.getStatus();
+            const job = jobs.find(j => j.name === name);
+
+            if (!job) {
+                return res.status(404).json({
+                    status: 404,
+                    message: `Unknown backfill job: ${name}`
+                });
+            }
+            if (job.running) {
+                return res.status(409).json({
+                    status: 409,
+                    message: `Backfill ${name} is already running`
+                });
+            }
+
+            Services.backfillJobs.rerunJob(name).catch(() => { /* logged by the job */ });
+
+            return res.status(202).json({
+                status: 202,
+                message: `Backfill ${name} started`
+            });
+        } catch (error) {
+            console.error('Rerun backfill error:', error);
+            return res.status(500).json({
+                status: 500,
+                message: error.message
+            });
+        }
+    },
+
     // Set opening balance for today
     setOpeningBalance: async (req, res) => {
         try {
@@ -1,93 +1,220 @@
 const { spawn } = require('child_process');
+const zlib = require('zlib');
 const db = require('../models');
+const Services = require('../services');
+const Validations = require('../validations');
+
+const FALLBACK_TABLES = ['orders', 'payments', 'receipt_allocations', 'customers', 'audit_logs'];
+const FALLBACK_BATCH_ROWS = 1000;
+
+const sqlValue = (v) => {
+    if (v === null || v === undefined) return 'NULL';
+    if (typeof v === 'number') return v;
+    if (typeof v === 'boolean') return v ? 'TRUE' : 'FALSE';
+    if (v instanceof Date) return `'${v.toISOString()}'`;
+    if (typeof v === 'object') return `'${JSON.stringify(v).replace(/'/g, "''")}'`;
+    return `'${String(v).replace(/'/g, "''")}'`;
+};
+
+// Write to a stream, waiting for it to drain when its buffer is full
+const write = (stream, chunk) => new Promise((resolve) => {
+    if (stream.write(chunk)) resolve();
+    else stream.once('drain', resolve);
+});
+
+// Pipe a child's stdout to the response once it produces output; rejects if it fails before that
+const streamChild = (child, res, headers) => new Promise((resolve, reject) => {
+    let stderrData = '';
+    let hasData = false;
+
+    child.stdout.once('data', (chunk) => {
+        hasData = true;
+        Object.entries(headers).forEach(([name, value]) => res.setHeader(name, value));
+        res.write(chunk);
+        child.stdout.pipe(res);
+    });
+
+    child.stderr.on('data', (chunk) => { stderrData += chunk.toString(); });
+
+    child.on('close', (code) => {
+        if (code === 0 && hasData) return resolve();
+        if (!hasData) return reject(new Error(stderrData || `${child.spawnfile} failed`));
+        // Too late for an error response — cut the download short so it is not mistaken for complete
+        res.destroy(new Error(stderrData || 'backup stream failed'));
+        resolve();
+    });
+
+    child.on('error', (err) => reject(err));
+});
+
+const sendError = (res, error, label) => {
+    console.error(`${label}:`, error);
+    const status = error.status || 500;
+    if (res.headersSent) return;
+    return res.status(status).send({
+        status,
+        message: error.message || error
+    });
+};
 
 /**
  * GET /api/data-audit/backup
- * Tries pg_dump first. Falls back to SQL-based export if pg_dump is unavailable.
+ * Streams a compressed custom-format pg_dump (restore with pg_restore --jobs),
+ * or with ?id= a stored backup as a tar. Falls back to gzipped SQL if
+ * pg_dump is unavailable.
  */
 const backupDatabase = async (req, res) => {
     const dbName = process.env.DATABASE_NAME || 'customerInvoice';
-    const dbUser = process.env.DB_USER || 'postgres';
-    const dbHost = process.env.DB_HOST || '127.0.0.1';
-    const dbPort = process.env.DB_PORT || '5432';
-    const dbPass = process.env.PASSWORD || '';
-
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-').slice(0, 19);
-    const filename = `${dbName}_backup_${timestamp}.sql`;
-
-    // Try pg_dump first
-    try {
-        await new Promise((resolve, reject) => {
-            const env = { ...process.env };
-            if (dbPass) env.PGPASSWORD = dbPass;
-
-            const pgDump = spawn('pg_dump', [
-                '-h', dbHost, '-p', dbPort, '-U', dbUser, '-d', dbName,
-                '--no-owner', '--no-acl'
-            ], { env });
-
-            let stderrData = '';
-            let hasData = false;
-
-            pgDump.stdout.once('data', () => {
-                hasData = true;
-                res.setHeader('Content-Type', 'application/sql');
-                res.setHeader('Content-Disposition', `attachment; filename="${filename}"`);
-                pgDump.stdout.pipe(res);
-            });
 
-            pgDump.stderr.on('data', (chunk) => { stderrData += chunk.toString(); });
-
-            pgDump.on('close', (code) => {
-                if (code === 0 && hasData) resolve();
-                else reject(new Error(stderrData || 'pg_dump failed'));
+    if (req.query.id) {
+        try {
+            await streamChild(Services.dbBackup.tarStream(req.query.id), res, {
+                'Content-Type': 'application/x-tar',
+                'Content-Disposition': `attachment; filename="${dbName}_${req.query.id}.tar"`
             });
+        } catch (err) {
+            sendError(res, err, 'Stored backup download failed');
+        }
+        return;
+    }
 
-            pgDump.on('error', (err) => reject(err));
+    // Try pg_dump first
+    try {
+        const compression = await Services.dbBackup.dumpCompression();
+        const pgDump = spawn('pg_dump', [
+            ...Services.dbBackup.connectionArgs(), '--format=custom', `--compress=${compression.arg}`,
+            '--no-owner', '--no-acl'
+        ], { env: Services.dbBackup.clientEnv() });
+        await streamChild(pgDump, res, {
+            'Content-Type': 'application/octet-stream',
+            'Content-Disposition': `attachment; filename="${dbName}_backup_${timestamp}.dump"`,
+            'X-Backup-Compression': compression.method
         });
         return; // pg_dump succeeded
     } catch (pgErr) {
+        if (res.headersSent) return;
         console.log('pg_dump unavailable, falling back to SQL export:', pgErr.message);
     }
 
-    // Fallback: export critical tables as JSON-wrapped SQL
+    // Fallback: export critical tables as gzipped INSERTs, streamed in keyset batches
     try {
-        const tables = ['orders', 'payments', 'receipt_allocations', 'customers', 'audit_logs'];
-        const lines = [`-- Database backup: ${dbName}\n-- Generated: ${new Date().toISOString()}\n-- Method: SQL query fallback (pg_dump unavailable)\n`];
+        const gzip = zlib.createGzip();
+        res.setHeader('Content-Type', 'application/gzip');
+        res.setHeader('Content-Disposition', `attachment; filename="${dbName}_backup_${timestamp}.sql.gz"`);
+        gzip.pipe(res);
 
-        for (const table of tables) {
+        await write(gzip, `-- Database backup: ${dbName}\n-- Generated: ${new Date().toISOString()}\n-- Method: SQL query fallback (pg_dump unavailable)\n`);
+
+        for (const table of FALLBACK_TABLES) {
             try {
-                const [rows] = await db.sequelize.query(`SELECT * FROM "${table}"`);
-                lines.push(`\n-- Table: ${table} (${rows.length} rows)`);
-                if (rows.length > 0) {
-                    const cols = Object.keys(rows[0]);
-                    for (const row of rows) {
-                        const vals = cols.map(c => {
-                            const v = row[c];
-                            if (v === null || v === undefined) return 'NULL';
-                            if (typeof v === 'number') return v;
-                            if (typeof v === 'boolean') return v ? 'TRUE' : 'FALSE';
-                            if (v instanceof Date) return `'${v.toISOString()}'`;
-                            return `'${String(v).replace(/'/g, "''")}'`;
-                        });
-                        lines.push(`INSERT INTO "${table}" (${cols.map(c => `"${c}"`).join(', ')}) VALUES (${vals.join(', ')});`);
-                    }
+                let afterId = null;
+                let count = 0;
+                await write(gzip, `\n-- Table: ${table}\n`);
+                for (;;) {
+                    const [rows] = await db.sequelize.query(`
+                        SELECT * FROM "${table}" ${afterId === null ? '' : 'WHERE id > :afterId'}
+                        ORDER BY id LIMIT ${FALLBACK_BATCH_ROWS}
+                    `, { replacements: { afterId } });
+                    if (rows.length === 0) break;
+                    const cols = Object.keys(rows[0]).map(c => `"${c}"`).join(', ');
+                    const lines = rows.map(row =>
+                        `INSERT INTO "${table}" (${cols}) VALUES (${Object.values(row).map(sqlValue).join(', ')});\n`);
+                    await write(gzip, lines.join(''));
+                    count += rows.length;
+                    afterId = rows[rows.length - 1].id;
                 }
+                await write(gzip, `-- ${table}: ${count} rows\n`);
             } catch (tableErr) {
-                lines.push(`\n-- Skipped table ${table}: ${tableErr.message}`);
+                await write(gzip, `\n-- Skipped table ${table}: ${tableErr.message}\n`);
             }
         }
-
-        const content = lines.join('\n');
-        res.setHeader('Content-Type', 'application/sql');
-        res.setHeader('Content-Disposition', `attachment; filename="${filename}"`);
-        res.send(content);
+        gzip.end();
     } catch (err) {
         console.error('Backup fallback failed:', err);
         if (!res.headersSent) {
             res.status(500).json({ status: 500, message: `Backup failed: ${err.message}` });
+        } else {
+            res.destroy(err);
         }
     }
 };
 
-module.exports = { backupDatabase };
+module.exports = {
+    backupDatabase,
+
+    // Stored backups, newest first, with the WAL archiving state
+    listBackups: async (req, res) => {
+        try {
+            const wal = await Services.dbBackup.walSettings();
+            return res.status(200).send({
+                status: 200,
+                message: 'Backups fetched successfully',
+                data: {
+                    backupDir: Services.dbBackup.BACKUP_DIR,
+                    walArchiving: wal.archiving,
+                    backups: Services.dbBackup.listBackups()
+                }
+            });
+        } catch (error) {
+            return sendError(res, error, 'Backup list error');
+        }
+    },
+
+    // Take a backup: full, incremental, or auto (full when one is due)
+    runBackup: async (req, res) => {
+        try {
+            const { error, value } = Validations.dbBackup.validateRunBackup(req.body || {});
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const backup = await Services.dbBackup.createBackup(value.type);
+            return res.status(200).send({
+                status: 200,
+                message: `${backup.type === 'full' ? 'Full' : 'Incremental'} backup ${backup.id} completed`,
+                data: backup
+            });
+        } catch (error) {
+            return sendError(res, error, 'Backup error');
+        }
+    },
+
+    verifyBackup: async (req, res) => {
+        try {
+            const result = await Services.dbBackup.verifyBackup(req.params.id);
+            return res.status(200).send({
+                status: 200,
+                message: result.ok ? `Backup ${result.id} verified` : `Backup ${result.id} failed verification`,
+                data: result
+            });
+        } catch (error) {
+            return sendError(res, error, 'Backup verify error');
+        }
+    },
+
+    // Restore a full backup into a scratch database and time it
+    benchmarkRestore: async (req, res) => {
+        try {
+            const { error, value } = Validations.dbBackup.validateRestoreBenchmark(req.body || {});
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const result = await Services.dbBackup.benchmarkRestore(req.params.id, value);
+            return res.status(200).send({
+                status: 200,
+                message: `Backup ${result.id} restored in ${(result.durationMs / 1000).toFixed(1)}s with ${result.jobs} jobs`,
+                data: result
+            });
+        } catch (error) {
+            return sendError(res, error, 'Restore benchmark error');
+        }
+    }
+};
@@ -0,0 +1,61 @@
+const Services = require('../services');
+const Validations = require('../validations');
+
+module.exports = {
+    // Closed years, the current year and the one to close next
+    listYears: async (req, res) => {
+        try {
+            const years = await Services.financialYears.listYears();
+            return res.status(200).send({
+                status: 200,
+                message: 'Financial years fetched successfully',
+                data: years
+            });
+        } catch (error) {
+            console.error('Financial year list error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
+    // Close a year (?dryRun=true previews it and changes nothing)
+    closeYear: async (req, res) => {
+        try {
+            const { error, value } = Validations.financialYears.validateCloseYear({ ...req.params, ...req.query });
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const problem = await Services.financialYears.closeProblem(value.label);
+            if (problem) {
+                return res.status(problem.status).send({
+                    status: problem.status,
+                    message: problem.message
+                });
+            }
+
+            const result = await Services.financialYears.closeYear(value.label, {
+                dryRun: value.dryRun,
+                userId: req.user?.id || null
+            });
+            return res.status(200).send({
+                status: 200,
+                message: value.dryRun
+                    ? `Preview of closing financial year ${value.label} — nothing was changed`
+                    : `Financial year ${value.label} closed`,
+                data: result
+            });
+        } catch (error) {
+            console.error('Financial year close error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    }
+};
@@ -19,6 +19,7 @@
  *   6. None of the above → SUSPICIOUS_PAID
  */
 const db = require('../models');
+const { allocateFifo, sumAllocations, paymentState } = require('../utils/fifoAllocation');
 
 let _indexesCreated = false;
 
@@ -547,47 +548,26 @@ module.exports = {
                     ORDER BY "paymentDate" ASC, "createdAt" ASC
                 `, { replacements: { custId: custData.customerId, custName: custName } });
 
-                // FIFO allocate
-                const allocations = [];
-                const paymentRemaining = {};
-                for (const p of payments) {
-                    paymentRemaining[p.id] = Number(p.amount);
-                }
-
-                for (const order of custOrders) {
-                    let orderRemaining = Number(order.total);
-                    if (orderRemaining <= 0) continue;
-
-                    for (const payment of payments) {
-                        const available = paymentRemaining[payment.id] || 0;
-                        if (available <= 0.01) continue;
-                        const allocAmount = Math.round(Math.min(available, orderRemaining) * 100) / 100;
-                        if (allocAmount <= 0) continue;
-                        allocations.push({ paymentId: payment.id, orderId: order.id, orderNumber: order.orderNumber, amount: allocAmount });
-                        paymentRemaining[payment.id] -= allocAmount;
-                        orderRemaining -= allocAmount;
-                        if (orderRemaining <= 0.01) break;
-                    }
-                }
+                // FIFO allocate (whole invoice totals — system-toggled orders are reset to unpaid)
+                const { allocations } = allocateFifo(
+                    custOrders.map(o => ({ id: o.id, open: Number(o.total) })),
+                    payments.map(p => ({ id: p.id, amount: Number(p.amount) }))
+                );
 
                 // Calculate new states
-                const allocPerOrder = {};
-                for (const a of allocations) allocPerOrder[a.orderId] = (allocPerOrder[a.orderId] || 0) + a.amount;
+                const allocPerOrder = sumAllocations(allocations, 'orderId');
 
                 const orderUpdates = [];
                 for (const order of custOrders) {
                     const total = Number(order.total);
-                    const allocated = allocPerOrder[order.id] || 0;
-                    const newPaid = Math.round(Math.min(allocated, total) * 100) / 100;
-                    const newDue = Math.round(Math.max(0, total - newPaid) * 100) / 100;
-                    const newStatus = newPaid >= total - 0.5 ? 'paid' : (newPaid > 0.5 ? 'partial' : 'unpaid');
-                    const changed = Math.abs(Number(order.paidAmount) - newPaid) > 0.5
-                                 || Math.abs(Number(order.dueAmount) - newDue) > 0.5
-                                 || order.paymentStatus !== newStatus;
+                    const after = paymentState(total, Math.min(allocPerOrder.get(order.id) || 0, total), { tolerance: 0.5 });
+                    const changed = Math.abs(Number(order.paidAmount) - after.paidAmount) > 0.5
+                                 || Math.abs(Number(order.dueAmount) - after.dueAmount) > 0.5
+                                 || order.paymentStatus !== after.paymentStatus;
                     orderUpdates.push({
                         orderId: order.id, orderNumber: order.orderNumber,
                         before: { paidAmount: Number(order.paidAmount), dueAmount: Number(order.dueAmount), paymentStatus: order.paymentStatus },
-                        after: { paidAmount: newPaid, dueAmount: newDue, paymentStatus: newStatus },
+                        after,
                         changed
                     });
                 }
@@ -613,20 +593,14 @@ module.exports = {
                 // EXECUTE
                 if (!isDryRun && custOrders.length > 0) {
                     await db.sequelize.transaction(async (transaction) => {
-                        // Reset system-toggled orders to unpaid
-                        for (const order of custOrders) {
-                            await db.order.update(
-                                { paidAmount: 0, dueAmount: Number(order.total), paymentStatus: 'unpaid' },
-                                { where: { id: order.id }, transaction }
-                            );
-                            results.ordersReset++;
-                        }
+                        // System-toggled orders are reset and re-derived from allocations in one write each (below)
+                        results.ordersReset += custOrders.length;
                         // Create allocations
-                        for (const alloc of allocations) {
-                            await db.receiptAllocation.create({
-                                paymentId: alloc.paymentId, orderId: alloc.orderId,
-                                amount: alloc.amount, isDeleted: false
-                            }, { transaction });
+                        if (allocations.length > 0) {
+                            await db.receiptAllocation.bulkCreate(
+                                allocations.map(alloc => ({ ...alloc, isDeleted: false })),
+                                { transaction }
+                            );
                         }
                         // Update orders with correct values
                         for (const upd of orderUpdates) {
@@ -639,13 +613,13 @@ module.exports = {
                 }
             }
 
-            // Step 5: Recalculate customer.currentBalance from scratch
+            // Step 5: Recalculate customer.currentBalance from scratch (closed financial years included)
             if (!isDryRun) {
                 const [balanceRows] = await db.sequelize.query(`
                     SELECT c.id,
                         COALESCE(c."openingBalance", 0)
-                        + COALESCE((SELECT SUM(total) FROM orders WHERE "isDeleted" = false AND ("customerId" = c.id OR "customerName" = c.name)), 0)
-                        - COALESCE((SELECT SUM(amount) FROM payments WHERE "isDeleted" = false AND "partyType" = 'customer' AND ("partyId" = c.id OR "partyName" = c.name)), 0)
+                        + COALESCE((SELECT SUM(total) FROM orders_all WHERE "isDeleted" = false AND ("customerId" = c.id OR "customerName" = c.name)), 0)
+                        - COALESCE((SELECT SUM(amount) FROM payments_all WHERE "isDeleted" = false AND "partyType" = 'customer' AND ("partyId" = c.id OR "partyName" = c.name)), 0)
                         AS correct_balance
                     FROM customers c
                 `);
@@ -0,0 +1,97 @@
+const Services = require('../services');
+const Validations = require('../validations');
+
+module.exports = {
+    // Partitions, retention and archived months of the log tables
+    getStatus: async (req, res) => {
+        try {
+            const status = await Services.logPartitions.getStatus();
+            return res.status(200).send({
+                status: 200,
+                message: 'Log partitions fetched successfully',
+                data: status
+            });
+        } catch (error) {
+            console.error('Log partition status error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
+    // Run the daily maintenance now (future partitions + archival)
+    runMaintenance: async (req, res) => {
+        try {
+            const report = await Services.logPartitions.maintain();
+            return res.status(200).send({
+                status: 200,
+                message: 'Log partition maintenance finished',
+                data: report
+            });
+        } catch (error) {
+            console.error('Log partition maintenance error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
+    restoreMonth: async (req, res) => {
+        try {
+            const { error, value } = Validations.logPartitions.validateMonthParams(req.params);
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const restored = await Services.logPartitions.restoreMonth(value.table, value.month);
+            if (!restored) {
+                return res.status(404).send({
+                    status: 404,
+                    message: `No archive for ${value.table} ${value.month}`
+                });
+            }
+            return res.status(200).send({
+                status: 200,
+                message: `Restored ${restored.rows} rows of ${value.table} ${value.month}`,
+                data: restored
+            });
+        } catch (error) {
+            console.error('Log archive restore error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
+    // Partitions the planner scans for a date range — confirms pruning
+    explainRange: async (req, res) => {
+        try {
+            const { error, value } = Validations.logPartitions.validateExplainRange({ ...req.params, ...req.query });
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const plan = await Services.logPartitions.explainRange(value.table, value.from, value.to);
+            return res.status(200).send({
+                status: 200,
+                message: 'Plan fetched successfully',
+                data: plan
+            });
+        } catch (error) {
+            console.error('Log partition explain error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    }
+};
@@ -6,6 +6,9 @@ const db = require('../models');
 const { createAuditLog } = require('../middleware/auditLogger');
 const { postInvoiceToLedger, reverseInvoiceLedger, postPaymentStatusToggleToLedger, postInvoiceCashReceiptToLedger } = require('../services/realTimeLedger');
 const telegram = require('../services/telegramAlert');
+const idempotency = require('../services/idempotency');
+const { diffOrderItems, stockChanges } = require('../utils/orderItemDiff');
+const Money = require('../utils/money');
 
 // Helper to get client IP
 const getClientIP = (req) => {
@@ -16,6 +19,343 @@ const getClientIP = (req) => {
            'unknown';
 };
 
+// Body of a created-order response, as sent and as stored for idempotent replays
+const createdResponse = (result, linkSuggestion) => JSON.parse(JSON.stringify({
+    status: 200,
+    message: 'order created successfully',
+    data: result,
+    linkSuggestion: linkSuggestion || undefined
+}));
+
+// Create one validated order: invoice number, customer link, items, stock,
+// summaries, ledgers, audit log and alerts. Shared by POST /orders and the
+// offline outbox sync, so a queued bill is saved exactly like a live one.
+// completeKey(status, body, transaction) stores the Idempotency-Key response
+// in the bill's transaction, so the key and the bill commit together.
+const saveOrder = async (value, req, { consumeWeights = true, completeKey = null } = {}) => {
+    let { orderItems, ...orderObj } = value;
+
+    // paidAmount MUST be explicitly set by frontend.
+    // No default to "fully paid" — prevents silent data corruption.
+    if (orderObj.paidAmount === undefined || orderObj.paidAmount === null) {
+        orderObj.paidAmount = 0; // Default: unpaid (safe default)
+    }
+    orderObj.dueAmount = orderObj.total - orderObj.paidAmount;
+    
+    if (orderObj.paidAmount === 0) {
+        orderObj.paymentStatus = 'unpaid';
+        orderObj.paymentMode = 'CREDIT';
+    } else if (orderObj.paidAmount >= orderObj.total) {
+        orderObj.paymentStatus = 'paid';
+        orderObj.paymentMode = 'CASH';
+    } else {
+        orderObj.paymentStatus = 'partial';
+        orderObj.paymentMode = 'CREDIT'; // Partial at POS is still a credit sale
+    }
+
+    // Add created by user info
+    if (req.user) {
+        orderObj.createdBy = req.user.id;
+        orderObj.createdByName = req.user.name || req.user.username;
+    }
+
+    let linkSuggestion = null;
+    const result = await db.sequelize.transaction(async (transaction) => {
+        // Generate invoice number INSIDE transaction (only if everything else is valid)
+        const invoiceInfo = await Services.invoiceSequence.generateInvoiceNumber(transaction);
+        orderObj.orderNumber = invoiceInfo.invoiceNumber;
+        
+        // Customer linking — NOTHING happens silently.
+        // If explicit customerId passed from frontend → trust it (user already confirmed)
+        // If only customerName → search for match, DON'T auto-link, return suggestion
+        // If no match → create new customer
+        const hasCustomerName = orderObj.customerName && orderObj.customerName.trim();
+        const hasCustomerMobile = orderObj.customerMobile && orderObj.customerMobile.trim();
+        
+        if (orderObj.customerId) {
+            // Frontend explicitly passed customerId — user confirmed the link
+            const confirmed = await db.customer.findByPk(orderObj.customerId, { transaction });
+            if (confirmed && orderObj.dueAmount > 0) {
+                await confirmed.update({
+                    currentBalance: (Number(confirmed.currentBalance) || 0) + orderObj.dueAmount
+                }, { transaction });
+            }
+            console.log(`Order: CONFIRMED link to customer ID ${orderObj.customerId}`);
+        } else if (hasCustomerName || hasCustomerMobile) {
+            try {
+                // Search for existing match
+                let existingCustomer = null;
+                if (hasCustomerMobile) {
+                    existingCustomer = await db.customer.findOne({
+                        where: { mobile: orderObj.customerMobile.trim() },
+                        transaction
+                    });
+                }
+                if (!existingCustomer && hasCustomerName) {
+                    existingCustomer = await db.customer.findOne({
+                        where: db.Sequelize.where(
+                            db.Sequelize.fn('LOWER', db.Sequelize.fn('TRIM', db.Sequelize.col('name'))),
+                            orderObj.customerName.trim().toLowerCase()
+                        ),
+                        transaction
+                    });
+                }
+
+                if (existingCustomer) {
+                    // Match found — DON'T auto-link. Order created with customerName only.
+                    // Return suggestion for frontend to prompt user.
+                    linkSuggestion = {
+                        customerId: existingCustomer.id,
+                        name: existingCustomer.name,
+                        mobile: existingCustomer.mobile,
+                        currentBalance: existingCustomer.currentBalance
+                    };
+                    // Order stays with customerName but NO customerId until user confirms
+                    console.log(`Order: Match found "${existingCustomer.name}" — NOT auto-linked. Awaiting user confirmation.`);
+                } else {
+                    // No match — create new customer
+                    const customerName = hasCustomerName ? orderObj.customerName.trim() : orderObj.customerMobile.trim();
+                    const newCustomer = await db.customer.create({
+                        id: uuidv4(),
+                        name: customerName,
+                        mobile: hasCustomerMobile ? orderObj.customerMobile.trim() : null,
+                        address: orderObj.customerAddress || null,
+                        openingBalance: 0,
+                        currentBalance: orderObj.dueAmount > 0 ? orderObj.dueAmount : 0
+                    }, { transaction });
+                    orderObj.customerId = newCustomer.id;
+                    console.log(`Order: CREATED new customer "${customerName}" (ID: ${newCustomer.id})`);
+                }
+            } catch (customerError) {
+                console.error('Failed to handle customer:', customerError);
+            }
+        }
+        
+        // NOW create the order with customerId set
+        const response = await Services.order.createOrder(orderObj, transaction);
+        const orderId = response.id;
+
+        orderItems = orderItems.map((item, index) => { 
+            return {
+                ...item, 
+                productId: item.productId || null,
+                orderId: orderId,
+                sortOrder: item.sortOrder !== undefined ? item.sortOrder : index
+            }; 
+        });
+        await Services.orderItems.addOrderItems(orderItems, transaction);
+
+        // Deduct stock for catalogue items — one statement for the whole bill.
+        // Savepoint: a stock failure must not abort the bill's transaction
+        try {
+            await db.sequelize.transaction({ transaction }, (savepoint) => Services.stock.applyMovements('out', orderItems, {
+                referenceType: 'sale',
+                referenceId: orderId,
+                notes: `Sale ${orderObj.orderNumber}`,
+                createdBy: req.user?.id,
+                createdByName: req.user?.name || req.user?.username
+            }, savepoint));
+        } catch (stockError) {
+            console.error(`[STOCK] Failed to deduct stock for ${orderObj.orderNumber}:`, stockError.message);
+        }
+
+        // Update daily summary
+        try {
+            await Services.dailySummary.recordOrderCreated(response, transaction);
+        } catch (summaryError) {
+            console.error('Failed to update daily summary:', summaryError);
+            // Don't fail the order creation for summary issues
+        }
+
+        // Dynamically get the Sales and Cash/Bank Ledger IDs (old single-entry system)
+        // Non-blocking: if old ledger accounts not set up, skip
+        try {
+            const salesLedger = await Services.ledger.getLedgerByName('Sales Account');
+            const cashBankLedger = await Services.ledger.getLedgerByName('Cash Account');
+            
+            if (salesLedger && cashBankLedger) {
+                const SALES_LEDGER_ID = salesLedger.id;
+                const CASH_BANK_LEDGER_ID = cashBankLedger.id;
+
+        // Create ledger entries for sale
+        const ledgerEntries = [];
+        
+        // 1. Debit Customer/Receivable (if not fully paid)
+        if (orderObj.dueAmount > 0 && orderObj.customerId) {
+            // Assuming customer has a ledgerId
+            const customer = await Services.customer.getCustomer({ id: orderObj.customerId });
+            if (customer && customer.ledgerId) {
+                ledgerEntries.push({
+                    ledgerId: customer.ledgerId, 
+                    entryDate: orderObj.orderDate,
+                    debit: orderObj.dueAmount, // Receivable is debited (asset increases)
+                    credit: 0,
+                    description: `Sale to ${customer.name} (Due Amount)`,
+                    referenceType: 'order',
+                    referenceId: orderId
+                });
+            }
+        }
+
+        // 2. Debit Cash/Bank (if partially or fully paid)
+        if (orderObj.paidAmount > 0) {
+            ledgerEntries.push({
+                ledgerId: CASH_BANK_LEDGER_ID, 
+                entryDate: orderObj.orderDate,
+                debit: orderObj.paidAmount, // Cash/Bank is debited (asset increases)
+                credit: 0,
+                description: `Sale to ${orderObj.customerName} (Paid Amount)`,
+                referenceType: 'order',
+                referenceId: orderId
+            });
+        }
+
+        // 3. Credit Sales
+        ledgerEntries.push({
+            ledgerId: SALES_LEDGER_ID, 
+            entryDate: orderObj.orderDate,
+            debit: 0,
+            credit: orderObj.total, // Sales is credited (income increases)
+            description: `Sale to ${orderObj.customerName} (Total)`,
+            referenceType: 'order',
+            referenceId: orderId
+        });
+
+        if (ledgerEntries.length > 0) {
+            await db.ledgerEntry.bulkCreate(ledgerEntries, { transaction });
+        }
+            } else {
+                console.warn('[OLD LEDGER] Sales Account or Cash Account ledger not found — skipping old ledger entries');
+            }
+        } catch (oldLedgerError) {
+            console.warn('[OLD LEDGER] Skipped:', oldLedgerError.message);
+        }
+
+        // === NEW DOUBLE-ENTRY LEDGER: Real-time posting ===
+        // Non-blocking: if Chart of Accounts isn't set up, log warning but don't crash order creation
+        if (orderObj.customerId) {
+            try {
+                const accountsExist = await db.account.count({ transaction });
+                if (accountsExist > 0) {
+                    await postInvoiceToLedger(
+                        { ...orderObj, id: orderId, createdAt: new Date() },
+                        transaction
+                    );
+                    // If order is paid (fully or partially), also post the cash receipt
+                    if (orderObj.paidAmount > 0) {
+                        await postInvoiceCashReceiptToLedger(
+                            { ...orderObj, id: orderId, createdAt: new Date() },
+                            transaction
+                        );
+                    }
+                } else {
+                    console.warn(`[LEDGER] SKIP: Chart of Accounts not initialized — invoice ${orderObj.orderNumber} not posted to ledger`);
+                }
+            } catch (ledgerError) {
+                console.error(`[LEDGER] Failed to post invoice ${orderObj.orderNumber}:`, ledgerError.message);
+                // Don't crash order creation — ledger posting is supplementary
+            }
+        }
+
+        const order = await Services.order.getOrder({id: orderId }, transaction);
+        if (completeKey) {
+            await completeKey(200, createdResponse(order, linkSuggestion), transaction);
+        }
+        return order;
+    });
+
+    // Audit log for order creation
+    await createAuditLog({
+        userId: req.user?.id,
+        userName: req.user?.name || req.user?.username || 'Anonymous',
+        userRole: req.user?.role || 'unknown',
+        action: 'CREATE',
+        entityType: 'ORDER',
+        entityId: result.id,
+        entityName: result.orderNumber,
+        newValues: {
+            orderNumber: result.orderNumber,
+            total: result.total,
+            customerName: result.customerName,
+            itemCount: orderItems.length
+        },
+        description: `Created order ${result.orderNumber} for ₹${result.total}`,
+        ipAddress: getClientIP(req),
+        userAgent: req.headers['user-agent']
+    });
+
+    // Mark recent weight fetches as consumed for this user (not for bills
+    // replayed from the outbox — those weights were taken long ago)
+    if (consumeWeights) {
+        try {
+            const fiveMinAgo = new Date(Date.now() - 5 * 60 * 1000);
+            await db.weightLog.update(
+                { consumed: true, orderId: result.id, orderNumber: result.orderNumber },
+                { where: {
+                    userId: req.user?.id,
+                    consumed: false,
+                    createdAt: { [db.Sequelize.Op.gte]: fiveMinAgo }
+                }}
+            );
+        } catch (e) { /* silent */ }
+    }
+
+    // Fire live Telegram alert for new bill (async, non-blocking)
+    telegram.alertOrderCreated({
+        orderNumber: result.orderNumber,
+        customerName: result.customerName,
+        total: result.total,
+        paidAmount: result.paidAmount,
+        dueAmount: result.dueAmount,
+        paymentStatus: result.paymentStatus,
+        items: orderItems,
+        createdBy: req.user?.name || req.user?.username
+    }).catch(e => console.error('[TELEGRAM] alertOrderCreated error:', e.message));
+
+    return { result, linkSuggestion };
+};
+
+// Save one bill from the offline outbox under the Idempotency-Key it was
+// first sent with. Keys are scoped exactly like POST /orders, so a bill whose
+// live attempt did reach the server is replayed here, not created twice.
+const syncOutboxBill = async ({ idempotencyKey, order }, req, route) => {
+    const scope = { key: idempotencyKey, userId: req.user?.id, method: 'POST', route };
+    const id = idempotency.keyId(scope);
+    const requestHash = idempotency.requestHash(order);
+
+    const existing = await idempotency.find(id);
+    if (existing && existing.requestHash !== requestHash) {
+        return { idempotencyKey, status: 'conflict', message: 'Idempotency-Key was already used with a different bill' };
+    }
+    if (existing && existing.status === 'completed') {
+        const { data, linkSuggestion } = existing.responseBody || {};
+        return { idempotencyKey, status: 'replayed', order: data, linkSuggestion };
+    }
+
+    const { error, value } = Validations.order.validateCreateOrderObj(order);
+    if (error) {
+        return { idempotencyKey, status: 'invalid', message: error.details[0].message };
+    }
+
+    if (!(await idempotency.reserve({ ...scope, id, requestHash }))) {
+        return { idempotencyKey, status: 'pending', message: 'This bill is still being processed — retry shortly' };
+    }
+
+    try {
+        // Same body POST /orders stores, so either path replays it
+        const { result, linkSuggestion } = await saveOrder(value, req, {
+            consumeWeights: false,
+            completeKey: (status, body, transaction) => idempotency.complete(id, status, body, transaction)
+        });
+        const body = createdResponse(result, linkSuggestion);
+        return { idempotencyKey, status: 'created', order: body.data, linkSuggestion: body.linkSuggestion };
+    } catch (error) {
+        await idempotency.release(id).catch(() => {});
+        console.error(`[OUTBOX] Failed to save bill ${idempotencyKey}:`, error.message);
+        return { idempotencyKey, status: 'failed', message: error.message || String(error) };
+    }
+};
+
 module.exports = {
     createOrder: async (req, res) => {
         try {
@@ -29,279 +369,114 @@ module.exports = {
                 });
             }
 
-            let { orderItems, ...orderObj } = value;
+            const { result, linkSuggestion } = await saveOrder(value, req, {
+                completeKey: req.idempotency && req.idempotency.complete
+            });
 
-            // paidAmount MUST be explicitly set by frontend.
-            // No default to "fully paid" — prevents silent data corruption.
-            if (orderObj.paidAmount === undefined || orderObj.paidAmount === null) {
-                orderObj.paidAmount = 0; // Default: unpaid (safe default)
-            }
-            orderObj.dueAmount = orderObj.total - orderObj.paidAmount;
-            
-            if (orderObj.paidAmount === 0) {
-                orderObj.paymentStatus = 'unpaid';
-                orderObj.paymentMode = 'CREDIT';
-            } else if (orderObj.paidAmount >= orderObj.total) {
-                orderObj.paymentStatus = 'paid';
-                orderObj.paymentMode = 'CASH';
-            } else {
-                orderObj.paymentStatus = 'partial';
-                orderObj.paymentMode = 'CREDIT'; // Partial at POS is still a credit sale
+            return res.status(200).send(createdResponse(result, linkSuggestion));
+
+        } catch (error) {
+            console.error('Create order error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+    
+    // Offline outbox sync — bills the POS queued while the server was slow or
+    // unreachable, saved in order. Results are per bill: created, replayed,
+    // conflict, invalid, pending (retry) or failed (retry).
+    syncOrders: async (req, res) => {
+        try {
+            const { error, value } = Validations.order.validateSyncOrdersObj(req.body);
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
             }
 
-            // Add created by user info
-            if (req.user) {
-                orderObj.createdBy = req.user.id;
-                orderObj.createdByName = req.user.name || req.user.username;
+            const route = `${req.baseUrl}/orders`;
+            const results = [];
+            // Sequential: invoice numbers follow the order the bills were made in
+            for (const bill of value.bills) {
+                results.push(await syncOutboxBill(bill, req, route));
             }
 
-            let linkSuggestion = null;
-            const result = await db.sequelize.transaction(async (transaction) => {
-                // Generate invoice number INSIDE transaction (only if everything else is valid)
-                const invoiceInfo = await Services.invoiceSequence.generateInvoiceNumber(transaction);
-                orderObj.orderNumber = invoiceInfo.invoiceNumber;
-                
-                // Customer linking — NOTHING happens silently.
-                // If explicit customerId passed from frontend → trust it (user already confirmed)
-                // If only customerName → search for match, DON'T auto-link, return suggestion
-                // If no match → create new customer
-                const hasCustomerName = orderObj.customerName && orderObj.customerName.trim();
-                const hasCustomerMobile = orderObj.customerMobile && orderObj.customerMobile.trim();
-                
-                if (orderObj.customerId) {
-                    // Frontend explicitly passed customerId — user confirmed the link
-                    const confirmed = await db.customer.findByPk(orderObj.customerId, { transaction });
-                    if (confirmed && orderObj.dueAmount > 0) {
-                        await confirmed.update({
-                            currentBalance: (Number(confirmed.currentBalance) || 0) + orderObj.dueAmount
-                        }, { transaction });
-                    }
-                    console.log(`Order: CONFIRMED link to customer ID ${orderObj.customerId}`);
-                } else if (hasCustomerName || hasCustomerMobile) {
-                    try {
-                        // Search for existing match
-                        let existingCustomer = null;
-                        if (hasCustomerMobile) {
-                            existingCustomer = await db.customer.findOne({
-                                where: { mobile: orderObj.customerMobile.trim() },
-                                transaction
-                            });
-                        }
-                        if (!existingCustomer && hasCustomerName) {
-                            existingCustomer = await db.customer.findOne({
-                                where: db.Sequelize.where(
-                                    db.Sequelize.fn('LOWER', db.Sequelize.fn('TRIM', db.Sequelize.col('name'))),
-                                    orderObj.customerName.trim().toLowerCase()
-                                ),
-                                transaction
-                            });
-                        }
+            const summary = results.reduce((acc, r) => ({ ...acc, [r.status]: (acc[r.status] || 0) + 1 }), {});
+            if (summary.conflict || summary.invalid) {
+                console.warn(`[OUTBOX] ${req.user?.username || 'unknown'} synced ${results.length} bills with conflicts:`, summary);
+            }
 
-                        if (existingCustomer) {
-                            // Match found — DON'T auto-link. Order created with customerName only.
-                            // Return suggestion for frontend to prompt user.
-                            linkSuggestion = {
-                                customerId: existingCustomer.id,
-                                name: existingCustomer.name,
-                                mobile: existingCustomer.mobile,
-                                currentBalance: existingCustomer.currentBalance
-                            };
-                            // Order stays with customerName but NO customerId until user confirms
-                            console.log(`Order: Match found "${existingCustomer.name}" — NOT auto-linked. Awaiting user confirmation.`);
-                        } else {
-                            // No match — create new customer
-                            const customerName = hasCustomerName ? orderObj.customerName.trim() : orderObj.customerMobile.trim();
-                            const newCustomer = await db.customer.create({
-                                id: uuidv4(),
-                                name: customerName,
-                                mobile: hasCustomerMobile ? orderObj.customerMobile.trim() : null,
-                                address: orderObj.customerAddress || null,
-                                openingBalance: 0,
-                                currentBalance: orderObj.dueAmount > 0 ? orderObj.dueAmount : 0
-                            }, { transaction });
-                            orderObj.customerId = newCustomer.id;
-                            console.log(`Order: CREATED new customer "${customerName}" (ID: ${newCustomer.id})`);
-                        }
-                    } catch (customerError) {
-                        console.error('Failed to handle customer:', customerError);
-                    }
-                }
-                
-                // NOW create the order with customerId set
-                const response = await Services.order.createOrder(orderObj, transaction);
-                const orderId = response.id;
+            return res.status(200).send({
+                status: 200,
+                message: 'Outbox synced',
+                data: { results, summary }
+            });
+        } catch (error) {
+            console.error('Outbox sync error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
 
-                orderItems = orderItems.map((item, index) => { 
-                    return {
-                        ...item, 
-                        orderId: orderId,
-                        sortOrder: item.sortOrder !== undefined ? item.sortOrder : index
-                    }; 
+    // Bulk import of past sales (CSV or JSON) — one audit entry and one alert per import
+    bulkImportOrders: async (req, res) => {
+        try {
+            const rawBills = Services.orderImport.parseBills(req);
+            if (!rawBills || rawBills.length === 0) {
+                return res.status(400).send({
+                    status: 400,
+                    message: 'No bills found. Send a text/csv body or JSON { bills: [...] }'
                 });
-                await Services.orderItems.addOrderItems(orderItems, transaction);
-
-                // Update daily summary
-                try {
-                    await Services.dailySummary.recordOrderCreated(response, transaction);
-                } catch (summaryError) {
-                    console.error('Failed to update daily summary:', summaryError);
-                    // Don't fail the order creation for summary issues
-                }
-
-                // Dynamically get the Sales and Cash/Bank Ledger IDs (old single-entry system)
-                // Non-blocking: if old ledger accounts not set up, skip
-                try {
-                    const salesLedger = await Services.ledger.getLedgerByName('Sales Account');
-                    const cashBankLedger = await Services.ledger.getLedgerByName('Cash Account');
-                    
-                    if (salesLedger && cashBankLedger) {
-                        const SALES_LEDGER_ID = salesLedger.id;
-                        const CASH_BANK_LEDGER_ID = cashBankLedger.id;
-
-                // Create ledger entries for sale
-                const ledgerEntries = [];
-                
-                // 1. Debit Customer/Receivable (if not fully paid)
-                if (orderObj.dueAmount > 0 && orderObj.customerId) {
-                    // Assuming customer has a ledgerId
-                    const customer = await Services.customer.getCustomer({ id: orderObj.customerId });
-                    if (customer && customer.ledgerId) {
-                        ledgerEntries.push({
-                            ledgerId: customer.ledgerId, 
-                            entryDate: orderObj.orderDate,
-                            debit: orderObj.dueAmount, // Receivable is debited (asset increases)
-                            credit: 0,
-                            description: `Sale to ${customer.name} (Due Amount)`,
-                            referenceType: 'order',
-                            referenceId: orderId
-                        });
-                    }
-                }
-
-                // 2. Debit Cash/Bank (if partially or fully paid)
-                if (orderObj.paidAmount > 0) {
-                    ledgerEntries.push({
-                        ledgerId: CASH_BANK_LEDGER_ID, 
-                        entryDate: orderObj.orderDate,
-                        debit: orderObj.paidAmount, // Cash/Bank is debited (asset increases)
-                        credit: 0,
-                        description: `Sale to ${orderObj.customerName} (Paid Amount)`,
-                        referenceType: 'order',
-                        referenceId: orderId
-                    });
-                }
+            }
 
-                // 3. Credit Sales
-                ledgerEntries.push({
-                    ledgerId: SALES_LEDGER_ID, 
-                    entryDate: orderObj.orderDate,
-                    debit: 0,
-                    credit: orderObj.total, // Sales is credited (income increases)
-                    description: `Sale to ${orderObj.customerName} (Total)`,
-                    referenceType: 'order',
-                    referenceId: orderId
+            const { bills, errors } = Services.orderImport.validateBills(rawBills);
+            if (errors.length > 0) {
+                return res.status(400).send({
+                    status: 400,
+                    message: `${errors.length} bill(s) failed validation — nothing was imported`,
+                    data: { errors: errors.slice(0, 100), errorCount: errors.length }
                 });
+            }
 
-                if (ledgerEntries.length > 0) {
-                    await db.ledgerEntry.bulkCreate(ledgerEntries, { transaction });
-                }
-                    } else {
-                        console.warn('[OLD LEDGER] Sales Account or Cash Account ledger not found — skipping old ledger entries');
-                    }
-                } catch (oldLedgerError) {
-                    console.warn('[OLD LEDGER] Skipped:', oldLedgerError.message);
-                }
-
-                // === NEW DOUBLE-ENTRY LEDGER: Real-time posting ===
-                // Non-blocking: if Chart of Accounts isn't set up, log warning but don't crash order creation
-                if (orderObj.customerId) {
-                    try {
-                        const accountsExist = await db.account.count({ transaction });
-                        if (accountsExist > 0) {
-                            await postInvoiceToLedger(
-                                { ...orderObj, id: orderId, createdAt: new Date() },
-                                transaction
-                            );
-                            // If order is paid (fully or partially), also post the cash receipt
-                            if (orderObj.paidAmount > 0) {
-                                await postInvoiceCashReceiptToLedger(
-                                    { ...orderObj, id: orderId, createdAt: new Date() },
-                                    transaction
-                                );
-                            }
-                        } else {
-                            console.warn(`[LEDGER] SKIP: Chart of Accounts not initialized — invoice ${orderObj.orderNumber} not posted to ledger`);
-                        }
-                    } catch (ledgerError) {
-                        console.error(`[LEDGER] Failed to post invoice ${orderObj.orderNumber}:`, ledgerError.message);
-                        // Don't crash order creation — ledger posting is supplementary
-                    }
-                }
-
-                return await Services.order.getOrder({id: orderId }, transaction);
-            });
+            const summary = await Services.orderImport.importBills(bills, { user: req.user });
+            const userName = req.user?.name || req.user?.username;
 
-            // Audit log for order creation
-            await createAuditLog({
+            createAuditLog({
                 userId: req.user?.id,
-                userName: req.user?.name || req.user?.username || 'Anonymous',
+                userName: userName || 'Anonymous',
                 userRole: req.user?.role || 'unknown',
                 action: 'CREATE',
-                entityType: 'ORDER',
-                entityId: result.id,
-                entityName: result.orderNumber,
-                newValues: {
-                    orderNumber: result.orderNumber,
-                    total: result.total,
-                    customerName: result.customerName,
-                    itemCount: orderItems.length
-                },
-                description: `Created order ${result.orderNumber} for ₹${result.total}`,
+                entityType: 'ORDER_IMPORT',
+                entityName: `${summary.firstInvoice} - ${summary.lastInvoice}`,
+                newValues: summary,
+                description: `Imported ${summary.imported} past bills worth ₹${summary.totalValue}`,
                 ipAddress: getClientIP(req),
                 userAgent: req.headers['user-agent']
-            });
+            }).catch(e => console.warn('[AUDIT] Bulk import log failed:', e.message));
 
-            // Mark recent weight fetches as consumed for this user
-            try {
-                const fiveMinAgo = new Date(Date.now() - 5 * 60 * 1000);
-                await db.weightLog.update(
-                    { consumed: true, orderId: result.id, orderNumber: result.orderNumber },
-                    { where: {
-                        userId: req.user?.id,
-                        consumed: false,
-                        createdAt: { [db.Sequelize.Op.gte]: fiveMinAgo }
-                    }}
-                );
-            } catch (e) { /* silent */ }
-
-            // Fire live Telegram alert for new bill (async, non-blocking)
-            telegram.alertOrderCreated({
-                orderNumber: result.orderNumber,
-                customerName: result.customerName,
-                total: result.total,
-                paidAmount: result.paidAmount,
-                dueAmount: result.dueAmount,
-                paymentStatus: result.paymentStatus,
-                items: orderItems,
-                createdBy: req.user?.name || req.user?.username
-            }).catch(e => console.error('[TELEGRAM] alertOrderCreated error:', e.message));
+            telegram.alertBulkImport({ ...summary, user: userName });
 
             return res.status(200).send({
                 status: 200,
-                message: 'order created successfully',
-                data: result,
-                linkSuggestion: linkSuggestion || undefined
+                message: summary.linkSuggestions.length > 0
+                    ? `Imported ${summary.imported} bills; ${summary.linkSuggestions.length} customer name(s) left unlinked — mobile differs from the existing customer`
+                    : `Imported ${summary.imported} bills`,
+                data: summary
             });
-
         } catch (error) {
-            console.error('Create order error:', error);
+            console.error('Bulk import error:', error);
             return res.status(500).send({
                 status: 500,
-                message: error.message || error
+                message: `Import failed — nothing was imported: ${error.message || error}`
             });
         }
     },
-    
+
     listOrders: async (req, res) => {
         try {
             const { error, value } = Validations.order.validateListOrdersObj(req.query);
@@ -366,17 +541,6 @@ module.exports = {
 
             const orderId = req.params.orderId;
             const { orderItems, ...orderData } = req.body;
-            
-            // Get original order for audit
-            const originalOrder = await Services.order.getOrder({ id: orderId });
-            if (!originalOrder) {
-                return res.status(400).send({
-                    status: 400,
-                    message: "order doesn't exist"
-                });
-            }
-            
-            console.log(`Updating order ${orderId}...`);
 
             // INVOICE IMMUTABILITY GUARD: Prevent direct mutation of financial fields
             // These fields can only change through proper receipt/adjustment entries
@@ -389,50 +553,113 @@ module.exports = {
                     message: `Cannot directly edit payment fields (${attemptedFinancialChanges.join(', ')}). Use "Record Payment" or adjustment entries instead.`
                 });
             }
-            
-            // Update order in transaction
-            const result = await db.sequelize.transaction(async (transaction) => {
-                // Update order basic info (exclude orderItems from update)
-                const { orderItems: _, ...updateFields } = orderData;
-                
-                // Add modified by info
-                if (req.user) {
-                    updateFields.modifiedBy = req.user.id;
-                    updateFields.modifiedByName = req.user.name || req.user.username;
-                }
-                
-                await Services.order.updateOrder(
-                    { id: orderId },
-                    updateFields
-                );
-                
-                // Update order items if provided
-                if (orderItems && orderItems.length > 0) {
-                    // Bulk update existing items instead of delete + insert
-                    const updatePromises = orderItems.map(item => {
-                        return db.orderItems.update(
-                            {
-                                quantity: item.quantity,
-                                productPrice: item.productPrice,
-                                totalPrice: item.totalPrice
-                            },
-                            {
-                                where: { id: item.id },
-                                transaction
-                            }
-                        );
+
+            let submittedItems = null;
+            if (orderItems !== undefined) {
+                const { error, value } = Validations.order.validateUpdateOrderItems(orderItems);
+                if (error) {
+                    return res.status(400).send({
+                        status: 400,
+                        message: error.details[0].message
                     });
-                    
-                    await Promise.all(updatePromises);
                 }
-                
-                // Return updated order with items (fetch outside transaction for speed)
-                return orderId;
+                submittedItems = value;
+            }
+
+            const updateFields = { ...orderData };
+            if (submittedItems) {
+                // Derived from the lines below
+                delete updateFields.subTotal;
+                delete updateFields.total;
+            }
+            // Add modified by info
+            if (req.user) {
+                updateFields.modifiedBy = req.user.id;
+                updateFields.modifiedByName = req.user.name || req.user.username;
+            }
+
+            // Lock the bill, diff its lines against the submitted ones and write only
+            // what changed: one upsert and one delete, whatever the number of lines
+            const outcome = await db.sequelize.transaction(async (transaction) => {
+                const order = await Services.order.lockOrder({ id: orderId }, transaction);
+                if (!order) {
+                    return { status: 400, message: "order doesn't exist" };
+                }
+                const before = {
+                    total: order.total,
+                    customerName: order.customerName,
+                    paymentStatus: order.paymentStatus
+                };
+
+                const stored = await Services.orderItems.listOrderItems({ orderId }, transaction);
+                const diff = submittedItems ? diffOrderItems(stored, submittedItems) : null;
+                if (diff && diff.unknownIds.length > 0) {
+                    return { status: 400, message: `Items do not belong to this order: ${diff.unknownIds.join(', ')}` };
+                }
+                // Changing the invoice amount would need ledger, balance and summary
+                // adjustments — those go through adjustment entries, not an edit
+                if (diff && !Money.equals(diff.subTotal, order.subTotal)) {
+                    return {
+                        status: 400,
+                        message: `Item totals must add up to the invoice subtotal ${order.subTotal} (got ${diff.subTotal}). Use adjustment entries to change the invoice amount.`
+                    };
+                }
+
+                await order.update(updateFields, { transaction });
+
+                const lines = new Map(stored.map(item => [item.id, item]));
+                let totals = null;
+                if (diff && (diff.inserted.length || diff.updated.length || diff.deleted.length)) {
+                    const upserted = await Services.orderItems.applyItemDiff(orderId, {
+                        upserts: [...diff.updated, ...diff.inserted],
+                        deletedIds: diff.deleted
+                    }, transaction);
+                    upserted.forEach(item => lines.set(item.id, item));
+                    diff.deleted.forEach(id => lines.delete(id));
+                    totals = await Services.order.recomputeTotals({ id: orderId }, transaction);
+
+                    // Move stock by the quantities the edit changed, logged against
+                    // the sale so deleting the bill later returns the right amount.
+                    // Savepoint: a stock failure must not abort the edit, as on create
+                    const changes = stockChanges(stored, diff);
+                    if (changes.length > 0) {
+                        const stockData = {
+                            referenceType: 'sale',
+                            referenceId: orderId,
+                            notes: `Edited ${order.orderNumber}`,
+                            createdBy: req.user?.id,
+                            createdByName: req.user?.name || req.user?.username
+                        };
+                        try {
+                            await db.sequelize.transaction({ transaction }, async (savepoint) => {
+                                await Services.stock.applyMovements('out', changes.filter(c => c.quantity > 0), stockData, savepoint);
+                                await Services.stock.applyMovements('in',
+                                    changes.filter(c => c.quantity < 0).map(c => ({ ...c, quantity: -c.quantity })), stockData, savepoint);
+                            });
+                        } catch (stockError) {
+                            console.error(`[STOCK] Failed to move stock for edit of ${order.orderNumber}:`, stockError.message);
+                        }
+                    }
+                }
+
+                const updated = order.get({ plain: true });
+                if (totals) {
+                    ['subTotal', 'total', 'dueAmount', 'updatedAt'].forEach((field) => { updated[field] = totals[field]; });
+                }
+                updated.orderItems = [...lines.values()].sort((a, b) => a.sortOrder - b.sortOrder);
+
+                console.log(`Order ${orderId} updated: ${diff ? `${diff.inserted.length} added, ${diff.updated.length} changed, ${diff.deleted.length} removed` : 'header only'}`);
+                return { status: 200, before, order: updated };
             });
-            
-            // Fetch complete order data after transaction
-            const completeOrder = await Services.order.getOrder({ id: result });
-            
+
+            if (outcome.status !== 200) {
+                return res.status(outcome.status).send({
+                    status: outcome.status,
+                    message: outcome.message
+                });
+            }
+            const { before, order: completeOrder } = outcome;
+
             // Audit log for order update
             await createAuditLog({
                 userId: req.user?.id,
@@ -441,24 +668,18 @@ module.exports = {
                 action: 'UPDATE',
                 entityType: 'ORDER',
                 entityId: orderId,
-                entityName: originalOrder.orderNumber,
-                oldValues: {
-                    total: originalOrder.total,
-                    customerName: originalOrder.customerName,
-                    paymentStatus: originalOrder.paymentStatus
-                },
+                entityName: completeOrder.orderNumber,
+                oldValues: before,
                 newValues: {
                     total: completeOrder.total,
                     customerName: completeOrder.customerName,
                     paymentStatus: completeOrder.paymentStatus
                 },
-                description: `Updated order ${originalOrder.orderNumber}`,
+                description: `Updated order ${completeOrder.orderNumber}`,
                 ipAddress: getClientIP(req),
                 userAgent: req.headers['user-agent']
             });
-            
-            console.log(`Order ${orderId} updated successfully`);
-            
+
             return res.status(200).send({
                 status: 200,
                 message: 'order updated successfully',
@@ -512,6 +733,17 @@ module.exports = {
                     console.error('Failed to update daily summary for deletion:', summaryError);
                 }
 
+                // Put back the stock this bill deducted
+                try {
+                    await db.sequelize.transaction({ transaction }, (savepoint) => Services.stock.reverseMovements('sale', orderId, {
+                        notes: `Deleted ${order.orderNumber}`,
+                        createdBy: req.user?.id,
+                        createdByName: req.user?.name || req.user?.username
+                    }, savepoint));
+                } catch (stockError) {
+                    console.error(`[STOCK] Failed to restore stock for ${order.orderNumber}:`, stockError.message);
+                }
+
                 // CRITICAL: Reverse customer balance if this was a credit sale
                 if (order.customerId && order.paymentStatus !== 'paid') {
                     try {
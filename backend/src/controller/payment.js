@@ -286,6 +286,14 @@ module.exports = {
                     }
                 }
 
+                // Idempotency-Key response commits with the payment
+                if (req.idempotency) {
+                    await req.idempotency.complete(200, {
+                        status: 200,
+                        message: 'payment recorded successfully',
+                        data: response
+                    }, transaction);
+                }
                 return response;
             });
 
@@ -327,6 +335,61 @@ module.exports = {
         }
     },
     
+    // Bulk receipt import (bank statement CSV or JSON) with optional FIFO allocation
+    bulkImportReceipts: async (req, res) => {
+        try {
+            const rawReceipts = Services.receiptImport.parseReceipts(req);
+            if (!rawReceipts || rawReceipts.length === 0) {
+                return res.status(400).send({
+                    status: 400,
+                    message: 'No receipts found. Send a text/csv body or JSON { receipts: [...] }'
+                });
+            }
+
+            const allocate = req.query.allocate || (req.body && req.body.allocate) || 'fifo';
+            if (!['fifo', 'none'].includes(allocate)) {
+                return res.status(400).send({ status: 400, message: 'allocate must be "fifo" or "none"' });
+            }
+
+            const { receipts, errors } = Services.receiptImport.validateReceipts(rawReceipts);
+            if (errors.length > 0) {
+                return res.status(400).send({
+                    status: 400,
+                    message: `${errors.length} receipt(s) failed validation — nothing was imported`,
+                    data: { errors: errors.slice(0, 100), errorCount: errors.length }
+                });
+            }
+
+            const summary = await Services.receiptImport.importReceipts(receipts, { user: req.user, allocate });
+
+            createAuditLog({
+                userId: req.user?.id,
+                userName: req.user?.name || req.user?.username || 'System',
+                userRole: req.user?.role || 'unknown',
+                action: 'CREATE',
+                entityType: 'PAYMENT_IMPORT',
+                entityName: `${summary.imported} receipts`,
+                oldValues: null,
+                newValues: summary,
+                description: `Imported ${summary.imported} receipts | ₹${summary.totalAmount} | ${summary.allocationCount} allocations (${allocate})`,
+                ipAddress: getClientIP(req),
+                userAgent: req.headers['user-agent']
+            }).catch(e => console.warn('[AUDIT] Receipt import log failed:', e.message));
+
+            return res.status(200).send({
+                status: 200,
+                message: `Imported ${summary.imported} receipts`,
+                data: summary
+            });
+        } catch (error) {
+            console.error('Bulk receipt import error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: `Import failed — nothing was imported: ${error.message || error}`
+            });
+        }
+    },
+
     listPayments: async (req, res) => {
         try {
             const { error, value } = Validations.payment.validateListPaymentsObj(req.query);
@@ -1,65 +1,6 @@
 const Services = require('../services');
 const Validations = require('../validations');
 
-let weight = 0;
-let connectionStatus = 'disconnected'; // 'connected', 'disconnected', 'error'
-let lastDataReceived = null; // Timestamp of last data received
-
-const fs = require('fs');
-const { SerialPort } = require('serialport');
-const { ReadlineParser } = require('@serialport/parser-readline');
-
-const devPath = '/dev/cu.usbserial-1420';
-let port = null;
-let parser = null;
-
-// SAFE SERIAL INITIALIZATION
-if (fs.existsSync(devPath)) {
-    console.log("Serial device found → opening:", devPath);
-
-    try {
-        port = new SerialPort({
-            path: devPath,
-            baudRate: 9600
-        });
-
-        parser = port.pipe(new ReadlineParser({ delimiter: '\n' }));
-
-        port.on('open', () => {
-            console.log("Serial port opened successfully");
-            connectionStatus = 'connected';
-        });
-
-        parser.on('data', (line) => {
-            const data = Number(line.trim());
-            if (!isNaN(data) && data !== weight) {
-                weight = data;
-                lastDataReceived = Date.now();
-                connectionStatus = 'connected';
-            }
-        });
-
-        port.on('error', (e) => {
-            console.log("SerialPort Error:", e.message);
-            connectionStatus = 'error';
-        });
-
-        port.on('close', () => {
-            console.log("Serial port closed");
-            connectionStatus = 'disconnected';
-        });
-
-    } catch (err) {
-        console.log("Failed to open serial port:", err.message);
-        connectionStatus = 'error';
-    }
-
-} else {
-    console.log("Serial device NOT found → skipping serial initialization");
-    connectionStatus = 'disconnected';
-}
-
-
 module.exports = {
     addProduct: async (req, res) => {
         try {
@@ -200,6 +141,9 @@ module.exports = {
 
     getWeights: async (req, res) => {
         try {
+            // Serial port is owned by the leader process; this is its latest reading
+            const { weight, connectionStatus, lastDataReceived } = Services.scaleReader.getReading();
+
             // Check if connection seems stale (no data in last 30 seconds while expecting continuous data)
             const isStale = lastDataReceived && (Date.now() - lastDataReceived > 30000);
             const effectiveStatus = isStale ? 'stale' : connectionStatus;
@@ -41,6 +41,19 @@ module.exports = {
                 purchaseItems = purchaseItems.map(item => { return {...item, purchaseBillId: purchaseBillId } });
                 await Services.purchaseItem.addPurchaseItems(purchaseItems, transaction);
 
+                // Stock in for catalogue items — one statement for the whole bill
+                try {
+                    await db.sequelize.transaction({ transaction }, (savepoint) => Services.stock.applyMovements('in', purchaseItems, {
+                        referenceType: 'purchase',
+                        referenceId: purchaseBillId,
+                        notes: `Purchase ${billNumber}`,
+                        createdBy: req.user?.id,
+                        createdByName: req.user?.name || req.user?.username
+                    }, savepoint));
+                } catch (stockError) {
+                    console.error(`[STOCK] Failed to add stock for purchase ${billNumber}:`, stockError.message);
+                }
+
                 // Update supplier balance
                 const supplier = await Services.supplier.getSupplier({ id: purchaseObj.supplierId });
 
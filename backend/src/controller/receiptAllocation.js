@@ -10,6 +10,10 @@
  */
 const db = require('../models');
 const { createAuditLog } = require('../middleware/auditLogger');
+const { sumAllocations, paymentState } = require('../utils/fifoAllocation');
+
+const isBackfillAllocation = (a) =>
+    a.allocatedByName === 'system-backfill' || (a.notes && a.notes.startsWith('Backfill FIFO:'));
 
 module.exports = {
     /**
@@ -62,15 +66,30 @@ module.exports = {
                     );
                 }
 
-                const createdAllocations = [];
-
                 for (const alloc of allocations) {
                     if (!alloc.orderId || !alloc.amount || Number(alloc.amount) <= 0) {
                         throw new Error('Each allocation must have orderId and positive amount');
                     }
+                }
 
-                    // Fetch invoice with row-level lock (FOR UPDATE) to prevent concurrent modifications
-                    const order = await db.order.findByPk(alloc.orderId, { transaction, lock: transaction.LOCK.UPDATE });
+                // Fetch all invoices with row-level lock (FOR UPDATE) and their existing allocations in one pass
+                const orderIds = [...new Set(allocations.map(a => a.orderId))];
+                const orders = await db.order.findAll({
+                    where: { id: orderIds },
+                    transaction,
+                    lock: transaction.LOCK.UPDATE
+                });
+                const ordersById = new Map(orders.map(o => [o.id, o]));
+                const invoiceAllocations = await db.receiptAllocation.findAll({
+                    attributes: ['orderId', 'amount'],
+                    where: { orderId: orderIds, isDeleted: false },
+                    transaction
+                });
+                const allocatedPerInvoice = sumAllocations(invoiceAllocations, 'orderId');
+
+                const rows = [];
+                for (const alloc of allocations) {
+                    const order = ordersById.get(alloc.orderId);
                     if (!order) {
                         throw new Error(`Invoice ${alloc.orderId} not found`);
                     }
@@ -78,12 +97,7 @@ module.exports = {
                         throw new Error(`Invoice ${order.orderNumber} is deleted`);
                     }
 
-                    // Check existing allocations for this specific invoice
-                    const invoiceAllocations = await db.receiptAllocation.findAll({
-                        where: { orderId: alloc.orderId, isDeleted: false },
-                        transaction
-                    });
-                    const invoiceAllocatedTotal = invoiceAllocations.reduce((s, a) => s + Number(a.amount), 0);
+                    const invoiceAllocatedTotal = allocatedPerInvoice.get(alloc.orderId) || 0;
                     const invoiceTotal = Number(order.total) || 0;
 
                     if (invoiceAllocatedTotal + Number(alloc.amount) > invoiceTotal + 0.01) {
@@ -93,36 +107,27 @@ module.exports = {
                             `attempting ₹${Number(alloc.amount).toFixed(2)}`
                         );
                     }
+                    allocatedPerInvoice.set(alloc.orderId, invoiceAllocatedTotal + Number(alloc.amount));
 
-                    // Create allocation record
-                    const allocation = await db.receiptAllocation.create({
+                    rows.push({
                         paymentId,
                         orderId: alloc.orderId,
                         amount: Number(alloc.amount),
                         allocatedBy: req.user?.id,
                         allocatedByName: changedBy.trim(),
                         notes: alloc.notes || null
-                    }, { transaction });
-
-                    createdAllocations.push(allocation);
-
-                    // Update the order's cached paidAmount/dueAmount/paymentStatus
-                    const newInvoiceAllocated = invoiceAllocatedTotal + Number(alloc.amount);
-                    const newDueAmount = Math.max(0, invoiceTotal - newInvoiceAllocated);
-                    let newPaymentStatus = 'unpaid';
-                    if (newInvoiceAllocated >= invoiceTotal) {
-                        newPaymentStatus = 'paid';
-                    } else if (newInvoiceAllocated > 0) {
-                        newPaymentStatus = 'partial';
-                    }
+                    });
+                }
 
-                    await db.order.update({
-                        paidAmount: newInvoiceAllocated,
-                        dueAmount: newDueAmount,
-                        paymentStatus: newPaymentStatus
-                    }, { where: { id: alloc.orderId }, transaction });
+                const createdAllocations = await db.receiptAllocation.bulkCreate(rows, { transaction });
 
-                    console.log(`[ALLOCATION] ${order.orderNumber}: allocated ₹${alloc.amount} from ${payment.paymentNumber} → due now ₹${newDueAmount.toFixed(2)} (${newPaymentStatus})`);
+                // Update each invoice's cached paidAmount/dueAmount/paymentStatus
+                for (const orderId of orderIds) {
+                    const order = ordersById.get(orderId);
+                    const state = paymentState(Number(order.total) || 0, allocatedPerInvoice.get(orderId));
+                    await db.order.update(state, { where: { id: orderId }, transaction });
+
+                    console.log(`[ALLOCATION] ${order.orderNumber}: allocated from ${payment.paymentNumber} → due now ₹${state.dueAmount.toFixed(2)} (${state.paymentStatus})`);
                 }
 
                 return createdAllocations;
@@ -320,47 +325,35 @@ module.exports = {
             // Gather affected order IDs
             const affectedOrderIds = [...new Set(backfillAllocations.map(a => a.orderId))];
 
-            const affectedOrders = [];
-            for (const orderId of affectedOrderIds) {
-                const order = await db.order.findByPk(orderId);
-                if (!order) continue;
-
-                // Current state
-                const currentPaid = Number(order.paidAmount) || 0;
-                const currentDue = Number(order.dueAmount);
-                const currentStatus = order.paymentStatus;
+            // Load affected orders and all their live allocations in two queries
+            const orders = await db.order.findAll({ where: { id: affectedOrderIds } });
+            const allAllocations = await db.receiptAllocation.findAll({
+                where: { orderId: affectedOrderIds, isDeleted: false }
+            });
+            const legitimateAllocations = allAllocations.filter(a => !isBackfillAllocation(a));
+            const legitimatePerOrder = sumAllocations(legitimateAllocations, 'orderId');
+            const countPerOrder = (list) => list.reduce((m, a) => m.set(a.orderId, (m.get(a.orderId) || 0) + 1), new Map());
+            const backfillCounts = countPerOrder(allAllocations.filter(isBackfillAllocation));
+            const legitimateCounts = countPerOrder(legitimateAllocations);
+
+            const ordersById = new Map(orders.map(o => [o.id, o]));
+            const affectedOrders = affectedOrderIds.filter(id => ordersById.has(id)).map((orderId) => {
+                const order = ordersById.get(orderId);
                 const orderTotal = Number(order.total) || 0;
-
                 // What would remain after removing backfill allocations
-                const allAllocations = await db.receiptAllocation.findAll({
-                    where: { orderId, isDeleted: false }
-                });
-                const backfillForThisOrder = allAllocations.filter(a =>
-                    a.allocatedByName === 'system-backfill' ||
-                    (a.notes && a.notes.startsWith('Backfill FIFO:'))
-                );
-                const legitimateAllocations = allAllocations.filter(a =>
-                    a.allocatedByName !== 'system-backfill' &&
-                    !(a.notes && a.notes.startsWith('Backfill FIFO:'))
-                );
+                const afterUndo = paymentState(orderTotal, legitimatePerOrder.get(order.id) || 0);
 
-                const legitimateTotal = legitimateAllocations.reduce((s, a) => s + Number(a.amount), 0);
-                const newDue = Math.max(0, orderTotal - legitimateTotal);
-                let newStatus = 'unpaid';
-                if (legitimateTotal >= orderTotal) newStatus = 'paid';
-                else if (legitimateTotal > 0) newStatus = 'partial';
-
-                affectedOrders.push({
+                return {
                     orderId: order.id,
                     orderNumber: order.orderNumber,
                     customerName: order.customerName,
                     orderTotal,
-                    current: { paidAmount: currentPaid, dueAmount: currentDue, paymentStatus: currentStatus },
-                    afterUndo: { paidAmount: legitimateTotal, dueAmount: newDue, paymentStatus: newStatus },
-                    backfillAllocationsToRemove: backfillForThisOrder.length,
-                    legitimateAllocationsKept: legitimateAllocations.length
-                });
-            }
+                    current: { paidAmount: Number(order.paidAmount) || 0, dueAmount: Number(order.dueAmount), paymentStatus: order.paymentStatus },
+                    afterUndo,
+                    backfillAllocationsToRemove: backfillCounts.get(order.id) || 0,
+                    legitimateAllocationsKept: legitimateCounts.get(order.id) || 0
+                };
+            });
 
             return res.status(200).json({
                 status: 200,
@@ -428,38 +421,30 @@ module.exports = {
                     }
                 );
 
-                // Recalculate each affected order
-                const ordersFixed = [];
-                for (const orderId of affectedOrderIds) {
-                    const order = await db.order.findByPk(orderId, { transaction, lock: transaction.LOCK.UPDATE });
-                    if (!order) continue;
-
-                    const oldPaid = Number(order.paidAmount) || 0;
-                    const oldStatus = order.paymentStatus;
+                // Recalculate each affected order from its remaining legitimate allocations
+                const orders = await db.order.findAll({
+                    where: { id: affectedOrderIds },
+                    transaction,
+                    lock: transaction.LOCK.UPDATE
+                });
+                const remaining = await db.receiptAllocation.findAll({
+                    attributes: ['orderId', 'amount'],
+                    where: { orderId: affectedOrderIds, isDeleted: false },
+                    transaction
+                });
+                const legitimatePerOrder = sumAllocations(remaining, 'orderId');
 
-                    // Only count remaining legitimate allocations
-                    const remaining = await db.receiptAllocation.findAll({
-                        where: { orderId, isDeleted: false },
-                        transaction
-                    });
-                    const legitimateTotal = remaining.reduce((s, a) => s + Number(a.amount), 0);
-                    const orderTotal = Number(order.total) || 0;
-                    const newDue = Math.max(0, orderTotal - legitimateTotal);
-                    let newStatus = 'unpaid';
-                    if (legitimateTotal >= orderTotal) newStatus = 'paid';
-                    else if (legitimateTotal > 0) newStatus = 'partial';
+                const ordersFixed = [];
+                for (const order of orders) {
+                    const after = paymentState(Number(order.total) || 0, legitimatePerOrder.get(order.id) || 0);
 
-                    await db.order.update({
-                        paidAmount: legitimateTotal,
-                        dueAmount: newDue,
-                        paymentStatus: newStatus
-                    }, { where: { id: orderId }, transaction });
+                    await db.order.update(after, { where: { id: order.id }, transaction });
 
                     ordersFixed.push({
                         orderNumber: order.orderNumber,
                         customerName: order.customerName,
-                        before: { paidAmount: oldPaid, paymentStatus: oldStatus },
-                        after: { paidAmount: legitimateTotal, dueAmount: newDue, paymentStatus: newStatus }
+                        before: { paidAmount: Number(order.paidAmount) || 0, paymentStatus: order.paymentStatus },
+                        after
                     });
                 }
 
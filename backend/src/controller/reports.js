@@ -210,14 +210,12 @@ module.exports = {
                     });
                 });
 
-                // Get payments
-                const payments = await db.payment.findAll({
-                    where: { 
-                        partyId: partyId,
-                        partyType: 'supplier'
-                    },
-                    order: [['paymentDate', 'DESC']]
-                });
+                // Get payments (closed financial years included)
+                const payments = await db.sequelize.query(`
+                    SELECT "paymentDate", "paymentNumber", amount FROM payments_all
+                    WHERE "partyId" = :partyId AND "partyType" = 'supplier'
+                    ORDER BY "paymentDate" DESC
+                `, { replacements: { partyId }, type: db.Sequelize.QueryTypes.SELECT });
 
                 payments.forEach(payment => {
                     transactions.push({
@@ -233,13 +231,12 @@ module.exports = {
             } else {
                 // For customers, we'll use order data with customerMobile or customerName
                 // This is a simplified version - you might want to create a separate customer table
-                const orders = await db.order.findAll({
-                    where: db.Sequelize.or(
-                        { customerMobile: partyId },
-                        { id: partyId }
-                    ),
-                    order: [['orderDate', 'DESC']]
-                });
+                // Closed financial years included — statements span years
+                const orders = await db.sequelize.query(`
+                    SELECT "orderDate", "orderNumber", total, "customerName", "customerMobile" FROM orders_all
+                    WHERE "customerMobile" = :partyId OR CAST(id AS text) = :partyId
+                    ORDER BY "orderDate" DESC
+                `, { replacements: { partyId }, type: db.Sequelize.QueryTypes.SELECT });
 
                 if (!orders || orders.length === 0) {
                     return res.status(400).send({
@@ -265,13 +262,11 @@ module.exports = {
                 });
 
                 // Get payments
-                const payments = await db.payment.findAll({
-                    where: { 
-                        partyId: partyId,
-                        partyType: 'customer'
-                    },
-                    order: [['paymentDate', 'DESC']]
-                });
+                const payments = await db.sequelize.query(`
+                    SELECT "paymentDate", "paymentNumber", amount FROM payments_all
+                    WHERE CAST("partyId" AS text) = :partyId AND "partyType" = 'customer'
+                    ORDER BY "paymentDate" DESC
+                `, { replacements: { partyId }, type: db.Sequelize.QueryTypes.SELECT });
 
                 payments.forEach(payment => {
                     transactions.push({
@@ -285,15 +280,12 @@ module.exports = {
                 });
             }
 
-            // Sort all transactions by date
-            transactions.sort((a, b) => new Date(a.date) - new Date(b.date));
-
-            // Calculate running balance
-            let balance = partyType === 'supplier' ? (partyInfo.openingBalance || 0) : 0;
-            transactions.forEach(txn => {
-                balance = (partyType === 'supplier') ? balance + txn.credit - txn.debit : balance + txn.debit - txn.credit;
-                txn.balance = balance;
-            });
+            // Sort by date and calculate running balance (worker thread for long statements)
+            const { transactions: sorted, currentBalance } = await Services.workerPool.runTask('partyStatement', {
+                transactions,
+                partyType,
+                openingBalance: partyType === 'supplier' ? (partyInfo.openingBalance || 0) : 0
+            }, { size: transactions.length });
 
             return res.status(200).send({
                 status: 200,
@@ -301,8 +293,8 @@ module.exports = {
                 data: {
                     partyInfo,
                     partyType,
-                    transactions,
-                    currentBalance: balance
+                    transactions: sorted,
+                    currentBalance
                 }
             });
 
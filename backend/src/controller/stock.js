@@ -50,6 +50,60 @@ module.exports = {
         }
     },
 
+    // List low-stock products, lowest stock first
+    listLowStock: async (req, res) => {
+        try {
+            const { error, value } = Validations.stock.validateListStocks(req.query);
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const response = await Services.stock.listStocks({ ...value, lowStockOnly: true });
+
+            return res.status(200).send({
+                status: 200,
+                message: 'Low stock fetched successfully',
+                data: response
+            });
+        } catch (error) {
+            console.error('List low stock error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
+    // Incremental low-stock alert feed
+    getLowStockFeed: async (req, res) => {
+        try {
+            const { error, value } = Validations.stock.validateLowStockFeed(req.query);
+            if (error) {
+                return res.status(400).send({
+                    status: 400,
+                    message: error.details[0].message
+                });
+            }
+
+            const response = await Services.stock.getLowStockFeed(value);
+
+            return res.status(200).send({
+                status: 200,
+                message: 'Low stock feed fetched successfully',
+                data: response
+            });
+        } catch (error) {
+            console.error('Low stock feed error:', error);
+            return res.status(500).send({
+                status: 500,
+                message: error.message || error
+            });
+        }
+    },
+
     // Get stock for a specific product
     getProductStock: async (req, res) => {
         try {
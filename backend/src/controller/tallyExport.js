@@ -1,21 +1,9 @@
 const db = require('../models');
+const financialYears = require('../services/financialYears');
+const { runTask } = require('../services/workerPool');
 
-// Helper function to convert data to CSV
-const convertToCSV = (headers, rows) => {
-    const csvHeaders = headers.join(',');
-    const csvRows = rows.map(row => {
-        return row.map(cell => {
-            // Escape quotes and wrap in quotes if contains comma
-            if (cell === null || cell === undefined) return '';
-            const cellStr = String(cell);
-            if (cellStr.includes(',') || cellStr.includes('"') || cellStr.includes('\n')) {
-                return `"${cellStr.replace(/"/g, '""')}"`;
-            }
-            return cellStr;
-        }).join(',');
-    });
-    return [csvHeaders, ...csvRows].join('\n');
-};
+// Helper function to convert data to CSV (large exports are formatted on a worker thread)
+const convertToCSV = (headers, rows) => runTask('csv', { headers, rows }, { size: rows.length });
 
 // Helper to determine Invoice Type (B2B if GSTIN present, B2C otherwise)
 const getInvoiceType = (gstin) => {
@@ -56,6 +44,31 @@ const calculateGSTBreakup = (taxAmount, taxPercent, placeOfSupply, sellerStateCo
     }
 };
 
+/**
+ * Non-deleted orders with their orderItems, by id or by orderDate range
+ * (neither = every order), oldest first. Reads the _all views when the
+ * selection reaches a closed financial year.
+ */
+const findOrders = async ({ ids = null, startDate = null, endDate = null }) => {
+    const range = !ids && startDate && endDate;
+    const scope = await financialYears.salesScope(range ? startDate : null);
+    const orders = await db.sequelize.query(`
+        SELECT * FROM ${scope.orders}
+        WHERE "isDeleted" = false
+        ${ids ? 'AND id IN (:ids)' : ''}
+        ${range ? 'AND "orderDate" BETWEEN :startDate AND :endDate' : ''}
+        ORDER BY "orderDate" ASC
+    `, { replacements: { ids, startDate, endDate }, type: db.Sequelize.QueryTypes.SELECT });
+    if (orders.length === 0) return orders;
+
+    const items = await db.sequelize.query(`
+        SELECT * FROM ${scope.orderItems} WHERE "orderId" IN (:orderIds)
+    `, { replacements: { orderIds: orders.map(o => o.id) }, type: db.Sequelize.QueryTypes.SELECT });
+    const byOrder = {};
+    items.forEach(item => { (byOrder[item.orderId] = byOrder[item.orderId] || []).push(item); });
+    return orders.map(order => ({ ...order, orderItems: byOrder[order.id] || [] }));
+};
+
 module.exports = {
     // GSTR-1 compliant export for sales
     exportGSTR1: async (req, res) => {
@@ -63,21 +76,9 @@ module.exports = {
             const { ids } = req.body;
             const { startDate, endDate } = req.query;
 
-            let whereClause = { isDeleted: false };
-            
-            if (ids && Array.isArray(ids) && ids.length > 0) {
-                whereClause.id = { [db.Sequelize.Op.in]: ids };
-            } else if (startDate && endDate) {
-                whereClause.orderDate = {
-                    [db.Sequelize.Op.between]: [startDate, endDate]
-                };
-            }
-
-            const orders = await db.order.findAll({
-                where: whereClause,
-                include: [{ model: db.orderItems }],
-                order: [['orderDate', 'ASC']]
-            });
+            const orders = await findOrders(ids && Array.isArray(ids) && ids.length > 0
+                ? { ids }
+                : { startDate, endDate });
 
             // GSTR-1 compliant headers
             const headers = [
@@ -132,7 +133,7 @@ module.exports = {
                 ]);
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=GSTR1_Sales_Export.csv');
@@ -151,18 +152,7 @@ module.exports = {
         try {
             const { startDate, endDate } = req.query;
 
-            const whereClause = { isDeleted: false };
-            if (startDate && endDate) {
-                whereClause.orderDate = {
-                    [db.Sequelize.Op.between]: [startDate, endDate]
-                };
-            }
-
-            const orders = await db.order.findAll({
-                where: whereClause,
-                include: [{ model: db.orderItems }],
-                order: [['orderDate', 'ASC']]
-            });
+            const orders = await findOrders({ startDate, endDate });
 
             const headers = [
                 'Date', 'Invoice No', 'Customer Name', 'Customer Mobile', 
@@ -212,7 +202,7 @@ module.exports = {
                 }
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=tally_sales_export.csv');
@@ -238,16 +228,7 @@ module.exports = {
                 });
             }
 
-            const orders = await db.order.findAll({
-                where: {
-                    id: {
-                        [db.Sequelize.Op.in]: ids
-                    },
-                    isDeleted: false
-                },
-                include: [{ model: db.orderItems }],
-                order: [['orderDate', 'ASC']]
-            });
+            const orders = await findOrders({ ids });
 
             // GSTR-1 compliant headers
             const headers = [
@@ -302,7 +283,7 @@ module.exports = {
                 ]);
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=GSTR1_Sales_Export.csv');
@@ -387,7 +368,7 @@ module.exports = {
                 }
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=tally_purchases_export.csv');
@@ -476,7 +457,7 @@ module.exports = {
                 }
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=tally_purchases_export.csv');
@@ -495,19 +476,18 @@ module.exports = {
         try {
             const { startDate, endDate, partyType } = req.query;
 
-            const whereClause = {};
-            if (startDate && endDate) {
-                whereClause.paymentDate = {
-                    [db.Sequelize.Op.between]: [startDate, endDate]
-                };
-            }
-            if (partyType) {
-                whereClause.partyType = partyType;
-            }
-
-            const payments = await db.payment.findAll({
-                where: whereClause,
-                order: [['paymentDate', 'ASC']]
+            // Payments of closed financial years live in payments_all
+            const range = startDate && endDate;
+            const scope = await financialYears.salesScope(range ? startDate : null);
+            const payments = await db.sequelize.query(`
+                SELECT * FROM ${scope.payments}
+                WHERE true
+                ${range ? 'AND "paymentDate" BETWEEN :startDate AND :endDate' : ''}
+                ${partyType ? 'AND "partyType" = :partyType' : ''}
+                ORDER BY "paymentDate" ASC
+            `, {
+                replacements: { startDate: startDate || null, endDate: endDate || null, partyType: partyType || null },
+                type: db.Sequelize.QueryTypes.SELECT
             });
 
             const headers = [
@@ -526,7 +506,7 @@ module.exports = {
                 payment.notes || ''
             ]);
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=tally_payments_export.csv');
@@ -599,7 +579,7 @@ module.exports = {
                 ]);
             });
 
-            const csv = convertToCSV(headers, rows);
+            const csv = await convertToCSV(headers, rows);
 
             res.setHeader('Content-Type', 'text/csv');
             res.setHeader('Content-Disposition', 'attachment; filename=tally_outstanding_export.csv');
@@ -0,0 +1,59 @@
+const db = require('../models');
+const changeFeeds = require('../services/changeFeeds');
+
+// Client versions are epoch microseconds, exact in a bigint
+const VERSION_TO_TS = `(TIMESTAMP WITH TIME ZONE 'epoch' + CAST(:since AS bigint) * INTERVAL '1 microsecond')`;
+
+module.exports = {
+    // Catalogue version: the latest change or deletion below the feed horizon
+    // (see services/changeFeeds), as epoch microseconds (string; '0' for an
+    // empty catalogue). Every row up to it is committed. Two index-only MAX lookups.
+    getVersion: async ({ table, entityType }) => {
+        const horizon = await changeFeeds.horizon([table, 'catalog_tombstones']);
+        const [row] = await db.sequelize.query(`
+            SELECT CAST(COALESCE(FLOOR(EXTRACT(EPOCH FROM GREATEST(
+                (SELECT MAX("updatedAt") FROM ${table} WHERE "updatedAt" < CAST(:horizon AS timestamptz)),
+                (SELECT MAX("deletedAt") FROM catalog_tombstones
+                 WHERE "entityType" = :entityType AND "deletedAt" < CAST(:horizon AS timestamptz))
+            )) * 1000000), 0) AS bigint) AS version
+        `, {
+            replacements: { entityType, horizon },
+            type: db.sequelize.QueryTypes.SELECT
+        });
+        return String(row.version);
+    },
+
+    // Rows changed, and ids deleted, after `since` up to `version` (from
+    // getVersion). Without `since`, every row up to `version` and no deletions.
+    listChanges: async ({ table, entityType, columns }, { since, version }) => {
+        const select = columns.map(c => `"${c}"`).join(', ');
+        const until = `(TIMESTAMP WITH TIME ZONE 'epoch' + CAST(:version AS bigint) * INTERVAL '1 microsecond')`;
+        if (!since) {
+            const upserts = await db.sequelize.query(`
+                SELECT ${select} FROM ${table}
+                WHERE "updatedAt" <= ${until}
+                ORDER BY "updatedAt", id
+            `, { replacements: { version }, type: db.sequelize.QueryTypes.SELECT });
+            return { upserts, deletes: [] };
+        }
+
+        const replacements = { since, version, entityType };
+        const [upserts, deleted] = await Promise.all([
+            db.sequelize.query(`
+                SELECT ${select} FROM ${table}
+                WHERE "updatedAt" > ${VERSION_TO_TS} AND "updatedAt" <= ${until}
+                ORDER BY "updatedAt", id
+            `, { replacements, type: db.sequelize.QueryTypes.SELECT }),
+            db.sequelize.query(`
+                SELECT DISTINCT "entityId" FROM catalog_tombstones
+                WHERE "entityType" = :entityType
+                  AND "deletedAt" > ${VERSION_TO_TS} AND "deletedAt" <= ${until}
+            `, { replacements, type: db.sequelize.QueryTypes.SELECT })
+        ]);
+        return { upserts, deletes: deleted.map(d => d.entityId) };
+    },
+
+    purgeTombstones: async (olderThan) => {
+        return await db.catalogTombstone.destroy({ where: { deletedAt: { [db.Sequelize.Op.lt]: olderThan } } });
+    }
+};
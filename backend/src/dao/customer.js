@@ -1,5 +1,6 @@
 const uuidv4 = require('uuid/v4');
 const db = require('../models');
+const financialYears = require('../services/financialYears');
 
 module.exports = {
     createCustomer: async (payload) => {
@@ -69,56 +70,59 @@ module.exports = {
      * - Fallback (if no ledger account): opening + sum(dueAmount) from orders
      * 
      * Invoice due is DERIVED: invoice_total - sum(receipt_allocations for that invoice)
+     * Orders and payments archived by a financial-year close are listed, and
+     * count towards the balance through party_carry_forwards.
      */
     getCustomerWithTransactions: async (customerId) => {
         try {
             const customer = await db.customer.findByPk(customerId);
             if (!customer) return null;
 
+            // A customer's history reaches back to the beginning: once a year
+            // is closed, its settled invoices and receipts are read from the
+            // _all views (financialYear is set on those rows)
+            const scope = await financialYears.salesScope();
+            const yearColumn = scope.archived ? '"financialYear"' : 'CAST(NULL AS VARCHAR(7)) AS "financialYear"';
+            const party = { customerId, name: customer.name };
+
             // Get all orders for this customer
-            const orders = await db.order.findAll({
-                where: { 
-                    [db.Sequelize.Op.or]: [
-                        { customerId: customerId },
-                        { 
-                            customerName: customer.name,
-                            customerId: null
-                        }
-                    ],
-                    isDeleted: false
-                },
-                attributes: ['id', 'orderNumber', 'orderDate', 'total', 'paidAmount', 'dueAmount', 'paymentStatus', 'createdAt', 'customerId'],
-                order: [['createdAt', 'ASC']]
-            });
+            const orders = await db.sequelize.query(`
+                SELECT id, "orderNumber", "orderDate", total, "paidAmount", "dueAmount", "paymentStatus", "createdAt", "customerId", ${yearColumn}
+                FROM ${scope.orders}
+                WHERE ("customerId" = :customerId OR ("customerName" = :name AND "customerId" IS NULL))
+                AND "isDeleted" = false
+                ORDER BY "createdAt" ASC
+            `, { replacements: party, type: db.Sequelize.QueryTypes.SELECT });
 
             // Get all non-deleted payments from this customer
-            const payments = await db.payment.findAll({
-                where: { 
-                    [db.Sequelize.Op.or]: [
-                        { partyId: customerId },
-                        {
-                            partyName: customer.name,
-                            partyId: null
-                        }
-                    ],
-                    partyType: 'customer',
-                    ...(db.payment.rawAttributes.isDeleted ? { isDeleted: false } : {})
-                },
-                attributes: ['id', 'paymentNumber', 'paymentDate', 'amount', 'referenceType', 'referenceId', 'notes', 'createdAt'],
-                order: [['createdAt', 'ASC']]
-            });
+            const payments = await db.sequelize.query(`
+                SELECT id, "paymentNumber", "paymentDate", amount, "referenceType", "referenceId", notes, "createdAt", ${yearColumn}
+                FROM ${scope.payments}
+                WHERE ("partyId" = :customerId OR ("partyName" = :name AND "partyId" IS NULL))
+                AND "partyType" = 'customer'
+                ${db.payment.rawAttributes.isDeleted ? 'AND "isDeleted" = false' : ''}
+                ORDER BY "createdAt" ASC
+            `, { replacements: party, type: db.Sequelize.QueryTypes.SELECT });
+
+            // What the years closed so far carried forward for this customer
+            const [carried] = await db.sequelize.query(`
+                SELECT 
+                    COALESCE(SUM(sales), 0) as sales,
+                    COALESCE(SUM(received), 0) as received
+                FROM party_carry_forwards
+                WHERE "partyType" = 'customer'
+                AND ("partyId" = :customerId OR ("partyName" = :name AND "partyId" IS NULL))
+            `, { replacements: party, type: db.Sequelize.QueryTypes.SELECT });
 
             // Get receipt allocations for this customer's orders
             const orderIds = orders.map(o => o.id);
             let allocations = [];
             if (orderIds.length > 0) {
                 try {
-                    allocations = await db.receiptAllocation.findAll({
-                        where: {
-                            orderId: { [db.Sequelize.Op.in]: orderIds },
-                            isDeleted: false
-                        }
-                    });
+                    allocations = await db.sequelize.query(`
+                        SELECT * FROM ${scope.allocations}
+                        WHERE "orderId" IN (:orderIds) AND "isDeleted" = false
+                    `, { replacements: { orderIds }, type: db.Sequelize.QueryTypes.SELECT });
                 } catch (e) {
                     // Table may not exist yet
                 }
@@ -142,8 +146,12 @@ module.exports = {
                 const pNum = p.paymentNumber || (p.dataValues && p.dataValues.paymentNumber) || '';
                 return !pNum.startsWith('PAY-TOGGLE-');
             });
-            const totalSales = orders.reduce((sum, o) => sum + (Number(o.total) || 0), 0);
-            const totalReceived = realPayments.reduce((sum, p) => sum + (Number(p.amount) || 0), 0);
+            // Closed years count through their carry-forwards, as in listCustomersWithBalance
+            const hot = (row) => !row.financialYear;
+            const totalSales = orders.filter(hot).reduce((sum, o) => sum + (Number(o.total) || 0), 0)
+                + (Number(carried.sales) || 0);
+            const totalReceived = realPayments.filter(hot).reduce((sum, p) => sum + (Number(p.amount) || 0), 0)
+                + (Number(carried.received) || 0);
             const totalDebit = totalSales + openingBal;
             const totalCredit = Math.round(totalReceived * 100) / 100;
             const balance = Math.round((openingBal + totalSales - totalReceived) * 100) / 100;
@@ -230,6 +238,8 @@ module.exports = {
      * 
      * TALLY-CORRECT: Uses ledger entries as authoritative source when available.
      * Fallback: Opening Balance + Sum of all order dueAmounts
+     * Orders and payments archived by a financial-year close count through
+     * party_carry_forwards.
      */
     listCustomersWithBalance: async (params = {}) => {
         try {
@@ -245,17 +255,18 @@ module.exports = {
                     c."createdAt",
                     c."updatedAt",
                     -- Total sales from orders
-                    COALESCE(order_totals.total_sales, 0) as total_sales,
-                    COALESCE(order_totals.total_paid, 0) as orders_paid,
-                    COALESCE(order_totals.total_due, 0) as orders_due,
+                    COALESCE(order_totals.total_sales, 0) + carried.sales as total_sales,
+                    COALESCE(order_totals.total_paid, 0) + carried.paid as orders_paid,
+                    COALESCE(order_totals.total_due, 0) + carried.due as orders_due,
                     -- Total ALL receipts from payments table (includes On Account)
-                    COALESCE(payment_totals.total_received, 0) as total_received,
+                    COALESCE(payment_totals.total_received, 0) + carried.received as total_received,
                     -- Debit = Opening + Sales
-                    COALESCE(c."openingBalance", 0) + COALESCE(order_totals.total_sales, 0) as "totalDebit",
+                    COALESCE(c."openingBalance", 0) + COALESCE(order_totals.total_sales, 0) + carried.sales as "totalDebit",
                     -- Credit = ALL receipts (not just per-invoice paidAmount)
-                    COALESCE(payment_totals.total_received, 0) as "totalCredit",
+                    COALESCE(payment_totals.total_received, 0) + carried.received as "totalCredit",
                     -- Balance = Opening + Sales - ALL Receipts
-                    COALESCE(c."openingBalance", 0) + COALESCE(order_totals.total_sales, 0) - COALESCE(payment_totals.total_received, 0) as balance
+                    COALESCE(c."openingBalance", 0) + COALESCE(order_totals.total_sales, 0) + carried.sales
+                        - COALESCE(payment_totals.total_received, 0) - carried.received as balance
                 FROM customers c
                 LEFT JOIN LATERAL (
                     SELECT 
@@ -275,8 +286,22 @@ module.exports = {
                     AND ("paymentNumber" IS NULL OR "paymentNumber" NOT LIKE 'PAY-TOGGLE-%')
                     ${db.payment.rawAttributes.isDeleted ? 'AND "isDeleted" = false' : ''}
                 ) payment_totals ON true
+                LEFT JOIN LATERAL (
+                    SELECT 
+                        COALESCE(SUM(sales), 0) as sales,
+                        COALESCE(SUM(paid), 0) as paid,
+                        COALESCE(SUM(due), 0) as due,
+                        COALESCE(SUM(received), 0) as received
+                    FROM party_carry_forwards
+                    WHERE "partyType" = 'customer'
+                    AND ("partyId" = c.id OR ("partyName" = c.name AND "partyId" IS NULL))
+                ) carried ON true
+                ${params.customerId ? 'WHERE c.id = :customerId' : ''}
                 ORDER BY c.name ASC
-            `, { type: db.Sequelize.QueryTypes.SELECT });
+            `, {
+                replacements: { customerId: params.customerId || null },
+                type: db.Sequelize.QueryTypes.SELECT
+            });
 
             return {
                 count: customers.length,
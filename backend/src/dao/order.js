@@ -106,13 +106,56 @@ module.exports = {
             throw new Error(error);
         }
     },
-    updateOrder: async (filterObj, updateObj) => {
+    updateOrder: async (filterObj, updateObj, transaction = null) => {
         try {
-            const res = await db.order.update(updateObj, { where: filterObj });
+            const options = transaction ? { where: filterObj, transaction } : { where: filterObj };
+            const res = await db.order.update(updateObj, options);
             return res;
         } catch (error) {
             console.log(error);
             throw new Error(error);
         }
+    },
+    // Order header only, row-locked until the transaction ends — serialises edits of one bill
+    lockOrder: async (filterObj, transaction) => {
+        try {
+            const res = await db.order.findOne({
+                where: { id: filterObj.id },
+                lock: transaction.LOCK.UPDATE,
+                transaction
+            });
+            return res;
+        } catch (error) {
+            console.log(error);
+            throw new Error(error);
+        }
+    },
+    // Re-derive subTotal from the stored lines; total and dueAmount move by the
+    // same amount, so tax, rounding and payments already made are preserved
+    recomputeTotals: async (filterObj, transaction = null) => {
+        try {
+            const [row] = await db.sequelize.query(`
+                UPDATE orders o
+                SET "subTotal" = t."subTotal",
+                    total = o.total + (t."subTotal" - o."subTotal"),
+                    "dueAmount" = o."dueAmount" + (t."subTotal" - o."subTotal"),
+                    "updatedAt" = NOW()
+                FROM (
+                    SELECT COALESCE(SUM("totalPrice"), 0) AS "subTotal"
+                    FROM "orderItems"
+                    WHERE "orderId" = :orderId
+                ) t
+                WHERE o.id = :orderId
+                RETURNING o.*
+            `, {
+                replacements: { orderId: filterObj.id },
+                type: db.sequelize.QueryTypes.SELECT,
+                transaction
+            });
+            return row || null;
+        } catch (error) {
+            console.log(error);
+            throw new Error(error);
+        }
     }
 }
\ No newline at end of file
@@ -11,5 +11,79 @@ module.exports = {
             console.log(error);
             throw new Error(error);
         }
+    },
+    listOrderItems: async (filterObj, transaction = null) => {
+        try {
+            const options = {
+                where: { orderId: filterObj.orderId },
+                order: [['sortOrder', 'ASC']],
+                raw: true
+            };
+            if (transaction) {
+                options.transaction = transaction;
+            }
+            const res = await db.orderItems.findAll(options);
+            return res;
+        } catch (error) {
+            console.log(error);
+            throw new Error(error);
+        }
+    },
+    // Apply an item diff (utils/orderItemDiff.js) in two statements: inserted and
+    // updated lines as one multi-row upsert, deleted lines as one delete.
+    // Returns the upserted rows.
+    applyItemDiff: async (orderId, { upserts, deletedIds }, transaction = null) => {
+        try {
+            let rows = [];
+            if (upserts.length > 0) {
+                rows = await db.sequelize.query(`
+                    INSERT INTO "orderItems" (id, "orderId", "productId", name, "altName", quantity, "productPrice", "totalPrice",
+                        type, "sortOrder", "createdAt", "updatedAt")
+                    SELECT i.id, CAST(:orderId AS uuid), i."productId", i.name, i."altName", i.quantity, i."productPrice", i."totalPrice",
+                        CAST(i.type AS "enum_orderItems_type"), i."sortOrder", NOW(), NOW()
+                    FROM unnest(ARRAY[:ids]::uuid[], ARRAY[:productIds]::uuid[], ARRAY[:names]::text[], ARRAY[:altNames]::text[],
+                        ARRAY[:quantities]::double precision[], ARRAY[:productPrices]::double precision[],
+                        ARRAY[:totalPrices]::double precision[], ARRAY[:types]::text[], ARRAY[:sortOrders]::integer[])
+                        AS i(id, "productId", name, "altName", quantity, "productPrice", "totalPrice", type, "sortOrder")
+                    ON CONFLICT (id) DO UPDATE SET
+                        "productId" = EXCLUDED."productId",
+                        name = EXCLUDED.name,
+                        "altName" = EXCLUDED."altName",
+                        quantity = EXCLUDED.quantity,
+                        "productPrice" = EXCLUDED."productPrice",
+                        "totalPrice" = EXCLUDED."totalPrice",
+                        type = EXCLUDED.type,
+                        "sortOrder" = EXCLUDED."sortOrder",
+                        "updatedAt" = NOW()
+                    WHERE "orderItems"."orderId" = EXCLUDED."orderId"
+                    RETURNING *
+                `, {
+                    replacements: {
+                        orderId,
+                        ids: upserts.map(i => i.id),
+                        productIds: upserts.map(i => i.productId ?? null),
+                        names: upserts.map(i => i.name),
+                        altNames: upserts.map(i => i.altName ?? null),
+                        quantities: upserts.map(i => i.quantity),
+                        productPrices: upserts.map(i => i.productPrice),
+                        totalPrices: upserts.map(i => i.totalPrice),
+                        types: upserts.map(i => i.type),
+                        sortOrders: upserts.map(i => i.sortOrder)
+                    },
+                    type: db.sequelize.QueryTypes.SELECT,
+                    transaction
+                });
+            }
+            if (deletedIds.length > 0) {
+                await db.sequelize.query(
+                    'DELETE FROM "orderItems" WHERE "orderId" = :orderId AND id = ANY(ARRAY[:deletedIds]::uuid[])',
+                    { replacements: { orderId, deletedIds }, transaction }
+                );
+            }
+            return rows;
+        } catch (error) {
+            console.log(error);
+            throw new Error(error);
+        }
     }
 }
\ No newline at end of file
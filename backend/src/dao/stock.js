@@ -1,4 +1,6 @@
+const uuidv4 = require('uuid/v4');
 const db = require('../models');
+const changeFeeds = require('../services/changeFeeds');
 const { Op } = require('sequelize');
 
 module.exports = {
@@ -31,13 +33,19 @@ module.exports = {
         const { limit = 100, offset = 0, lowStockOnly = false, q = '' } = filters;
 
         const whereClause = {};
-        
+        if (lowStockOnly) {
+            // Same predicate as the stocks_low_stock partial index
+            whereClause[Op.and] = [
+                db.sequelize.where(db.sequelize.col('stocks.currentStock'), Op.lte, db.sequelize.col('stocks.minStockLevel'))
+            ];
+        }
+
         const productWhere = {};
         if (q && q.trim()) {
             productWhere.name = { [Op.iLike]: `%${q.trim()}%` };
         }
 
-        const stocks = await db.stock.findAndCountAll({
+        return await db.stock.findAndCountAll({
             where: whereClause,
             include: [{
                 model: db.product,
@@ -47,19 +55,42 @@ module.exports = {
             }],
             limit,
             offset,
-            order: [['lastUpdated', 'DESC']]
+            order: lowStockOnly
+                ? [['currentStock', 'ASC'], ['productId', 'ASC']]
+                : [['lastUpdated', 'DESC']]
         });
+    },
 
-        // Filter low stock if needed
-        let rows = stocks.rows;
-        if (lowStockOnly) {
-            rows = rows.filter(s => s.currentStock <= s.minStockLevel);
-        }
+    // Low-stock alert feed, keyset-paginated on ("lastUpdated", id).
+    // Without a cursor it pages through the products that are low right now
+    // (served by the partial index); with one it returns every stock row that
+    // changed after it, flagged, so clients can raise and clear alerts.
+    // `cursor` is "lastUpdated" as Postgres text — full microsecond precision,
+    // so a row is never returned twice.
+    // "lastUpdated" is stamped before the writer commits, so rows are only
+    // served up to the feed horizon (services/changeFeeds) — the start of the
+    // oldest transaction still writing stocks: anything that commits later
+    // carries a later stamp and is picked up by a later poll, never skipped.
+    listLowStockChanges: async ({ since, afterId, limit = 100 }) => {
+        const horizon = await changeFeeds.horizon(['stocks']);
+        const after = since
+            ? `AND (s."lastUpdated", s.id) > (CAST(:since AS timestamptz), CAST(:afterId AS uuid))`
+            : 'AND s."currentStock" <= s."minStockLevel"';
 
-        return {
-            count: lowStockOnly ? rows.length : stocks.count,
-            rows
-        };
+        return await db.sequelize.query(`
+            SELECT s.id, s."productId", p.name AS "productName", s."currentStock", s."minStockLevel", s.unit,
+                s."lastUpdated", CAST(s."lastUpdated" AS text) AS cursor,
+                s."currentStock" <= s."minStockLevel" AS "isLowStock",
+                s."currentStock" <= 0 AS "isOutOfStock"
+            FROM stocks s
+            JOIN products p ON p.id = s."productId"
+            WHERE s."lastUpdated" < CAST(:horizon AS timestamptz) ${after}
+            ORDER BY s."lastUpdated", s.id
+            LIMIT :limit
+        `, {
+            replacements: { since: since || null, afterId: afterId || '00000000-0000-0000-0000-000000000000', limit, horizon },
+            type: db.sequelize.QueryTypes.SELECT
+        });
     },
 
     // Create stock transaction
@@ -67,6 +98,105 @@ module.exports = {
         return await db.stockTransaction.create(transactionData, { transaction });
     },
 
+    // Apply stock deltas atomically and log them, in one statement for any
+    // number of products. Rows are locked in productId order, so concurrent
+    // bills touching the same products queue instead of deadlocking, and every
+    // delta is applied to the latest committed stock — no lost updates.
+    // Products without a stock row are skipped (stock tracking is opt-in).
+    // The log records what actually moved: with floorAtZero an oversell logs
+    // the stock it took to zero, not the quantity asked for, so reversing the
+    // movement later puts back no more than was there.
+    // movements: [{ productId, delta }] — one per product
+    // Returns [{ productId, previousStock, newStock, delta }]
+    applyStockDeltas: async (movements, { type, floorAtZero = false, ...transactionData }, transaction = null) => {
+        if (movements.length === 0) return [];
+        const newStock = floorAtZero ? 'GREATEST(0, l."previousStock" + m.delta)' : 'l."previousStock" + m.delta';
+
+        return await db.sequelize.query(`
+            WITH moved AS (
+                SELECT * FROM unnest(ARRAY[:productIds]::uuid[], ARRAY[:deltas]::double precision[], ARRAY[:ids]::uuid[])
+                    AS m("productId", delta, "transactionId")
+            ), locked AS MATERIALIZED (
+                SELECT s.id, s."productId", s."currentStock" AS "previousStock"
+                FROM stocks s
+                WHERE s."productId" IN (SELECT "productId" FROM moved)
+                ORDER BY s."productId", s.id
+                FOR UPDATE
+            ), updated AS (
+                UPDATE stocks s
+                SET "currentStock" = ${newStock}, "lastUpdated" = NOW(), "updatedAt" = NOW()
+                FROM locked l JOIN moved m ON m."productId" = l."productId"
+                WHERE s.id = l.id
+                RETURNING s."productId", m."transactionId", m.delta, l."previousStock", s."currentStock" AS "newStock"
+            ), logged AS (
+                INSERT INTO stock_transactions (id, "productId", type, quantity, "previousStock", "newStock", "referenceType",
+                    "referenceId", notes, "transactionDate", "createdBy", "createdByName", "createdAt", "updatedAt")
+                SELECT DISTINCT ON ("transactionId") "transactionId", "productId", CAST(:type AS "enum_stock_transactions_type"),
+                    ABS("newStock" - "previousStock"), "previousStock", "newStock", :referenceType, CAST(:referenceId AS uuid), :notes,
+                    CAST(:transactionDate AS date), CAST(:createdBy AS uuid), :createdByName, NOW(), NOW()
+                FROM updated
+            )
+            SELECT "productId", "previousStock", "newStock", delta FROM updated
+        `, {
+            replacements: {
+                productIds: movements.map(m => m.productId),
+                deltas: movements.map(m => m.delta),
+                ids: movements.map(() => uuidv4()),
+                type,
+                referenceType: transactionData.referenceType || null,
+                referenceId: transactionData.referenceId || null,
+                notes: transactionData.notes || null,
+                transactionDate: transactionData.transactionDate || new Date(),
+                createdBy: transactionData.createdBy || null,
+                createdByName: transactionData.createdByName || null
+            },
+            type: db.sequelize.QueryTypes.SELECT,
+            transaction
+        });
+    },
+
+    // Set stock to an absolute value atomically and log the adjustment
+    // Returns { previousStock, newStock } or null when the product has no stock row
+    setStockLevel: async (productId, newStockValue, transactionData, transaction = null) => {
+        const [row] = await db.sequelize.query(`
+            WITH locked AS (
+                SELECT id, "currentStock" AS "previousStock" FROM stocks
+                WHERE "productId" = :productId
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE
+            ), updated AS (
+                UPDATE stocks s
+                SET "currentStock" = :newStock, "lastUpdated" = NOW(), "updatedAt" = NOW()
+                FROM locked l
+                WHERE s.id = l.id
+                RETURNING l."previousStock", s."currentStock" AS "newStock"
+            ), logged AS (
+                INSERT INTO stock_transactions (id, "productId", type, quantity, "previousStock", "newStock", "referenceType",
+                    "referenceId", notes, "transactionDate", "createdBy", "createdByName", "createdAt", "updatedAt")
+                SELECT :id, :productId, CAST('adjustment' AS "enum_stock_transactions_type"), ABS("newStock" - "previousStock"), "previousStock", "newStock", :referenceType,
+                    CAST(:referenceId AS uuid), :notes, CAST(:transactionDate AS date), CAST(:createdBy AS uuid), :createdByName, NOW(), NOW()
+                FROM updated
+            )
+            SELECT "previousStock", "newStock" FROM updated
+        `, {
+            replacements: {
+                id: uuidv4(),
+                productId,
+                newStock: newStockValue,
+                referenceType: transactionData.referenceType || null,
+                referenceId: transactionData.referenceId || null,
+                notes: transactionData.notes || null,
+                transactionDate: transactionData.transactionDate || new Date(),
+                createdBy: transactionData.createdBy || null,
+                createdByName: transactionData.createdByName || null
+            },
+            type: db.sequelize.QueryTypes.SELECT,
+            transaction
+        });
+        return row || null;
+    },
+
     // List stock transactions
     listStockTransactions: async (filters = {}) => {
         const { productId, limit = 50, offset = 0, startDate, endDate, type } = filters;
@@ -104,25 +234,21 @@ module.exports = {
         });
     },
 
-    // Get stock summary
+    // Get stock summary — counts only, aggregated in one pass over stocks
     getStockSummary: async () => {
-        const stocks = await db.stock.findAll({
-            include: [{
-                model: db.product,
-                as: 'product',
-                required: true
-            }]
-        });
-
-        const totalProducts = stocks.length;
-        const lowStockCount = stocks.filter(s => s.currentStock <= s.minStockLevel).length;
-        const outOfStockCount = stocks.filter(s => s.currentStock <= 0).length;
+        const [summary] = await db.sequelize.query(`
+            SELECT
+                COUNT(*) AS "totalProducts",
+                COUNT(*) FILTER (WHERE s."currentStock" <= s."minStockLevel") AS "lowStockCount",
+                COUNT(*) FILTER (WHERE s."currentStock" <= 0) AS "outOfStockCount"
+            FROM stocks s
+            JOIN products p ON p.id = s."productId"
+        `, { type: db.sequelize.QueryTypes.SELECT });
 
         return {
-            totalProducts,
-            lowStockCount,
-            outOfStockCount,
-            stocks
+            totalProducts: Number(summary.totalProducts),
+            lowStockCount: Number(summary.lowStockCount),
+            outOfStockCount: Number(summary.outOfStockCount)
         };
     }
 };
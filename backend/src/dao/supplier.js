@@ -136,6 +136,7 @@ module.exports = {
 
     // List suppliers with calculated balance
     // Balance = Opening Balance + Sum of all purchase bill dueAmounts (source of truth)
+    // Payments archived by a financial-year close count through party_carry_forwards
     listSuppliersWithBalance: async (params = {}) => {
         try {
             const suppliers = await db.sequelize.query(`
@@ -167,6 +168,11 @@ module.exports = {
                           AND "partyType" = 'supplier'
                           AND (COALESCE("isDeleted", false) = false)
                           AND "referenceType" != 'purchase'
+                    ), 0) + COALESCE((
+                        SELECT SUM(received)
+                        FROM party_carry_forwards
+                        WHERE "partyId" = s.id
+                          AND "partyType" = 'supplier'
                     ), 0) as "totalCredit",
                     COALESCE(s."openingBalance", 0) + COALESCE((
                         SELECT SUM(total) 
@@ -185,6 +191,11 @@ module.exports = {
                           AND "partyType" = 'supplier'
                           AND (COALESCE("isDeleted", false) = false)
                           AND "referenceType" != 'purchase'
+                    ), 0) - COALESCE((
+                        SELECT SUM(received)
+                        FROM party_carry_forwards
+                        WHERE "partyId" = s.id
+                          AND "partyType" = 'supplier'
                     ), 0) as balance
                 FROM suppliers s
                 ORDER BY s.name ASC
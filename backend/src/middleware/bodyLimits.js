@@ -0,0 +1,80 @@
+/**
+ * Per-route request body limits
+ *
+ * JSON and urlencoded bodies are parsed with the limit of the first matching
+ * rule below, or BODY_LIMIT (default 1mb). Only the exports and imports that
+ * really carry large payloads get a large limit, so a runaway client cannot
+ * make the POS routes buffer 100mb. Oversized bodies are rejected with 413.
+ *
+ * Paths are relative to the /api mount point.
+ */
+
+const express = require('express');
+
+const DEFAULT_LIMIT = process.env.BODY_LIMIT || '1mb';
+
+// First match wins
+const ROUTE_LIMITS = [
+    { path: /^\/gst-export\/excel$/, limit: '50mb' },           // all orders with items for the period
+    { path: /^\/(orders|payments)\/bulk$/, limit: '50mb' },     // bulk imports (JSON form)
+    { path: /^\/export\/tally\//, limit: '5mb' },               // selected-ID Tally exports
+    { path: /^\/data-audit\//, limit: '5mb' },                  // repair/fix selections
+    { path: /^\/orders\/sync$/, limit: '5mb' },                 // POS outbox batches (up to 50 bills)
+    { path: /^\/orders(\/[^/]+)?$/, limit: '512kb' }            // POS bill create/update
+];
+
+const parsers = new Map();
+
+function parsersFor(limit) {
+    if (!parsers.has(limit)) {
+        parsers.set(limit, {
+            json: express.json({ limit }),
+            urlencoded: express.urlencoded({ limit, extended: false, parameterLimit: 5000 })
+        });
+    }
+    return parsers.get(limit);
+}
+
+/**
+ * Body limit for an /api-relative path.
+ */
+function limitFor(path) {
+    const rule = ROUTE_LIMITS.find(r => r.path.test(path));
+    return rule ? rule.limit : DEFAULT_LIMIT;
+}
+
+/**
+ * Parse JSON / urlencoded bodies with the route's limit.
+ */
+function parseBody(req, res, next) {
+    const { json, urlencoded } = parsersFor(limitFor(req.path));
+    json(req, res, (err) => {
+        if (err) return next(err);
+        urlencoded(req, res, next);
+    });
+}
+
+/**
+ * Turn body-parser errors into the API's { status, message } shape.
+ */
+function bodyErrorHandler(err, req, res, next) {
+    if (err && err.type === 'entity.too.large') {
+        return res.status(413).send({
+            status: 413,
+            message: `Request body too large (limit ${limitFor(req.path)})`
+        });
+    }
+    if (err && err.type === 'entity.parse.failed') {
+        return res.status(400).send({
+            status: 400,
+            message: 'Malformed JSON body'
+        });
+    }
+    return next(err);
+}
+
+module.exports = {
+    parseBody,
+    bodyErrorHandler,
+    limitFor
+};
@@ -0,0 +1,95 @@
+/**
+ * Idempotency-Key support for retried POS writes
+ *
+ * Requests without the header pass straight through. With it:
+ *
+ *   • first request        runs normally; a 2xx response is stored before it is sent,
+ *                          in the write's transaction when the controller calls
+ *                          req.idempotency.complete(status, body, transaction)
+ *   • retry, completed     stored response replayed (Idempotent-Replayed: true),
+ *                          the controller does not run
+ *   • retry, still running 409 — retry shortly
+ *   • same key, new body   422 — keys are single-use per payload
+ *
+ * Non-2xx responses release the key, so a corrected request can reuse it.
+ * Mount after `authenticate` (keys are scoped per user) and before
+ * auditMiddleware, so replays are not audited twice.
+ */
+
+const idempotency = require('../services/idempotency');
+
+const MAX_KEY_LENGTH = 255;
+
+const idempotent = async (req, res, next) => {
+    const key = req.get('Idempotency-Key');
+    if (!key) return next();
+
+    if (key.length > MAX_KEY_LENGTH) {
+        return res.status(400).json({
+            status: 400,
+            message: `Idempotency-Key must be at most ${MAX_KEY_LENGTH} characters`
+        });
+    }
+
+    try {
+        const scope = { key, userId: req.user?.id, method: req.method, route: `${req.baseUrl}${req.route.path}` };
+        const id = idempotency.keyId(scope);
+        const requestHash = idempotency.requestHash(req.body);
+
+        const existing = await idempotency.find(id);
+        if (existing && existing.requestHash !== requestHash) {
+            return res.status(422).json({
+                status: 422,
+                message: 'Idempotency-Key was already used with a different request body'
+            });
+        }
+        if (existing && existing.status === 'completed') {
+            res.set('Idempotent-Replayed', 'true');
+            return res.status(existing.responseStatus).json(existing.responseBody);
+        }
+
+        if (!(await idempotency.reserve({ ...scope, id, requestHash }))) {
+            return res.status(409).json({
+                status: 409,
+                message: 'A request with this Idempotency-Key is still being processed — retry shortly'
+            });
+        }
+
+        // A controller that completes the key inside its own transaction commits
+        // the response with the write: no crash in between can leave the write
+        // done and the key still `processing`
+        req.idempotency = {
+            completed: false,
+            complete: async (status, body, transaction) => {
+                await idempotency.complete(id, status, body, transaction);
+                transaction.afterCommit(() => { req.idempotency.completed = true; });
+            }
+        };
+
+        // Otherwise store (or release) before the response goes out, so a client
+        // that saw the response never retries into a `processing` row
+        const json = res.json;
+        res.json = function (body) {
+            const ok = res.statusCode >= 200 && res.statusCode < 300;
+            const settle = ok && req.idempotency.completed
+                ? Promise.resolve()
+                : ok ? idempotency.complete(id, res.statusCode, body) : idempotency.release(id);
+            settle
+                .catch(error => console.error(`[IDEMPOTENCY] Failed to settle key ${key}:`, error.message))
+                .then(() => json.call(res, body));
+            return res;
+        };
+
+        next();
+    } catch (error) {
+        console.error('[IDEMPOTENCY] Lookup failed:', error.message);
+        return res.status(500).json({
+            status: 500,
+            message: error.message
+        });
+    }
+};
+
+module.exports = {
+    idempotent
+};
@@ -0,0 +1,88 @@
+/**
+ * Per-request query budget and N+1 detector (development / test)
+ *
+ * Counts the SQL statements each API request issues and groups them by
+ * fingerprint (utils/metrics.js). Every response carries:
+ *
+ *   X-Query-Count      statements issued by the request
+ *   X-Query-Budget     the route's budget
+ *   X-Query-Repeats    highest number of times one statement shape repeated
+ *   X-DB-Time-Ms       total database time
+ *
+ * so API tests can assert on them. Routes over budget, or with a shape
+ * repeated N1_THRESHOLD times (the N+1 pattern), are logged with the
+ * offending SQL.
+ *
+ * QUERY_BUDGET:
+ *   off     disabled (default in production)
+ *   warn    headers + log (default otherwise)
+ *   strict  also fails the request: the first statement over budget throws
+ */
+
+const metrics = require('../utils/metrics');
+
+const MODE = process.env.QUERY_BUDGET || (process.env.NODE_ENV === 'production' ? 'off' : 'warn');
+const DEFAULT_BUDGET = Number(process.env.QUERY_BUDGET_DEFAULT) || 40;
+const N1_THRESHOLD = Number(process.env.QUERY_N1_THRESHOLD) || 10;
+
+// Tighter budgets for the POS hot paths, keyed by "METHOD /api/route/pattern"
+const ROUTE_BUDGETS = {
+    'POST /api/orders': 30,
+    'POST /api/orders/sync': 30 * 50,   // POST /api/orders per bill × the outbox batch limit
+    'PUT /api/orders/:orderId': 30,
+    'POST /api/payments': 25,
+    'GET /api/customers/:customerId/transactions': 10,
+    'GET /api/reports/party-statement/:partyType/:partyId': 10
+};
+
+const routeKey = (req) => (req.route ? `${req.method} ${req.baseUrl}${req.route.path}` : null);
+const budgetFor = (req) => ROUTE_BUDGETS[routeKey(req)] || DEFAULT_BUDGET;
+
+function report(req, ctx) {
+    const budget = budgetFor(req);
+    const repeated = [...ctx.shapes.values()].filter(s => s.count >= N1_THRESHOLD);
+    if (ctx.queries <= budget && repeated.length === 0) return;
+
+    const lines = [`[QUERY BUDGET] ${req.method} ${ctx.path}: ${ctx.queries} queries (budget ${budget}), ${Math.round(ctx.dbMs)}ms in DB`];
+    for (const shape of repeated) {
+        lines.push(`  N+1: ${shape.count}× ${shape.text.slice(0, 300)}`);
+    }
+    console.warn(lines.join('\n'));
+}
+
+const queryBudget = (req, res, next) => {
+    const ctx = req.metricsContext;
+    if (MODE === 'off' || !ctx) return next();
+
+    ctx.shapes = new Map();
+    ctx.onQuery = (sql) => {
+        const { text, id } = metrics.fingerprint(sql);
+        const shape = ctx.shapes.get(id);
+        if (shape) shape.count++;
+        else ctx.shapes.set(id, { text, count: 1 });
+
+        if (MODE === 'strict' && ctx.queries === budgetFor(req) + 1) {
+            throw new Error(`Query budget exceeded: ${req.method} ${ctx.path} issued more than ${budgetFor(req)} queries`);
+        }
+    };
+
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+        if (!res.headersSent) {
+            let repeats = 0;
+            for (const shape of ctx.shapes.values()) repeats = Math.max(repeats, shape.count);
+            res.setHeader('X-Query-Count', ctx.queries);
+            res.setHeader('X-Query-Budget', budgetFor(req));
+            res.setHeader('X-Query-Repeats', repeats);
+            res.setHeader('X-DB-Time-Ms', Math.round(ctx.dbMs));
+        }
+        return writeHead.apply(this, args);
+    };
+
+    res.once('finish', () => report(req, ctx));
+    next();
+};
+
+module.exports = {
+    queryBudget
+};
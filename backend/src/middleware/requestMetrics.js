@@ -0,0 +1,43 @@
+const metrics = require('../utils/metrics');
+
+/**
+ * Time every API request and open its metrics context (DB time, query count).
+ * Recorded under the matched route pattern (/api/orders/:orderId), so the
+ * number of series stays bounded; unmatched requests share one label.
+ */
+const requestMetrics = (req, res, next) => {
+    const start = process.hrtime.bigint();
+    const ctx = { method: req.method, path: req.originalUrl.split('?')[0], dbMs: 0, queries: 0 };
+    req.metricsContext = ctx;
+
+    let recorded = false;
+    const record = () => {
+        if (recorded) return;
+        recorded = true;
+        metrics.recordRequest({
+            method: req.method,
+            route: req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched',
+            status: res.statusCode,
+            seconds: Number(process.hrtime.bigint() - start) / 1e9,
+            dbSeconds: ctx.dbMs / 1000
+        });
+    };
+    res.once('finish', record);
+    res.once('close', record);
+
+    metrics.runWithContext(ctx, next);
+};
+
+/**
+ * Re-enter the request's metrics context. Body parsing resumes in stream
+ * callbacks, which run outside it — mount this right after the parsers.
+ */
+const bindMetricsContext = (req, res, next) => {
+    if (!req.metricsContext) return next();
+    metrics.runWithContext(req.metricsContext, next);
+};
+
+module.exports = {
+    requestMetrics,
+    bindMetricsContext
+};
@@ -0,0 +1,27 @@
+'use strict';
+
+/**
+ * Schema fixes that used to run in app.listen on every boot (index.js).
+ * Idempotent. The paymentMode data backfill now runs as a batched background
+ * job instead (services/backfillJobs.js → orders-payment-mode).
+ *
+ * Not wrapped in a transaction: ALTER TYPE ... ADD VALUE cannot run inside one
+ * on older PostgreSQL versions.
+ */
+
+module.exports = {
+    up: async (queryInterface) => {
+        const q = (sql) => queryInterface.sequelize.query(sql);
+
+        await q('ALTER TABLE customers ADD COLUMN IF NOT EXISTS notes TEXT DEFAULT NULL');
+
+        await q("DO $$ BEGIN CREATE TYPE \"enum_orders_paymentMode\" AS ENUM ('CASH', 'CREDIT'); EXCEPTION WHEN duplicate_object THEN null; END $$;");
+        await q('ALTER TABLE orders ADD COLUMN IF NOT EXISTS "paymentMode" "enum_orders_paymentMode" NOT NULL DEFAULT \'CREDIT\'');
+
+        await q("ALTER TYPE \"enum_audit_logs_action\" ADD VALUE IF NOT EXISTS 'ORDER_PAYMENT_STATUS'");
+        await q("ALTER TYPE \"enum_audit_logs_action\" ADD VALUE IF NOT EXISTS 'CONFIRM_LINK'");
+    },
+    down: async () => {
+        // Columns and enum values are kept — later migrations and the models depend on them
+    }
+};
@@ -0,0 +1,23 @@
+'use strict';
+
+module.exports = {
+    up: async (queryInterface) => {
+        await queryInterface.sequelize.query(`
+            CREATE TABLE IF NOT EXISTS backfill_jobs (
+                name VARCHAR(255) PRIMARY KEY,
+                status VARCHAR(255) NOT NULL DEFAULT 'pending',
+                "cursor" VARCHAR(255),
+                processed INTEGER DEFAULT 0,
+                changed INTEGER DEFAULT 0,
+                error TEXT,
+                "startedAt" TIMESTAMP WITH TIME ZONE,
+                "finishedAt" TIMESTAMP WITH TIME ZONE,
+                "createdAt" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                "updatedAt" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+            )
+        `);
+    },
+    down: async (queryInterface) => {
+        await queryInterface.dropTable('backfill_jobs');
+    }
+};
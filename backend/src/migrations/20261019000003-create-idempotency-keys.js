@@ -0,0 +1,28 @@
+'use strict';
+
+module.exports = {
+    up: async (queryInterface) => {
+        await queryInterface.sequelize.query(`
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                id VARCHAR(64) PRIMARY KEY,
+                key VARCHAR(255) NOT NULL,
+                "userId" UUID,
+                method VARCHAR(10) NOT NULL,
+                route VARCHAR(255) NOT NULL,
+                "requestHash" VARCHAR(64) NOT NULL,
+                status VARCHAR(255) NOT NULL DEFAULT 'processing',
+                "responseStatus" INTEGER,
+                "responseBody" JSONB,
+                "expiresAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "createdAt" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                "updatedAt" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+            )
+        `);
+        await queryInterface.sequelize.query(
+            'CREATE INDEX IF NOT EXISTS idempotency_keys_expires_at ON idempotency_keys ("expiresAt")'
+        );
+    },
+    down: async (queryInterface) => {
+        await queryInterface.dropTable('idempotency_keys');
+    }
+};
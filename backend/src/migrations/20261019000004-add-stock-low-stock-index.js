@@ -0,0 +1,21 @@
+'use strict';
+
+module.exports = {
+    up: async (queryInterface) => {
+        // Partial index: only low-stock rows, so the low-stock list and the
+        // feed's first page stay small however large the catalogue grows
+        await queryInterface.sequelize.query(`
+            CREATE INDEX IF NOT EXISTS stocks_low_stock
+            ON stocks ("currentStock", "productId")
+            WHERE "currentStock" <= "minStockLevel"
+        `);
+        // Keyset order for the low-stock alert feed
+        await queryInterface.sequelize.query(
+            'CREATE INDEX IF NOT EXISTS stocks_last_updated_id ON stocks ("lastUpdated", id)'
+        );
+    },
+    down: async (queryInterface) => {
+        await queryInterface.sequelize.query('DROP INDEX IF EXISTS stocks_last_updated_id');
+        await queryInterface.sequelize.query('DROP INDEX IF EXISTS stocks_low_stock');
+    }
+};
@@ -0,0 +1,29 @@
+'use strict';
+
+module.exports = {
+    up: async (queryInterface) => {
+        await queryInterface.sequelize.query(`
+            CREATE TABLE IF NOT EXISTS catalog_tombstones (
+                id UUID PRIMARY KEY,
+                "entityType" VARCHAR(32) NOT NULL,
+                "entityId" UUID NOT NULL,
+                "deletedAt" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+            )
+        `);
+        await queryInterface.sequelize.query(
+            'CREATE INDEX IF NOT EXISTS catalog_tombstones_entity_type_deleted_at ON catalog_tombstones ("entityType", "deletedAt")'
+        );
+        // Catalogue versions are MAX("updatedAt"); deltas are "updatedAt" > since
+        await queryInterface.sequelize.query(
+            'CREATE INDEX IF NOT EXISTS products_updated_at ON products ("updatedAt")'
+        );
+        await queryInterface.sequelize.query(
+            'CREATE INDEX IF NOT EXISTS customers_updated_at ON customers ("updatedAt")'
+        );
+    },
+    down: async (queryInterface) => {
+        await queryInterface.sequelize.query('DROP INDEX IF EXISTS customers_updated_at');
+        await queryInterface.sequelize.query('DROP INDEX IF EXISTS products_updated_at');
+        await queryInterface.dropTable('catalog_tombstones');
+    }
+};
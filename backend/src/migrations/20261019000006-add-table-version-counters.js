@@ -0,0 +1,18 @@
+'use strict';
+
+const tableVersions = require('../services/tableVersions');
+
+module.exports = {
+    // Triggers are not part of the models, so a fresh database needs this too
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        await tableVersions.install(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        for (const table of tableVersions.TABLES) {
+            await queryInterface.sequelize.query(`DROP TRIGGER IF EXISTS "${table}_version_bump" ON "${table}"`);
+            await queryInterface.sequelize.query(`DROP SEQUENCE IF EXISTS "${table}_version_seq"`);
+        }
+        await queryInterface.sequelize.query('DROP FUNCTION IF EXISTS bump_table_version()');
+    }
+};
@@ -0,0 +1,35 @@
+'use strict';
+
+// Composite indexes for the audit log's filter shapes; each leading column
+// set replaces a single-column index that only narrowed the scan
+const INDEXES = {
+    audit_logs_entity_created: '"entityType", "entityId", "createdAt", id',
+    audit_logs_user_created: '"userId", "createdAt", id',
+    audit_logs_action_created: 'action, "createdAt", id',
+    audit_logs_created_id: '"createdAt", id'
+};
+const REPLACED = {
+    audit_logs_user_id: '"userId"',
+    audit_logs_action: 'action',
+    audit_logs_entity_type: '"entityType"',
+    audit_logs_created_at: '"createdAt"'
+};
+
+module.exports = {
+    up: async (queryInterface) => {
+        for (const [name, columns] of Object.entries(INDEXES)) {
+            await queryInterface.sequelize.query(`CREATE INDEX IF NOT EXISTS ${name} ON audit_logs (${columns})`);
+        }
+        for (const name of Object.keys(REPLACED)) {
+            await queryInterface.sequelize.query(`DROP INDEX IF EXISTS ${name}`);
+        }
+    },
+    down: async (queryInterface) => {
+        for (const [name, columns] of Object.entries(REPLACED)) {
+            await queryInterface.sequelize.query(`CREATE INDEX IF NOT EXISTS ${name} ON audit_logs (${columns})`);
+        }
+        for (const name of Object.keys(INDEXES)) {
+            await queryInterface.sequelize.query(`DROP INDEX IF EXISTS ${name}`);
+        }
+    }
+};
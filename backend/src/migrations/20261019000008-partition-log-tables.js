@@ -0,0 +1,61 @@
+'use strict';
+
+const logPartitions = require('../services/logPartitions');
+
+module.exports = {
+    // sync() builds plain tables from the models, so a fresh database needs this too
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        await queryInterface.sequelize.query(`
+            CREATE TABLE IF NOT EXISTS log_archives (
+                id UUID PRIMARY KEY,
+                "tableName" VARCHAR(64) NOT NULL,
+                month VARCHAR(7) NOT NULL,
+                chunk INTEGER NOT NULL,
+                "rowCount" INTEGER NOT NULL,
+                "firstAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "lastAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                payload BYTEA NOT NULL,
+                sha256 VARCHAR(64) NOT NULL,
+                "createdAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "updatedAt" TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        `);
+        await queryInterface.sequelize.query(
+            'CREATE UNIQUE INDEX IF NOT EXISTS log_archives_table_name_month_chunk ON log_archives ("tableName", month, chunk)'
+        );
+        // Swaps in the partitioned tables; existing rows are moved by the
+        // partition-<table> backfill jobs after boot (services/backfillJobs.js)
+        await logPartitions.partitionAll(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        const q = (sql) => queryInterface.sequelize.query(sql);
+        for (const table of Object.keys(logPartitions.TABLES)) {
+            const [[state]] = await q(`SELECT relkind FROM pg_class WHERE oid = to_regclass('"${table}"')`);
+            if (!state || state.relkind !== 'p') continue;
+            const [indexes] = await q(`
+                SELECT indexdef FROM pg_indexes
+                WHERE schemaname = current_schema() AND tablename = '${table}' AND indexdef NOT LIKE 'CREATE UNIQUE%'
+            `);
+            await q(`CREATE TABLE "${table}_plain" (LIKE "${table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)`);
+            await q(`INSERT INTO "${table}_plain" SELECT * FROM "${table}"`);
+            // Rows the backfill had not moved yet
+            const legacy = logPartitions.legacyName(table);
+            const [[{ present }]] = await q(`SELECT to_regclass('"${legacy}"') IS NOT NULL AS present`);
+            if (present) {
+                await q(`
+                    INSERT INTO "${table}_plain" SELECT * FROM "${legacy}" l
+                    WHERE NOT EXISTS (SELECT 1 FROM "${table}" t WHERE t.id = l.id)
+                `);
+                await q(`DROP TABLE "${legacy}"`);
+            }
+            await q(`DROP TABLE "${table}"`);
+            await q(`ALTER TABLE "${table}_plain" RENAME TO "${table}"`);
+            await q(`ALTER TABLE "${table}" ADD PRIMARY KEY (id)`);
+            for (const { indexdef } of indexes) {
+                await q(indexdef.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS').replace(' ON ONLY ', ' ON '));
+            }
+        }
+        await q('DROP TABLE IF EXISTS log_archives');
+    }
+};
@@ -0,0 +1,65 @@
+'use strict';
+
+const financialYears = require('../services/financialYears');
+
+module.exports = {
+    // History tables, views and the posting trigger are not part of the models
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        const q = (sql) => queryInterface.sequelize.query(sql);
+        await q(`
+            CREATE TABLE IF NOT EXISTS financial_years (
+                id UUID PRIMARY KEY,
+                label VARCHAR(7) NOT NULL UNIQUE,
+                "startDate" DATE NOT NULL,
+                "endDate" DATE NOT NULL,
+                "openingBatchId" UUID,
+                "closedAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "closedBy" UUID,
+                summary JSONB,
+                "createdAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "updatedAt" TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        `);
+        await q(`
+            DO $$ BEGIN
+                CREATE TYPE "enum_party_carry_forwards_partyType" AS ENUM ('customer', 'supplier');
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+        `);
+        await q(`
+            CREATE TABLE IF NOT EXISTS party_carry_forwards (
+                id UUID PRIMARY KEY,
+                "financialYear" VARCHAR(7) NOT NULL,
+                "partyType" "enum_party_carry_forwards_partyType" NOT NULL,
+                "partyId" UUID,
+                "partyName" VARCHAR(255),
+                sales DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                paid DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                due DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                received DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                "createdAt" TIMESTAMP WITH TIME ZONE NOT NULL,
+                "updatedAt" TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        `);
+        await q('CREATE INDEX IF NOT EXISTS party_carry_forwards_party_type_party_id ON party_carry_forwards ("partyType", "partyId")');
+        await q('CREATE INDEX IF NOT EXISTS party_carry_forwards_party_type_party_name ON party_carry_forwards ("partyType", "partyName")');
+        await financialYears.install(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        const q = (sql) => queryInterface.sequelize.query(sql);
+        const [[{ closed }]] = await q('SELECT COUNT(*)::int AS closed FROM financial_years');
+        if (closed > 0) {
+            throw new Error('Financial years have been closed — their rows live in the history tables; not reverting');
+        }
+        await q('DROP TRIGGER IF EXISTS journal_batches_closed_year ON journal_batches');
+        await q('DROP FUNCTION IF EXISTS reject_closed_year_posting()');
+        for (const table of Object.keys(financialYears.HISTORY_TABLES)) {
+            await q(`DROP VIEW IF EXISTS "${table}_all"`);
+            await q(`DROP TABLE IF EXISTS "${table}_history"`);
+        }
+        await q('DROP TABLE IF EXISTS party_carry_forwards');
+        await q('DROP TYPE IF EXISTS "enum_party_carry_forwards_partyType"');
+        await q('DROP TABLE IF EXISTS financial_years');
+    }
+};
@@ -0,0 +1,14 @@
+'use strict';
+
+const tableVersions = require('../services/tableVersions');
+
+module.exports = {
+    // Re-creates bump_table_version() so writers take their table's advisory key
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        await tableVersions.install(queryInterface.sequelize);
+    },
+    down: async () => {
+        // The previous trigger body had no lock; keeping the new one is harmless
+    }
+};
@@ -0,0 +1,18 @@
+'use strict';
+
+const financialYears = require('../services/financialYears');
+
+module.exports = {
+    // Bill lines remember their catalogue product, so an edit can move stock
+    up: async (queryInterface) => {
+        await queryInterface.sequelize.query('ALTER TABLE "orderItems" ADD COLUMN IF NOT EXISTS "productId" UUID');
+        // orderItems_history and orderItems_all pick up the new column
+        await financialYears.install(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        await queryInterface.sequelize.query('DROP VIEW IF EXISTS "orderItems_all"');
+        await queryInterface.sequelize.query('ALTER TABLE "orderItems_history" DROP COLUMN IF EXISTS "productId"');
+        await queryInterface.sequelize.query('ALTER TABLE "orderItems" DROP COLUMN IF EXISTS "productId"');
+        await financialYears.install(queryInterface.sequelize);
+    }
+};
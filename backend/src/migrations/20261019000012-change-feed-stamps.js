@@ -0,0 +1,17 @@
+'use strict';
+
+const changeFeeds = require('../services/changeFeeds');
+
+module.exports = {
+    // Catalogue tables stamp changes under an advisory key, for commit-safe deltas
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        await changeFeeds.install(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        for (const table of Object.keys(changeFeeds.FEEDS)) {
+            await queryInterface.sequelize.query(`DROP TRIGGER IF EXISTS "${table}_feed_stamp" ON "${table}"`);
+        }
+        await queryInterface.sequelize.query('DROP FUNCTION IF EXISTS stamp_feed_change()');
+    }
+};
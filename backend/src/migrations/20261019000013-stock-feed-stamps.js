@@ -0,0 +1,14 @@
+'use strict';
+
+const changeFeeds = require('../services/changeFeeds');
+
+module.exports = {
+    // Stock writers stamp "lastUpdated" under the stocks feed key
+    onFreshDatabase: true,
+    up: async (queryInterface) => {
+        await changeFeeds.install(queryInterface.sequelize);
+    },
+    down: async (queryInterface) => {
+        await queryInterface.sequelize.query('DROP TRIGGER IF EXISTS "stocks_feed_stamp" ON "stocks"');
+    }
+};
@@ -68,12 +68,14 @@ module.exports = (sequelize, Sequelize) => {
             }
         },
         {
+            // One composite per filter shape, each ending in the keyset order
+            // (createdAt, id) so a filtered page is a single index range scan
             indexes: [
-                { fields: ['userId'] },
-                { fields: ['action'] },
-                { fields: ['entityType'] },
-                { fields: ['entityId'] },
-                { fields: ['createdAt'] }
+                { name: 'audit_logs_entity_created', fields: ['entityType', 'entityId', 'createdAt', 'id'] },
+                { name: 'audit_logs_user_created', fields: ['userId', 'createdAt', 'id'] },
+                { name: 'audit_logs_action_created', fields: ['action', 'createdAt', 'id'] },
+                { name: 'audit_logs_created_id', fields: ['createdAt', 'id'] },
+                { fields: ['entityId'] }
             ]
         }
     );
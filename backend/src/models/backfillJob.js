@@ -0,0 +1,45 @@
+module.exports = (sequelize, Sequelize) => {
+    const backfillJob = sequelize.define(
+        'backfill_jobs',
+        {
+            // Job name as registered in services/backfillJobs.js
+            name: {
+                type: Sequelize.STRING,
+                primaryKey: true
+            },
+            // pending | running | completed | failed
+            status: {
+                type: Sequelize.STRING,
+                allowNull: false,
+                defaultValue: 'pending'
+            },
+            // Last primary key processed — the job resumes after it
+            cursor: {
+                type: Sequelize.STRING,
+                allowNull: true
+            },
+            processed: {
+                type: Sequelize.INTEGER,
+                defaultValue: 0
+            },
+            changed: {
+                type: Sequelize.INTEGER,
+                defaultValue: 0
+            },
+            error: {
+                type: Sequelize.TEXT,
+                allowNull: true
+            },
+            startedAt: {
+                type: Sequelize.DATE,
+                allowNull: true
+            },
+            finishedAt: {
+                type: Sequelize.DATE,
+                allowNull: true
+            }
+        }
+    );
+
+    return backfillJob;
+};
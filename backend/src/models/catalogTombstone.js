@@ -0,0 +1,35 @@
+module.exports = (sequelize, Sequelize) => {
+    // One row per deleted catalogue record, so delta sync (GET /catalog/*?since=)
+    // can tell clients what to drop. Written by the product/customer destroy hooks.
+    const catalogTombstone = sequelize.define(
+        'catalog_tombstones',
+        {
+            id: {
+                type: Sequelize.UUID,
+                primaryKey: true,
+                defaultValue: Sequelize.UUIDV4
+            },
+            entityType: {
+                type: Sequelize.STRING(32),
+                allowNull: false
+            },
+            entityId: {
+                type: Sequelize.UUID,
+                allowNull: false
+            },
+            deletedAt: {
+                type: Sequelize.DATE,
+                allowNull: false,
+                defaultValue: Sequelize.NOW
+            }
+        },
+        {
+            timestamps: false,
+            indexes: [
+                { fields: ['entityType', 'deletedAt'] }
+            ]
+        }
+    );
+
+    return catalogTombstone;
+};
@@ -1,3 +1,5 @@
+const uuidv4 = require('uuid/v4');
+
 module.exports = (sequelize, Sequelize) => {
     const customer = sequelize.define(
         'customers',
@@ -35,6 +37,23 @@ module.exports = (sequelize, Sequelize) => {
                 allowNull: true,
                 defaultValue: null
             }
+        },
+        {
+            // Deletions leave a tombstone for catalogue delta sync. Bulk
+            // destroys run per row so every deleted id is recorded.
+            hooks: {
+                beforeBulkDestroy: (options) => {
+                    options.individualHooks = true;
+                },
+                afterDestroy: (instance, options) => sequelize.query(
+                    `INSERT INTO catalog_tombstones (id, "entityType", "entityId", "deletedAt")
+                     VALUES (:id, 'customer', :entityId, NOW())`,
+                    { replacements: { id: uuidv4(), entityId: instance.id }, transaction: options.transaction }
+                )
+            },
+            indexes: [
+                { fields: ['updatedAt'] }
+            ]
         }
     );
 
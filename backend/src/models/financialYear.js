@@ -0,0 +1,52 @@
+module.exports = (sequelize, Sequelize) => {
+    // One row per closed financial year (services/financialYears.js)
+    const financialYear = sequelize.define(
+        'financialYear',
+        {
+            id: {
+                type: Sequelize.UUID,
+                primaryKey: true,
+                defaultValue: Sequelize.UUIDV4
+            },
+            // '2024-25' — April to March, as invoice numbers use
+            label: {
+                type: Sequelize.STRING(7),
+                allowNull: false,
+                unique: true
+            },
+            startDate: {
+                type: Sequelize.DATEONLY,
+                allowNull: false
+            },
+            endDate: {
+                type: Sequelize.DATEONLY,
+                allowNull: false
+            },
+            // OPENING batch that carried the closing balances into the next year;
+            // null when there was nothing to carry
+            openingBatchId: {
+                type: Sequelize.UUID,
+                allowNull: true
+            },
+            closedAt: {
+                type: Sequelize.DATE,
+                allowNull: false
+            },
+            closedBy: {
+                type: Sequelize.UUID,
+                allowNull: true
+            },
+            // Rows archived and kept open by the close, retained earnings posted
+            summary: {
+                type: Sequelize.JSONB,
+                allowNull: true
+            }
+        },
+        {
+            tableName: 'financial_years',
+            timestamps: true
+        }
+    );
+
+    return financialYear;
+};
@@ -0,0 +1,59 @@
+module.exports = (sequelize, Sequelize) => {
+    const idempotencyKey = sequelize.define(
+        'idempotency_keys',
+        {
+            // sha256 of user + route + client key (services/idempotency.js)
+            id: {
+                type: Sequelize.STRING(64),
+                primaryKey: true
+            },
+            // Idempotency-Key header as sent by the client
+            key: {
+                type: Sequelize.STRING,
+                allowNull: false
+            },
+            userId: {
+                type: Sequelize.UUID,
+                allowNull: true
+            },
+            method: {
+                type: Sequelize.STRING(10),
+                allowNull: false
+            },
+            route: {
+                type: Sequelize.STRING,
+                allowNull: false
+            },
+            // sha256 of the request body — a reused key with a different body is rejected
+            requestHash: {
+                type: Sequelize.STRING(64),
+                allowNull: false
+            },
+            // processing | completed
+            status: {
+                type: Sequelize.STRING,
+                allowNull: false,
+                defaultValue: 'processing'
+            },
+            responseStatus: {
+                type: Sequelize.INTEGER,
+                allowNull: true
+            },
+            responseBody: {
+                type: Sequelize.JSONB,
+                allowNull: true
+            },
+            expiresAt: {
+                type: Sequelize.DATE,
+                allowNull: false
+            }
+        },
+        {
+            indexes: [
+                { fields: ['expiresAt'] }
+            ]
+        }
+    );
+
+    return idempotencyKey;
+};
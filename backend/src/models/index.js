@@ -2,28 +2,12 @@
 'use strict';
 
 require('dotenv').config();
-const fs = require('fs');
 const path = require('path');
-const glob = require('glob');
 const SequelizeLib = require('sequelize'); // library
-const basename = path.basename(__filename);
-
-// Try to require config from common locations (adjust if your config is elsewhere)
-let config;
-try {
-  config = require(path.join(__dirname, '..', 'config', 'config.js'));
-} catch (e1) {
-  try {
-    config = require(path.join(__dirname, '..', '..', 'config.js'));
-  } catch (e2) {
-    try {
-      config = require(path.join(__dirname, '..', '..', 'config', 'index.js'));
-    } catch (e3) {
-      console.error('Could not load DB config file. Checked several locations.');
-      throw e3;
-    }
-  }
-}
+const metrics = require('../utils/metrics');
+
+// DB config lives where .sequelizerc points sequelize-cli
+const config = require(path.join(__dirname, '..', 'config', 'config.js'));
 
 const env = process.env.NODE_ENV || 'development';
 
@@ -70,41 +54,103 @@ const sequelize = new SequelizeLib(
     port: dbConfig.port,
     dialect: dbConfig.dialect,
     dialectOptions: dbConfig.dialectOptions || {},
-    logging: process.env.SQL_LOG === 'true' ? console.log : false
+    // Every statement is timed for utils/metrics.js (per-request DB time, slow-query log)
+    benchmark: true,
+    logging: (sql, ms) => {
+      if (process.env.SQL_LOG === 'true') console.log(sql);
+      metrics.recordQuery(sql, ms);
+    }
   }
 );
 
+// Let AsyncLocalStorage follow Sequelize's bluebird promises, so each query's
+// time is attributed to the request that issued it
+if (SequelizeLib.Promise && typeof SequelizeLib.Promise.config === 'function') {
+  SequelizeLib.Promise.config({ asyncHooks: true });
+}
+
+// Static model manifest — add new model files here.
+// Models are constructed on first access (db.order), so scripts that touch two
+// tables do not pay for all of them.
+const MODELS = [
+  'account',
+  'auditLog',
+  'backfillJob',
+  'billAuditLog',
+  'catalogTombstone',
+  'customer',
+  'dailyExpense',
+  'dailySummary',
+  'financialYear',
+  'idempotencyKey',
+  'invoiceSequence',
+  'journalBatch',
+  'ledger',
+  'ledgerEntry',
+  'logArchive',
+  'order',
+  'orderItems',
+  'partyCarryForward',
+  'payment',
+  'product',
+  'purchaseBill',
+  'purchaseItem',
+  'receiptAllocation',
+  'stock',
+  'stockTransaction',
+  'supplier',
+  'user',
+  'weightLog'
+];
+
+// Models whose associate() functions reference each other are constructed
+// together: hasMany() adds the foreign key to the *other* model, so loading
+// one side alone would leave that attribute missing.
+const ASSOCIATION_GROUPS = [
+  ['order', 'orderItems', 'customer'],
+  ['account', 'journalBatch', 'ledger', 'ledgerEntry'],
+  ['purchaseBill', 'purchaseItem', 'supplier'],
+  ['product', 'stock', 'stockTransaction']
+];
+
+const groupOf = new Map();
+for (const group of ASSOCIATION_GROUPS) {
+  for (const name of group) groupOf.set(name, group);
+}
+
 const db = {};
 
-// Use glob to load model files
-const files = glob.sync(path.join(__dirname, '**', '*.js'));
-
-for (const file of files) {
-  const base = path.basename(file);
-  if (base === basename) continue; // skip this file
-  if (base.startsWith('.')) continue; // skip hidden files
-  if (path.extname(base) !== '.js') continue;
-
-  const modelName = path.basename(base, '.js');
-
-  try {
-    const modelFactory = require(file);
-    if (typeof modelFactory === 'function') {
-      db[modelName] = modelFactory(sequelize, SequelizeLib.DataTypes || SequelizeLib);
-    } else if (modelFactory && modelFactory.name) {
-      db[modelName] = modelFactory;
-    } else {
-      console.warn(`Model file ${file} did not export a function or model instance; skipping.`);
-    }
-  } catch (err) {
-    console.error(`Failed to load model "${modelName}" from ${file}:`, err);
-  }
+function defineModel(name) {
+  const modelFactory = require(path.join(__dirname, `${name}.js`));
+  const model = modelFactory(sequelize, SequelizeLib.DataTypes || SequelizeLib);
+  Object.defineProperty(db, name, { value: model, enumerable: true, writable: true, configurable: true });
+  return model;
+}
+
+function loadModel(name) {
+  const group = groupOf.get(name) || [name];
+  const created = group.map(defineModel);
+  created.forEach((model) => {
+    if (typeof model.associate === 'function') model.associate(db);
+  });
+  return db[name];
+}
+
+for (const name of MODELS) {
+  Object.defineProperty(db, name, {
+    get: () => loadModel(name),
+    enumerable: true,
+    configurable: true
+  });
 }
 
-// Call associate if present
-Object.keys(db).forEach((modelName) => {
-  if (db[modelName] && typeof db[modelName].associate === 'function') {
-    db[modelName].associate(db);
+/**
+ * Construct every model — needed before sequelize.sync().
+ */
+Object.defineProperty(db, 'loadAllModels', {
+  value: () => {
+    for (const name of MODELS) void db[name];
+    return db;
   }
 });
 
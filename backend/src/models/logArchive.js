@@ -0,0 +1,54 @@
+module.exports = (sequelize, Sequelize) => {
+    // Cold storage for log partitions past retention (services/logPartitions.js).
+    // One row per chunk of a month: gzipped NDJSON of the partition's rows.
+    const logArchive = sequelize.define(
+        'log_archives',
+        {
+            id: {
+                type: Sequelize.UUID,
+                primaryKey: true,
+                defaultValue: Sequelize.UUIDV4
+            },
+            tableName: {
+                type: Sequelize.STRING(64),
+                allowNull: false
+            },
+            // 'YYYY-MM' (UTC), the partition's month
+            month: {
+                type: Sequelize.STRING(7),
+                allowNull: false
+            },
+            chunk: {
+                type: Sequelize.INTEGER,
+                allowNull: false
+            },
+            rowCount: {
+                type: Sequelize.INTEGER,
+                allowNull: false
+            },
+            firstAt: {
+                type: Sequelize.DATE,
+                allowNull: false
+            },
+            lastAt: {
+                type: Sequelize.DATE,
+                allowNull: false
+            },
+            payload: {
+                type: Sequelize.BLOB,
+                allowNull: false
+            },
+            sha256: {
+                type: Sequelize.STRING(64),
+                allowNull: false
+            }
+        },
+        {
+            indexes: [
+                { unique: true, fields: ['tableName', 'month', 'chunk'] }
+            ]
+        }
+    );
+
+    return logArchive;
+};
@@ -10,6 +10,11 @@ module.exports = (sequelize, Sequelize) => {
                 unique: true,
                 defaultValue: Sequelize.UUIDV4
             },
+            // Catalogue product the line was sold from; null for direct entries
+            productId: {
+                type: Sequelize.UUID,
+                allowNull: true
+            },
             name: {
                 type: Sequelize.TEXT
             },
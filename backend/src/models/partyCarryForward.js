@@ -0,0 +1,65 @@
+module.exports = (sequelize, Sequelize) => {
+    // What a party's invoices and receipts archived by a financial-year close
+    // added up to. Balance queries over orders and payments add these, so
+    // archiving a year does not change anyone's balance.
+    // Rows are matched like orders and payments are: by partyId, or by
+    // partyName when partyId is null.
+    const partyCarryForward = sequelize.define(
+        'partyCarryForward',
+        {
+            id: {
+                type: Sequelize.UUID,
+                primaryKey: true,
+                defaultValue: Sequelize.UUIDV4
+            },
+            financialYear: {
+                type: Sequelize.STRING(7),
+                allowNull: false
+            },
+            partyType: {
+                type: Sequelize.ENUM('customer', 'supplier'),
+                allowNull: false
+            },
+            partyId: {
+                type: Sequelize.UUID,
+                allowNull: true
+            },
+            partyName: {
+                type: Sequelize.STRING,
+                allowNull: true
+            },
+            // Archived orders: SUM(total), SUM(paidAmount), SUM(dueAmount)
+            sales: {
+                type: Sequelize.DECIMAL(15, 2),
+                allowNull: false,
+                defaultValue: 0
+            },
+            paid: {
+                type: Sequelize.DECIMAL(15, 2),
+                allowNull: false,
+                defaultValue: 0
+            },
+            due: {
+                type: Sequelize.DECIMAL(15, 2),
+                allowNull: false,
+                defaultValue: 0
+            },
+            // Archived payments, counted the way each balance query counts them
+            received: {
+                type: Sequelize.DECIMAL(15, 2),
+                allowNull: false,
+                defaultValue: 0
+            }
+        },
+        {
+            tableName: 'party_carry_forwards',
+            timestamps: true,
+            indexes: [
+                { fields: ['partyType', 'partyId'] },
+                { fields: ['partyType', 'partyName'] }
+            ]
+        }
+    );
+
+    return partyCarryForward;
+};
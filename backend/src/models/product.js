@@ -1,3 +1,4 @@
+const uuidv4 = require('uuid/v4');
 const Enums = require('../enums');
 
 module.exports = (sequelize, Sequelize) => {
@@ -19,6 +20,23 @@ module.exports = (sequelize, Sequelize) => {
             type: {
                 type: Sequelize.ENUM(Object.values(Enums.product))
             }
+        },
+        {
+            // Deletions leave a tombstone for catalogue delta sync. Bulk
+            // destroys run per row so every deleted id is recorded.
+            hooks: {
+                beforeBulkDestroy: (options) => {
+                    options.individualHooks = true;
+                },
+                afterDestroy: (instance, options) => sequelize.query(
+                    `INSERT INTO catalog_tombstones (id, "entityType", "entityId", "deletedAt")
+                     VALUES (:id, 'product', :entityId, NOW())`,
+                    { replacements: { id: uuidv4(), entityId: instance.id }, transaction: options.transaction }
+                )
+            },
+            indexes: [
+                { fields: ['updatedAt'] }
+            ]
         }
     );
 
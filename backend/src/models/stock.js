@@ -32,6 +32,19 @@ module.exports = (sequelize, Sequelize) => {
                 type: Sequelize.DATE,
                 defaultValue: Sequelize.NOW
             }
+        },
+        {
+            indexes: [
+                {
+                    // Only low-stock rows — keeps the low-stock list cheap on large catalogues
+                    name: 'stocks_low_stock',
+                    fields: ['currentStock', 'productId'],
+                    where: {
+                        currentStock: { [Sequelize.Op.lte]: sequelize.col('minStockLevel') }
+                    }
+                },
+                { name: 'stocks_last_updated_id', fields: ['lastUpdated', 'id'] }
+            ]
         }
     );
 
@@ -69,4 +69,12 @@ module.exports = (router) => {
             authorize('admin'),
             Controller.billAudit.sendFullAuditReport
         );
+
+    router
+        .route('/audit/full-report')
+        .get(
+            authenticate,
+            authorize('admin'),
+            Controller.billAudit.downloadFullAuditReport
+        );
 };
@@ -0,0 +1,13 @@
+const Controller = require('../controller');
+const { authenticate } = require('../middleware/auth');
+
+module.exports = (router) => {
+    // Versioned catalogues for client caches — ?since=<version> returns only changes
+    router
+        .route('/catalog/products')
+        .get(authenticate, Controller.catalog.getProductCatalog);
+
+    router
+        .route('/catalog/customers')
+        .get(authenticate, Controller.catalog.getCustomerCatalog);
+};
@@ -38,4 +38,8 @@ module.exports = (router) => {
     
     // Invoice sequence info
     router.get('/dashboard/invoice-sequence', authenticate, Controller.getInvoiceSequence);
+
+    // Schema migrations and data backfills (admin only)
+    router.get('/dashboard/migrations', authenticate, authorize('admin'), Controller.getMigrationStatus);
+    router.post('/dashboard/backfills/:name/run', authenticate, authorize('admin'), Controller.rerunBackfill);
 };
@@ -1,7 +1,7 @@
 const Controller = require('../controller/dataIntegrityAudit');
 const RecoveryController = require('../controller/paymentRecovery');
 const ClassifyController = require('../controller/forensicClassification');
-const { backupDatabase } = require('../controller/dbBackup');
+const BackupController = require('../controller/dbBackup');
 const { authenticate, authorize } = require('../middleware/auth');
 
 module.exports = (router) => {
@@ -29,8 +29,14 @@ module.exports = (router) => {
     // Diagnostic: deep scan of DB state — helps debug classification issues
     router.get('/data-audit/diagnose', authenticate, authorize('admin'), ClassifyController.diagnose);
 
-    // Database Backup: download full pg_dump
-    router.get('/data-audit/backup', authenticate, authorize('admin'), backupDatabase);
+    // Database Backup: download a compressed pg_dump, or a stored backup with ?id=
+    router.get('/data-audit/backup', authenticate, authorize('admin'), BackupController.backupDatabase);
+
+    // Stored backups: parallel fulls + WAL incrementals, checksum verify, restore benchmark
+    router.get('/data-audit/backups', authenticate, authorize('admin'), BackupController.listBackups);
+    router.post('/data-audit/backups', authenticate, authorize('admin'), BackupController.runBackup);
+    router.post('/data-audit/backups/:id/verify', authenticate, authorize('admin'), BackupController.verifyBackup);
+    router.post('/data-audit/backups/:id/restore-benchmark', authenticate, authorize('admin'), BackupController.benchmarkRestore);
 
     // Backward compat
     router.get('/data-audit/reconstruct', authenticate, authorize('admin'), Controller.reconstructOrders);
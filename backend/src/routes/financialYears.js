@@ -0,0 +1,13 @@
+const Controller = require('../controller');
+const { authenticate, authorize } = require('../middleware/auth');
+
+module.exports = (router) => {
+    // Financial-year close: carry balances forward, archive the year's rows
+    router
+        .route('/ledger/financial-years')
+        .get(authenticate, authorize('admin'), Controller.financialYears.listYears);
+
+    router
+        .route('/ledger/financial-years/:label/close')
+        .post(authenticate, authorize('admin'), Controller.financialYears.closeYear);
+};
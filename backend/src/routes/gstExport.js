@@ -1,5 +1,7 @@
 const { authenticate, canModify } = require('../middleware/auth');
 const db = require('../models');
+const financialYears = require('../services/financialYears');
+const { runTask } = require('../services/workerPool');
 
 module.exports = (router) => {
     // GST Export - Clean CSV format for CA (no comparison columns)
@@ -12,88 +14,9 @@ module.exports = (router) => {
             }
 
             // Clean professional format - NO comparison columns
-            // Just the final values as they should appear for CA
-            const headers = [
-                'Invoice Number',
-                'Invoice Date',
-                'Customer Name',
-                'Customer GSTIN',
-                'Place of Supply',
-                'HSN Code',
-                'Product Name',
-                'Rate',          // Product Price (adjusted if applicable)
-                'Weight',        // Quantity (adjusted if applicable)
-                'Unit',
-                'Taxable Value',
-                'CGST Rate',
-                'CGST Amount',
-                'SGST Rate', 
-                'SGST Amount',
-                'Total Tax',
-                'Amount',
-                'Invoice Total'
-            ];
-
-            const rows = [];
-
-            // GST Rate constants (5% total = 2.5% CGST + 2.5% SGST)
-            const GST_RATE = 0.05;
-            const CGST_RATE = 2.5;
-            const SGST_RATE = 2.5;
-
-            for (const order of orders) {
-                // Use adjusted items if available, otherwise original
-                const items = useAdjusted && order.adjustedItems 
-                    ? order.adjustedItems 
-                    : order.orderItems || [];
-
-                for (const item of items) {
-                    const lineTotal = Number(item.totalPrice || 0);
-                    
-                    // Use pre-calculated GST values from frontend if available
-                    let baseAmount, cgstAmount, sgstAmount;
-                    if (item.baseAmount && item.cgstAmount && item.sgstAmount) {
-                        baseAmount = Number(item.baseAmount);
-                        cgstAmount = Number(item.cgstAmount);
-                        sgstAmount = Number(item.sgstAmount);
-                    } else {
-                        // Calculate GST (price is inclusive, so extract base)
-                        baseAmount = lineTotal / (1 + GST_RATE);
-                        cgstAmount = baseAmount * (CGST_RATE / 100);
-                        sgstAmount = baseAmount * (SGST_RATE / 100);
-                    }
-                    
-                    const totalTax = cgstAmount + sgstAmount;
-
-                    // Clean row - just the final values
-                    rows.push([
-                        order.orderNumber || '',
-                        order.orderDate || '',
-                        order.customerName || 'Walk-in Customer',
-                        order.customerGstin || 'URP',
-                        order.placeOfSupply || '27-Maharashtra',
-                        '7323',
-                        item.name || '',
-                        item.productPrice,                    // Rate (final price)
-                        Number(item.quantity).toFixed(3),     // Weight (final quantity)
-                        item.type === 'weighted' ? 'KG' : 'PCS',
-                        baseAmount.toFixed(2),
-                        CGST_RATE.toFixed(2),
-                        cgstAmount.toFixed(2),
-                        SGST_RATE.toFixed(2),
-                        sgstAmount.toFixed(2),
-                        totalTax.toFixed(2),
-                        lineTotal.toFixed(2),
-                        Number(order.total || 0).toFixed(2)
-                    ]);
-                }
-            }
-
-            // Convert to CSV
-            const csvContent = [
-                headers.join(','),
-                ...rows.map(row => row.map(cell => `"${String(cell).replace(/"/g, '""')}"`).join(','))
-            ].join('\n');
+            // Just the final values as they should appear for CA.
+            // Large exports are formatted on a worker thread (workers/tasks.js)
+            const csvContent = await runTask('gstExportCsv', { orders, useAdjusted }, { size: orders.length });
 
             // Set response headers for CSV download
             res.setHeader('Content-Type', 'text/csv');
@@ -112,17 +35,15 @@ module.exports = (router) => {
         try {
             const { startDate, endDate } = req.query;
 
-            const whereClause = {};
-            if (startDate && endDate) {
-                whereClause.orderDate = {
-                    [db.Sequelize.Op.between]: [startDate, endDate]
-                };
-            }
-
-            const orders = await db.order.findAll({
-                where: whereClause,
-                include: [{ model: db.orderItems }],
-                order: [['createdAt', 'DESC']]
+            // Orders of closed financial years live in orders_all
+            const range = startDate && endDate;
+            const scope = await financialYears.salesScope(range ? startDate : null);
+            const orders = await db.sequelize.query(`
+                SELECT total, tax, "customerGstin" FROM ${scope.orders}
+                ${range ? 'WHERE "orderDate" BETWEEN :startDate AND :endDate' : ''}
+            `, {
+                replacements: { startDate: startDate || null, endDate: endDate || null },
+                type: db.Sequelize.QueryTypes.SELECT
             });
 
             // Calculate summary
@@ -0,0 +1,22 @@
+const Controller = require('../controller');
+const { authenticate, authorize } = require('../middleware/auth');
+
+module.exports = (router) => {
+    // Monthly partitions of audit_logs, bill_audit_logs and weight_logs (admin only)
+    router
+        .route('/audit/partitions')
+        .get(authenticate, authorize('admin'), Controller.logPartitions.getStatus);
+
+    router
+        .route('/audit/partitions/maintain')
+        .post(authenticate, authorize('admin'), Controller.logPartitions.runMaintenance);
+
+    router
+        .route('/audit/partitions/:table/explain')
+        .get(authenticate, authorize('admin'), Controller.logPartitions.explainRange);
+
+    // Bring an archived month back online
+    router
+        .route('/audit/partitions/:table/:month/restore')
+        .post(authenticate, authorize('admin'), Controller.logPartitions.restoreMonth);
+};
@@ -0,0 +1,30 @@
+const metrics = require('../utils/metrics');
+const workerPool = require('../services/workerPool');
+const { authenticate, authorize } = require('../middleware/auth');
+
+metrics.registerGauge('worker_pool_threads', 'Worker pool threads by state', () => {
+    const { threads, busy, queued } = workerPool.stats();
+    return [
+        { labels: { state: 'busy' }, value: busy },
+        { labels: { state: 'idle' }, value: threads - busy },
+        { labels: { state: 'queued' }, value: queued }
+    ];
+});
+
+const adminOnly = authorize('admin');
+
+// The scraper's token when METRICS_TOKEN is set, otherwise an admin login
+const scraperOrAdmin = (req, res, next) => {
+    const token = process.env.METRICS_TOKEN;
+    if (token && req.headers.authorization === `Bearer ${token}`) return next();
+    return authenticate(req, res, () => adminOnly(req, res, next));
+};
+
+module.exports = (router) => {
+    // Prometheus scrape endpoint — admins only. Set METRICS_TOKEN to let a
+    // scraper in with "Authorization: Bearer <METRICS_TOKEN>" instead.
+    router.get('/metrics', scraperOrAdmin, (req, res) => {
+        res.setHeader('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+        return res.status(200).send(metrics.render());
+    });
+};
@@ -1,6 +1,9 @@
+const express = require('express');
 const Controller = require('../controller');
 const { authenticate, optionalAuth, canModify } = require('../middleware/auth');
 const { auditMiddleware, captureOriginal } = require('../middleware/auditLogger');
+const { conditionalGet } = require('../middleware/conditionalGet');
+const { idempotent } = require('../middleware/idempotency');
 const db = require('../models');
 
 module.exports = (router) => {
@@ -9,18 +12,39 @@ module.exports = (router) => {
         .route('/orders')
         .post(
             authenticate,           // Must be logged in
+            idempotent,             // Idempotency-Key: POS retries replay the stored response
             auditMiddleware('ORDER'),
             Controller.order.createOrder
         )
         .get(
             authenticate,           // Must be logged in to view
+            conditionalGet('orders', 'orderItems'),
             Controller.order.listOrders
         );
 
+    // Offline outbox sync — bills queued at the POS, each with its Idempotency-Key
+    router
+        .route('/orders/sync')
+        .post(
+            authenticate,
+            Controller.order.syncOrders
+        );
+
+    // Bulk past-sales import — CSV (text/csv) or JSON { bills: [...] }
+    router
+        .route('/orders/bulk')
+        .post(
+            authenticate,
+            canModify,              // Admin only
+            express.text({ type: ['text/csv', 'text/plain'], limit: '50mb' }),
+            Controller.order.bulkImportOrders
+        );
+
     router
         .route('/orders/:orderId')
         .get(
             authenticate,
+            conditionalGet('orders', 'orderItems'),
             Controller.order.getOrder
         )
         .put(
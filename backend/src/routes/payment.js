@@ -1,6 +1,9 @@
+const express = require('express');
 const Controller = require('../controller');
 const { authenticate, canModify } = require('../middleware/auth');
 const { auditMiddleware, captureOriginal } = require('../middleware/auditLogger');
+const { conditionalGet } = require('../middleware/conditionalGet');
+const { idempotent } = require('../middleware/idempotency');
 const db = require('../models');
 
 module.exports = (router) => {
@@ -8,18 +11,31 @@ module.exports = (router) => {
         .route('/payments')
         .post(
             authenticate,
+            idempotent,
             auditMiddleware('PAYMENT'),
             Controller.payment.createPayment
         )
         .get(
             authenticate,
+            conditionalGet('payments'),
             Controller.payment.listPayments
         );
 
+    // Bulk receipt import — CSV (text/csv) or JSON { receipts: [...] }; ?allocate=fifo|none
+    router
+        .route('/payments/bulk')
+        .post(
+            authenticate,
+            canModify,
+            express.text({ type: ['text/csv', 'text/plain'], limit: '50mb' }),
+            Controller.payment.bulkImportReceipts
+        );
+
     router
         .route('/payments/daily-summary')
         .get(
             authenticate,
+            conditionalGet('payments'),
             Controller.payment.getDailySummary
         );
 
@@ -1,14 +1,15 @@
 const Controller = require('../controller');
 const { authenticate } = require('../middleware/auth');
+const { conditionalGet } = require('../middleware/conditionalGet');
 
 module.exports = (router) => {
     router
         .route('/reports/outstanding-receivables')
-        .get(authenticate, Controller.reports.getOutstandingReceivables);
+        .get(authenticate, conditionalGet('customers', 'orders', 'payments'), Controller.reports.getOutstandingReceivables);
 
     router
         .route('/reports/outstanding-payables')
-        .get(authenticate, Controller.reports.getOutstandingPayables);
+        .get(authenticate, conditionalGet('suppliers', 'purchaseBills', 'payments'), Controller.reports.getOutstandingPayables);
 
     router
         .route('/reports/party-statement/:partyType/:partyId')
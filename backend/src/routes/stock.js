@@ -12,6 +12,16 @@ module.exports = (router) => {
         .route('/stocks/summary')
         .get(authenticate, Controller.stock.getStockSummary);
 
+    // Low-stock products, paginated - authenticated users
+    router
+        .route('/stocks/low-stock')
+        .get(authenticate, Controller.stock.listLowStock);
+
+    // Low-stock alert feed (changes since a cursor) - authenticated users
+    router
+        .route('/stocks/low-stock/feed')
+        .get(authenticate, Controller.stock.getLowStockFeed);
+
     // List stock transactions - authenticated users
     router
         .route('/stocks/transactions')
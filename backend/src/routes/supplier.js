@@ -1,6 +1,7 @@
 const Controller = require('../controller');
 const { authenticate, canModify } = require('../middleware/auth');
 const { auditMiddleware, captureOriginal } = require('../middleware/auditLogger');
+const { conditionalGet } = require('../middleware/conditionalGet');
 const db = require('../models');
 
 module.exports = (router) => {
@@ -13,6 +14,7 @@ module.exports = (router) => {
         )
         .get(
             authenticate,
+            conditionalGet('suppliers'),
             Controller.supplier.listSuppliers
         );
 
@@ -21,6 +23,7 @@ module.exports = (router) => {
         .route('/suppliers/with-balance')
         .get(
             authenticate,
+            conditionalGet('suppliers', 'purchaseBills', 'payments'),
             Controller.supplier.listSuppliersWithBalance
         );
 
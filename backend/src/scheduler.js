@@ -3,11 +3,21 @@
  *
  * Jobs:
  *   • Daily Drift Check — 2:00 AM server time
+ *   • Daily Fraud Summary — 9:00 PM IST
+ *   • Idempotency key eviction — hourly
+ *   • Catalogue tombstone purge — 03:00 server time
+ *   • Log partition maintenance — 03:30 server time
+ *
+ * Started by the leader process only (see src/cluster.js), so jobs run once
+ * even when several HTTP workers are running.
  */
 
 const cron = require('node-cron');
 const LedgerService = require('./services/ledgerService');
 const telegram = require('./services/telegramAlert');
+const idempotency = require('./services/idempotency');
+const catalog = require('./services/catalog');
+const logPartitions = require('./services/logPartitions');
 
 let initialized = false;
 
@@ -59,6 +69,46 @@ function init(db) {
     });
 
     console.log('[SCHEDULER] Daily fraud summary registered — runs at 9:00 PM IST');
+
+    // ── Idempotency key eviction — hourly ───────────────────
+    cron.schedule('15 * * * *', async () => {
+        try {
+            const removed = await idempotency.purgeExpired();
+            if (removed > 0) console.log(`[SCHEDULER] Purged ${removed} expired idempotency keys`);
+        } catch (err) {
+            console.error(`[SCHEDULER] Idempotency key purge failed: ${err.message}`);
+        }
+    });
+
+    console.log('[SCHEDULER] Idempotency key eviction registered — runs hourly');
+
+    // ── Catalogue tombstone purge — every day at 03:00 ──────
+    cron.schedule('0 3 * * *', async () => {
+        try {
+            const removed = await catalog.purgeTombstones();
+            if (removed > 0) console.log(`[SCHEDULER] Purged ${removed} catalogue tombstones`);
+        } catch (err) {
+            console.error(`[SCHEDULER] Catalogue tombstone purge failed: ${err.message}`);
+        }
+    });
+
+    console.log('[SCHEDULER] Catalogue tombstone purge registered — runs at 03:00 server time');
+
+    // ── Log partition maintenance — every day at 03:30 ──────
+    // Future monthly partitions for the audit/weight logs, archival past retention
+    cron.schedule('30 3 * * *', async () => {
+        try {
+            const report = await logPartitions.maintain();
+            report.forEach(({ table, archived, errors }) => {
+                if (archived.length > 0) console.log(`[SCHEDULER] Archived ${archived.map(a => a.month).join(', ')} of ${table}`);
+                errors.forEach(message => console.error(`[SCHEDULER] ${table} partition maintenance: ${message}`));
+            });
+        } catch (err) {
+            console.error(`[SCHEDULER] Log partition maintenance failed: ${err.message}`);
+        }
+    });
+
+    console.log('[SCHEDULER] Log partition maintenance registered — runs at 03:30 server time');
 }
 
 module.exports = { init };
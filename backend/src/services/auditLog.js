@@ -2,112 +2,130 @@ const db = require('../models');
 const { Op } = require('sequelize');
 const moment = require('moment-timezone');
 
+// audit_logs is the fastest-growing table, so every read here is bounded:
+// lists are keyset pages over the composite indexes in models/auditLog.js
+// (entityType+entityId, userId or action, then createdAt+id), and summaries
+// are grouped in SQL instead of loading rows into JS.
+
+const DEFAULT_PAGE_SIZE = 100;
+const RECENT_ACTIONS = 20;
+const FAILED_LOGIN_ROWS = 50;
+// Without a From date the audit trail's summary chips cover this many days
+const TRAIL_SUMMARY_DAYS = 30;
+const MAX_UUID = 'ffffffff-ffff-ffff-ffff-ffffffffffff';
+
+// One page of audit logs, newest first. Pass the returned cursor's
+// before/beforeId back to get the next page; it is null on the last page.
+const pageLogs = async (conditions, replacements, { limit = DEFAULT_PAGE_SIZE, before, beforeId } = {}, columns = 'a.*') => {
+    const where = [...conditions];
+    if (before) {
+        where.push('(a."createdAt", a.id) < (CAST(:before AS timestamptz), CAST(:beforeId AS uuid))');
+    }
+    const rows = await db.sequelize.query(`
+        SELECT ${columns}, CAST(a."createdAt" AS text) AS cursor
+        FROM audit_logs a
+        ${where.length > 0 ? `WHERE ${where.join(' AND ')}` : ''}
+        ORDER BY a."createdAt" DESC, a.id DESC
+        LIMIT :limit
+    `, {
+        replacements: { ...replacements, before: before || null, beforeId: beforeId || MAX_UUID, limit: limit + 1 },
+        type: db.sequelize.QueryTypes.SELECT
+    });
+
+    const hasMore = rows.length > limit;
+    const page = hasMore ? rows.slice(0, limit) : rows;
+    const last = page[page.length - 1];
+    return {
+        rows: page.map(({ cursor, ...row }) => row),
+        cursor: hasMore ? { before: last.cursor, beforeId: last.id } : null,
+        hasMore
+    };
+};
+
+const dateRange = (startDate, endDate, conditions, replacements) => {
+    if (startDate) {
+        conditions.push('a."createdAt" >= :startDate');
+        replacements.startDate = moment(startDate).startOf('day').toDate();
+    }
+    if (endDate) {
+        conditions.push('a."createdAt" <= :endDate');
+        replacements.endDate = moment(endDate).endOf('day').toDate();
+    }
+};
+
 module.exports = {
-    // Get audit logs with filters
+    // Get audit logs with filters, one keyset page at a time
     getAuditLogs: async (filters = {}) => {
-        const where = {};
-        
-        if (filters.userId) {
-            where.userId = filters.userId;
-        }
-        
-        if (filters.action) {
-            where.action = filters.action;
-        }
-        
-        if (filters.entityType) {
-            where.entityType = filters.entityType;
-        }
-        
-        if (filters.entityId) {
-            where.entityId = filters.entityId;
-        }
-        
-        if (filters.startDate && filters.endDate) {
-            where.createdAt = {
-                [Op.between]: [
-                    moment(filters.startDate).startOf('day').toDate(),
-                    moment(filters.endDate).endOf('day').toDate()
-                ]
-            };
-        } else if (filters.startDate) {
-            where.createdAt = {
-                [Op.gte]: moment(filters.startDate).startOf('day').toDate()
-            };
-        } else if (filters.endDate) {
-            where.createdAt = {
-                [Op.lte]: moment(filters.endDate).endOf('day').toDate()
-            };
-        }
-        
-        const logs = await db.auditLog.findAndCountAll({
-            where,
-            order: [['createdAt', 'DESC']],
-            limit: filters.limit || 100,
-            offset: filters.offset || 0
+        const conditions = [];
+        const replacements = {};
+
+        ['userId', 'action', 'entityType', 'entityId'].forEach((field) => {
+            if (filters[field]) {
+                conditions.push(`a."${field}" = :${field}`);
+                replacements[field] = filters[field];
+            }
         });
-        
-        return logs;
+        dateRange(filters.startDate, filters.endDate, conditions, replacements);
+
+        return await pageLogs(conditions, replacements, filters);
     },
 
     // Get audit log for specific entity
-    getEntityHistory: async (entityType, entityId) => {
-        const logs = await db.auditLog.findAll({
-            where: {
-                entityType,
-                entityId: String(entityId)
-            },
-            order: [['createdAt', 'DESC']]
-        });
-        
-        return logs;
+    getEntityHistory: async (entityType, entityId, page = {}) => {
+        return await pageLogs(
+            ['a."entityType" = :entityType', 'a."entityId" = :entityId'],
+            { entityType, entityId: String(entityId) },
+            page
+        );
     },
 
     // Get user activity summary
     getUserActivity: async (userId, days = 7) => {
         const startDate = moment().subtract(days, 'days').startOf('day').toDate();
-        
-        const logs = await db.auditLog.findAll({
-            where: {
-                userId,
-                createdAt: {
-                    [Op.gte]: startDate
-                }
-            },
-            order: [['createdAt', 'DESC']]
+
+        // action and entityType are NOT NULL, so a NULL marks the other grouping set
+        const counts = await db.sequelize.query(`
+            SELECT action, "entityType", COUNT(*)::int AS count
+            FROM audit_logs
+            WHERE "userId" = :userId AND "createdAt" >= :startDate
+            GROUP BY GROUPING SETS ((action), ("entityType"))
+        `, {
+            replacements: { userId, startDate },
+            type: db.sequelize.QueryTypes.SELECT
         });
-        
-        // Group by action type
+        const recent = await pageLogs(
+            ['a."userId" = :userId', 'a."createdAt" >= :startDate'],
+            { userId, startDate },
+            { limit: RECENT_ACTIONS }
+        );
+
         const summary = {
-            total: logs.length,
+            total: 0,
             byAction: {},
             byEntityType: {},
-            recentActions: logs.slice(0, 20)
+            recentActions: recent.rows
         };
-        
-        logs.forEach(log => {
-            summary.byAction[log.action] = (summary.byAction[log.action] || 0) + 1;
-            summary.byEntityType[log.entityType] = (summary.byEntityType[log.entityType] || 0) + 1;
+        counts.forEach((row) => {
+            if (row.action !== null) {
+                summary.byAction[row.action] = row.count;
+                summary.total += row.count;
+            } else {
+                summary.byEntityType[row.entityType] = row.count;
+            }
         });
-        
+
         return summary;
     },
 
     // Get recent deletions (for admin review)
-    getRecentDeletions: async (days = 30) => {
+    getRecentDeletions: async (days = 30, page = {}) => {
         const startDate = moment().subtract(days, 'days').startOf('day').toDate();
-        
-        const logs = await db.auditLog.findAll({
-            where: {
-                action: 'DELETE',
-                createdAt: {
-                    [Op.gte]: startDate
-                }
-            },
-            order: [['createdAt', 'DESC']]
-        });
-        
-        return logs;
+
+        return await pageLogs(
+            ['a.action = \'DELETE\'', 'a."createdAt" >= :startDate'],
+            { startDate },
+            page
+        );
     },
 
     // Get suspicious activities (multiple deletions, etc.)
@@ -132,35 +150,110 @@ module.exports = {
             raw: true
         });
         
-        // Get failed login attempts
-        const failedLogins = await db.auditLog.findAll({
+        // Failed login attempts: the count, and only the latest rows
+        const failedLoginCount = await db.auditLog.count({
             where: {
                 action: 'LOGIN_FAILED',
                 createdAt: {
                     [Op.gte]: last24h
                 }
-            },
-            order: [['createdAt', 'DESC']]
+            }
         });
+        const failedLogins = await pageLogs(
+            ['a.action = \'LOGIN_FAILED\'', 'a."createdAt" >= :last24h'],
+            { last24h },
+            { limit: FAILED_LOGIN_ROWS }
+        );
         
         return {
             highDeletionUsers: deletions,
-            failedLogins,
+            failedLogins: failedLogins.rows,
+            failedLoginCount,
             alerts: [
                 ...deletions.map(d => ({
                     type: 'HIGH_DELETIONS',
                     message: `User ${d.userName} deleted ${d.deleteCount} records in the last 24 hours`,
                     userId: d.userId
                 })),
-                ...(failedLogins.length >= 5 ? [{
+                ...(failedLoginCount >= 5 ? [{
                     type: 'MULTIPLE_FAILED_LOGINS',
-                    message: `${failedLogins.length} failed login attempts in the last 24 hours`,
-                    count: failedLogins.length
+                    message: `${failedLoginCount} failed login attempts in the last 24 hours`,
+                    count: failedLoginCount
                 }] : [])
             ]
         };
     },
 
+    // Full audit trail screen: filters, keyset pages and, on the first page,
+    // per action/entity counts. Substring filters (userName, search) still
+    // scan the rows the other filters leave.
+    getAuditTrail: async (filters = {}) => {
+        const conditions = [];
+        const replacements = {};
+
+        if (filters.action) {
+            conditions.push('a.action = :action');
+            replacements.action = filters.action;
+        }
+        if (filters.entityType) {
+            conditions.push('a."entityType" = :entityType');
+            replacements.entityType = filters.entityType;
+        }
+        if (filters.entityId) {
+            conditions.push('a."entityId" = :entityId');
+            replacements.entityId = filters.entityId;
+        }
+        if (filters.userName) {
+            conditions.push('LOWER(a."userName") LIKE LOWER(:userName)');
+            replacements.userName = `%${filters.userName}%`;
+        }
+        if (filters.from) {
+            conditions.push('a."createdAt" >= CAST(:from AS date)');
+            replacements.from = filters.from;
+        }
+        if (filters.to) {
+            conditions.push('a."createdAt" < CAST(:to AS date) + interval \'1 day\'');
+            replacements.to = filters.to;
+        }
+        if (filters.search) {
+            conditions.push(`(
+                LOWER(a.description) LIKE LOWER(:search)
+                OR LOWER(a."entityName") LIKE LOWER(:search)
+                OR LOWER(a."userName") LIKE LOWER(:search)
+            )`);
+            replacements.search = `%${filters.search}%`;
+        }
+
+        const page = await pageLogs(conditions, replacements, filters, `a.id, a.action, a."entityType", a."entityId",
+            a."entityName", a."userName", a."userRole", a.description, a."oldValues", a."newValues",
+            a."ipAddress", a."createdAt"`);
+
+        // Counts only with the first page, and over a bounded window
+        let summary = null;
+        let total = null;
+        let summarySince = null;
+        if (!filters.before) {
+            const summaryConditions = [...conditions];
+            if (!filters.from) {
+                summarySince = moment().subtract(TRAIL_SUMMARY_DAYS, 'days').format('YYYY-MM-DD');
+                summaryConditions.push('a."createdAt" >= CAST(:summarySince AS date)');
+            }
+            summary = await db.sequelize.query(`
+                SELECT action, "entityType", COUNT(*)::int AS count
+                FROM audit_logs a
+                ${summaryConditions.length > 0 ? `WHERE ${summaryConditions.join(' AND ')}` : ''}
+                GROUP BY action, "entityType"
+                ORDER BY count DESC
+            `, {
+                replacements: { ...replacements, summarySince },
+                type: db.sequelize.QueryTypes.SELECT
+            });
+            total = summary.reduce((sum, row) => sum + row.count, 0);
+        }
+
+        return { ...page, total, summary, summarySince, limit: filters.limit || DEFAULT_PAGE_SIZE };
+    },
+
     // Dashboard stats
     getDashboardStats: async () => {
         const today = moment().startOf('day').toDate();
@@ -187,15 +280,13 @@ module.exports = {
         });
         
         // Active users today
-        const activeUsersToday = await db.auditLog.findAll({
+        const activeUsersToday = await db.auditLog.count({
             where: {
                 createdAt: { [Op.gte]: today },
                 userId: { [Op.ne]: null }
             },
-            attributes: [
-                [db.Sequelize.fn('DISTINCT', db.Sequelize.col('userId')), 'userId']
-            ],
-            raw: true
+            distinct: true,
+            col: 'userId'
         });
         
         return {
@@ -204,7 +295,7 @@ module.exports = {
                 acc[row.action] = parseInt(row.count);
                 return acc;
             }, {}),
-            activeUsersToday: activeUsersToday.length
+            activeUsersToday
         };
     }
 };
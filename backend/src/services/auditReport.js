@@ -0,0 +1,501 @@
+/**
+ * Full Bill Audit Report
+ *
+ * Builds the complete /bill-audit report (item deletions, weight fetches,
+ * payment toggles). Totals are aggregated in SQL; the summary sections run
+ * concurrently with bounded parallelism. The detail lists (item removals,
+ * bill clears, bill deletes) are read in keyset pages, newest first, and each
+ * page is written to the sink as soon as it is read — a busy day never holds
+ * a whole table, or the whole report, in memory. Every read stops at the
+ * moment the report started, so rows logged while it runs neither shift the
+ * pages nor change the counts.
+ *
+ * The report is streamed to a pluggable sink — begin(meta), write(sections)
+ * for each chunk in order, end():
+ *   • telegramSink()       — packed into as few 4096-char messages as possible
+ *   • fileSink(path)       — written as a single document
+ *   • httpSink(res)        — streamed back as a downloadable document
+ *
+ * Packing and rendering are pure (workers/tasks.js) and run per chunk.
+ */
+
+const fs = require('fs');
+const db = require('../models');
+const { once } = require('events');
+const { Op, fn, col } = require('sequelize');
+const { sendTelegram, esc } = require('./telegramAlert');
+const { runTask } = require('./workerPool');
+const { mapWithConcurrency } = require('../utils/concurrency');
+
+const PAGE_SIZE = 500;
+const SECTION_CONCURRENCY = Number(process.env.AUDIT_REPORT_CONCURRENCY) || 3;
+const TELEGRAM_MESSAGE_LIMIT = 3800;
+const DIVIDER = '━━━━━━━━━━━━━━━━━━━━━━━━━━';
+
+const fmt = (v) => `₹${(Number(v) || 0).toLocaleString('en-IN')}`;
+const timeStr = (d) => new Date(d).toLocaleString('en-IN', {
+    hour: '2-digit', minute: '2-digit', second: '2-digit',
+    hour12: true, timeZone: 'Asia/Kolkata'
+});
+
+// ─── Context ─────────────────────────────────────────────────────
+
+function buildContext(options = {}) {
+    const startDate = options.startDate ? new Date(options.startDate) : new Date(new Date().setHours(0, 0, 0, 0));
+    const endDate = options.endDate ? new Date(new Date(options.endDate).setHours(23, 59, 59, 999)) : new Date(new Date().setHours(23, 59, 59, 999));
+    // Rows logged after the report started are left out of every section
+    const readUntil = new Date(Math.min(endDate.getTime(), Date.now()));
+    return {
+        startDate,
+        endDate,
+        readUntil,
+        dateRange: { [Op.gte]: startDate, [Op.lte]: readUntil },
+        dateLabel: startDate.toLocaleDateString('en-IN', { day: '2-digit', month: 'short', year: 'numeric', timeZone: 'Asia/Kolkata' })
+    };
+}
+
+/**
+ * Read bill_audit_logs rows of one event type in keyset pages on
+ * ("createdAt", id), newest first, calling `onPage(rows, firstIndex)` for
+ * each page. Returns the number of rows seen.
+ */
+async function forEachBillAuditPage(ctx, eventType, columns, onPage) {
+    let cursor = null;
+    let seen = 0;
+    for (;;) {
+        const rows = await db.sequelize.query(`
+            SELECT ${columns.map(c => `"${c}"`).join(', ')}, CAST("createdAt" AS text) AS cursor
+            FROM bill_audit_logs
+            WHERE "eventType" = :eventType AND "createdAt" >= :startDate AND "createdAt" <= :readUntil
+            ${cursor ? 'AND ("createdAt", id) < (CAST(:before AS timestamptz), CAST(:beforeId AS uuid))' : ''}
+            ORDER BY "createdAt" DESC, id DESC
+            LIMIT :limit
+        `, {
+            replacements: {
+                eventType,
+                startDate: ctx.startDate,
+                readUntil: ctx.readUntil,
+                before: cursor ? cursor.before : null,
+                beforeId: cursor ? cursor.beforeId : null,
+                limit: PAGE_SIZE
+            },
+            type: db.sequelize.QueryTypes.SELECT
+        });
+        if (rows.length > 0) await onPage(rows, seen);
+        seen += rows.length;
+        if (rows.length < PAGE_SIZE) return seen;
+        const last = rows[rows.length - 1];
+        cursor = { before: last.cursor, beforeId: last.id };
+    }
+}
+
+// A log table that does not exist yet reads as empty; any other failure —
+// connection, timeout, a Telegram send — fails the report
+const UNDEFINED_TABLE = '42P01';
+const ignoreMissingTable = (error) => {
+    const code = error && (error.original || error.parent || error).code;
+    if (code !== UNDEFINED_TABLE) throw error;
+};
+
+const countBillAudit = (ctx, eventType) => db.billAuditLog.count({ where: { eventType, createdAt: ctx.dateRange } });
+
+/**
+ * Stream one detail list: a header with the row count, then the rows page by
+ * page. Nothing is written when there are no rows.
+ */
+async function streamBillAuditList(ctx, emit, { eventType, columns, header, render }) {
+    let count = 0;
+    try {
+        count = await countBillAudit(ctx, eventType);
+    } catch (e) { ignoreMissingTable(e); }
+    if (count === 0) return;
+    let headerSent = false;
+    await forEachBillAuditPage(ctx, eventType, columns, async (rows, firstIndex) => {
+        const entries = rows.map((row, i) => render(row, firstIndex + i));
+        await emit(headerSent ? entries : [header(count), ...entries]);
+        headerSent = true;
+    });
+}
+
+// ─── Section producers ───────────────────────────────────────────
+// Summary producers return { blocks, stats }; list producers stream their
+// blocks through emit(blocks) as pages are read. A block is a unit of text
+// that must not be split across Telegram messages.
+
+async function deletionSummarySection(ctx) {
+    const stats = { ITEM_REMOVED: 0, BILL_CLEARED: 0, BILL_DELETED: 0, totalDeletedValue: 0 };
+    try {
+        const rows = await db.billAuditLog.findAll({
+            attributes: [
+                'eventType',
+                [fn('COUNT', col('id')), 'count'],
+                [fn('COALESCE', fn('SUM', col('totalPrice')), 0), 'value']
+            ],
+            where: { createdAt: ctx.dateRange },
+            group: ['eventType'],
+            raw: true
+        });
+        for (const row of rows) {
+            stats[row.eventType] = Number(row.count) || 0;
+            stats.totalDeletedValue += Number(row.value) || 0;
+        }
+    } catch (e) { ignoreMissingTable(e); }
+
+    const lines = [
+        `📊 <b>COMPLETE BILL AUDIT REPORT</b>`,
+        `📅 ${ctx.dateLabel}`,
+        ``,
+        DIVIDER,
+        `📋 <b>TAB 1: ITEM DELETIONS</b>`,
+        DIVIDER,
+        ``,
+        `<b>Summary:</b>`,
+        `• Item Removals: <b>${stats.ITEM_REMOVED}</b>`,
+        `• Bill Clears: <b>${stats.BILL_CLEARED}</b>`,
+        `• Bill Deletes: <b>${stats.BILL_DELETED}</b>`,
+        `• Total Deleted Value: <b>${fmt(stats.totalDeletedValue)}</b>`,
+    ];
+    if (stats.ITEM_REMOVED === 0 && stats.BILL_CLEARED === 0 && stats.BILL_DELETED === 0) {
+        lines.push('', '<i>No deletion events recorded.</i>');
+    }
+
+    return {
+        blocks: [lines.join('\n')],
+        stats: { itemRemovals: stats.ITEM_REMOVED, billDeletes: stats.BILL_DELETED }
+    };
+}
+
+async function itemRemovalsSection(ctx, emit) {
+    await streamBillAuditList(ctx, emit, {
+        eventType: 'ITEM_REMOVED',
+        columns: ['id', 'productName', 'quantity', 'price', 'totalPrice', 'deviceInfo', 'userName', 'invoiceContext', 'customerName', 'createdAt'],
+        header: (count) => `\n<b>🚨 Item Removals (${count}):</b>\n`,
+        render: (log, i) => {
+            const isScale = log.deviceInfo?.includes('WEIGHTED');
+            return [
+                `<b>${i + 1}.</b> ${esc(log.productName)}`,
+                `   Qty: ${log.quantity || '-'} | Price: ${fmt(log.price)} | Value: <b>${fmt(log.totalPrice)}</b>`,
+                `   Type: ${isScale ? '⚖️ Scale' : '✏️ Manual'} | By: ${esc(log.userName) || '?'}`,
+                `   Time: ${timeStr(log.createdAt)}`,
+                log.invoiceContext ? `   Invoice: <code>${esc(log.invoiceContext)}</code>` : '',
+                log.customerName ? `   Customer: ${esc(log.customerName)}` : '',
+                ``
+            ].filter(Boolean).join('\n');
+        }
+    });
+    return {};
+}
+
+async function billClearsSection(ctx, emit) {
+    await streamBillAuditList(ctx, emit, {
+        eventType: 'BILL_CLEARED',
+        columns: ['id', 'productName', 'totalPrice', 'userName', 'createdAt'],
+        header: (count) => `<b>🧹 Bill Clears (${count}):</b>\n`,
+        render: (log) => `• ${esc(log.productName)} — ${fmt(log.totalPrice)} | By: ${esc(log.userName)} | ${timeStr(log.createdAt)}`
+    });
+    return {};
+}
+
+async function billDeletesSection(ctx, emit) {
+    await streamBillAuditList(ctx, emit, {
+        eventType: 'BILL_DELETED',
+        columns: ['id', 'productName', 'totalPrice', 'userName', 'invoiceContext', 'createdAt'],
+        header: (count) => `<b>🗑️ Bill Deletes (${count}):</b>\n`,
+        render: (log) => [
+            `• ${esc(log.productName) || 'Bill'} — <b>${fmt(log.totalPrice)}</b>`,
+            `  By: ${esc(log.userName)} | ${timeStr(log.createdAt)}`,
+            log.invoiceContext ? `  Invoice: <code>${esc(log.invoiceContext)}</code>` : '',
+            ``
+        ].filter(Boolean).join('\n')
+    });
+    return {};
+}
+
+async function weightFetchesSection(ctx) {
+    const where = { createdAt: ctx.dateRange };
+    let totals = { total: 0, consumed: 0, unmatchedKg: 0 };
+    let unmatched = [];
+    let consumed = [];
+    try {
+        const [agg] = await db.weightLog.findAll({
+            attributes: [
+                [fn('COUNT', col('id')), 'total'],
+                [fn('COUNT', db.sequelize.literal('CASE WHEN "consumed" THEN 1 END')), 'consumed'],
+                [fn('COALESCE', fn('SUM', db.sequelize.literal('CASE WHEN NOT "consumed" THEN "weight" END')), 0), 'unmatchedKg']
+            ],
+            where,
+            raw: true
+        });
+        totals = {
+            total: Number(agg?.total) || 0,
+            consumed: Number(agg?.consumed) || 0,
+            unmatchedKg: Number(agg?.unmatchedKg) || 0
+        };
+        const attributes = ['id', 'weight', 'userName', 'orderNumber', 'createdAt'];
+        [unmatched, consumed] = await Promise.all([
+            db.weightLog.findAll({ where: { ...where, consumed: false }, attributes, order: [['createdAt', 'DESC']], limit: 20, raw: true }),
+            db.weightLog.findAll({ where: { ...where, consumed: true }, attributes, order: [['createdAt', 'DESC']], limit: 15, raw: true })
+        ]);
+    } catch (e) { ignoreMissingTable(e); }
+
+    const unmatchedCount = totals.total - totals.consumed;
+    const lines = [
+        DIVIDER,
+        `⚖️ <b>TAB 2: WEIGHT FETCHES</b>`,
+        DIVIDER,
+        ``,
+        `<b>Summary:</b>`,
+        `• Total Fetches: <b>${totals.total}</b>`,
+        `• Added to Bill: <b>${totals.consumed}</b>`,
+        `• NOT Added to Bill: <b>${unmatchedCount}</b>${unmatchedCount > 0 ? ' ⚠️' : ''}`,
+        `• Unmatched Weight: <b>${totals.unmatchedKg.toFixed(2)} kg</b>`,
+    ];
+
+    if (totals.total === 0) {
+        lines.push('', '<i>No weight readings recorded.</i>');
+    }
+
+    if (unmatchedCount > 0) {
+        lines.push('', `<b>⚠️ Unmatched Weights (${unmatchedCount}):</b>`, ``);
+        for (const w of unmatched) {
+            lines.push(`• <b>${Number(w.weight).toFixed(3)} kg</b> — ${timeStr(w.createdAt)} — By: ${esc(w.userName) || '?'}`);
+        }
+        if (unmatchedCount > 20) {
+            lines.push(`<i>...and ${unmatchedCount - 20} more</i>`);
+        }
+    }
+
+    if (totals.consumed > 0) {
+        lines.push('', `<b>✅ Added to Bill (${totals.consumed}):</b>`, ``);
+        for (const w of consumed) {
+            lines.push(`• ${Number(w.weight).toFixed(3)} kg → ${esc(w.orderNumber) || '?'} | ${timeStr(w.createdAt)}`);
+        }
+        if (totals.consumed > 15) {
+            lines.push(`<i>...and ${totals.consumed - 15} more</i>`);
+        }
+    }
+
+    return { blocks: [lines.join('\n')], stats: { unmatchedWeights: unmatchedCount } };
+}
+
+async function paymentTogglesSection(ctx) {
+    const where = { referenceType: 'PAYMENT_TOGGLE', createdAt: ctx.dateRange };
+    let toggleCount = 0;
+    let toggleBatches = [];
+    try {
+        [toggleCount, toggleBatches] = await Promise.all([
+            db.journalBatch.count({ where }),
+            db.journalBatch.findAll({
+                where,
+                attributes: ['id', 'description', 'totalDebit'],
+                order: [['createdAt', 'DESC']],
+                limit: 20,
+                raw: true
+            })
+        ]);
+    } catch (e) { ignoreMissingTable(e); }
+
+    if (toggleCount === 0) return { blocks: [], stats: { toggleCount } };
+
+    const lines = [
+        ``,
+        DIVIDER,
+        `💱 <b>PAYMENT TOGGLES: ${toggleCount}</b>`,
+        DIVIDER,
+    ];
+    for (const b of toggleBatches) {
+        lines.push(`• ${esc((b.description || 'Toggle').substring(0, 80))} — ₹${b.totalDebit}`);
+    }
+    return { blocks: [lines.join('\n')], stats: { toggleCount } };
+}
+
+// Report order. `build` sections are computed up front (concurrently);
+// `stream` sections write their pages as they are read.
+const SECTIONS = [
+    { build: deletionSummarySection },
+    { stream: itemRemovalsSection },
+    { stream: billClearsSection },
+    { stream: billDeletesSection },
+    { build: weightFetchesSection },
+    { build: paymentTogglesSection }
+];
+
+function footerSection(stats) {
+    const redFlags = [];
+    if (stats.itemRemovals > 3) redFlags.push(`${stats.itemRemovals} items deleted`);
+    if (stats.billDeletes > 0) redFlags.push(`${stats.billDeletes} bills deleted`);
+    if (stats.unmatchedWeights > 2) redFlags.push(`${stats.unmatchedWeights} unused weights`);
+    if (stats.toggleCount > 4) redFlags.push(`${stats.toggleCount} payment toggles`);
+
+    const alertLevel = redFlags.length >= 3 ? '🔴 HIGH RISK' :
+                      redFlags.length >= 1 ? '🟡 NEEDS ATTENTION' : '🟢 ALL CLEAR';
+
+    const lines = [
+        DIVIDER,
+        `<b>Overall: ${alertLevel}</b>`,
+    ];
+    if (redFlags.length > 0) {
+        lines.push('Red flags: ' + redFlags.map(f => esc(f)).join(', '));
+    }
+    lines.push(`<i>Report generated at ${new Date().toLocaleString('en-IN', { timeZone: 'Asia/Kolkata' })}</i>`);
+
+    return { blocks: [lines.join('\n')], alertLevel, redFlags };
+}
+
+// ─── Sinks ───────────────────────────────────────────────────────
+
+const blockCount = (sections) => sections.reduce((n, s) => n + s.blocks.length, 0);
+
+/**
+ * Send the report to Telegram as packed messages, as each chunk fills them
+ * (sequential — Telegram rate-limits per chat; sendTelegram already backs
+ * off on 429).
+ */
+function telegramSink({ pacingMs = 300, limit = TELEGRAM_MESSAGE_LIMIT } = {}) {
+    let carry = '';
+    let sent = 0;
+    const send = async (messages) => {
+        for (const message of messages) {
+            if (pacingMs > 0 && sent > 0) await new Promise(r => setTimeout(r, pacingMs));
+            await sendTelegram(message);
+            sent++;
+        }
+    };
+    return {
+        begin: async () => {},
+        write: async (sections) => {
+            const packed = await runTask('auditMessages', { sections, limit, carry }, { size: blockCount(sections) });
+            carry = packed.carry;
+            await send(packed.messages);
+        },
+        end: async () => {
+            if (carry.trim()) await send([carry]);
+            return { messageCount: sent };
+        }
+    };
+}
+
+/**
+ * Write the report to a stream as a single document, chunk by chunk.
+ */
+function documentWriter(stream, format) {
+    let first = true;
+    let bytes = 0;
+    const put = async (text) => {
+        bytes += Buffer.byteLength(text);
+        if (!stream.write(text)) await once(stream, 'drain');
+    };
+    return {
+        bytes: () => bytes,
+        begin: async (meta) => {
+            if (format !== 'html') return;
+            await put([
+                '<!DOCTYPE html>',
+                '<html><head><meta charset="utf-8">',
+                `<title>Bill Audit Report — ${esc(meta.dateLabel)}</title>`,
+                '</head>',
+                '<body style="font-family: sans-serif; white-space: pre-wrap;">',
+                ''
+            ].join('\n'));
+        },
+        write: async (sections) => {
+            await put(await runTask('auditDocument', { sections, format, first }, { size: blockCount(sections) }));
+            first = false;
+        },
+        end: async () => {
+            if (format === 'html') await put('\n</body></html>');
+            stream.end();
+            await once(stream, 'finish');
+        }
+    };
+}
+
+/**
+ * Write the report to a file as a single document.
+ */
+function fileSink(filePath, { format = 'text' } = {}) {
+    let writer;
+    return {
+        begin: async (meta) => {
+            writer = documentWriter(fs.createWriteStream(filePath, 'utf8'), format);
+            await writer.begin(meta);
+        },
+        write: (sections) => writer.write(sections),
+        end: async () => {
+            await writer.end();
+            return { filePath, bytes: writer.bytes() };
+        }
+    };
+}
+
+/**
+ * Stream the report as a downloadable document on an Express response.
+ */
+function httpSink(res, { format = 'text', filename } = {}) {
+    const writer = documentWriter(res, format);
+    let name;
+    return {
+        begin: async (meta) => {
+            const ext = format === 'html' ? 'html' : 'txt';
+            name = filename || `bill-audit-report-${meta.startDate.toISOString().split('T')[0]}.${ext}`;
+            res.setHeader('Content-Type', format === 'html' ? 'text/html; charset=utf-8' : 'text/plain; charset=utf-8');
+            res.setHeader('Content-Disposition', `attachment; filename="${name}"`);
+            res.status(200);
+            await writer.begin(meta);
+        },
+        write: (sections) => writer.write(sections),
+        end: async () => {
+            await writer.end();
+            return { filename: name, bytes: writer.bytes() };
+        }
+    };
+}
+
+// ─── Report assembly ─────────────────────────────────────────────
+
+/**
+ * Build the full audit report and stream it to `sink`, section by section in
+ * report order. The summary sections run concurrently (bounded) while the
+ * detail lists are being written.
+ * @param {Object} options - { startDate, endDate, concurrency }
+ * @param {Object} sink - { begin(meta), write(sections), end() => Promise<Object> }
+ */
+async function generateFullAuditReport(options, sink) {
+    const ctx = buildContext(options);
+    const built = mapWithConcurrency(
+        SECTIONS.filter(s => s.build),
+        options.concurrency || SECTION_CONCURRENCY,
+        (section) => section.build(ctx)
+    );
+    built.catch(() => {}); // awaited below; don't report it unhandled if a list fails first
+
+    await sink.begin({ dateLabel: ctx.dateLabel, startDate: ctx.startDate, endDate: ctx.endDate });
+
+    const stats = {};
+    let builtIndex = 0;
+    for (const section of SECTIONS) {
+        if (section.build) {
+            const { blocks, stats: sectionStats } = (await built)[builtIndex++];
+            Object.assign(stats, sectionStats);
+            if (blocks.length > 0) await sink.write([{ blocks, continues: false }]);
+        } else {
+            let continues = false;
+            Object.assign(stats, await section.stream(ctx, async (blocks) => {
+                await sink.write([{ blocks, continues }]);
+                continues = true;
+            }));
+        }
+    }
+
+    const footer = footerSection(stats);
+    await sink.write([{ blocks: footer.blocks, continues: false }]);
+    const written = await sink.end();
+    return { ...written, alertLevel: footer.alertLevel, redFlags: footer.redFlags };
+}
+
+module.exports = {
+    generateFullAuditReport,
+    telegramSink,
+    fileSink,
+    httpSink
+};
@@ -0,0 +1,183 @@
+/**
+ * Resumable Background Backfills
+ *
+ * Data fixes that used to run as full-table UPDATEs on every boot. Each job
+ * walks its table in primary-key order, BACKFILL_BATCH_SIZE rows per
+ * transaction, and stores its cursor and counters in backfill_jobs together
+ * with each batch, so a restart resumes where the last batch committed.
+ * Locks are held for one batch at a time, never for the whole table.
+ *
+ * Started by the leader after boot (index.js), without blocking startup.
+ * A completed job does not run again unless re-run by an admin
+ * (POST /api/dashboard/backfills/:name/run).
+ */
+
+const db = require('../models');
+const logPartitions = require('./logPartitions');
+
+const BATCH_SIZE = Number(process.env.BACKFILL_BATCH_SIZE) || 1000;
+// Pause between batches so billing traffic gets the database first
+const PAUSE_MS = Number(process.env.BACKFILL_PAUSE_MS) || 50;
+
+// Customer receipts linked to an order (PAY-TOGGLE journal payments excluded)
+const LINKED_RECEIPT = `
+    SELECT 1 FROM payments
+    WHERE payments."referenceId"::text = orders.id::text
+      AND payments."referenceType" = 'order'
+      AND payments."partyType" = 'customer'
+      AND (payments."isDeleted" = false OR payments."isDeleted" IS NULL)
+      AND (payments."paymentNumber" IS NULL OR payments."paymentNumber" NOT LIKE 'PAY-TOGGLE-%')
+`;
+
+/**
+ * Registered jobs. batch(afterId, limit, transaction) processes the next
+ * `limit` rows after `afterId` and returns { lastId, processed, changed };
+ * processed = 0 means the job is done.
+ */
+const JOBS = {
+    'orders-payment-mode': {
+        description: 'Orders with linked receipts are CREDIT; paid-at-POS orders without receipts are CASH',
+        batch: async (afterId, limit, transaction) => {
+            const [ids] = await db.sequelize.query(`
+                SELECT id FROM orders
+                WHERE (:afterId::uuid IS NULL OR id > :afterId::uuid)
+                ORDER BY id
+                LIMIT :limit
+            `, { replacements: { afterId, limit }, transaction });
+            if (ids.length === 0) return { lastId: afterId, processed: 0, changed: 0 };
+
+            const batchIds = ids.map(r => r.id);
+
+            // Misclassified CASH → CREDIT (has linked receipts)
+            const [toCredit] = await db.sequelize.query(`
+                UPDATE orders SET "paymentMode" = 'CREDIT'
+                WHERE id IN (:batchIds)
+                  AND "paymentMode" = 'CASH'
+                  AND "isDeleted" = false
+                  AND EXISTS (${LINKED_RECEIPT})
+                RETURNING id
+            `, { replacements: { batchIds }, transaction });
+
+            // Paid at POS with no receipts → CASH
+            const [toCash] = await db.sequelize.query(`
+                UPDATE orders SET "paymentMode" = 'CASH'
+                WHERE id IN (:batchIds)
+                  AND "paymentMode" = 'CREDIT'
+                  AND "paymentStatus" = 'paid'
+                  AND "paidAmount" >= "total"
+                  AND "isDeleted" = false
+                  AND NOT EXISTS (${LINKED_RECEIPT})
+                RETURNING id
+            `, { replacements: { batchIds }, transaction });
+
+            return {
+                lastId: batchIds[batchIds.length - 1],
+                processed: batchIds.length,
+                changed: toCredit.length + toCash.length
+            };
+        }
+    },
+
+    // Rows left in <table>_unpartitioned when the log tables were partitioned
+    // (services/logPartitions.js); changed = rows not already present
+    ...Object.fromEntries(Object.keys(logPartitions.TABLES).map(table => [`partition-${table}`, {
+        description: `Move ${table} rows from before partitioning into the monthly partitions`,
+        batch: (afterId, limit, transaction) => logPartitions.moveLegacyRows(table, afterId, limit, transaction)
+    }]))
+};
+
+const running = new Set();
+
+/**
+ * Run (or resume) one job to completion.
+ * @param {string} name - Key of JOBS
+ * @returns {Promise<Object>} Final backfill_jobs row
+ */
+async function runJob(name) {
+    const job = JOBS[name];
+    if (!job) throw new Error(`Unknown backfill job: ${name}`);
+    if (running.has(name)) throw new Error(`Backfill ${name} is already running`);
+    running.add(name);
+
+    try {
+        const [state] = await db.backfillJob.findOrCreate({ where: { name }, defaults: { name } });
+        if (state.status === 'completed') return state;
+
+        await state.update({ status: 'running', error: null, startedAt: state.startedAt || new Date() });
+        console.log(`[BACKFILL] ${name}: ${state.cursor ? `resuming after ${state.cursor}` : 'starting'}`);
+
+        for (;;) {
+            const done = await db.sequelize.transaction(async (transaction) => {
+                const { lastId, processed, changed } = await job.batch(state.cursor, BATCH_SIZE, transaction);
+                if (processed === 0) {
+                    await state.update({ status: 'completed', finishedAt: new Date() }, { transaction });
+                    return true;
+                }
+                await state.update({
+                    cursor: lastId,
+                    processed: state.processed + processed,
+                    changed: state.changed + changed
+                }, { transaction });
+                return false;
+            });
+            if (done) break;
+            if (PAUSE_MS > 0) await new Promise(r => setTimeout(r, PAUSE_MS));
+        }
+
+        console.log(`[BACKFILL] ${name}: completed — ${state.processed} rows scanned, ${state.changed} changed`);
+        return state;
+    } catch (error) {
+        console.warn(`[BACKFILL] ${name} failed (will resume on next start): ${error.message}`);
+        await db.backfillJob.update({ status: 'failed', error: error.message }, { where: { name } }).catch(() => {});
+        throw error;
+    } finally {
+        running.delete(name);
+    }
+}
+
+/**
+ * Run every job that has not completed, one after another. Never rejects.
+ */
+async function runPending() {
+    for (const name of Object.keys(JOBS)) {
+        try {
+            await runJob(name);
+        } catch (error) {
+            // Logged in runJob; continue with the next job
+        }
+    }
+}
+
+/**
+ * Reset a job so it scans from the start again, then run it.
+ */
+async function rerunJob(name) {
+    if (!JOBS[name]) throw new Error(`Unknown backfill job: ${name}`);
+    if (running.has(name)) throw new Error(`Backfill ${name} is already running`);
+    await db.backfillJob.upsert({
+        name, status: 'pending', cursor: null, processed: 0, changed: 0,
+        error: null, startedAt: null, finishedAt: null
+    });
+    return runJob(name);
+}
+
+/**
+ * Progress of every registered job.
+ */
+async function getStatus() {
+    const rows = await db.backfillJob.findAll({ raw: true });
+    const byName = new Map(rows.map(r => [r.name, r]));
+    return Object.entries(JOBS).map(([name, job]) => ({
+        name,
+        description: job.description,
+        running: running.has(name),
+        ...(byName.get(name) || { status: 'pending', processed: 0, changed: 0 })
+    }));
+}
+
+module.exports = {
+    runJob,
+    runPending,
+    rerunJob,
+    getStatus
+};
@@ -0,0 +1,64 @@
+/**
+ * Versioned catalogues for client-side caches (POS product and customer pickers)
+ *
+ * A client keeps the catalogue in IndexedDB and asks only for what changed:
+ *
+ *   GET /api/catalog/products              full snapshot + version
+ *   GET /api/catalog/products?since=<v>    rows changed and ids deleted since v
+ *
+ * Versions are the latest "updatedAt" / tombstone time, in epoch microseconds.
+ * The version is two index lookups, so an unchanged catalogue is answered
+ * with 304 before any row is read.
+ *
+ * A write stamps its rows before it commits, so versions only advance up to
+ * the feed horizon (services/changeFeeds): every row at or below a version is
+ * committed, and a delta is exactly the rows after `since` up to the current
+ * version. Tombstones are kept for TOMBSTONE_RETENTION_DAYS — older versions
+ * get a full snapshot instead.
+ */
+
+const DAO = require('../dao');
+
+const TOMBSTONE_RETENTION_DAYS = Number(process.env.CATALOG_TOMBSTONE_RETENTION_DAYS) || 30;
+
+const CATALOGS = {
+    products: {
+        table: 'products',
+        entityType: 'product',
+        columns: ['id', 'name', 'pricePerKg', 'type', 'updatedAt']
+    },
+    customers: {
+        table: 'customers',
+        entityType: 'customer',
+        columns: ['id', 'name', 'mobile', 'email', 'address', 'gstin', 'openingBalance', 'currentBalance', 'updatedAt']
+    }
+};
+
+const retentionCutoff = () => new Date(Date.now() - TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60 * 1000);
+
+// A `since` older than the kept tombstones cannot be answered with a delta
+const needsFullSnapshot = (since) => !since || Number(since) / 1000 < retentionCutoff().getTime();
+
+module.exports = {
+    CATALOGS,
+
+    // What a request would return, without reading rows: { version, full }
+    getCatalogState: async (name, since) => {
+        const version = await DAO.catalog.getVersion(CATALOGS[name]);
+        return { version, full: needsFullSnapshot(since) };
+    },
+
+    // { version, full, upserts, deletes } — `full` means replace, not merge
+    getCatalog: async (name, since, state) => {
+        const { version, full } = state || await module.exports.getCatalogState(name, since);
+        const { upserts, deletes } = await DAO.catalog.listChanges(CATALOGS[name], {
+            since: full ? null : since,
+            version
+        });
+        return { version, full, upserts, deletes };
+    },
+
+    purgeTombstones: async () => {
+        return await DAO.catalog.purgeTombstones(retentionCutoff());
+    }
+};
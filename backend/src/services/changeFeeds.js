@@ -0,0 +1,81 @@
+/**
+ * Commit-safe watermarks for delta feeds (catalogue sync, low-stock alerts)
+ *
+ * A feed pages through rows by a change timestamp, but a row becomes visible
+ * when its writer commits, not when it is stamped — a cursor could move past a
+ * row that is still being written and never see it. Each feed table therefore
+ * has a row-level trigger that first takes a shared transaction-level advisory
+ * lock on the table's key and only then stamps the row's change column with
+ * clock_timestamp(), so a stamp is never earlier than the lock.
+ *
+ * horizon() reads who holds those keys: every row stamped before the start of
+ * the oldest holder's transaction (or before now, when nobody holds one) is
+ * committed, and anything stamped later is served by a later poll. Long
+ * transactions that do not write a feed table — reports, backfills — never
+ * hold a feed back.
+ */
+
+const db = require('../models');
+
+// Feed table → the column its trigger stamps
+const FEEDS = {
+    stocks: 'lastUpdated',
+    products: 'updatedAt',
+    customers: 'updatedAt',
+    catalog_tombstones: 'deletedAt'
+};
+
+// Advisory lock keys: (hashtext('change_feed'), hashtext(<table>))
+const LOCK_NAMESPACE = "hashtext('change_feed')";
+
+/**
+ * Install the triggers. Idempotent — run by the migration and again after
+ * sync() on a fresh database.
+ */
+async function install(sequelize = db.sequelize) {
+    await sequelize.query(`
+        CREATE OR REPLACE FUNCTION stamp_feed_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock_shared(${LOCK_NAMESPACE}, hashtext(TG_TABLE_NAME));
+            NEW := jsonb_populate_record(NEW, jsonb_build_object(TG_ARGV[0], clock_timestamp()));
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    `);
+    for (const [table, column] of Object.entries(FEEDS)) {
+        await sequelize.query(`DROP TRIGGER IF EXISTS "${table}_feed_stamp" ON "${table}"`);
+        await sequelize.query(`
+            CREATE TRIGGER "${table}_feed_stamp"
+            BEFORE INSERT OR UPDATE ON "${table}"
+            FOR EACH ROW EXECUTE FUNCTION stamp_feed_change('${column}')
+        `);
+    }
+}
+
+/**
+ * Upper bound for a feed read, as Postgres timestamptz text (microseconds).
+ * Must run as its own statement BEFORE the read: a holder that commits in
+ * between is then visible to the read, and one that locks later stamps after
+ * this bound.
+ * @param {string[]} tables - subset of the FEEDS tables
+ * @returns {Promise<string>}
+ */
+async function horizon(tables) {
+    const [{ at }] = await db.sequelize.query(`
+        SELECT CAST(LEAST(NOW(), MIN(a.xact_start)) AS text) AS at
+        FROM pg_locks l
+        JOIN pg_stat_activity a ON a.pid = l.pid
+        WHERE l.locktype = 'advisory'
+          AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND l.objsubid = 2
+          AND l.classid = CAST(${LOCK_NAMESPACE} AS oid)
+          AND l.objid IN (${tables.map(t => `CAST(hashtext('${t}') AS oid)`).join(', ')})
+    `, { type: db.sequelize.QueryTypes.SELECT });
+    return at;
+}
+
+module.exports = {
+    FEEDS,
+    install,
+    horizon
+};
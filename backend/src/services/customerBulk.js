@@ -0,0 +1,149 @@
+/**
+ * Set-based customer helpers for bulk imports (orders, receipts).
+ *
+ * Replaces the per-record "find customer by mobile/name, else create" and
+ * "read balance, write balance" round-trips with one query each.
+ */
+
+const uuidv4 = require('uuid/v4');
+const db = require('../models');
+
+const nameKey = (name) => String(name || '').trim().toLowerCase();
+const round2 = (n) => Math.round(n * 100) / 100;
+
+/**
+ * Resolve customers for many records in one query (mobile first, then
+ * case-insensitive name), creating missing ones with a single multi-row insert.
+ * Sets record[idField] in place.
+ *
+ * A name match links only records without a mobile. When the name matches
+ * but the mobile does not, record[idField] is left unset and the customer is
+ * reported as a suggestion (as POST /orders returns linkSuggestion) — the
+ * user decides whether it is the same person.
+ *
+ * @param {Array<Object>} records
+ * @param {Object} fields - { nameField, mobileField, idField }
+ * @param {Object} transaction
+ * @returns {Promise<{matched: number, created: number, suggestions: Array}>}
+ *   suggestions: [{ name, mobile, records, linkSuggestion: { customerId, name, mobile } }]
+ */
+async function resolveCustomers(records, { nameField = 'customerName', mobileField = 'customerMobile', idField = 'customerId' } = {}, transaction) {
+    const mobiles = new Set();
+    const names = new Set();
+    for (const record of records) {
+        if (record[mobileField]) mobiles.add(String(record[mobileField]).trim());
+        if (record[nameField]) names.add(nameKey(record[nameField]));
+    }
+    mobiles.delete('');
+    names.delete('');
+    if (mobiles.size === 0 && names.size === 0) return { matched: 0, created: 0, suggestions: [] };
+
+    const { Op, fn, col, where } = db.Sequelize;
+    const clauses = [];
+    if (mobiles.size > 0) clauses.push({ mobile: { [Op.in]: [...mobiles] } });
+    if (names.size > 0) clauses.push(where(fn('LOWER', fn('TRIM', col('name'))), { [Op.in]: [...names] }));
+
+    const existing = await db.customer.findAll({
+        attributes: ['id', 'name', 'mobile'],
+        where: { [Op.or]: clauses },
+        transaction
+    });
+
+    const byId = new Map();
+    const byMobile = new Map();
+    const byName = new Map();
+    for (const c of existing) {
+        byId.set(c.id, c);
+        if (c.mobile && !byMobile.has(c.mobile)) byMobile.set(c.mobile, c.id);
+        const key = nameKey(c.name);
+        if (!byName.has(key)) byName.set(key, c.id);
+    }
+
+    const toCreate = new Map();
+    const suggested = new Map();
+    let matched = 0;
+    for (const record of records) {
+        const mobile = record[mobileField] ? String(record[mobileField]).trim() : '';
+        const key = nameKey(record[nameField]);
+        if (!mobile && !key) continue;
+
+        const existingId = mobile ? byMobile.get(mobile) : byName.get(key);
+        if (existingId) {
+            record[idField] = existingId;
+            matched++;
+            continue;
+        }
+
+        // Same name, different mobile — possibly the same person; don't guess
+        const sameNameId = key && byName.get(key);
+        if (sameNameId) {
+            const suggestKey = `${mobile}|${key}`;
+            let suggestion = suggested.get(suggestKey);
+            if (!suggestion) {
+                const customer = byId.get(sameNameId);
+                suggestion = {
+                    name: String(record[nameField]).trim(),
+                    mobile,
+                    records: 0,
+                    linkSuggestion: { customerId: customer.id, name: customer.name, mobile: customer.mobile }
+                };
+                suggested.set(suggestKey, suggestion);
+            }
+            suggestion.records++;
+            continue;
+        }
+
+        // Same new customer may appear on many records — create once
+        const createKey = mobile ? `m:${mobile}` : `n:${key}`;
+        let pending = toCreate.get(createKey);
+        if (!pending) {
+            pending = {
+                id: uuidv4(),
+                name: key ? String(record[nameField]).trim() : mobile,
+                mobile: mobile || null,
+                openingBalance: 0,
+                currentBalance: 0
+            };
+            toCreate.set(createKey, pending);
+            byId.set(pending.id, pending);
+            if (mobile) byMobile.set(mobile, pending.id);
+            if (key) byName.set(key, pending.id);
+        }
+        record[idField] = pending.id;
+    }
+
+    if (toCreate.size > 0) {
+        await db.customer.bulkCreate([...toCreate.values()], { transaction });
+    }
+
+    return { matched, created: toCreate.size, suggestions: [...suggested.values()] };
+}
+
+/**
+ * Apply balance deltas to many customers in one UPDATE ... FROM (VALUES ...).
+ *
+ * @param {Map<string, number>} deltas - customerId → amount to add (negative to reduce)
+ * @param {Object} transaction
+ * @param {Object} options - { floorAtZero: false } clamps the result at 0, like createPayment
+ */
+async function adjustCustomerBalances(deltas, transaction, { floorAtZero = false } = {}) {
+    if (deltas.size === 0) return;
+
+    const replacements = [];
+    const values = [...deltas.entries()].map(([id, delta]) => {
+        replacements.push(id, round2(delta));
+        return '(?::uuid, ?::double precision)';
+    });
+    const newBalance = 'COALESCE(customers."currentBalance", 0) + v.delta';
+    await db.sequelize.query(
+        `UPDATE customers SET "currentBalance" = ${floorAtZero ? `GREATEST(0, ${newBalance})` : newBalance}, "updatedAt" = NOW()
+         FROM (VALUES ${values.join(', ')}) AS v(id, delta)
+         WHERE customers.id = v.id`,
+        { replacements, transaction }
+    );
+}
+
+module.exports = {
+    resolveCustomers,
+    adjustCustomerBalances
+};
@@ -0,0 +1,517 @@
+/**
+ * Database backups: parallel compressed fulls, WAL incrementals in between
+ *
+ * Layout under BACKUP_DIR (default /app/backups/postgres):
+ *   full_<ts>/dump/      pg_dump --format=directory --jobs=N, one compressed
+ *                        file per table (zstd when pg_dump ≥ 16, else gzip)
+ *   full_<ts>/base/      pg_basebackup tarballs — only when WAL archiving is
+ *                        on; it is what archived WAL can be replayed onto
+ *   incr_<ts>/           manifest only: the WAL segments archived since the
+ *                        previous backup, with their checksums
+ *   wal/                 the WAL archive (archive_command, see walSettings())
+ *   <id>/manifest.json   every file with its size and sha256, LSNs, timings
+ *
+ * A logical dump cannot take WAL on top of it, so point-in-time restore goes
+ * base/ + wal/; dump/ is for a plain restore, a partial restore of some tables
+ * and the restore benchmark (pg_restore --jobs into a scratch database).
+ *
+ * One backup runs at a time: a lock file in BACKUP_DIR guards across workers
+ * and the CLI (scripts/backup.js).
+ */
+
+const fs = require('fs');
+const path = require('path');
+const os = require('os');
+const crypto = require('crypto');
+const { spawn } = require('child_process');
+const moment = require('moment-timezone');
+const db = require('../models');
+
+const BACKUP_DIR = process.env.BACKUP_DIR || '/app/backups/postgres';
+const WAL_DIR = path.join(BACKUP_DIR, 'wal');
+const LOCK_FILE = path.join(BACKUP_DIR, '.backup.lock');
+const JOBS = Number(process.env.BACKUP_JOBS) || Math.min(4, os.cpus().length);
+const RETAIN_FULLS = Number(process.env.BACKUP_RETAIN_FULLS) || 7;
+const FULL_EVERY_DAYS = Number(process.env.BACKUP_FULL_EVERY_DAYS) || 7;
+// 'auto' picks zstd where the client supports it; 'gzip' forces gzip
+const COMPRESSION = process.env.BACKUP_COMPRESSION || 'auto';
+const ARCHIVE_WAIT_MS = Number(process.env.BACKUP_ARCHIVE_WAIT_MS) || 60000;
+const STALE_LOCK_MS = 6 * 60 * 60 * 1000;
+
+const WAL_SEGMENT = /^([0-9A-F]{8})([0-9A-F]{8})([0-9A-F]{8})(\.gz)?$/;
+
+const connection = () => ({
+    database: process.env.DATABASE_NAME || 'customerInvoice',
+    user: process.env.DB_USER || 'postgres',
+    host: process.env.DB_HOST || '127.0.0.1',
+    port: process.env.DB_PORT || '5432',
+    password: process.env.PASSWORD || ''
+});
+
+const connectionArgs = (database) => {
+    const conn = connection();
+    return ['-h', conn.host, '-p', conn.port, '-U', conn.user, ...(database === false ? [] : ['-d', database || conn.database])];
+};
+
+const clientEnv = () => {
+    const env = { ...process.env };
+    if (connection().password) env.PGPASSWORD = connection().password;
+    return env;
+};
+
+const query = (sql, options = {}) => db.sequelize.query(sql, { type: db.sequelize.QueryTypes.SELECT, ...options });
+
+class BackupError extends Error {
+    constructor(message, status = 409) {
+        super(message);
+        this.status = status;
+    }
+}
+
+// Run a client binary to completion; rejects with its stderr
+function exec(bin, args) {
+    return new Promise((resolve, reject) => {
+        const child = spawn(bin, args, { env: clientEnv() });
+        let stdout = '';
+        let stderr = '';
+        child.stdout.on('data', (chunk) => { stdout += chunk.toString(); });
+        child.stderr.on('data', (chunk) => { stderr += chunk.toString(); });
+        child.on('error', reject);
+        child.on('close', (code) => {
+            if (code === 0) resolve(stdout);
+            else reject(new Error(`${bin} exited with ${code}: ${stderr.trim().split('\n').slice(-3).join(' | ')}`));
+        });
+    });
+}
+
+const clientVersions = {};
+
+// Major version of a client binary (pg_dump 16.2 → 16); null when it is not installed
+async function clientMajor(bin) {
+    if (!(bin in clientVersions)) {
+        clientVersions[bin] = exec(bin, ['--version'])
+            .then(out => Number((out.match(/(\d+)(\.\d+)?/) || [])[1]) || null)
+            .catch(() => null);
+    }
+    return clientVersions[bin];
+}
+
+// --compress value for pg_dump: zstd needs pg_dump 16, gzip works everywhere
+async function dumpCompression() {
+    const major = await clientMajor('pg_dump');
+    if (!major) throw new BackupError('pg_dump is not installed on this server', 503);
+    const zstd = COMPRESSION !== 'gzip' && major >= 16;
+    return { major, method: zstd ? 'zstd' : 'gzip', arg: zstd ? 'zstd:3' : (major >= 16 ? 'gzip:6' : '6') };
+}
+
+async function baseBackupCompression() {
+    const major = await clientMajor('pg_basebackup');
+    if (!major) return null;
+    if (major < 15) return { major, method: 'gzip', args: ['-z'] };
+    const method = COMPRESSION !== 'gzip' ? 'zstd' : 'gzip';
+    return { major, method, args: [`--compress=client-${method}`] };
+}
+
+function sha256File(file) {
+    return new Promise((resolve, reject) => {
+        const hash = crypto.createHash('sha256');
+        fs.createReadStream(file)
+            .on('data', chunk => hash.update(chunk))
+            .on('error', reject)
+            .on('end', () => resolve(hash.digest('hex')));
+    });
+}
+
+// Every regular file under `dir`, relative to `root`, in a stable order
+function walk(dir, root = dir) {
+    return fs.readdirSync(dir, { withFileTypes: true })
+        .sort((a, b) => a.name.localeCompare(b.name))
+        .flatMap(entry => {
+            const full = path.join(dir, entry.name);
+            if (entry.isDirectory()) return walk(full, root);
+            return entry.isFile() ? [path.relative(root, full)] : [];
+        });
+}
+
+async function describeFiles(root, relativePaths) {
+    const files = [];
+    for (const rel of relativePaths) {
+        const full = path.join(root, rel);
+        files.push({ path: rel, bytes: fs.statSync(full).size, sha256: await sha256File(full) });
+    }
+    return files;
+}
+
+const backupPath = (id) => path.join(BACKUP_DIR, id);
+const manifestPath = (id) => path.join(backupPath(id), 'manifest.json');
+
+function readManifest(id) {
+    if (!/^(full|incr)_\d{8}T\d{6}$/.test(id) || !fs.existsSync(manifestPath(id))) return null;
+    return JSON.parse(fs.readFileSync(manifestPath(id), 'utf8'));
+}
+
+function writeManifest(manifest) {
+    const file = manifestPath(manifest.id);
+    fs.writeFileSync(`${file}.tmp`, JSON.stringify(manifest, null, 2));
+    fs.renameSync(`${file}.tmp`, file);
+}
+
+// Completed backups, newest first (a directory without a manifest never finished)
+function listBackups() {
+    if (!fs.existsSync(BACKUP_DIR)) return [];
+    return fs.readdirSync(BACKUP_DIR)
+        .map(readManifest)
+        .filter(Boolean)
+        .sort((a, b) => b.id.localeCompare(a.id));
+}
+
+const summary = ({ files, ...manifest }) => ({ ...manifest, fileCount: files.length });
+
+async function withLock(work) {
+    fs.mkdirSync(BACKUP_DIR, { recursive: true });
+    try {
+        if (Date.now() - fs.statSync(LOCK_FILE).mtimeMs > STALE_LOCK_MS) fs.unlinkSync(LOCK_FILE);
+    } catch (err) {
+        if (err.code !== 'ENOENT') throw err;
+    }
+    let fd;
+    try {
+        fd = fs.openSync(LOCK_FILE, 'wx');
+    } catch (err) {
+        if (err.code === 'EEXIST') throw new BackupError('Another backup is already running');
+        throw err;
+    }
+    fs.writeSync(fd, JSON.stringify({ pid: process.pid, startedAt: new Date().toISOString() }));
+    fs.closeSync(fd);
+    try {
+        return await work();
+    } finally {
+        fs.unlinkSync(LOCK_FILE);
+    }
+}
+
+/**
+ * Server-side WAL state: whether archiving is on, and the archive/restore
+ * commands that keep segments gzipped in BACKUP_DIR/wal.
+ */
+async function walSettings() {
+    const [row] = await query(`
+        SELECT current_setting('archive_mode') AS "archiveMode",
+               current_setting('archive_command') AS "archiveCommand",
+               current_setting('wal_level') AS "walLevel",
+               pg_size_bytes(current_setting('wal_segment_size')) AS "segmentBytes"
+    `);
+    return {
+        ...row,
+        segmentBytes: Number(row.segmentBytes),
+        archiving: row.archiveMode !== 'off' && row.walLevel !== 'minimal'
+            && !['', '(disabled)'].includes(row.archiveCommand),
+        recommended: {
+            archive_mode: 'on',
+            archive_command: `test ! -f ${WAL_DIR}/%f.gz && gzip -c %p > ${WAL_DIR}/%f.gz.tmp && mv ${WAL_DIR}/%f.gz.tmp ${WAL_DIR}/%f.gz`,
+            restore_command: `gunzip -c ${WAL_DIR}/%f.gz > %p`
+        }
+    };
+}
+
+async function currentWal() {
+    const [row] = await query(`
+        SELECT pg_current_wal_lsn()::text AS lsn, pg_walfile_name(pg_current_wal_lsn()) AS "walFile",
+               current_setting('server_version') AS "serverVersion"
+    `);
+    return row;
+}
+
+const newId = (type) => `${type}_${moment.utc().format('YYYYMMDD[T]HHmmss')}`;
+
+/**
+ * Full backup: parallel directory-format dump, plus a physical base backup
+ * when WAL archiving is on so the incrementals that follow can replay onto it.
+ */
+async function createFullBackup({ jobs = JOBS } = {}) {
+    return withLock(async () => {
+        const compression = await dumpCompression();
+        const wal = await walSettings();
+        const id = newId('full');
+        const dir = backupPath(id);
+        fs.mkdirSync(dir, { recursive: true });
+        const startedAt = new Date();
+
+        try {
+            const start = await currentWal();
+            const dumpStarted = Date.now();
+            await exec('pg_dump', [
+                ...connectionArgs(), '--format=directory', `--jobs=${jobs}`, `--compress=${compression.arg}`,
+                '--no-owner', '--no-acl', '-f', path.join(dir, 'dump')
+            ]);
+            const dumpMs = Date.now() - dumpStarted;
+
+            let base = null;
+            const baseCompression = wal.archiving ? await baseBackupCompression() : null;
+            if (baseCompression) {
+                const baseStarted = Date.now();
+                await exec('pg_basebackup', [
+                    ...connectionArgs(false), '-D', path.join(dir, 'base'), '--format=tar',
+                    '--wal-method=stream', '--checkpoint=fast', ...baseCompression.args
+                ]);
+                base = { compression: baseCompression.method, durationMs: Date.now() - baseStarted };
+            }
+            const end = await currentWal();
+
+            const files = await describeFiles(dir, walk(dir));
+            const manifest = {
+                id,
+                type: 'full',
+                database: connection().database,
+                serverVersion: start.serverVersion,
+                pgDumpVersion: compression.major,
+                format: 'directory',
+                jobs,
+                compression: compression.method,
+                startedAt: startedAt.toISOString(),
+                finishedAt: new Date().toISOString(),
+                durationMs: Date.now() - startedAt.getTime(),
+                dumpMs,
+                base,
+                startLsn: start.lsn,
+                startWalFile: start.walFile,
+                endLsn: end.lsn,
+                endWalFile: end.walFile,
+                bytes: files.reduce((sum, f) => sum + f.bytes, 0),
+                files,
+                restoreBenchmarks: []
+            };
+            writeManifest(manifest);
+            return summary(manifest);
+        } catch (err) {
+            fs.rmSync(dir, { recursive: true, force: true });
+            throw err;
+        }
+    });
+}
+
+const segmentNumber = (name, segmentBytes) => {
+    const [, , log, seg] = name.match(WAL_SEGMENT);
+    return parseInt(log, 16) * Math.floor(0x100000000 / segmentBytes) + parseInt(seg, 16);
+};
+
+async function waitForArchive(walFile) {
+    const deadline = Date.now() + ARCHIVE_WAIT_MS;
+    for (;;) {
+        const [row] = await query('SELECT last_archived_wal AS "lastArchived", last_failed_wal AS "lastFailed" FROM pg_stat_archiver');
+        if (row.lastArchived && row.lastArchived.slice(0, 24) >= walFile) return;
+        if (Date.now() > deadline) {
+            throw new BackupError(`WAL segment ${walFile} was not archived within ${ARCHIVE_WAIT_MS / 1000}s`
+                + (row.lastFailed ? ` (last failure: ${row.lastFailed})` : ''), 503);
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
+/**
+ * Incremental backup: close the current WAL segment, wait for it to be
+ * archived, and record every segment since the previous backup. Refuses a
+ * gap in the sequence — a missing segment makes everything after it useless.
+ */
+async function createIncrementalBackup() {
+    return withLock(async () => {
+        const wal = await walSettings();
+        if (!wal.archiving) throw new BackupError('WAL archiving is off — run `node scripts/backup.js setup-wal` first');
+
+        const backups = listBackups();
+        const parent = backups.find(b => b.type === 'full' && b.base);
+        if (!parent) throw new BackupError('No full backup with a base backup to build on — take a full backup first');
+        const previous = backups.find(b => b.id === parent.id || b.parentId === parent.id);
+
+        const startedAt = new Date();
+        const [{ walFile }] = await query('SELECT pg_walfile_name(pg_switch_wal()) AS "walFile"');
+        await waitForArchive(walFile);
+
+        // After a full, from the segment it started in; after an incremental, past its last one
+        const after = (name) => (previous.type === 'full' ? name >= previous.startWalFile : name > previous.endWalFile);
+        const segments = (fs.existsSync(WAL_DIR) ? fs.readdirSync(WAL_DIR) : [])
+            .filter(name => WAL_SEGMENT.test(name) && after(name.slice(0, 24)) && name.slice(0, 24) <= walFile)
+            .sort();
+        if (!segments.length || segments[segments.length - 1].slice(0, 24) !== walFile) {
+            throw new BackupError(`Segment ${walFile} was archived, but not into ${WAL_DIR} — check archive_command`);
+        }
+
+        const numbers = segments.map(name => segmentNumber(name, wal.segmentBytes));
+        const gap = numbers.findIndex((n, i) => i > 0 && n !== numbers[i - 1] + 1);
+        if (gap > 0) throw new BackupError(`WAL archive has a gap before ${segments[gap]}`);
+
+        const id = newId('incr');
+        fs.mkdirSync(backupPath(id), { recursive: true });
+        const files = (await describeFiles(WAL_DIR, segments)).map(f => ({ ...f, path: path.join('..', 'wal', f.path) }));
+        const manifest = {
+            id,
+            type: 'incremental',
+            database: connection().database,
+            parentId: parent.id,
+            previousId: previous.id,
+            startedAt: startedAt.toISOString(),
+            finishedAt: new Date().toISOString(),
+            durationMs: Date.now() - startedAt.getTime(),
+            startWalFile: segments[0].slice(0, 24),
+            endWalFile: walFile,
+            segmentBytes: wal.segmentBytes,
+            bytes: files.reduce((sum, f) => sum + f.bytes, 0),
+            files
+        };
+        writeManifest(manifest);
+        return summary(manifest);
+    });
+}
+
+// Full when there is none recent enough (or no WAL to build on), incremental otherwise
+async function createBackup(type = 'auto') {
+    if (type === 'full') return createFullBackup();
+    if (type === 'incremental') return createIncrementalBackup();
+
+    const lastFull = listBackups().find(b => b.type === 'full');
+    const due = !lastFull || !lastFull.base
+        || moment.utc().diff(moment.utc(lastFull.startedAt), 'days', true) >= FULL_EVERY_DAYS;
+    if (due || !(await walSettings()).archiving) return createFullBackup();
+    return createIncrementalBackup();
+}
+
+/**
+ * Re-hash every file against the manifest. Fulls also get a pg_restore
+ * --list of the dump's table of contents; incrementals check their chain
+ * back to the full they replay onto.
+ */
+async function verifyBackup(id) {
+    const manifest = readManifest(id);
+    if (!manifest) throw new BackupError(`Backup ${id} not found`, 404);
+
+    const dir = backupPath(id);
+    const problems = [];
+    for (const file of manifest.files) {
+        const full = path.join(dir, file.path);
+        if (!fs.existsSync(full)) {
+            problems.push(`${file.path} is missing`);
+        } else if (await sha256File(full) !== file.sha256) {
+            problems.push(`${file.path} checksum mismatch`);
+        }
+    }
+
+    if (manifest.type === 'full') {
+        try {
+            const toc = await exec('pg_restore', ['--list', path.join(dir, 'dump')]);
+            if (!/TABLE DATA/.test(toc)) problems.push('dump has no table data');
+        } catch (err) {
+            problems.push(`pg_restore --list failed: ${err.message}`);
+        }
+    } else {
+        for (let link = manifest; link.type === 'incremental';) {
+            const previous = readManifest(link.previousId);
+            if (!previous) {
+                problems.push(`chain broken: ${link.previousId} is missing`);
+                break;
+            }
+            link = previous;
+        }
+    }
+
+    return { id, type: manifest.type, ok: problems.length === 0, filesChecked: manifest.files.length, problems };
+}
+
+/**
+ * Restore a full backup's dump into a scratch database with pg_restore
+ * --jobs and time it. The result is kept in the manifest so restore time can
+ * be tracked as the data grows.
+ */
+async function benchmarkRestore(id, { jobs = JOBS } = {}) {
+    const manifest = readManifest(id);
+    if (!manifest) throw new BackupError(`Backup ${id} not found`, 404);
+    if (manifest.type !== 'full') throw new BackupError('Only a full backup can be restored on its own', 400);
+
+    const scratch = `restore_bench_${Date.now()}`;
+    await db.sequelize.query(`CREATE DATABASE "${scratch}"`);
+    try {
+        const started = Date.now();
+        await exec('pg_restore', [
+            ...connectionArgs(scratch), `--jobs=${jobs}`, '--no-owner', '--no-acl', '--exit-on-error',
+            path.join(backupPath(id), 'dump')
+        ]);
+        const durationMs = Date.now() - started;
+        const [{ bytes }] = await query('SELECT pg_database_size(:scratch) AS bytes', { replacements: { scratch } });
+
+        const dumpBytes = manifest.files.filter(f => f.path.startsWith('dump')).reduce((sum, f) => sum + f.bytes, 0);
+        const result = {
+            ranAt: new Date().toISOString(),
+            jobs,
+            durationMs,
+            dumpBytes,
+            restoredBytes: Number(bytes),
+            restoredMBps: Number((Number(bytes) / 1048576 / Math.max(durationMs / 1000, 0.001)).toFixed(2))
+        };
+        writeManifest({ ...manifest, restoreBenchmarks: [...(manifest.restoreBenchmarks || []), result] });
+        return { id, ...result };
+    } finally {
+        await db.sequelize.query(`DROP DATABASE IF EXISTS "${scratch}"`);
+    }
+}
+
+/**
+ * Keep the newest RETAIN_FULLS fulls and the incrementals built on them;
+ * archived WAL older than the oldest kept base backup goes too.
+ */
+async function prune() {
+    return withLock(async () => {
+        const backups = listBackups();
+        const kept = backups.filter(b => b.type === 'full').slice(0, RETAIN_FULLS);
+        const keptIds = new Set(kept.map(b => b.id));
+        const removed = backups
+            .filter(b => !keptIds.has(b.type === 'full' ? b.id : b.parentId))
+            .map(b => b.id);
+        removed.forEach(id => fs.rmSync(backupPath(id), { recursive: true, force: true }));
+
+        let walRemoved = 0;
+        const oldestBase = kept.filter(b => b.base).pop();
+        if (oldestBase && fs.existsSync(WAL_DIR)) {
+            fs.readdirSync(WAL_DIR)
+                .filter(name => WAL_SEGMENT.test(name) && name.slice(0, 24) < oldestBase.startWalFile)
+                .forEach(name => {
+                    fs.unlinkSync(path.join(WAL_DIR, name));
+                    walRemoved++;
+                });
+        }
+        return { kept: kept.map(b => b.id), removed, walSegmentsRemoved: walRemoved };
+    });
+}
+
+// Stored backup as an uncompressed tar stream (its files are compressed already),
+// laid out as under BACKUP_DIR. An incremental's WAL segments live in wal/, outside
+// its directory, and go in as wal/<segment> so its manifest paths still resolve.
+function tarStream(id) {
+    const manifest = readManifest(id);
+    if (!manifest) throw new BackupError(`Backup ${id} not found`, 404);
+    const outside = manifest.files
+        .map(f => path.normalize(path.join(id, f.path)))
+        .filter(file => !file.startsWith(`${id}${path.sep}`));
+    const missing = outside.filter(file => !fs.existsSync(path.join(BACKUP_DIR, file)));
+    if (missing.length) {
+        throw new BackupError(`Backup ${id} is incomplete — ${missing.length} WAL segment(s) missing, first ${missing[0]}`);
+    }
+    return spawn('tar', ['-C', BACKUP_DIR, '-cf', '-', id, ...outside]);
+}
+
+module.exports = {
+    BACKUP_DIR,
+    WAL_DIR,
+    JOBS,
+    BackupError,
+    connectionArgs,
+    clientEnv,
+    dumpCompression,
+    walSettings,
+    listBackups: () => listBackups().map(summary),
+    createFullBackup,
+    createIncrementalBackup,
+    createBackup,
+    verifyBackup,
+    benchmarkRestore,
+    prune,
+    tarStream
+};
@@ -0,0 +1,489 @@
+/**
+ * Financial-year close and archive partitions
+ *
+ * The books run April to March, the years invoice numbers use ('2024-25').
+ * Closing a year, in one transaction:
+ *   1. carries every balance forward as one OPENING journal batch dated the
+ *      first day of the next year: asset, liability and equity accounts keep
+ *      their balance, income and expense net into Retained Earnings (3200)
+ *   2. records, per party, what the invoices and receipts about to be
+ *      archived add up to (party_carry_forwards), so balances computed from
+ *      orders and payments do not change
+ *   3. moves rows out of the hot tables into <table>_history, list-partitioned
+ *      by the close that archived them (<table>_fy2024 holds 2024-25):
+ *        journal_batches, ledger_entries   everything dated in or before the year
+ *        orders, orderItems                settled or deleted invoices
+ *        payments, receipt_allocations     receipts fully allocated to archived
+ *                                          invoices, deleted receipts, supplier
+ *                                          payments
+ *      Open invoices, and receipts with credit still to allocate, stay hot
+ *      until a later close finds them settled. Orders and payments belong to
+ *      the year of their "createdAt" — the date their journal batch carries.
+ *
+ * Afterwards the hot tables hold the current year plus whatever is still
+ * open, and a trigger refuses journal batches dated in a closed year.
+ * <table>_all views (hot UNION ALL history) serve statements and as-of
+ * reports reaching back into closed years; ledger readers on those views skip
+ * the carried-forward OPENING batches, since the history they read replaces them.
+ *
+ * Years close oldest first, once they have ended. closeYear(label, { dryRun })
+ * runs the whole close and rolls it back, as a preview.
+ */
+
+const moment = require('moment-timezone');
+const { v4: uuidv4 } = require('uuid');
+const db = require('../models');
+const LedgerService = require('./ledgerService');
+const { getFinancialYear } = require('./invoiceSequence');
+
+const ledgerService = new LedgerService(db);
+
+const LOCK_KEY = 7302261049;
+const RETAINED_EARNINGS_CODE = '3200';
+
+// Moved in this order: child rows leave before the rows they reference
+const HISTORY_TABLES = {
+    orderItems: { indexes: [['orderId']] },
+    orders: { indexes: [['id'], ['customerId'], ['customerMobile']] },
+    receipt_allocations: { indexes: [['paymentId'], ['orderId']] },
+    payments: { indexes: [['id'], ['partyId']] },
+    ledger_entries: { indexes: [['batchId'], ['accountId']] },
+    journal_batches: { indexes: [['id'], ['referenceType', 'referenceId'], ['transactionDate']] }
+};
+
+// Sales tables of the open years, and of every year (see salesScope)
+const HOT_SALES = {
+    orders: 'orders', orderItems: '"orderItems"', payments: 'payments', allocations: 'receipt_allocations', archived: false
+};
+const FULL_SALES = {
+    orders: 'orders_all', orderItems: '"orderItems_all"', payments: 'payments_all', allocations: 'receipt_allocations_all', archived: true
+};
+
+const LABEL = /^(\d{4})-(\d{2})$/;
+
+const query = (sql, options = {}) => db.sequelize.query(sql, { type: db.sequelize.QueryTypes.SELECT, ...options });
+const run = (sql, options = {}) => db.sequelize.query(sql, options);
+
+/**
+ * Dates of a year label; null when the label is not a financial year.
+ * @returns {Object|null} { label, startYear, startDate, endDate, nextStart }
+ */
+function yearBounds(label) {
+    const match = LABEL.exec(label || '');
+    if (!match) return null;
+    const startYear = Number(match[1]);
+    if ((startYear + 1) % 100 !== Number(match[2])) return null;
+    const start = moment.utc({ year: startYear, month: 3, date: 1 });
+    return {
+        label,
+        startYear,
+        startDate: start.format('YYYY-MM-DD'),
+        endDate: start.clone().add(1, 'year').subtract(1, 'day').format('YYYY-MM-DD'),
+        nextStart: start.clone().add(1, 'year').format('YYYY-MM-DD')
+    };
+}
+
+// Year label of a 'YYYY-MM-DD' day
+const labelOf = (day) => {
+    const date = moment.utc(day, 'YYYY-MM-DD');
+    const startYear = date.month() < 3 ? date.year() - 1 : date.year();
+    return `${startYear}-${String(startYear + 1).slice(-2)}`;
+};
+
+const nextLabel = (label) => {
+    const { startYear } = yearBounds(label);
+    return `${startYear + 1}-${String(startYear + 2).slice(-2)}`;
+};
+
+async function columnsOf(table, transaction = null) {
+    const rows = await query(`
+        SELECT attname AS name FROM pg_attribute
+        WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    `, { replacements: { table: `"${table}"` }, transaction });
+    return rows.map(r => r.name);
+}
+
+/**
+ * Bring <table>_history and <table>_all up to date with the hot table:
+ * columns added to the hot table since are added to the history table, and
+ * the view is rebuilt over the current column list.
+ */
+async function refreshHistoryTable(table, transaction = null) {
+    const history = `${table}_history`;
+    await run(`
+        CREATE TABLE IF NOT EXISTS "${history}" (LIKE "${table}", "financialYear" VARCHAR(7) NOT NULL)
+        PARTITION BY LIST ("financialYear")
+    `, { transaction });
+    for (const columns of HISTORY_TABLES[table].indexes) {
+        await run(`
+            CREATE INDEX IF NOT EXISTS "${history}_${columns.join('_')}"
+            ON "${history}" (${columns.map(c => `"${c}"`).join(', ')})
+        `, { transaction });
+    }
+
+    const missing = await query(`
+        SELECT a.attname AS name, format_type(a.atttypid, a.atttypmod) AS type
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(:table) AND a.attnum > 0 AND NOT a.attisdropped
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_attribute h
+              WHERE h.attrelid = to_regclass(:history) AND h.attname = a.attname AND NOT h.attisdropped
+          )
+        ORDER BY a.attnum
+    `, { replacements: { table: `"${table}"`, history: `"${history}"` }, transaction });
+    for (const { name, type } of missing) {
+        await run(`ALTER TABLE "${history}" ADD COLUMN "${name}" ${type}`, { transaction });
+    }
+
+    const list = (await columnsOf(table, transaction)).map(c => `"${c}"`).join(', ');
+    await run(`DROP VIEW IF EXISTS "${table}_all"`, { transaction });
+    await run(`
+        CREATE VIEW "${table}_all" AS
+        SELECT ${list}, CAST(NULL AS VARCHAR(7)) AS "financialYear" FROM "${table}"
+        UNION ALL
+        SELECT ${list}, "financialYear" FROM "${history}"
+    `, { transaction });
+}
+
+/**
+ * History tables, _all views and the closed-year posting guard. Idempotent —
+ * run by the migration and after sync() on a fresh database.
+ */
+async function install(sequelize = db.sequelize) {
+    await sequelize.transaction(async (transaction) => {
+        for (const table of Object.keys(HISTORY_TABLES)) {
+            await refreshHistoryTable(table, transaction);
+        }
+        await sequelize.query(`
+            CREATE OR REPLACE FUNCTION reject_closed_year_posting() RETURNS trigger AS $$
+            DECLARE
+                closed VARCHAR(7);
+            BEGIN
+                SELECT label INTO closed FROM financial_years
+                WHERE "endDate" >= NEW."transactionDate"
+                ORDER BY "endDate" LIMIT 1;
+                IF closed IS NOT NULL THEN
+                    RAISE EXCEPTION 'Financial year % is closed — journal batch dated % refused', closed, NEW."transactionDate"
+                        USING ERRCODE = 'check_violation';
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        `, { transaction });
+        await sequelize.query('DROP TRIGGER IF EXISTS journal_batches_closed_year ON journal_batches', { transaction });
+        await sequelize.query(`
+            CREATE TRIGGER journal_batches_closed_year
+            BEFORE INSERT OR UPDATE OF "transactionDate" ON journal_batches
+            FOR EACH ROW EXECUTE FUNCTION reject_closed_year_posting()
+        `, { transaction });
+    });
+}
+
+// Last day of the latest closed year ('YYYY-MM-DD'), or null
+async function closedThrough(transaction = null) {
+    const [row] = await query(`SELECT CAST(MAX("endDate") AS text) AS "closedThrough" FROM financial_years`, { transaction });
+    return row.closedThrough;
+}
+
+/**
+ * Sales tables for a read reaching back to `date` (null = the beginning):
+ * the hot tables, or the _all views once the read reaches a closed year.
+ * Callers that total FULL_SALES rows must not add party_carry_forwards too —
+ * those rows are what the carry-forwards stand in for.
+ */
+async function salesScope(date = null, transaction = null) {
+    const through = await closedThrough(transaction);
+    if (!through) return HOT_SALES;
+    return !date || moment(date).format('YYYY-MM-DD') <= through ? FULL_SALES : HOT_SALES;
+}
+
+/**
+ * The year the next close must be: the year of the earliest hot journal
+ * batch, order or payment dated after the last close. Null when there is
+ * nothing left to close.
+ */
+async function nextToClose(transaction = null) {
+    const through = await closedThrough(transaction);
+    const after = (column) => (through ? `WHERE ${column} >= CAST(:through AS date) + 1` : '');
+    const [{ first }] = await query(`
+        SELECT CAST(LEAST(
+            (SELECT MIN("transactionDate") FROM journal_batches ${after('"transactionDate"')}),
+            (SELECT CAST(MIN("createdAt") AS date) FROM orders ${after('"createdAt"')}),
+            (SELECT CAST(MIN("createdAt") AS date) FROM payments ${after('"createdAt"')})
+        ) AS text) AS first
+    `, { replacements: { through }, transaction });
+    return first ? labelOf(first) : null;
+}
+
+/**
+ * Why `label` cannot be closed now, or null when it can.
+ * @returns {Promise<Object|null>} { status, message }
+ */
+async function closeProblem(label, transaction = null) {
+    const year = yearBounds(label);
+    if (!year) return { status: 400, message: `${label} is not a financial year (expected e.g. 2024-25)` };
+    if (year.endDate >= moment().format('YYYY-MM-DD')) {
+        return { status: 400, message: `Financial year ${label} has not ended yet` };
+    }
+    const closed = await db.financialYear.findOne({ where: { label }, transaction });
+    if (closed) return { status: 409, message: `Financial year ${label} is already closed` };
+    const next = await nextToClose(transaction);
+    if (!next) return { status: 409, message: 'There is no unclosed financial year with data' };
+    if (next !== label) return { status: 409, message: `Close financial year ${next} first` };
+    return null;
+}
+
+// Closed years, the current year and the one to close next
+async function listYears() {
+    const closed = await db.financialYear.findAll({ order: [['startDate', 'ASC']] });
+    return {
+        current: getFinancialYear(),
+        closedThrough: await closedThrough(),
+        nextToClose: await nextToClose(),
+        closed
+    };
+}
+
+/**
+ * Closing balances of every account as of the year end, as the entries of
+ * the OPENING batch: balance-sheet accounts as they stand, income and expense
+ * netted into Retained Earnings.
+ */
+async function openingEntries(year, transaction) {
+    const balances = await query(`
+        SELECT le."accountId", a.type, ROUND(SUM(le.debit) - SUM(le.credit), 2) AS balance
+        FROM ledger_entries le
+        INNER JOIN journal_batches jb ON jb.id = le."batchId"
+        INNER JOIN accounts a ON a.id = le."accountId"
+        WHERE jb."isPosted" = true AND jb."isReversed" = false AND jb."transactionDate" <= :endDate
+        GROUP BY le."accountId", a.type
+        HAVING ROUND(SUM(le.debit) - SUM(le.credit), 2) <> 0
+    `, { replacements: { endDate: year.endDate }, transaction });
+
+    const carried = new Map();
+    let retainedEarnings = 0;
+    for (const row of balances) {
+        const balance = Number(row.balance);
+        if (row.type === 'INCOME' || row.type === 'EXPENSE') {
+            retainedEarnings += balance;
+        } else {
+            carried.set(row.accountId, (carried.get(row.accountId) || 0) + balance);
+        }
+    }
+    retainedEarnings = Math.round(retainedEarnings * 100) / 100;
+    if (retainedEarnings !== 0) {
+        const account = await db.account.findOne({ where: { code: RETAINED_EARNINGS_CODE }, transaction });
+        if (!account) {
+            throw new Error(`Retained Earnings account (${RETAINED_EARNINGS_CODE}) not found. Run chart of accounts initialization first.`);
+        }
+        carried.set(account.id, (carried.get(account.id) || 0) + retainedEarnings);
+    }
+
+    const narration = `Opening balance ${nextLabel(year.label)}`;
+    const entries = [...carried]
+        .map(([accountId, balance]) => [accountId, Math.round(balance * 100) / 100])
+        .filter(([, balance]) => balance !== 0)
+        .map(([accountId, balance]) => ({
+            accountId,
+            debit: balance > 0 ? balance : 0,
+            credit: balance < 0 ? -balance : 0,
+            narration
+        }));
+    // Net profit is a credit to Retained Earnings, a loss a debit
+    return { entries, retainedEarnings: -retainedEarnings };
+}
+
+/**
+ * Orders and payments the close archives, into fy_orders / fy_payments
+ * (dropped at commit). An order and a receipt linked by an allocation are
+ * archived together or not at all, so the loop drops candidates whose
+ * counterpart stays hot until nothing changes.
+ */
+async function selectArchivable(year, transaction) {
+    const replacements = { nextStart: year.nextStart };
+    await run(`
+        CREATE TEMP TABLE fy_orders ON COMMIT DROP AS
+        SELECT id FROM orders
+        WHERE "createdAt" < CAST(:nextStart AS timestamptz)
+          AND (COALESCE("isDeleted", false) = true OR COALESCE("dueAmount", 0) < 0.01)
+    `, { replacements, transaction });
+    await run(`
+        CREATE TEMP TABLE fy_payments ON COMMIT DROP AS
+        SELECT p.id FROM payments p
+        WHERE p."createdAt" < CAST(:nextStart AS timestamptz)
+          AND (p."partyType" <> 'customer'
+               OR COALESCE(p."isDeleted", false) = true
+               OR p.amount - COALESCE((
+                   SELECT SUM(ra.amount) FROM receipt_allocations ra
+                   WHERE ra."paymentId" = p.id AND COALESCE(ra."isDeleted", false) = false
+               ), 0) < 0.01)
+    `, { replacements, transaction });
+    await run('ALTER TABLE fy_orders ADD PRIMARY KEY (id)', { transaction });
+    await run('ALTER TABLE fy_payments ADD PRIMARY KEY (id)', { transaction });
+
+    for (;;) {
+        const [, orders] = await run(`
+            DELETE FROM fy_orders f USING receipt_allocations ra
+            WHERE ra."orderId" = f.id AND NOT EXISTS (SELECT 1 FROM fy_payments p WHERE p.id = ra."paymentId")
+        `, { transaction });
+        const [, payments] = await run(`
+            DELETE FROM fy_payments f USING receipt_allocations ra
+            WHERE ra."paymentId" = f.id AND NOT EXISTS (SELECT 1 FROM fy_orders o WHERE o.id = ra."orderId")
+        `, { transaction });
+        if (orders.rowCount === 0 && payments.rowCount === 0) break;
+    }
+}
+
+// Per-party totals of the selected orders and payments, filtered the way
+// listCustomersWithBalance and listSuppliersWithBalance filter them
+async function recordCarryForwards(year, transaction) {
+    const replacements = { label: year.label };
+    const [, sales] = await run(`
+        INSERT INTO party_carry_forwards
+            (id, "financialYear", "partyType", "partyId", "partyName", sales, paid, due, received, "createdAt", "updatedAt")
+        SELECT gen_random_uuid(), :label, 'customer', o."customerId", MAX(o."customerName"),
+            ROUND(CAST(SUM(o.total) AS numeric), 2), ROUND(CAST(SUM(o."paidAmount") AS numeric), 2),
+            ROUND(CAST(SUM(o."dueAmount") AS numeric), 2), 0, NOW(), NOW()
+        FROM orders o
+        INNER JOIN fy_orders f ON f.id = o.id
+        WHERE o."isDeleted" = false
+        GROUP BY o."customerId", CASE WHEN o."customerId" IS NULL THEN o."customerName" END
+    `, { replacements, transaction });
+    const [, receipts] = await run(`
+        INSERT INTO party_carry_forwards
+            (id, "financialYear", "partyType", "partyId", "partyName", sales, paid, due, received, "createdAt", "updatedAt")
+        SELECT gen_random_uuid(), :label, p."partyType", p."partyId", MAX(p."partyName"),
+            0, 0, 0, ROUND(CAST(SUM(p.amount) AS numeric), 2), NOW(), NOW()
+        FROM payments p
+        INNER JOIN fy_payments f ON f.id = p.id
+        WHERE (p."partyType" = 'customer' AND p."isDeleted" = false
+               AND (p."paymentNumber" IS NULL OR p."paymentNumber" NOT LIKE 'PAY-TOGGLE-%'))
+           OR (p."partyType" = 'supplier' AND COALESCE(p."isDeleted", false) = false AND p."referenceType" != 'purchase')
+        GROUP BY p."partyType", p."partyId", CASE WHEN p."partyId" IS NULL THEN p."partyName" END
+    `, { replacements, transaction });
+    return sales.rowCount + receipts.rowCount;
+}
+
+// Move the rows matching `condition` (alias t) into the year's history partition
+async function archiveRows(table, condition, year, transaction, replacements = {}) {
+    const list = (await columnsOf(table, transaction)).map(c => `"${c}"`).join(', ');
+    const [, result] = await run(`
+        WITH moved AS (DELETE FROM "${table}" t WHERE ${condition} RETURNING t.*)
+        INSERT INTO "${table}_history" (${list}, "financialYear")
+        SELECT ${list}, :label FROM moved
+    `, { replacements: { ...replacements, label: year.label }, transaction });
+    return result.rowCount;
+}
+
+/**
+ * Close a financial year: carry balances forward, record party totals and
+ * move its rows into the archive partitions (see the header).
+ * @param {string} label - '2024-25'
+ * @param {Object} options - { dryRun, userId }; dryRun rolls everything back
+ * @returns {Promise<Object>} what was (or would be) posted and archived
+ */
+async function closeYear(label, { dryRun = false, userId = null } = {}) {
+    const transaction = await db.sequelize.transaction();
+    try {
+        await run('SELECT pg_advisory_xact_lock(:key)', { replacements: { key: LOCK_KEY }, transaction });
+        const problem = await closeProblem(label, transaction);
+        if (problem) throw new Error(problem.message);
+        const year = yearBounds(label);
+        const yearId = uuidv4();
+
+        for (const table of Object.keys(HISTORY_TABLES)) {
+            await refreshHistoryTable(table, transaction);
+            await run(`
+                CREATE TABLE IF NOT EXISTS "${table}_fy${year.startYear}" PARTITION OF "${table}_history"
+                FOR VALUES IN ('${year.label}')
+            `, { transaction });
+        }
+
+        const { entries, retainedEarnings } = await openingEntries(year, transaction);
+        let openingBatch = null;
+        if (entries.length > 0) {
+            const { batches } = await ledgerService.createJournalBatches([{
+                referenceType: 'OPENING',
+                referenceId: yearId,
+                description: `Opening balances ${nextLabel(label)} — carried forward from ${label}`,
+                transactionDate: year.nextStart,
+                createdBy: userId,
+                entries
+            }], transaction);
+            openingBatch = batches[0];
+        }
+
+        await selectArchivable(year, transaction);
+        const partyCarryForwards = await recordCarryForwards(year, transaction);
+
+        const archived = {};
+        archived.orderItems = await archiveRows('orderItems', 't."orderId" IN (SELECT id FROM fy_orders)', year, transaction);
+        archived.orders = await archiveRows('orders', 't.id IN (SELECT id FROM fy_orders)', year, transaction);
+        archived.receipt_allocations = await archiveRows('receipt_allocations', 't."paymentId" IN (SELECT id FROM fy_payments)', year, transaction);
+        archived.payments = await archiveRows('payments', 't.id IN (SELECT id FROM fy_payments)', year, transaction);
+        const dated = { endDate: year.endDate };
+        archived.ledger_entries = await archiveRows('ledger_entries',
+            't."batchId" IN (SELECT id FROM journal_batches WHERE "transactionDate" <= :endDate)', year, transaction, dated);
+        archived.journal_batches = await archiveRows('journal_batches', 't."transactionDate" <= :endDate', year, transaction, dated);
+
+        const [keptOpen] = await query(`
+            SELECT
+                (SELECT COUNT(*) FROM orders WHERE "createdAt" < CAST(:nextStart AS timestamptz))::int AS orders,
+                (SELECT COUNT(*) FROM payments WHERE "createdAt" < CAST(:nextStart AS timestamptz))::int AS payments
+        `, { replacements: { nextStart: year.nextStart }, transaction });
+
+        const summary = {
+            archived,
+            keptOpen,
+            partyCarryForwards,
+            retainedEarnings,
+            openingAccounts: entries.length,
+            openingTotal: Math.round(entries.reduce((sum, e) => sum + e.debit, 0) * 100) / 100
+        };
+        await db.financialYear.create({
+            id: yearId,
+            label,
+            startDate: year.startDate,
+            endDate: year.endDate,
+            openingBatchId: openingBatch ? openingBatch.id : null,
+            closedAt: new Date(),
+            closedBy: userId,
+            summary
+        }, { transaction });
+
+        if (dryRun) {
+            await transaction.rollback();
+        } else {
+            await transaction.commit();
+            console.log(`[FY CLOSE] ${label} closed: ${JSON.stringify(archived)}`);
+        }
+        return {
+            financialYear: label,
+            startDate: year.startDate,
+            endDate: year.endDate,
+            dryRun,
+            openingBatch: openingBatch && {
+                id: openingBatch.id,
+                batchNumber: openingBatch.batchNumber,
+                transactionDate: year.nextStart
+            },
+            ...summary
+        };
+    } catch (error) {
+        if (!transaction.finished) await transaction.rollback();
+        throw error;
+    }
+}
+
+module.exports = {
+    HISTORY_TABLES,
+    yearBounds,
+    install,
+    closedThrough,
+    salesScope,
+    nextToClose,
+    closeProblem,
+    listYears,
+    closeYear
+};
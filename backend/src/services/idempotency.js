@@ -0,0 +1,103 @@
+/**
+ * Idempotency Keys for POS writes
+ *
+ * A client that may retry a write (the POS on a flaky network) sends an
+ * `Idempotency-Key` header; middleware/idempotency.js uses this service to
+ * run the write once and answer every retry with the stored response.
+ *
+ * Rows are keyed by a hash of user + route + client key, so a retry is one
+ * primary-key lookup. A row is `processing` while the first request runs and
+ * `completed` once its 2xx response is stored — inside the write's own
+ * transaction where the controller supports it. Failed requests release the
+ * key so a corrected retry can go through. Rows expire after
+ * IDEMPOTENCY_TTL_HOURS and are purged hourly by the scheduler.
+ */
+
+const crypto = require('crypto');
+const db = require('../models');
+
+const TTL_HOURS = Number(process.env.IDEMPOTENCY_TTL_HOURS) || 24;
+// A `processing` row older than this belongs to a request that died — let a retry take it over
+const LOCK_TIMEOUT_SECONDS = Number(process.env.IDEMPOTENCY_LOCK_SECONDS) || 120;
+
+const sha256 = (value) => crypto.createHash('sha256').update(value).digest('hex');
+
+const keyId = ({ userId, method, route, key }) => sha256(`${userId || 'anonymous'}|${method} ${route}|${key}`);
+
+const requestHash = (body) => sha256(JSON.stringify(body === undefined ? null : body));
+
+/**
+ * Stored entry for `id`, or null when absent or expired.
+ */
+async function find(id) {
+    const entry = await db.idempotencyKey.findByPk(id, { raw: true });
+    if (!entry || new Date(entry.expiresAt) <= new Date()) return null;
+    return entry;
+}
+
+/**
+ * Claim `id` for a new request. Succeeds when the key is new, expired, or
+ * held by a request that stopped responding.
+ * @returns {boolean} false when another request holds the key
+ */
+async function reserve({ id, key, userId, method, route, requestHash: hash }) {
+    const [rows] = await db.sequelize.query(`
+        INSERT INTO idempotency_keys (id, key, "userId", method, route, "requestHash", status, "expiresAt", "createdAt", "updatedAt")
+        VALUES (:id, :key, :userId, :method, :route, :hash, 'processing', NOW() + make_interval(hours => :ttl), NOW(), NOW())
+        ON CONFLICT (id) DO UPDATE SET
+            "requestHash" = EXCLUDED."requestHash",
+            status = 'processing',
+            "responseStatus" = NULL,
+            "responseBody" = NULL,
+            "expiresAt" = EXCLUDED."expiresAt",
+            "createdAt" = NOW(),
+            "updatedAt" = NOW()
+        WHERE idempotency_keys."expiresAt" <= NOW()
+           OR (idempotency_keys.status = 'processing'
+               AND idempotency_keys."updatedAt" < NOW() - make_interval(secs => :lockSeconds))
+        RETURNING id
+    `, {
+        replacements: { id, key, userId: userId || null, method, route, hash, ttl: TTL_HOURS, lockSeconds: LOCK_TIMEOUT_SECONDS }
+    });
+    return rows.length > 0;
+}
+
+/**
+ * Store the response that retries will be answered with. Pass the write's
+ * transaction so the key is completed exactly when the write commits.
+ */
+async function complete(id, status, body, transaction = null) {
+    await db.sequelize.query(`
+        UPDATE idempotency_keys
+        SET status = 'completed', "responseStatus" = :status, "responseBody" = CAST(:body AS JSONB), "updatedAt" = NOW()
+        WHERE id = :id
+    `, { replacements: { id, status, body: JSON.stringify(body === undefined ? null : body) }, transaction });
+}
+
+/**
+ * Drop a `processing` claim so the request can be retried.
+ */
+async function release(id) {
+    await db.sequelize.query(
+        "DELETE FROM idempotency_keys WHERE id = :id AND status = 'processing'",
+        { replacements: { id } }
+    );
+}
+
+/**
+ * Delete expired keys.
+ * @returns {number} rows removed
+ */
+async function purgeExpired() {
+    return db.idempotencyKey.destroy({ where: { expiresAt: { [db.Sequelize.Op.lte]: new Date() } } });
+}
+
+module.exports = {
+    keyId,
+    requestHash,
+    find,
+    reserve,
+    complete,
+    release,
+    purgeExpired
+};
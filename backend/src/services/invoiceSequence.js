@@ -105,6 +105,50 @@ module.exports = {
         };
     },
 
+    // Reserve a contiguous block of `count` invoice numbers in one locked update
+    // (used by bulk imports instead of calling generateInvoiceNumber per bill)
+    allocateInvoiceBlock: async (count, transaction) => {
+        const today = moment().format('YYYY-MM-DD');
+        const currentFY = getFinancialYear();
+
+        let sequence = await db.invoiceSequence.findOne({ transaction, lock: transaction.LOCK.UPDATE });
+
+        if (!sequence) {
+            sequence = await db.invoiceSequence.create({
+                id: uuidv4(),
+                prefix: 'INV',
+                currentNumber: 0,
+                dailyNumber: 0,
+                lastDate: today,
+                lastFinancialYear: currentFY
+            }, { transaction });
+        }
+
+        const lastFY = sequence.lastFinancialYear || getFinancialYear(sequence.lastDate || today);
+        const firstNumber = lastFY !== currentFY ? 1 : sequence.currentNumber + 1;
+        const lastNumber = firstNumber + count - 1;
+        const dailyStart = sequence.lastDate !== today ? 0 : sequence.dailyNumber;
+
+        await sequence.update({
+            currentNumber: lastNumber,
+            dailyNumber: dailyStart + count,
+            lastDate: today,
+            lastFinancialYear: currentFY
+        }, { transaction });
+
+        const invoiceNumbers = [];
+        for (let n = firstNumber; n <= lastNumber; n++) {
+            invoiceNumbers.push(`${sequence.prefix}/${currentFY}/${String(n).padStart(4, '0')}`);
+        }
+
+        return {
+            invoiceNumbers,
+            firstNumber,
+            lastNumber,
+            financialYear: currentFY
+        };
+    },
+
     // Get current sequence info
     getSequenceInfo: async () => {
         const sequence = await db.invoiceSequence.findOne();
@@ -1,5 +1,61 @@
 const { v4: uuidv4 } = require('uuid');
 
+// Ledger tables of the open years (see services/financialYears.js)
+const HOT_LEDGER = { entries: 'ledger_entries', batches: 'journal_batches', skipCarriedForward: '' };
+// Every year, closed ones included — without the OPENING batches that carried
+// balances across each close, which the closed years' own rows replace
+const FULL_LEDGER = {
+    entries: 'ledger_entries_all',
+    batches: 'journal_batches_all',
+    skipCarriedForward: 'AND le."batchId" NOT IN (SELECT "openingBatchId" FROM financial_years WHERE "openingBatchId" IS NOT NULL)'
+};
+
+/**
+ * Validate journal entries and return their totals.
+ * Throws if the batch is empty, has negative/NaN values or is unbalanced.
+ */
+function computeBatchTotals(entries) {
+    // Validate: prevent empty batches
+    if (!entries || !Array.isArray(entries) || entries.length === 0) {
+        throw new Error('Journal batch cannot be empty');
+    }
+
+    // Validate: minimum 2 entries for double-entry
+    if (entries.length < 2) {
+        throw new Error('Journal batch must have at least 2 entries');
+    }
+
+    // Calculate totals with strict validation
+    let totalDebit = 0;
+    let totalCredit = 0;
+    for (const entry of entries) {
+        const debit = Number(entry.debit);
+        const credit = Number(entry.credit);
+
+        if (isNaN(debit) || isNaN(credit)) {
+            throw new Error('Debit and credit values must be valid numbers');
+        }
+        if (debit < 0 || credit < 0) {
+            throw new Error('Debit and credit values cannot be negative');
+        }
+        totalDebit += debit;
+        totalCredit += credit;
+    }
+
+    // Validate: batch must have actual monetary movement
+    if (totalDebit === 0 && totalCredit === 0) {
+        throw new Error('Journal batch has no monetary values');
+    }
+
+    // Check if balanced (SUM(debit) must equal SUM(credit))
+    const isBalanced = Math.abs(totalDebit - totalCredit) < 0.01;
+    if (!isBalanced) {
+        throw new Error(`Journal batch is not balanced. Debit: ${totalDebit.toFixed(2)}, Credit: ${totalCredit.toFixed(2)}, Difference: ${Math.abs(totalDebit - totalCredit).toFixed(2)}`);
+    }
+
+    return { totalDebit, totalCredit };
+}
+
 class LedgerService {
     constructor(db) {
         this.db = db;
@@ -132,6 +188,61 @@ class LedgerService {
         return account;
     }
 
+    /**
+     * Batch variant of getOrCreateCustomerAccount: one lookup for all parties,
+     * one multi-row insert for the missing ones.
+     * @param {Array} parties - [{ id, name }]
+     * @returns {Promise<Map>} customerId → account
+     */
+    async getOrCreateCustomerAccounts(parties, transaction = null) {
+        const db = this.db;
+        const names = new Map();
+        for (const p of parties) {
+            if (p.id && !names.has(p.id)) names.set(p.id, p.name);
+        }
+        const ids = [...names.keys()];
+        const accounts = new Map();
+        if (ids.length === 0) return accounts;
+
+        const existing = await db.account.findAll({
+            where: { partyId: ids, partyType: 'customer' },
+            transaction
+        });
+        for (const account of existing) accounts.set(account.partyId, account);
+
+        const missing = ids.filter(id => !accounts.has(id));
+        if (missing.length === 0) return accounts;
+
+        const arAccount = await db.account.findOne({
+            where: { code: '1300' },
+            transaction
+        });
+        const lastCustomerAccount = await db.account.findOne({
+            where: {
+                partyType: 'customer',
+                code: { [db.Sequelize.Op.like]: '1300-%' }
+            },
+            order: [['code', 'DESC']],
+            transaction
+        });
+        let lastNum = lastCustomerAccount ? (parseInt(lastCustomerAccount.code.split('-')[1]) || 0) : 0;
+
+        const created = await db.account.bulkCreate(missing.map(id => ({
+            id: uuidv4(),
+            code: `1300-${String(++lastNum).padStart(3, '0')}`,
+            name: names.get(id) || 'Walk-in Customer',
+            type: 'ASSET',
+            subType: 'RECEIVABLE',
+            parentId: arAccount?.id,
+            partyId: id,
+            partyType: 'customer',
+            isSystemAccount: false
+        })), { transaction });
+        for (const account of created) accounts.set(account.partyId, account);
+
+        return accounts;
+    }
+
     /**
      * Create or get supplier account (sub-account under Accounts Payable)
      */
@@ -234,43 +345,7 @@ class LedgerService {
         }
 
         try {
-            // Validate: prevent empty batches
-            if (!batchData.entries || !Array.isArray(batchData.entries) || batchData.entries.length === 0) {
-                throw new Error('Journal batch cannot be empty');
-            }
-
-            // Validate: minimum 2 entries for double-entry
-            if (batchData.entries.length < 2) {
-                throw new Error('Journal batch must have at least 2 entries');
-            }
-
-            // Calculate totals with strict validation
-            let totalDebit = 0;
-            let totalCredit = 0;
-            for (const entry of batchData.entries) {
-                const debit = Number(entry.debit);
-                const credit = Number(entry.credit);
-
-                if (isNaN(debit) || isNaN(credit)) {
-                    throw new Error('Debit and credit values must be valid numbers');
-                }
-                if (debit < 0 || credit < 0) {
-                    throw new Error('Debit and credit values cannot be negative');
-                }
-                totalDebit += debit;
-                totalCredit += credit;
-            }
-
-            // Validate: batch must have actual monetary movement
-            if (totalDebit === 0 && totalCredit === 0) {
-                throw new Error('Journal batch has no monetary values');
-            }
-
-            // Check if balanced (SUM(debit) must equal SUM(credit))
-            const isBalanced = Math.abs(totalDebit - totalCredit) < 0.01;
-            if (!isBalanced) {
-                throw new Error(`Journal batch is not balanced. Debit: ${totalDebit.toFixed(2)}, Credit: ${totalCredit.toFixed(2)}, Difference: ${Math.abs(totalDebit - totalCredit).toFixed(2)}`);
-            }
+            const { totalDebit, totalCredit } = computeBatchTotals(batchData.entries);
 
             // Create batch
             const batchNumber = await this.generateBatchNumber(batchData.referenceType);
@@ -313,6 +388,60 @@ class LedgerService {
         }
     }
 
+    /**
+     * Create many journal batches with multi-row inserts (bulk imports).
+     * Same validation as createJournalBatch; must run inside a transaction.
+     * @param {Array} batchDataList - [{ referenceType, referenceId, description, transactionDate, entries }]
+     */
+    async createJournalBatches(batchDataList, transaction) {
+        const db = this.db;
+        const batchRows = [];
+        const entryRows = [];
+        const usedNumbers = new Set();
+
+        for (const batchData of batchDataList) {
+            const { totalDebit, totalCredit } = computeBatchTotals(batchData.entries);
+
+            let batchNumber = await this.generateBatchNumber(batchData.referenceType);
+            while (usedNumbers.has(batchNumber)) {
+                batchNumber = await this.generateBatchNumber(batchData.referenceType);
+            }
+            usedNumbers.add(batchNumber);
+
+            const batchId = uuidv4();
+            batchRows.push({
+                id: batchId,
+                batchNumber,
+                referenceType: batchData.referenceType,
+                referenceId: batchData.referenceId || null,
+                description: batchData.description || null,
+                transactionDate: batchData.transactionDate || new Date(),
+                totalDebit,
+                totalCredit,
+                isBalanced: true,
+                isPosted: true,
+                createdBy: batchData.createdBy || null
+            });
+            for (const entry of batchData.entries) {
+                entryRows.push({
+                    id: uuidv4(),
+                    batchId,
+                    accountId: entry.accountId,
+                    debit: Number(entry.debit) || 0,
+                    credit: Number(entry.credit) || 0,
+                    narration: entry.narration || null
+                });
+            }
+        }
+
+        if (batchRows.length === 0) return { batches: [], entryCount: 0 };
+
+        const batches = await db.journalBatch.bulkCreate(batchRows, { transaction });
+        await db.ledgerEntry.bulkCreate(entryRows, { transaction });
+
+        return { batches, entryCount: entryRows.length };
+    }
+
     /**
      * Reverse a journal batch
      */
@@ -403,10 +532,17 @@ class LedgerService {
      * Lightweight read-only drift detection.
      * Compares old system vs ledger for every customer + system totals.
      * Designed to run daily to catch real-time posting failures early.
+     * System totals cover the open years only: closed years were reconciled
+     * when they closed and their rows are archived.
      */
     async dailyDriftCheck() {
         const db = this.db;
         const timestamp = new Date().toISOString();
+        const [{ openFrom }] = await db.sequelize.query(`
+            SELECT CAST(MAX("endDate") + 1 AS text) AS "openFrom" FROM financial_years
+        `, { type: db.Sequelize.QueryTypes.SELECT });
+        const openYears = openFrom ? 'AND "createdAt" >= CAST(:openFrom AS date)' : '';
+        const carriedForward = 'AND le."batchId" NOT IN (SELECT "openingBatchId" FROM financial_years WHERE "openingBatchId" IS NOT NULL)';
 
         // ── 1. Per-customer: old SUM(dueAmount) vs ledger receivable ──
         const customerDrift = await db.sequelize.query(`
@@ -448,29 +584,29 @@ class LedgerService {
         // ── 2. System totals ──────────────────────────────────────
         const [salesTotals] = await db.sequelize.query(`
             SELECT
-                (SELECT COALESCE(SUM(total), 0) FROM orders WHERE "isDeleted" = false)
+                (SELECT COALESCE(SUM(total), 0) FROM orders WHERE "isDeleted" = false ${openYears})
                     AS old_sales,
                 COALESCE(SUM(le.credit), 0)
                     AS ledger_sales_credit
             FROM accounts a
-            LEFT JOIN ledger_entries le ON le."accountId" = a.id
+            LEFT JOIN ledger_entries le ON le."accountId" = a.id ${carriedForward}
             LEFT JOIN journal_batches jb ON le."batchId" = jb.id
                 AND jb."isPosted" = true AND jb."isReversed" = false
             WHERE a.code = '4100'
-        `, { type: db.Sequelize.QueryTypes.SELECT });
+        `, { replacements: { openFrom }, type: db.Sequelize.QueryTypes.SELECT });
 
         const [paymentTotals] = await db.sequelize.query(`
             SELECT
-                (SELECT COALESCE(SUM(amount), 0) FROM payments WHERE "partyType" = 'customer')
+                (SELECT COALESCE(SUM(amount), 0) FROM payments WHERE "partyType" = 'customer' ${openYears})
                     AS old_payments,
                 COALESCE(SUM(le.debit), 0)
                     AS ledger_cash_debit
             FROM accounts a
-            LEFT JOIN ledger_entries le ON le."accountId" = a.id
+            LEFT JOIN ledger_entries le ON le."accountId" = a.id ${carriedForward}
             LEFT JOIN journal_batches jb ON le."batchId" = jb.id
                 AND jb."isPosted" = true AND jb."isReversed" = false
             WHERE a.code = '1100'
-        `, { type: db.Sequelize.QueryTypes.SELECT });
+        `, { replacements: { openFrom }, type: db.Sequelize.QueryTypes.SELECT });
 
         const oldSales = Number(salesTotals?.old_sales) || 0;
         const ledgerSales = Number(salesTotals?.ledger_sales_credit) || 0;
@@ -497,6 +633,7 @@ class LedgerService {
                 difference: Number(r.difference)
             })),
             systemTotals: {
+                since: openFrom,
                 sales: {
                     oldSystem: oldSales,
                     ledgerCredit: ledgerSales,
@@ -520,13 +657,31 @@ class LedgerService {
 
     // ==================== BALANCE CALCULATIONS ====================
 
+    /**
+     * Ledger tables for a report reaching back to `date` ('YYYY-MM-DD';
+     * null = the beginning). Closed years live in the history tables, so a
+     * report starting on or before the last close reads the _all views.
+     */
+    async ledgerScope(date = null) {
+        const [row] = await this.db.sequelize.query(`
+            SELECT MAX("endDate") IS NOT NULL
+                AND (CAST(:date AS date) IS NULL OR CAST(:date AS date) <= MAX("endDate")) AS "reachesClosed"
+            FROM financial_years
+        `, {
+            replacements: { date: date || null },
+            type: this.db.Sequelize.QueryTypes.SELECT
+        });
+        return row.reachesClosed ? FULL_LEDGER : HOT_LEDGER;
+    }
+
     /**
      * Get account balance (NEVER STORED - always computed)
      */
     async getAccountBalance(accountId, asOfDate = null) {
         const db = this.db;
         
-        let whereClause = `le."accountId" = :accountId AND jb."isPosted" = true AND jb."isReversed" = false`;
+        const ledger = asOfDate ? await this.ledgerScope(asOfDate) : HOT_LEDGER;
+        let whereClause = `le."accountId" = :accountId AND jb."isPosted" = true AND jb."isReversed" = false ${ledger.skipCarriedForward}`;
         const replacements = { accountId };
         
         if (asOfDate) {
@@ -539,8 +694,8 @@ class LedgerService {
                 COALESCE(SUM(le.debit), 0) - COALESCE(SUM(le.credit), 0) as balance,
                 COALESCE(SUM(le.debit), 0) as totalDebit,
                 COALESCE(SUM(le.credit), 0) as totalCredit
-            FROM ledger_entries le
-            INNER JOIN journal_batches jb ON le."batchId" = jb.id
+            FROM ${ledger.entries} le
+            INNER JOIN ${ledger.batches} jb ON le."batchId" = jb.id
             WHERE ${whereClause}
         `, {
             replacements,
@@ -600,6 +755,7 @@ class LedgerService {
     async getTrialBalance(asOfDate = null) {
         const db = this.db;
         
+        const ledger = asOfDate ? await this.ledgerScope(asOfDate) : HOT_LEDGER;
         let dateFilter = '';
         const replacements = {};
         if (asOfDate) {
@@ -617,8 +773,8 @@ class LedgerService {
                 COALESCE(SUM(le.credit), 0) as "totalCredit",
                 COALESCE(SUM(le.debit), 0) - COALESCE(SUM(le.credit), 0) as balance
             FROM accounts a
-            LEFT JOIN ledger_entries le ON a.id = le."accountId"
-            LEFT JOIN journal_batches jb ON le."batchId" = jb.id AND jb."isPosted" = true AND jb."isReversed" = false ${dateFilter}
+            LEFT JOIN ${ledger.entries} le ON a.id = le."accountId" ${ledger.skipCarriedForward}
+            LEFT JOIN ${ledger.batches} jb ON le."batchId" = jb.id AND jb."isPosted" = true AND jb."isReversed" = false ${dateFilter}
             WHERE a."isActive" = true
             GROUP BY a.id, a.code, a.name, a.type
             HAVING COALESCE(SUM(le.debit), 0) != 0 OR COALESCE(SUM(le.credit), 0) != 0
@@ -646,14 +802,15 @@ class LedgerService {
      */
     async getProfitAndLoss(fromDate, toDate) {
         const db = this.db;
+        const ledger = await this.ledgerScope(fromDate);
         
         const incomeAccounts = await db.sequelize.query(`
             SELECT 
                 a.id, a.code, a.name,
                 COALESCE(SUM(le.credit), 0) - COALESCE(SUM(le.debit), 0) as amount
             FROM accounts a
-            LEFT JOIN ledger_entries le ON a.id = le."accountId"
-            LEFT JOIN journal_batches jb ON le."batchId" = jb.id 
+            LEFT JOIN ${ledger.entries} le ON a.id = le."accountId" ${ledger.skipCarriedForward}
+            LEFT JOIN ${ledger.batches} jb ON le."batchId" = jb.id 
                 AND jb."isPosted" = true 
                 AND jb."isReversed" = false
                 AND jb."transactionDate" BETWEEN :fromDate AND :toDate
@@ -671,8 +828,8 @@ class LedgerService {
                 a.id, a.code, a.name,
                 COALESCE(SUM(le.debit), 0) - COALESCE(SUM(le.credit), 0) as amount
             FROM accounts a
-            LEFT JOIN ledger_entries le ON a.id = le."accountId"
-            LEFT JOIN journal_batches jb ON le."batchId" = jb.id 
+            LEFT JOIN ${ledger.entries} le ON a.id = le."accountId" ${ledger.skipCarriedForward}
+            LEFT JOIN ${ledger.batches} jb ON le."batchId" = jb.id 
                 AND jb."isPosted" = true 
                 AND jb."isReversed" = false
                 AND jb."transactionDate" BETWEEN :fromDate AND :toDate
@@ -702,6 +859,7 @@ class LedgerService {
      */
     async getBalanceSheet(asOfDate = null) {
         const db = this.db;
+        const ledger = asOfDate ? await this.ledgerScope(asOfDate) : HOT_LEDGER;
         const dateFilter = asOfDate ? `AND jb."transactionDate" <= :asOfDate` : '';
         const replacements = asOfDate ? { asOfDate } : {};
 
@@ -711,8 +869,8 @@ class LedgerService {
                     a.id, a.code, a.name,
                     ${balanceFormula} as balance
                 FROM accounts a
-                LEFT JOIN ledger_entries le ON a.id = le."accountId"
-                LEFT JOIN journal_batches jb ON le."batchId" = jb.id 
+                LEFT JOIN ${ledger.entries} le ON a.id = le."accountId" ${ledger.skipCarriedForward}
+                LEFT JOIN ${ledger.batches} jb ON le."batchId" = jb.id 
                     AND jb."isPosted" = true 
                     AND jb."isReversed" = false
                     ${dateFilter}
@@ -744,10 +902,12 @@ class LedgerService {
     }
 
     /**
-     * Account Ledger - All transactions for an account
+     * Account Ledger - All transactions for an account, across closed years
+     * when the range reaches back into them
      */
     async getAccountLedger(accountId, fromDate = null, toDate = null) {
         const db = this.db;
+        const ledger = await this.ledgerScope(fromDate);
         
         let dateFilter = '';
         const replacements = { accountId };
@@ -777,11 +937,12 @@ class LedgerService {
                 jb."referenceType",
                 jb."transactionDate",
                 jb.description
-            FROM ledger_entries le
-            INNER JOIN journal_batches jb ON le."batchId" = jb.id
+            FROM ${ledger.entries} le
+            INNER JOIN ${ledger.batches} jb ON le."batchId" = jb.id
             WHERE le."accountId" = :accountId 
                 AND jb."isPosted" = true 
                 AND jb."isReversed" = false
+                ${ledger.skipCarriedForward}
                 ${dateFilter}
             ORDER BY jb."transactionDate" ASC, le."createdAt" ASC
         `, {
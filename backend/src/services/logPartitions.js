@@ -0,0 +1,391 @@
+/**
+ * Monthly partitions for the append-only log tables
+ *
+ * audit_logs, bill_audit_logs and weight_logs are range-partitioned by
+ * "createdAt", one partition per calendar month (UTC), named <table>_pYYYYMM,
+ * plus <table>_default for anything outside the prepared months. Every read
+ * filters by date, so the planner only touches the months asked for.
+ *
+ * maintain() runs daily from the scheduler:
+ *   • creates partitions MONTHS_AHEAD months ahead, so writes never land in
+ *     the default partition
+ *   • archives months older than the table's retention: rows are copied out
+ *     as gzipped NDJSON chunks into log_archives, then the partition is
+ *     detached and dropped once the archived row count matches
+ *
+ * A table is converted in place by the migration without copying: the plain
+ * table is renamed to <table>_unpartitioned and the partitioned table takes
+ * its name. The backfill job partition-<table> (services/backfillJobs.js)
+ * then moves the old rows across in batches and drops the renamed table;
+ * until it has, those rows are not visible through <table>, and maintain()
+ * leaves the table's old months alone.
+ *
+ * Retention is per table and set in months by environment variable; 0 keeps
+ * every month online. Archives are never deleted here. restoreMonth() puts an
+ * archived month back online for an investigation; the next maintenance run
+ * archives it again.
+ */
+
+const zlib = require('zlib');
+const crypto = require('crypto');
+const moment = require('moment-timezone');
+const db = require('../models');
+
+const months = (value, fallback) => (value === undefined || value === '' ? fallback : Number(value));
+
+const TABLES = {
+    audit_logs: { retentionMonths: months(process.env.AUDIT_LOG_RETENTION_MONTHS, 24) },
+    bill_audit_logs: { retentionMonths: months(process.env.BILL_AUDIT_LOG_RETENTION_MONTHS, 24) },
+    weight_logs: { retentionMonths: months(process.env.WEIGHT_LOG_RETENTION_MONTHS, 12) }
+};
+const MONTHS_AHEAD = Number(process.env.LOG_PARTITION_MONTHS_AHEAD) || 3;
+const ARCHIVE_CHUNK_ROWS = Number(process.env.LOG_ARCHIVE_CHUNK_ROWS) || 5000;
+
+const MONTH_FORMAT = 'YYYY-MM';
+const partitionName = (table, month) => `${table}_p${month.replace('-', '')}`;
+const legacyName = (table) => `${table}_unpartitioned`;
+const monthOf = (table, relname) => {
+    const match = relname.match(new RegExp(`^${table}_p(\\d{4})(\\d{2})$`));
+    return match ? `${match[1]}-${match[2]}` : null;
+};
+const monthStart = (month) => moment.utc(month, MONTH_FORMAT, true);
+
+const assertTable = (table) => {
+    if (!TABLES[table]) throw new Error(`${table} is not a partitioned log table`);
+};
+
+const query = (sql, options = {}) => db.sequelize.query(sql, { type: db.sequelize.QueryTypes.SELECT, ...options });
+const run = (sql, options = {}) => db.sequelize.query(sql, options);
+
+// Create the partition for `month` ('YYYY-MM') if it does not exist yet
+async function ensurePartition(table, month, transaction = null) {
+    const from = monthStart(month);
+    const to = from.clone().add(1, 'month');
+    await run(`
+        CREATE TABLE IF NOT EXISTS "${partitionName(table, month)}" PARTITION OF "${table}"
+        FOR VALUES FROM ('${from.format('YYYY-MM-DD')} 00:00:00+00') TO ('${to.format('YYYY-MM-DD')} 00:00:00+00')
+    `, { transaction });
+}
+
+async function ensureFuturePartitions(table, transaction = null) {
+    const created = [];
+    for (let i = 0; i <= MONTHS_AHEAD; i++) {
+        const month = moment.utc().add(i, 'months').format(MONTH_FORMAT);
+        await ensurePartition(table, month, transaction);
+        created.push(month);
+    }
+    return created;
+}
+
+async function isPartitioned(table, transaction = null) {
+    const [row] = await query('SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)', {
+        replacements: { table: `"${table}"` },
+        transaction
+    });
+    return row ? row.relkind === 'p' : null;
+}
+
+// Whether <table>_unpartitioned still holds rows to move
+async function legacyPresent(table, transaction = null) {
+    const [{ present }] = await query('SELECT to_regclass(:legacy) IS NOT NULL AS present', {
+        replacements: { legacy: `"${legacyName(table)}"` },
+        transaction
+    });
+    return present;
+}
+
+/**
+ * Convert a plain log table into a partitioned one, keeping its non-unique
+ * indexes. Idempotent — run by the migration and after sync() on a fresh
+ * database. Only renames and creates, so the ACCESS EXCLUSIVE lock is held
+ * for moments, whatever the table's size: existing rows stay in
+ * <table>_unpartitioned for moveLegacyRows(). The primary key becomes
+ * (id, "createdAt"), since a partitioned table's keys must include the
+ * partition column.
+ */
+async function partitionTable(table, sequelize = db.sequelize) {
+    assertTable(table);
+    await sequelize.transaction(async (transaction) => {
+        const state = await isPartitioned(table, transaction);
+        if (state !== false) return;
+
+        const legacy = legacyName(table);
+        const indexes = await query(`
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = :table AND indexdef NOT LIKE 'CREATE UNIQUE%'
+        `, { replacements: { table }, transaction });
+
+        await run(`ALTER TABLE "${table}" RENAME TO "${legacy}"`, { transaction });
+        // Months the moved rows will need — read from the "createdAt" index
+        const [{ first }] = await query(`SELECT MIN("createdAt") AS first FROM "${legacy}"`, { transaction });
+        // The old table is only read in id order from now on; its other
+        // indexes, and its primary key's name, go to the new table
+        for (const { indexname } of indexes) {
+            await run(`DROP INDEX "${indexname}"`, { transaction });
+        }
+        const [pkey] = await query(`
+            SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:legacy) AND contype = 'p'
+        `, { replacements: { legacy: `"${legacy}"` }, transaction });
+        if (pkey) await run(`ALTER TABLE "${legacy}" RENAME CONSTRAINT "${pkey.conname}" TO "${legacy}_pkey"`, { transaction });
+
+        await run(`
+            CREATE TABLE "${table}" (LIKE "${legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE ("createdAt")
+        `, { transaction });
+        await run(`CREATE TABLE "${table}_default" PARTITION OF "${table}" DEFAULT`, { transaction });
+
+        const start = first ? moment.utc(first).startOf('month') : moment.utc().startOf('month');
+        for (const month = start.clone(); month.isBefore(moment.utc().startOf('month')); month.add(1, 'month')) {
+            await ensurePartition(table, month.format(MONTH_FORMAT), transaction);
+        }
+        await ensureFuturePartitions(table, transaction);
+
+        await run(`ALTER TABLE "${table}" ADD PRIMARY KEY (id, "createdAt")`, { transaction });
+        for (const { indexdef } of indexes) {
+            await run(indexdef, { transaction });
+        }
+        if (!first) await run(`DROP TABLE "${legacy}"`, { transaction });
+        console.log(`[PARTITIONS] ${table} is now partitioned by month from ${start.format(MONTH_FORMAT)}`
+            + (first ? `; existing rows move from ${legacy} in the background` : ''));
+    });
+}
+
+/**
+ * Move the next `limit` rows after `afterId` from <table>_unpartitioned into
+ * the partitioned table, in id order; drops the old table once every row
+ * has been moved. Batch function of the partition-<table> backfill job.
+ * @returns {Promise<Object>} { lastId, processed, changed }
+ */
+async function moveLegacyRows(table, afterId, limit, transaction) {
+    assertTable(table);
+    const legacy = legacyName(table);
+    if (!(await legacyPresent(table, transaction))) return { lastId: afterId, processed: 0, changed: 0 };
+
+    const ids = await query(`
+        SELECT id FROM "${legacy}"
+        WHERE (CAST(:afterId AS uuid) IS NULL OR id > CAST(:afterId AS uuid))
+        ORDER BY id
+        LIMIT :limit
+    `, { replacements: { afterId, limit }, transaction });
+    if (ids.length === 0) {
+        await run(`DROP TABLE "${legacy}"`, { transaction });
+        console.log(`[PARTITIONS] ${table}: history moved, ${legacy} dropped`);
+        return { lastId: afterId, processed: 0, changed: 0 };
+    }
+
+    const batchIds = ids.map(r => r.id);
+    const [, inserted] = await run(`
+        INSERT INTO "${table}" SELECT * FROM "${legacy}" WHERE id IN (:batchIds)
+        ON CONFLICT DO NOTHING
+    `, { replacements: { batchIds }, transaction });
+    return { lastId: batchIds[batchIds.length - 1], processed: batchIds.length, changed: inserted.rowCount };
+}
+
+async function partitionAll(sequelize = db.sequelize) {
+    for (const table of Object.keys(TABLES)) {
+        await partitionTable(table, sequelize);
+    }
+}
+
+// Monthly partitions currently attached to `table`, oldest first
+async function listPartitions(table) {
+    const rows = await query(`
+        SELECT c.relname AS name, c.reltuples::bigint AS "estimatedRows",
+            pg_total_relation_size(c.oid) AS bytes
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+        ORDER BY c.relname
+    `, { replacements: { table: `"${table}"` } });
+    return rows.map(row => ({ ...row, month: monthOf(table, row.name) }));
+}
+
+/**
+ * Copy one month out to log_archives, then detach and drop its partition.
+ * The copy commits first, so inserts into the live table are never blocked
+ * for longer than the detach itself; a failed run leaves the partition
+ * attached and the next run starts the month over.
+ */
+async function archiveMonth(table, month) {
+    const partition = partitionName(table, month);
+    let archived = 0;
+
+    const locked = await db.sequelize.transaction(async (transaction) => {
+        const [{ acquired }] = await query('SELECT pg_try_advisory_xact_lock(hashtext(:key)) AS acquired', {
+            replacements: { key: `log-archive:${partition}` },
+            transaction
+        });
+        if (!acquired) return false;
+
+        await db.logArchive.destroy({ where: { tableName: table, month }, transaction });
+        let after = null;
+        for (let chunk = 0; ; chunk++) {
+            const rows = await query(`
+                SELECT row_to_json(p)::text AS line, p."createdAt", CAST(p."createdAt" AS text) AS cursor, p.id
+                FROM "${partition}" p
+                ${after ? 'WHERE (p."createdAt", p.id) > (CAST(:at AS timestamptz), CAST(:id AS uuid))' : ''}
+                ORDER BY p."createdAt", p.id
+                LIMIT :limit
+            `, { replacements: { ...after, limit: ARCHIVE_CHUNK_ROWS }, transaction });
+            if (rows.length === 0) break;
+
+            const payload = zlib.gzipSync(rows.map(r => r.line).join('\n'));
+            await db.logArchive.create({
+                tableName: table,
+                month,
+                chunk,
+                rowCount: rows.length,
+                firstAt: rows[0].createdAt,
+                lastAt: rows[rows.length - 1].createdAt,
+                payload,
+                sha256: crypto.createHash('sha256').update(payload).digest('hex')
+            }, { transaction });
+            archived += rows.length;
+            after = { at: rows[rows.length - 1].cursor, id: rows[rows.length - 1].id };
+        }
+        return true;
+    });
+    if (!locked) return null;
+
+    await db.sequelize.transaction(async (transaction) => {
+        await run(`ALTER TABLE "${table}" DETACH PARTITION "${partition}"`, { transaction });
+        const [{ count }] = await query(`SELECT COUNT(*)::int AS count FROM "${partition}"`, { transaction });
+        if (count !== archived) {
+            throw new Error(`${partition} has ${count} rows but ${archived} were archived — partition kept`);
+        }
+        await run(`DROP TABLE "${partition}"`, { transaction });
+    });
+    console.log(`[PARTITIONS] Archived ${partition}: ${archived} rows`);
+    return { table, month, rows: archived };
+}
+
+/**
+ * Daily upkeep for every log table: future partitions, then archival of
+ * months past retention. One table failing does not stop the others.
+ */
+async function maintain() {
+    const report = [];
+    for (const [table, { retentionMonths }] of Object.entries(TABLES)) {
+        const entry = { table, retentionMonths, archived: [], errors: [] };
+        try {
+            if (!(await isPartitioned(table))) {
+                entry.errors.push('table is not partitioned');
+                report.push(entry);
+                continue;
+            }
+            await ensureFuturePartitions(table);
+
+            // Old months are still being filled by the partition-<table> backfill
+            if (await legacyPresent(table)) {
+                entry.errors.push(`history still moving from ${legacyName(table)} — archival skipped`);
+            } else if (retentionMonths > 0) {
+                const cutoff = moment.utc().startOf('month').subtract(retentionMonths, 'months');
+                const expired = (await listPartitions(table))
+                    .filter(p => p.month && monthStart(p.month).isBefore(cutoff));
+                for (const { month } of expired) {
+                    try {
+                        const result = await archiveMonth(table, month);
+                        if (result) entry.archived.push(result);
+                    } catch (error) {
+                        entry.errors.push(`${month}: ${error.message}`);
+                    }
+                }
+            }
+
+            const [{ stray }] = await query(`SELECT COUNT(*)::int AS stray FROM "${table}_default"`);
+            if (stray > 0) entry.errors.push(`${stray} rows in ${table}_default are outside the prepared months`);
+        } catch (error) {
+            entry.errors.push(error.message);
+        }
+        report.push(entry);
+    }
+    return report;
+}
+
+// Partitions and archived months for every log table
+async function getStatus() {
+    const archives = await query(`
+        SELECT "tableName", month, COUNT(*)::int AS chunks, SUM("rowCount")::int AS rows,
+            SUM(octet_length(payload))::bigint AS bytes, MAX("createdAt") AS "archivedAt"
+        FROM log_archives
+        GROUP BY "tableName", month
+        ORDER BY "tableName", month
+    `);
+    const status = [];
+    for (const [table, { retentionMonths }] of Object.entries(TABLES)) {
+        status.push({
+            table,
+            retentionMonths,
+            monthsAhead: MONTHS_AHEAD,
+            partitioned: Boolean(await isPartitioned(table)),
+            historyMoving: await legacyPresent(table),
+            partitions: await listPartitions(table),
+            archives: archives.filter(a => a.tableName === table)
+        });
+    }
+    return status;
+}
+
+/**
+ * Bring an archived month back online (for an investigation or an audit
+ * request). Rows are re-inserted into their monthly partition; the archive
+ * is kept, and the month is archived again by the next maintenance run once
+ * it is still past retention.
+ */
+async function restoreMonth(table, month) {
+    assertTable(table);
+    return await db.sequelize.transaction(async (transaction) => {
+        const chunks = await db.logArchive.findAll({
+            where: { tableName: table, month },
+            order: [['chunk', 'ASC']],
+            transaction
+        });
+        if (chunks.length === 0) return null;
+
+        await ensurePartition(table, month, transaction);
+        let restored = 0;
+        for (const chunk of chunks) {
+            const digest = crypto.createHash('sha256').update(chunk.payload).digest('hex');
+            if (digest !== chunk.sha256) throw new Error(`Archive chunk ${chunk.chunk} of ${table} ${month} is corrupt`);
+            const rows = zlib.gunzipSync(chunk.payload).toString('utf8').split('\n');
+            await run(`
+                INSERT INTO "${table}"
+                SELECT * FROM json_populate_recordset(NULL::"${table}", CAST(:rows AS json))
+                ON CONFLICT DO NOTHING
+            `, { replacements: { rows: `[${rows.join(',')}]` }, transaction });
+            restored += chunk.rowCount;
+        }
+        return { table, month, rows: restored };
+    });
+}
+
+/**
+ * Partitions the planner would scan for a createdAt range — used by the
+ * admin screen and tests to confirm pruning.
+ */
+async function explainRange(table, from, to) {
+    assertTable(table);
+    const [row] = await query(`
+        EXPLAIN (FORMAT JSON)
+        SELECT id FROM "${table}" WHERE "createdAt" >= CAST(:from AS timestamptz) AND "createdAt" < CAST(:to AS timestamptz)
+    `, { replacements: { from, to } });
+    const plan = row['QUERY PLAN'];
+    const scanned = new Set();
+    const walk = (node) => {
+        if (node['Relation Name']) scanned.add(node['Relation Name']);
+        (node.Plans || []).forEach(walk);
+    };
+    walk((Array.isArray(plan) ? plan[0] : plan).Plan);
+    return { table, from, to, partitionsScanned: [...scanned].sort() };
+}
+
+module.exports = {
+    TABLES,
+    legacyName,
+    partitionAll,
+    moveLegacyRows,
+    maintain,
+    getStatus,
+    restoreMonth,
+    explainRange
+};
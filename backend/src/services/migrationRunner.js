@@ -0,0 +1,137 @@
+/**
+ * Versioned Migration Runner
+ *
+ * Applies pending files from src/migrations at boot and records them in the
+ * "SequelizeMeta" table — the same ledger sequelize-cli uses, so
+ * `npm run migrations` and boot agree on what has run. When nothing is
+ * pending, boot costs one SELECT and a directory listing.
+ *
+ *   • Fresh database (no orders table): sequelize.sync() builds the schema from
+ *     the models once, and every migration is recorded as applied. Migrations
+ *     that create objects models cannot describe (triggers, functions) export
+ *     `onFreshDatabase: true` and are run after the sync; they must be idempotent.
+ *   • Database kept current by the old boot-time DDL (tables exist, ledger
+ *     empty): migrations up to BASELINE are recorded without running.
+ *
+ * A transaction-scoped advisory lock makes concurrent boots (cluster restarts,
+ * several replicas) wait for one runner instead of racing.
+ *
+ * Data backfills do not belong here — see services/backfillJobs.js.
+ */
+
+const fs = require('fs');
+const path = require('path');
+const db = require('../models');
+
+const MIGRATIONS_DIR = path.join(__dirname, '../migrations');
+const META_TABLE = '"SequelizeMeta"';
+const LOCK_KEY = 7302261019;
+// Last migration that predates the runner (the boot-time DDL covered these)
+const BASELINE = '20260316000001-add-payment-mode.js';
+
+function listMigrations() {
+    return fs.readdirSync(MIGRATIONS_DIR)
+        .filter(file => file.endsWith('.js') && !file.startsWith('.'))
+        .sort();
+}
+
+async function ensureMetaTable() {
+    await db.sequelize.query(`CREATE TABLE IF NOT EXISTS ${META_TABLE} (name VARCHAR(255) NOT NULL PRIMARY KEY)`);
+}
+
+async function appliedMigrations(transaction) {
+    const [rows] = await db.sequelize.query(`SELECT name FROM ${META_TABLE}`, { transaction });
+    return new Set(rows.map(r => r.name));
+}
+
+// Recorded outside the lock transaction so a later failure does not un-record
+// migrations that already ran
+async function record(names) {
+    if (names.length === 0) return;
+    await db.sequelize.query(
+        `INSERT INTO ${META_TABLE} (name) SELECT unnest(ARRAY[:names]::varchar[]) ON CONFLICT DO NOTHING`,
+        { replacements: { names } }
+    );
+}
+
+async function schemaExists(transaction) {
+    const [[row]] = await db.sequelize.query(`SELECT to_regclass('public.orders') IS NOT NULL AS "exists"`, { transaction });
+    return row.exists;
+}
+
+/**
+ * Applied and pending migration names.
+ * @returns {Promise<Object>} { applied: [], pending: [] }
+ */
+async function status() {
+    await ensureMetaTable();
+    const applied = await appliedMigrations();
+    const files = listMigrations();
+    return {
+        applied: files.filter(f => applied.has(f)),
+        pending: files.filter(f => !applied.has(f))
+    };
+}
+
+/**
+ * Apply all pending migrations, in file-name order.
+ * @returns {Promise<Object>} { ran: [], baselined: [] }
+ */
+async function migrate() {
+    const result = { ran: [], baselined: [] };
+
+    // Fast path: nothing to do
+    await ensureMetaTable();
+    const files = listMigrations();
+    let applied = await appliedMigrations();
+    if (files.every(f => applied.has(f))) return result;
+
+    const lock = await db.sequelize.transaction();
+    try {
+        await db.sequelize.query('SELECT pg_advisory_xact_lock(:key)', { replacements: { key: LOCK_KEY }, transaction: lock });
+        applied = await appliedMigrations(lock);
+
+        if (applied.size === 0) {
+            if (!(await schemaExists(lock))) {
+                db.loadAllModels();
+                await db.sequelize.sync({ force: false });
+                const queryInterface = db.sequelize.getQueryInterface();
+                for (const file of files) {
+                    const migration = require(path.join(MIGRATIONS_DIR, file));
+                    if (migration.onFreshDatabase) await migration.up(queryInterface, db.Sequelize);
+                }
+                await record(files);
+                result.baselined = files;
+                console.log(`[MIGRATION] Fresh database — schema created from models, ${files.length} migrations recorded`);
+                await lock.commit();
+                return result;
+            }
+            const baseline = files.filter(f => f <= BASELINE);
+            await record(baseline);
+            baseline.forEach(f => applied.add(f));
+            result.baselined = baseline;
+            console.log(`[MIGRATION] Existing database — ${baseline.length} pre-runner migrations recorded as applied`);
+        }
+
+        const queryInterface = db.sequelize.getQueryInterface();
+        for (const file of files.filter(f => !applied.has(f))) {
+            const started = Date.now();
+            await require(path.join(MIGRATIONS_DIR, file)).up(queryInterface, db.Sequelize);
+            await record([file]);
+            result.ran.push(file);
+            console.log(`[MIGRATION] Applied ${file} (${Date.now() - started}ms)`);
+        }
+
+        await lock.commit();
+        return result;
+    } catch (error) {
+        await lock.rollback();
+        throw error;
+    }
+}
+
+module.exports = {
+    migrate,
+    status,
+    listMigrations
+};
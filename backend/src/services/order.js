@@ -34,9 +34,25 @@ module.exports= {
             throw error;
         }
     },
-    updateOrder: async (filterObj, updateObj) => {
+    updateOrder: async (filterObj, updateObj, transaction = null) => {
         try {
-            const res = await Dao.order.updateOrder(filterObj, updateObj);
+            const res = await Dao.order.updateOrder(filterObj, updateObj, transaction);
+            return res;
+        } catch (error) {
+            throw error;
+        }
+    },
+    lockOrder: async (filterObj, transaction) => {
+        try {
+            const res = await Dao.order.lockOrder(filterObj, transaction);
+            return res;
+        } catch (error) {
+            throw error;
+        }
+    },
+    recomputeTotals: async (filterObj, transaction = null) => {
+        try {
+            const res = await Dao.order.recomputeTotals(filterObj, transaction);
             return res;
         } catch (error) {
             throw error;
@@ -0,0 +1,275 @@
+/**
+ * Bulk Past-Sales Import
+ *
+ * Imports many historic bills in one request without paying the per-bill
+ * costs of POST /orders (invoice lock, customer lookup, ledger postings,
+ * audit log and Telegram alert for every bill):
+ *
+ *   1. Parse (CSV or JSON) and validate every bill up front — nothing is
+ *      written if any bill is invalid.
+ *   2. Resolve all customers in one query; create missing ones multi-row.
+ *      A name that matches but with a different mobile is not linked — it
+ *      is reported in linkSuggestions instead.
+ *   3. Allocate one contiguous block of invoice numbers.
+ *   4. Insert orders, items and journal batches with multi-row statements of
+ *      at most chunkSize bills.
+ *   5. Caller emits one audit log entry and one Telegram summary.
+ *
+ * Steps 2-4 run in ONE transaction: an import lands whole or not at all, so
+ * a failure leaves no partial import and no gap in invoice numbers, and the
+ * same file can simply be sent again. Counter billing waits on the invoice
+ * sequence lock until the import commits.
+ *
+ * Past sales do NOT touch today's daily summary (cash in drawer) — that only
+ * tracks live counter activity.
+ */
+
+const uuidv4 = require('uuid/v4');
+const moment = require('moment-timezone');
+const db = require('../models');
+const Validations = require('../validations');
+const invoiceSequence = require('./invoiceSequence');
+const { postInvoicesToLedgerBulk } = require('./realTimeLedger');
+const { resolveCustomers, adjustCustomerBalances } = require('./customerBulk');
+const { parseCSV } = require('../utils/csv');
+const { chunk } = require('../utils/concurrency');
+
+const CHUNK_SIZE = Number(process.env.BULK_IMPORT_CHUNK_SIZE) || 500;
+const MAX_BILLS = Number(process.env.BULK_IMPORT_MAX_BILLS) || 20000;
+const DATE_FORMATS = ['DD-MM-YYYY', 'YYYY-MM-DD', 'DD/MM/YYYY'];
+
+const BILL_FIELDS = ['orderDate', 'customerName', 'customerMobile', 'paidAmount', 'notes'];
+const ITEM_FIELDS = ['name', 'altName', 'quantity', 'productPrice', 'totalPrice', 'type', 'productId'];
+const NUMERIC_FIELDS = new Set(['paidAmount', 'subTotal', 'total', 'tax', 'taxPercent', 'quantity', 'productPrice', 'totalPrice']);
+
+const round2 = (n) => Math.round(n * 100) / 100;
+
+const toValue = (field, raw) => {
+    if (raw === undefined) return undefined;
+    return NUMERIC_FIELDS.has(field) ? Number(raw) : raw;
+};
+
+// ─── Parsing ─────────────────────────────────────────────────────
+
+/**
+ * Group CSV rows (one row per line item) into bills by `billRef`.
+ * Bill-level columns are taken from the first row of each bill.
+ *
+ * Columns: billRef, orderDate, customerName, customerMobile, paidAmount,
+ *          name, altName, quantity, productPrice, totalPrice, type, productId
+ */
+function billsFromCSV(text) {
+    const bills = new Map();
+    for (const row of parseCSV(text)) {
+        const ref = row.billRef || `row-${row._row}`;
+        let bill = bills.get(ref);
+        if (!bill) {
+            bill = { billRef: ref, _row: row._row, orderItems: [] };
+            for (const field of BILL_FIELDS) {
+                const value = toValue(field, row[field]);
+                if (value !== undefined) bill[field] = value;
+            }
+            bills.set(ref, bill);
+        }
+        const item = {};
+        for (const field of ITEM_FIELDS) {
+            const value = toValue(field, row[field]);
+            if (value !== undefined) item[field] = value;
+        }
+        bill.orderItems.push(item);
+    }
+    return [...bills.values()];
+}
+
+/**
+ * Extract bills from a request: text/csv body, { csv } JSON field, or { bills: [...] }.
+ */
+function parseBills(req) {
+    if (typeof req.body === 'string') return billsFromCSV(req.body);
+    if (req.body && typeof req.body.csv === 'string') return billsFromCSV(req.body.csv);
+    if (req.body && Array.isArray(req.body.bills)) {
+        return req.body.bills.map((bill, index) => ({ billRef: `#${index + 1}`, ...bill }));
+    }
+    return null;
+}
+
+// ─── Validation ──────────────────────────────────────────────────
+
+/**
+ * Validate every bill with the same rules as POST /orders, plus a past-date check.
+ * @returns {{ bills: Array, errors: Array }} normalised bills, or per-bill errors
+ */
+function validateBills(rawBills) {
+    const errors = [];
+    const bills = [];
+    const today = moment().endOf('day');
+
+    if (rawBills.length > MAX_BILLS) {
+        return { bills: [], errors: [{ billRef: null, message: `Too many bills (${rawBills.length}); maximum per import is ${MAX_BILLS}` }] };
+    }
+
+    rawBills.forEach((raw) => {
+        const { billRef, _row, ...billObj } = raw;
+        const itemsTotal = round2((billObj.orderItems || []).reduce((s, i) => s + (Number(i.totalPrice) || 0), 0));
+        if (billObj.total === undefined) billObj.total = itemsTotal;
+        if (billObj.subTotal === undefined) billObj.subTotal = billObj.total;
+
+        const { error, value } = Validations.order.validateCreateOrderObj(billObj);
+        if (error) {
+            errors.push({ billRef, row: _row, message: error.details[0].message });
+            return;
+        }
+
+        const date = moment(value.orderDate, DATE_FORMATS, true);
+        if (!date.isValid()) {
+            errors.push({ billRef, row: _row, message: `Invalid orderDate "${value.orderDate}" (expected DD-MM-YYYY)` });
+            return;
+        }
+        if (date.isAfter(today)) {
+            errors.push({ billRef, row: _row, message: `orderDate ${value.orderDate} is in the future` });
+            return;
+        }
+
+        bills.push({ billRef, ...value, orderDate: date.format('DD-MM-YYYY'), billDate: date.toDate() });
+    });
+
+    return { bills, errors };
+}
+
+// ─── Customers ───────────────────────────────────────────────────
+
+/**
+ * Add each customer's new dues to currentBalance in one statement.
+ */
+async function applyCustomerBalances(orders, transaction) {
+    const deltas = new Map();
+    for (const o of orders) {
+        if (o.customerId && o.dueAmount > 0) {
+            deltas.set(o.customerId, (deltas.get(o.customerId) || 0) + o.dueAmount);
+        }
+    }
+    await adjustCustomerBalances(deltas, transaction);
+}
+
+// ─── Import ──────────────────────────────────────────────────────
+
+function buildOrderRow(bill, invoiceNumber, user) {
+    const paidAmount = bill.paidAmount === undefined || bill.paidAmount === null ? 0 : bill.paidAmount;
+    const dueAmount = round2(bill.total - paidAmount);
+    let paymentStatus;
+    let paymentMode;
+    if (paidAmount === 0) {
+        paymentStatus = 'unpaid';
+        paymentMode = 'CREDIT';
+    } else if (paidAmount >= bill.total) {
+        paymentStatus = 'paid';
+        paymentMode = 'CASH';
+    } else {
+        paymentStatus = 'partial';
+        paymentMode = 'CREDIT';
+    }
+
+    return {
+        id: uuidv4(),
+        orderNumber: invoiceNumber,
+        orderDate: bill.orderDate,
+        customerName: bill.customerName || null,
+        customerMobile: bill.customerMobile || null,
+        customerId: bill.customerId || null,
+        subTotal: bill.subTotal,
+        total: bill.total,
+        tax: bill.tax,
+        taxPercent: bill.taxPercent,
+        paidAmount,
+        dueAmount: Math.max(0, dueAmount),
+        paymentStatus,
+        paymentMode,
+        createdBy: user?.id || null,
+        createdByName: user?.name || user?.username || null,
+        createdAt: bill.billDate,
+        updatedAt: new Date()
+    };
+}
+
+/**
+ * Import validated bills, all or nothing.
+ * @param {Array} bills - Output of validateBills
+ * @param {Object} options - { user, chunkSize }
+ * @returns {Promise<Object>} Summary (counts, invoice range, totals, link suggestions)
+ */
+async function importBills(bills, { user = null, chunkSize = CHUNK_SIZE } = {}) {
+    const startedAt = Date.now();
+
+    const postToLedger = (await db.account.count()) > 0;
+    if (!postToLedger) {
+        console.warn('[LEDGER] SKIP: Chart of Accounts not initialized — imported invoices not posted to ledger');
+    }
+
+    const summary = await db.sequelize.transaction(async (transaction) => {
+        const customers = await resolveCustomers(bills, {}, transaction);
+        const block = await invoiceSequence.allocateInvoiceBlock(bills.length, transaction);
+
+        const result = {
+            totalBills: bills.length,
+            imported: 0,
+            itemCount: 0,
+            totalValue: 0,
+            ledgerBatches: 0,
+            customersMatched: customers.matched,
+            customersCreated: customers.created,
+            linkSuggestions: customers.suggestions,
+            firstInvoice: block.invoiceNumbers[0],
+            lastInvoice: block.invoiceNumbers[block.invoiceNumbers.length - 1]
+        };
+
+        const chunks = chunk(bills.map((bill, i) => ({ bill, invoiceNumber: block.invoiceNumbers[i] })), chunkSize);
+        for (const part of chunks) {
+            const orders = part.map(({ bill, invoiceNumber }) => buildOrderRow(bill, invoiceNumber, user));
+            const items = [];
+            part.forEach(({ bill }, i) => {
+                bill.orderItems.forEach((item, index) => {
+                    items.push({
+                        id: uuidv4(),
+                        orderId: orders[i].id,
+                        productId: item.productId || null,
+                        name: item.name,
+                        altName: item.altName || null,
+                        quantity: item.quantity,
+                        productPrice: item.productPrice,
+                        totalPrice: item.totalPrice,
+                        type: item.type,
+                        sortOrder: item.sortOrder !== undefined ? item.sortOrder : index
+                    });
+                });
+            });
+
+            await db.order.bulkCreate(orders, { transaction });
+            await db.orderItems.bulkCreate(items, { transaction });
+            await applyCustomerBalances(orders, transaction);
+            if (postToLedger) {
+                const posted = await postInvoicesToLedgerBulk(orders, transaction);
+                result.ledgerBatches += posted.batchCount;
+            }
+
+            result.imported += orders.length;
+            result.itemCount += items.length;
+            result.totalValue = round2(result.totalValue + orders.reduce((s, o) => s + o.total, 0));
+        }
+        return result;
+    });
+
+    summary.durationMs = Date.now() - startedAt;
+    summary.billsPerSecond = summary.durationMs > 0
+        ? Math.round((summary.imported / summary.durationMs) * 1000)
+        : summary.imported;
+
+    console.log(`[IMPORT] ${summary.imported}/${summary.totalBills} bills imported in ${summary.durationMs}ms (${summary.billsPerSecond} bills/s)`);
+    return summary;
+}
+
+module.exports = {
+    parseBills,
+    billsFromCSV,
+    validateBills,
+    importBills
+};
@@ -9,5 +9,21 @@ module.exports= {
         } catch (error) {
             throw error;
         }
+    },
+    listOrderItems: async (filterObj, transaction = null) => {
+        try {
+            const res = await Dao.orderItems.listOrderItems(filterObj, transaction);
+            return res;
+        } catch (error) {
+            throw error;
+        }
+    },
+    applyItemDiff: async (orderId, diff, transaction = null) => {
+        try {
+            const res = await Dao.orderItems.applyItemDiff(orderId, diff, transaction);
+            return res;
+        } catch (error) {
+            throw error;
+        }
     }
 }
\ No newline at end of file
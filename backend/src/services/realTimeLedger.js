@@ -12,6 +12,34 @@ const LedgerService = require('./ledgerService');
 
 const ledgerService = new LedgerService(db);
 
+/**
+ * The batch a reversal offsets, with its entries. A batch from a closed
+ * financial year lives in journal_batches_history: it is still offset by a
+ * reversal dated today, but the archived row itself is left untouched.
+ * @returns {Promise<Object|null>} { batch, entries, archived }
+ */
+async function findBatchToReverse(referenceType, referenceId, transaction) {
+    const batch = await db.journalBatch.findOne({
+        where: { referenceType, referenceId, isReversed: false },
+        transaction
+    });
+    if (batch) {
+        const entries = await db.ledgerEntry.findAll({ where: { batchId: batch.id }, transaction });
+        return { batch, entries, archived: false };
+    }
+
+    const [archived] = await db.sequelize.query(`
+        SELECT id, "batchNumber" FROM journal_batches_history
+        WHERE "referenceType" = :referenceType AND "referenceId" = :referenceId AND "isReversed" = false
+        LIMIT 1
+    `, { replacements: { referenceType, referenceId }, type: db.Sequelize.QueryTypes.SELECT, transaction });
+    if (!archived) return null;
+    const entries = await db.sequelize.query(`
+        SELECT "accountId", debit, credit, narration FROM ledger_entries_history WHERE "batchId" = :batchId
+    `, { replacements: { batchId: archived.id }, type: db.Sequelize.QueryTypes.SELECT, transaction });
+    return { batch: archived, entries, archived: true };
+}
+
 /**
  * Post an invoice (order) to the double-entry ledger.
  * DR: Customer Receivable Account (asset increases)
@@ -181,12 +209,8 @@ async function postPaymentToLedger(payment, customerId, customerName, transactio
  */
 async function reverseInvoiceLedger(order, transaction) {
     try {
-        // Find the original INVOICE batch
-        const originalBatch = await db.journalBatch.findOne({
-            where: { referenceType: 'INVOICE', referenceId: order.id, isReversed: false },
-            transaction
-        });
-        if (!originalBatch) {
+        const original = await findBatchToReverse('INVOICE', order.id, transaction);
+        if (!original) {
             console.log(`[LEDGER] SKIP REVERSAL: No INVOICE batch found for order ${order.orderNumber || order.id}`);
             return { skipped: true, reason: 'no_original_batch' };
         }
@@ -201,19 +225,13 @@ async function reverseInvoiceLedger(order, transaction) {
             return { skipped: true, reason: 'already_reversed' };
         }
 
-        // Fetch original entries
-        const originalEntries = await db.ledgerEntry.findAll({
-            where: { batchId: originalBatch.id },
-            transaction
-        });
-
         // Create reversal batch with swapped debit/credit
         const result = await ledgerService.createJournalBatch({
             referenceType: 'REVERSAL',
             referenceId: order.id,
             description: `Reversal of Invoice ${order.orderNumber || ''} (deleted)`,
             transactionDate: new Date(),
-            entries: originalEntries.map(e => ({
+            entries: original.entries.map(e => ({
                 accountId: e.accountId,
                 debit: Number(e.credit) || 0,
                 credit: Number(e.debit) || 0,
@@ -221,8 +239,8 @@ async function reverseInvoiceLedger(order, transaction) {
             }))
         }, transaction);
 
-        // Mark original batch as reversed
-        await originalBatch.update({ isReversed: true }, { transaction });
+        // Mark original batch as reversed (closed years are left as they were)
+        if (!original.archived) await original.batch.update({ isReversed: true }, { transaction });
 
         console.log(`[LEDGER] REVERSED: Invoice ${order.orderNumber || order.id} → batch ${result.batch.batchNumber}`);
         return { reversed: true, batchNumber: result.batch.batchNumber };
@@ -242,11 +260,8 @@ async function reverseInvoiceLedger(order, transaction) {
  */
 async function reversePaymentLedger(payment, transaction) {
     try {
-        const originalBatch = await db.journalBatch.findOne({
-            where: { referenceType: 'PAYMENT', referenceId: payment.id, isReversed: false },
-            transaction
-        });
-        if (!originalBatch) {
+        const original = await findBatchToReverse('PAYMENT', payment.id, transaction);
+        if (!original) {
             console.log(`[LEDGER] SKIP REVERSAL: No PAYMENT batch found for payment ${payment.paymentNumber || payment.id}`);
             return { skipped: true, reason: 'no_original_batch' };
         }
@@ -260,17 +275,12 @@ async function reversePaymentLedger(payment, transaction) {
             return { skipped: true, reason: 'already_reversed' };
         }
 
-        const originalEntries = await db.ledgerEntry.findAll({
-            where: { batchId: originalBatch.id },
-            transaction
-        });
-
         const result = await ledgerService.createJournalBatch({
             referenceType: 'REVERSAL',
             referenceId: payment.id,
             description: `Reversal of Payment ${payment.paymentNumber || ''} (deleted)`,
             transactionDate: new Date(),
-            entries: originalEntries.map(e => ({
+            entries: original.entries.map(e => ({
                 accountId: e.accountId,
                 debit: Number(e.credit) || 0,
                 credit: Number(e.debit) || 0,
@@ -278,7 +288,7 @@ async function reversePaymentLedger(payment, transaction) {
             }))
         }, transaction);
 
-        await originalBatch.update({ isReversed: true }, { transaction });
+        if (!original.archived) await original.batch.update({ isReversed: true }, { transaction });
 
         console.log(`[LEDGER] REVERSED: Payment ${payment.paymentNumber || payment.id} → batch ${result.batch.batchNumber}`);
         return { reversed: true, batchNumber: result.batch.batchNumber };
@@ -456,11 +466,8 @@ async function postSupplierPaymentToLedger(payment, supplierId, supplierName, tr
  */
 async function reversePurchaseLedger(purchase, transaction) {
     try {
-        const originalBatch = await db.journalBatch.findOne({
-            where: { referenceType: 'PURCHASE', referenceId: purchase.id, isReversed: false },
-            transaction
-        });
-        if (!originalBatch) {
+        const original = await findBatchToReverse('PURCHASE', purchase.id, transaction);
+        if (!original) {
             console.log(`[LEDGER] SKIP REVERSAL: No PURCHASE batch found for ${purchase.billNumber || purchase.id}`);
             return { skipped: true, reason: 'no_original_batch' };
         }
@@ -474,17 +481,12 @@ async function reversePurchaseLedger(purchase, transaction) {
             return { skipped: true, reason: 'already_reversed' };
         }
 
-        const originalEntries = await db.ledgerEntry.findAll({
-            where: { batchId: originalBatch.id },
-            transaction
-        });
-
         const result = await ledgerService.createJournalBatch({
             referenceType: 'REVERSAL',
             referenceId: purchase.id,
             description: `Reversal of Purchase ${purchase.billNumber || ''} (deleted)`,
             transactionDate: new Date(),
-            entries: originalEntries.map(e => ({
+            entries: original.entries.map(e => ({
                 accountId: e.accountId,
                 debit: Number(e.credit) || 0,
                 credit: Number(e.debit) || 0,
@@ -492,7 +494,7 @@ async function reversePurchaseLedger(purchase, transaction) {
             }))
         }, transaction);
 
-        await originalBatch.update({ isReversed: true }, { transaction });
+        if (!original.archived) await original.batch.update({ isReversed: true }, { transaction });
 
         console.log(`[LEDGER] REVERSED: Purchase ${purchase.billNumber || purchase.id} → batch ${result.batch.batchNumber}`);
         return { reversed: true, batchNumber: result.batch.batchNumber };
@@ -655,6 +657,136 @@ async function postInvoiceCashReceiptToLedger(order, transaction) {
     }
 }
 
+/**
+ * Bulk variant of postInvoiceToLedger + postInvoiceCashReceiptToLedger for
+ * freshly imported orders (no duplicate check needed — the orders are new).
+ * Resolves all customer accounts in one pass and writes every journal batch
+ * and entry with multi-row inserts.
+ *
+ * @param {Array} orders - Newly created order rows (with customerId, total, paidAmount, createdAt)
+ * @param {Object} transaction - The active Sequelize transaction
+ */
+async function postInvoicesToLedgerBulk(orders, transaction) {
+    try {
+        const postable = orders.filter(o => o.customerId && (Number(o.total) || 0) > 0);
+        if (postable.length === 0) {
+            return { posted: 0, batchCount: 0 };
+        }
+
+        const systemAccounts = await db.account.findAll({
+            where: { code: ['1100', '4100'] },
+            transaction
+        });
+        const cashAccount = systemAccounts.find(a => a.code === '1100');
+        const salesAccount = systemAccounts.find(a => a.code === '4100');
+        if (!salesAccount) {
+            throw new Error('[LEDGER] Sales Revenue account (4100) not found. Run chart of accounts initialization first.');
+        }
+        if (!cashAccount) {
+            throw new Error('[LEDGER] Cash account (1100) not found. Run chart of accounts initialization first.');
+        }
+
+        const customerAccounts = await ledgerService.getOrCreateCustomerAccounts(
+            postable.map(o => ({ id: o.customerId, name: o.customerName || 'Walk-in Customer' })),
+            transaction
+        );
+
+        const batches = [];
+        for (const order of postable) {
+            const total = Number(order.total) || 0;
+            const paidAmount = Number(order.paidAmount) || 0;
+            const customerAccount = customerAccounts.get(order.customerId);
+
+            batches.push({
+                referenceType: 'INVOICE',
+                referenceId: order.id,
+                description: `Invoice ${order.orderNumber} — ${order.customerName}`,
+                transactionDate: order.createdAt,
+                entries: [
+                    { accountId: customerAccount.id, debit: total, credit: 0, narration: `Invoice ${order.orderNumber}` },
+                    { accountId: salesAccount.id, debit: 0, credit: total, narration: `Invoice ${order.orderNumber}` }
+                ]
+            });
+
+            if (paidAmount > 0) {
+                batches.push({
+                    referenceType: 'INVOICE_CASH',
+                    referenceId: order.id,
+                    description: `Cash received for Invoice ${order.orderNumber} — ${order.customerName || 'Walk-in'}`,
+                    transactionDate: order.createdAt,
+                    entries: [
+                        { accountId: cashAccount.id, debit: paidAmount, credit: 0, narration: `Cash: Invoice ${order.orderNumber}` },
+                        { accountId: customerAccount.id, debit: 0, credit: paidAmount, narration: `Cash: Invoice ${order.orderNumber}` }
+                    ]
+                });
+            }
+        }
+
+        const result = await ledgerService.createJournalBatches(batches, transaction);
+
+        console.log(`[LEDGER] BULK POSTED: ${postable.length} invoices → ${result.batches.length} batches, ${result.entryCount} entries`);
+        return { posted: postable.length, batchCount: result.batches.length };
+
+    } catch (error) {
+        console.error(`[LEDGER] BULK ROLLBACK ERROR: ${orders.length} invoices — ${error.message}`);
+        throw error;
+    }
+}
+
+/**
+ * Post many customer receipts to the ledger at once (bulk receipt import).
+ * Same entries as postPaymentToLedger (DR Cash, CR Customer) for freshly
+ * created payments, with accounts resolved in one pass and multi-row inserts.
+ *
+ * @param {Array} payments - New payment rows (with partyId, partyName, amount, paymentNumber, transactionDate)
+ * @param {Object} transaction - The active Sequelize transaction
+ */
+async function postPaymentsToLedgerBulk(payments, transaction) {
+    try {
+        const postable = payments.filter(p => p.partyType === 'customer' && p.partyId && (Number(p.amount) || 0) > 0);
+        if (postable.length === 0) {
+            return { posted: 0, batchCount: 0 };
+        }
+
+        const cashAccount = await db.account.findOne({
+            where: { code: '1100' },
+            transaction
+        });
+        if (!cashAccount) {
+            throw new Error('[LEDGER] Cash account (1100) not found. Run chart of accounts initialization first.');
+        }
+
+        const customerAccounts = await ledgerService.getOrCreateCustomerAccounts(
+            postable.map(p => ({ id: p.partyId, name: p.partyName || 'Unknown Customer' })),
+            transaction
+        );
+
+        const batches = postable.map((payment) => {
+            const amount = Number(payment.amount);
+            const customerAccount = customerAccounts.get(payment.partyId);
+            return {
+                referenceType: 'PAYMENT',
+                referenceId: payment.id,
+                description: `Receipt ${payment.paymentNumber} — ${payment.partyName}`,
+                transactionDate: payment.transactionDate || new Date(),
+                entries: [
+                    { accountId: cashAccount.id, debit: amount, credit: 0, narration: `Receipt ${payment.paymentNumber}` },
+                    { accountId: customerAccount.id, debit: 0, credit: amount, narration: `Receipt ${payment.paymentNumber}` }
+                ]
+            };
+        });
+
+        const result = await ledgerService.createJournalBatches(batches, transaction);
+
+        console.log(`[LEDGER] BULK POSTED: ${postable.length} receipts → ${result.batches.length} batches, ${result.entryCount} entries`);
+        return { posted: postable.length, batchCount: result.batches.length };
+
+    } catch (error) {
+        console.error(`[LEDGER] BULK ROLLBACK ERROR: ${payments.length} receipts — ${error.message}`);
+        throw error;
+    }
+}
+
 module.exports = {
     postInvoiceToLedger,
     postPaymentToLedger,
@@ -664,5 +796,7 @@ module.exports = {
     postSupplierPaymentToLedger,
     reversePurchaseLedger,
     postPaymentStatusToggleToLedger,
-    postInvoiceCashReceiptToLedger
+    postInvoiceCashReceiptToLedger,
+    postInvoicesToLedgerBulk,
+    postPaymentsToLedgerBulk
 };
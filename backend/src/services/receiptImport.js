@@ -0,0 +1,317 @@
+/**
+ * Bulk Receipt Import (e.g. from a bank statement)
+ *
+ * Imports many customer receipts in one request:
+ *
+ *   1. Parse (CSV or JSON) and validate every receipt up front — nothing is
+ *      written if any receipt is invalid.
+ *   2. Resolve all parties in one query; create missing customers multi-row.
+ *   3. Per chunk of customers: load their open invoices in one query, allocate
+ *      receipts oldest-invoice-first in memory (utils/fifoAllocation), then write payments,
+ *      allocations, order updates, customer balances and PAYMENT journal
+ *      batches with set-based statements.
+ *
+ * Steps 2-3 run in ONE transaction, as for the bill import: a failure leaves
+ * no receipts and no new customers behind, so the same statement can simply
+ * be sent again without recording any receipt twice.
+ *
+ * Allocation is an explicit choice of the importing admin (`allocate: 'fifo'`).
+ * With `allocate: 'none'` receipts are recorded On Account, as with POST /payments.
+ */
+
+const uuidv4 = require('uuid/v4');
+const moment = require('moment-timezone');
+const db = require('../models');
+const Validations = require('../validations');
+const { postPaymentsToLedgerBulk } = require('./realTimeLedger');
+const { resolveCustomers, adjustCustomerBalances } = require('./customerBulk');
+const { parseCSV } = require('../utils/csv');
+const { chunk } = require('../utils/concurrency');
+const { allocateFifo, sumAllocations, paymentState } = require('../utils/fifoAllocation');
+
+const CUSTOMERS_PER_CHUNK = Number(process.env.BULK_RECEIPT_CHUNK_CUSTOMERS) || 200;
+const MAX_RECEIPTS = Number(process.env.BULK_IMPORT_MAX_RECEIPTS) || 20000;
+const DATE_FORMATS = ['DD-MM-YYYY', 'YYYY-MM-DD', 'DD/MM/YYYY'];
+const ALLOCATION_MODES = ['fifo', 'none'];
+
+const round2 = (n) => Math.round(n * 100) / 100;
+
+// ─── Parsing ─────────────────────────────────────────────────────
+
+/**
+ * Receipts from CSV, one row per receipt.
+ * Columns: paymentDate, partyName, partyMobile, amount, referenceNumber, notes
+ */
+function receiptsFromCSV(text) {
+    return parseCSV(text).map(row => ({
+        ref: `row ${row._row}`,
+        paymentDate: row.paymentDate,
+        partyName: row.partyName,
+        partyMobile: row.partyMobile,
+        amount: row.amount !== undefined ? Number(row.amount) : undefined,
+        referenceNumber: row.referenceNumber,
+        notes: row.notes
+    }));
+}
+
+/**
+ * Extract receipts from a request: text/csv body, { csv } JSON field, or { receipts: [...] }.
+ */
+function parseReceipts(req) {
+    if (typeof req.body === 'string') return receiptsFromCSV(req.body);
+    if (req.body && typeof req.body.csv === 'string') return receiptsFromCSV(req.body.csv);
+    if (req.body && Array.isArray(req.body.receipts)) {
+        return req.body.receipts.map((receipt, index) => ({ ref: `#${index + 1}`, ...receipt }));
+    }
+    return null;
+}
+
+// ─── Validation ──────────────────────────────────────────────────
+
+/**
+ * Validate every receipt with the same rules as POST /payments, plus a past-date check.
+ * @returns {{ receipts: Array, errors: Array }}
+ */
+function validateReceipts(rawReceipts) {
+    const errors = [];
+    const receipts = [];
+    const today = moment().endOf('day');
+
+    if (rawReceipts.length > MAX_RECEIPTS) {
+        return { receipts: [], errors: [{ ref: null, message: `Too many receipts (${rawReceipts.length}); maximum per import is ${MAX_RECEIPTS}` }] };
+    }
+
+    rawReceipts.forEach((raw, index) => {
+        const { ref, partyMobile, partyId, ...fields } = raw; // parties are matched by mobile/name
+        const paymentObj = {
+            ...fields,
+            paymentNumber: `PAY-${uuidv4().split('-')[0].toUpperCase()}`,
+            partyType: 'customer',
+            referenceType: 'advance'
+        };
+        Object.keys(paymentObj).forEach(k => paymentObj[k] === undefined && delete paymentObj[k]);
+
+        const { error, value } = Validations.payment.validateCreatePaymentObj(paymentObj);
+        if (error) {
+            errors.push({ ref, message: error.details[0].message });
+            return;
+        }
+
+        const date = moment(value.paymentDate, DATE_FORMATS, true);
+        if (!date.isValid()) {
+            errors.push({ ref, message: `Invalid paymentDate "${value.paymentDate}" (expected DD-MM-YYYY)` });
+            return;
+        }
+        if (date.isAfter(today)) {
+            errors.push({ ref, message: `paymentDate ${value.paymentDate} is in the future` });
+            return;
+        }
+
+        receipts.push({
+            ...value,
+            partyMobile: partyMobile ? String(partyMobile).trim() : undefined,
+            paymentDate: date.format('DD-MM-YYYY'),
+            receiptDate: date.toDate(),
+            _index: index
+        });
+    });
+
+    return { receipts, errors };
+}
+
+// ─── Open invoices ───────────────────────────────────────────────
+
+/**
+ * Open invoices for many customers in one query, oldest first, with the amount
+ * still due (net of POS cash and existing allocations).
+ */
+async function loadOpenInvoices(customerIds, transaction) {
+    const [rows] = await db.sequelize.query(`
+        SELECT o.id, o."orderNumber", o."customerId", o.total, o."paidAmount",
+               COALESCE(a.allocated, 0) AS allocated
+        FROM orders o
+        LEFT JOIN (
+            SELECT "orderId", SUM(amount) AS allocated
+            FROM receipt_allocations
+            WHERE "isDeleted" = false
+            GROUP BY "orderId"
+        ) a ON a."orderId" = o.id
+        WHERE o."customerId" IN (:customerIds)
+          AND o."isDeleted" = false
+          AND o."paymentStatus" != 'paid'
+        ORDER BY o."createdAt" ASC, o."orderNumber" ASC
+        FOR UPDATE OF o
+    `, { replacements: { customerIds }, transaction });
+
+    const byCustomer = new Map();
+    for (const row of rows) {
+        const total = Number(row.total) || 0;
+        const paid = Math.max(Number(row.paidAmount) || 0, Number(row.allocated) || 0);
+        const open = round2(total - paid);
+        if (open <= 0) continue;
+        if (!byCustomer.has(row.customerId)) byCustomer.set(row.customerId, []);
+        byCustomer.get(row.customerId).push({ id: row.id, orderNumber: row.orderNumber, total, paid, open });
+    }
+    return byCustomer;
+}
+
+/**
+ * Set paidAmount/dueAmount/paymentStatus for many orders in one statement.
+ */
+async function updateOrderPayments(updates, transaction) {
+    if (updates.length === 0) return;
+    const replacements = [];
+    const values = updates.map((u) => {
+        replacements.push(u.id, u.paidAmount, u.dueAmount, u.paymentStatus);
+        return '(?::uuid, ?::double precision, ?::double precision, ?)';
+    });
+    await db.sequelize.query(
+        `UPDATE orders SET "paidAmount" = v.paid, "dueAmount" = v.due,
+                "paymentStatus" = v.status::"enum_orders_paymentStatus", "updatedAt" = NOW()
+         FROM (VALUES ${values.join(', ')}) AS v(id, paid, due, status)
+         WHERE orders.id = v.id`,
+        { replacements, transaction }
+    );
+}
+
+// ─── Import ──────────────────────────────────────────────────────
+
+/**
+ * Import validated receipts, all or nothing.
+ * @param {Array} receipts - Output of validateReceipts
+ * @param {Object} options - { user, allocate: 'fifo' | 'none', customersPerChunk }
+ * @returns {Promise<Object>} Summary
+ */
+async function importReceipts(receipts, { user = null, allocate = 'fifo', customersPerChunk = CUSTOMERS_PER_CHUNK } = {}) {
+    if (!ALLOCATION_MODES.includes(allocate)) {
+        throw new Error(`allocate must be one of: ${ALLOCATION_MODES.join(', ')}`);
+    }
+    const startedAt = Date.now();
+    const allocatedByName = user?.name || user?.username || null;
+
+    const postToLedger = (await db.account.count()) > 0;
+    if (!postToLedger) {
+        console.warn('[LEDGER] SKIP: Chart of Accounts not initialized — imported receipts not posted to ledger');
+    }
+
+    const summary = await db.sequelize.transaction(async (transaction) => {
+        const customers = await resolveCustomers(receipts, { nameField: 'partyName', mobileField: 'partyMobile', idField: 'partyId' }, transaction);
+
+        // Oldest receipt first within each customer
+        const byCustomer = new Map();
+        for (const receipt of receipts) {
+            if (!byCustomer.has(receipt.partyId)) byCustomer.set(receipt.partyId, []);
+            byCustomer.get(receipt.partyId).push(receipt);
+        }
+        for (const list of byCustomer.values()) {
+            list.sort((a, b) => a.receiptDate - b.receiptDate || a._index - b._index);
+        }
+
+        const result = {
+            totalReceipts: receipts.length,
+            imported: 0,
+            totalAmount: 0,
+            allocate,
+            allocationCount: 0,
+            allocatedAmount: 0,
+            onAccountAmount: 0,
+            invoicesSettled: 0,
+            ledgerBatches: 0,
+            customersMatched: customers.matched,
+            customersCreated: customers.created,
+            linkSuggestions: customers.suggestions
+        };
+
+        for (const customerIds of chunk([...byCustomer.keys()], customersPerChunk)) {
+            const payments = [];
+            const allocations = [];
+            const orderUpdates = [];
+            const balanceDeltas = new Map();
+            let settled = 0;
+
+            // Receipts left unlinked (see resolveCustomers) stay on account under partyName
+            const linkedIds = customerIds.filter(Boolean);
+            const openInvoices = allocate === 'fifo' && linkedIds.length > 0
+                ? await loadOpenInvoices(linkedIds, transaction)
+                : new Map();
+
+            for (const customerId of customerIds) {
+                const customerReceipts = byCustomer.get(customerId).map(r => ({ ...r, id: uuidv4() }));
+                for (const r of customerReceipts) {
+                    payments.push({
+                        id: r.id,
+                        paymentNumber: r.paymentNumber,
+                        paymentDate: r.paymentDate,
+                        partyId: customerId || null,
+                        partyName: r.partyName,
+                        partyType: 'customer',
+                        amount: r.amount,
+                        referenceType: 'advance',
+                        referenceNumber: r.referenceNumber || null,
+                        notes: r.notes || null,
+                        transactionDate: r.receiptDate
+                    });
+                    if (customerId) balanceDeltas.set(customerId, (balanceDeltas.get(customerId) || 0) - r.amount);
+                }
+
+                const invoices = openInvoices.get(customerId) || [];
+                if (invoices.length === 0) continue;
+
+                const { allocations: customerAllocations } = allocateFifo(invoices, customerReceipts);
+                for (const a of customerAllocations) {
+                    allocations.push({
+                        id: uuidv4(),
+                        ...a,
+                        allocatedBy: user?.id || null,
+                        allocatedByName,
+                        notes: 'Bulk receipt import (FIFO)',
+                        isDeleted: false
+                    });
+                }
+                const allocatedPerInvoice = sumAllocations(customerAllocations, 'orderId');
+                for (const invoice of invoices) {
+                    const added = allocatedPerInvoice.get(invoice.id);
+                    if (!added) continue;
+                    const state = paymentState(invoice.total, invoice.paid + added);
+                    if (state.paymentStatus === 'paid') settled++;
+                    orderUpdates.push({ id: invoice.id, ...state });
+                }
+            }
+
+            await db.payment.bulkCreate(payments.map(({ transactionDate, ...p }) => p), { transaction });
+            if (allocations.length > 0) {
+                await db.receiptAllocation.bulkCreate(allocations, { transaction });
+            }
+            await updateOrderPayments(orderUpdates, transaction);
+            await adjustCustomerBalances(balanceDeltas, transaction, { floorAtZero: true });
+
+            if (postToLedger) {
+                const posted = await postPaymentsToLedgerBulk(payments, transaction);
+                result.ledgerBatches += posted.batchCount;
+            }
+
+            result.imported += payments.length;
+            result.totalAmount = round2(result.totalAmount + payments.reduce((s, p) => s + p.amount, 0));
+            result.allocationCount += allocations.length;
+            result.allocatedAmount = round2(result.allocatedAmount + allocations.reduce((s, a) => s + a.amount, 0));
+            result.invoicesSettled += settled;
+        }
+        return result;
+    });
+
+    summary.onAccountAmount = round2(summary.totalAmount - summary.allocatedAmount);
+    summary.durationMs = Date.now() - startedAt;
+    summary.receiptsPerSecond = summary.durationMs > 0
+        ? Math.round((summary.imported / summary.durationMs) * 1000)
+        : summary.imported;
+
+    console.log(`[IMPORT] ${summary.imported}/${summary.totalReceipts} receipts imported in ${summary.durationMs}ms (${summary.allocationCount} allocations)`);
+    return summary;
+}
+
+module.exports = {
+    parseReceipts,
+    receiptsFromCSV,
+    validateReceipts,
+    importReceipts
+};
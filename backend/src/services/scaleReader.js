@@ -0,0 +1,113 @@
+/**
+ * Weighing Scale Reader
+ *
+ * Reads weights from the serial scale. Only one process may own the serial
+ * port: in single-process mode that is the server itself, in cluster mode it
+ * is the leader (primary), which relays every reading to the HTTP workers over
+ * IPC. Workers keep the latest reading in memory, so GET /products/weights
+ * never touches the device.
+ */
+
+const fs = require('fs');
+const cluster = require('cluster');
+
+const DEV_PATH = process.env.SCALE_DEVICE || '/dev/cu.usbserial-1420';
+const IPC_MESSAGE = 'scale:reading';
+
+let reading = {
+    weight: 0,
+    connectionStatus: 'disconnected', // 'connected', 'disconnected', 'error'
+    lastDataReceived: null // Timestamp of last data received
+};
+const listeners = new Set();
+let started = false;
+
+function update(changes) {
+    reading = { ...reading, ...changes };
+    for (const listener of listeners) listener(reading);
+}
+
+/**
+ * Open the serial port and start reading. Call once, from the leader only.
+ */
+function start() {
+    if (started) return;
+    started = true;
+
+    if (!fs.existsSync(DEV_PATH)) {
+        console.log("Serial device NOT found → skipping serial initialization");
+        update({ connectionStatus: 'disconnected' });
+        return;
+    }
+
+    console.log("Serial device found → opening:", DEV_PATH);
+    try {
+        const { SerialPort } = require('serialport');
+        const { ReadlineParser } = require('@serialport/parser-readline');
+
+        const port = new SerialPort({ path: DEV_PATH, baudRate: 9600 });
+        const parser = port.pipe(new ReadlineParser({ delimiter: '\n' }));
+
+        port.on('open', () => {
+            console.log("Serial port opened successfully");
+            update({ connectionStatus: 'connected' });
+        });
+
+        parser.on('data', (line) => {
+            const data = Number(line.trim());
+            if (!isNaN(data) && data !== reading.weight) {
+                update({ weight: data, lastDataReceived: Date.now(), connectionStatus: 'connected' });
+            }
+        });
+
+        port.on('error', (e) => {
+            console.log("SerialPort Error:", e.message);
+            update({ connectionStatus: 'error' });
+        });
+
+        port.on('close', () => {
+            console.log("Serial port closed");
+            update({ connectionStatus: 'disconnected' });
+        });
+    } catch (err) {
+        console.log("Failed to open serial port:", err.message);
+        update({ connectionStatus: 'error' });
+    }
+}
+
+/**
+ * Latest reading: { weight, connectionStatus, lastDataReceived }
+ */
+function getReading() {
+    return reading;
+}
+
+/**
+ * Subscribe to reading changes (used by the leader to relay to workers).
+ * @returns {Function} unsubscribe
+ */
+function onReading(listener) {
+    listeners.add(listener);
+    return () => listeners.delete(listener);
+}
+
+/**
+ * IPC message carrying a reading, for cluster workers.
+ */
+function toMessage(value = reading) {
+    return { type: IPC_MESSAGE, reading: value };
+}
+
+// Cluster workers receive readings from the leader
+if (cluster.isWorker) {
+    process.on('message', (msg) => {
+        if (msg && msg.type === IPC_MESSAGE) reading = msg.reading;
+    });
+}
+
+module.exports = {
+    start,
+    getReading,
+    onReading,
+    toMessage
+};
@@ -1,6 +1,26 @@
+const moment = require('moment-timezone');
 const DAO = require('../dao');
 const db = require('../models');
 
+// First movement for a product without a stock row: create the row and log it
+async function openStock(productId, type, quantity, newStock, transactionData, transaction) {
+    await DAO.stock.upsertStock(productId, {
+        currentStock: newStock,
+        lastUpdated: new Date()
+    }, transaction);
+
+    await DAO.stock.createStockTransaction({
+        productId,
+        type,
+        quantity,
+        previousStock: 0,
+        newStock,
+        ...transactionData
+    }, transaction);
+
+    return { previousStock: 0, newStock, quantity };
+}
+
 module.exports = {
     // Get stock by product ID
     getStockByProductId: async (productId) => {
@@ -17,85 +37,111 @@ module.exports = {
         return await DAO.stock.getStockSummary();
     },
 
-    // Add stock (Stock In)
-    addStock: async (productId, quantity, transactionData, transaction = null) => {
-        const stock = await DAO.stock.getStockByProductId(productId);
-        const previousStock = stock?.currentStock || 0;
-        const newStock = previousStock + quantity;
-
-        // Update stock
-        await DAO.stock.upsertStock(productId, {
-            currentStock: newStock,
-            lastUpdated: new Date()
-        }, transaction);
-
-        // Create transaction record
-        await DAO.stock.createStockTransaction({
-            productId,
-            type: 'in',
-            quantity,
-            previousStock,
-            newStock,
-            ...transactionData
-        }, transaction);
+    // Low-stock alert feed; pass the returned cursor back to get only what changed since
+    getLowStockFeed: async ({ since, afterId, limit }) => {
+        const rows = await DAO.stock.listLowStockChanges({ since, afterId, limit });
+        const last = rows[rows.length - 1];
+        return {
+            rows: rows.map(({ cursor, ...row }) => row),
+            cursor: last ? { since: last.cursor, afterId: last.id } : { since: since || null, afterId: afterId || null },
+            hasMore: rows.length === limit
+        };
+    },
 
-        return { previousStock, newStock, quantity };
+    // Add stock (Stock In) — one atomic statement once the product has a stock row
+    addStock: async (productId, quantity, transactionData, transaction = null) => {
+        const [moved] = await DAO.stock.applyStockDeltas(
+            [{ productId, delta: quantity }], { type: 'in', ...transactionData }, transaction
+        );
+        if (moved) {
+            return { previousStock: moved.previousStock, newStock: moved.newStock, quantity };
+        }
+        return await openStock(productId, 'in', quantity, quantity, transactionData, transaction);
     },
 
-    // Remove stock (Stock Out)
+    // Remove stock (Stock Out) — floors at zero
     removeStock: async (productId, quantity, transactionData, transaction = null) => {
-        const stock = await DAO.stock.getStockByProductId(productId);
-        const previousStock = stock?.currentStock || 0;
-        const newStock = Math.max(0, previousStock - quantity);
-
-        // Update stock
-        await DAO.stock.upsertStock(productId, {
-            currentStock: newStock,
-            lastUpdated: new Date()
-        }, transaction);
-
-        // Create transaction record
-        await DAO.stock.createStockTransaction({
-            productId,
-            type: 'out',
-            quantity,
-            previousStock,
-            newStock,
-            ...transactionData
-        }, transaction);
-
-        return { previousStock, newStock, quantity };
+        const [moved] = await DAO.stock.applyStockDeltas(
+            [{ productId, delta: -quantity }], { type: 'out', floorAtZero: true, ...transactionData }, transaction
+        );
+        if (moved) {
+            return { previousStock: moved.previousStock, newStock: moved.newStock, quantity };
+        }
+        return await openStock(productId, 'out', quantity, 0, transactionData, transaction);
     },
 
     // Adjust stock (manual adjustment)
     adjustStock: async (productId, newStockValue, transactionData, transaction = null) => {
-        const stock = await DAO.stock.getStockByProductId(productId);
-        const previousStock = stock?.currentStock || 0;
-        const quantity = Math.abs(newStockValue - previousStock);
+        const adjusted = await DAO.stock.setStockLevel(productId, newStockValue, transactionData, transaction);
+        if (adjusted) {
+            return {
+                previousStock: adjusted.previousStock,
+                newStock: adjusted.newStock,
+                quantity: Math.abs(adjusted.newStock - adjusted.previousStock)
+            };
+        }
+        return await openStock(productId, 'adjustment', newStockValue, newStockValue, transactionData, transaction);
+    },
 
-        // Update stock
-        await DAO.stock.upsertStock(productId, {
-            currentStock: newStockValue,
-            lastUpdated: new Date()
+    // Apply every line of a bill or purchase bill in one statement.
+    // type: 'out' (sale) or 'in' (purchase). Items without a productId
+    // (direct entries) and products without a stock row are skipped.
+    // Returns { applied, skipped, movements: [{ productId, previousStock, newStock, delta }] }
+    applyMovements: async (type, items, transactionData = {}, transaction = null) => {
+        const sign = type === 'out' ? -1 : 1;
+        const totals = new Map();
+        for (const item of items) {
+            const quantity = Number(item.quantity);
+            if (!item.productId || !(quantity > 0)) continue;
+            totals.set(item.productId, (totals.get(item.productId) || 0) + quantity);
+        }
+        const movements = [...totals.entries()]
+            .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+            .map(([productId, quantity]) => ({ productId, delta: sign * quantity }));
+
+        const moved = await DAO.stock.applyStockDeltas(movements, {
+            type,
+            floorAtZero: type === 'out',
+            transactionDate: moment().format('YYYY-MM-DD'),
+            ...transactionData
         }, transaction);
 
-        // Create transaction record
-        await DAO.stock.createStockTransaction({
-            productId,
-            type: 'adjustment',
-            quantity,
-            previousStock,
-            newStock: newStockValue,
+        return { applied: moved.length, skipped: movements.length - moved.length, movements: moved };
+    },
+
+    // Return the stock deducted for a document (e.g. a deleted bill), read
+    // back from its stock_transactions — net of stock an edit already returned
+    // (bill lines saved before they kept productId have no other record)
+    reverseMovements: async (referenceType, referenceId, transactionData = {}, transaction = null) => {
+        const logged = await db.stockTransaction.findAll({
+            where: { referenceType, referenceId },
+            attributes: ['productId', 'type', 'quantity'],
+            raw: true,
+            transaction
+        });
+        const held = new Map();
+        for (const t of logged) {
+            const sign = t.type === 'out' ? 1 : t.type === 'in' ? -1 : 0;
+            held.set(t.productId, (held.get(t.productId) || 0) + sign * (Number(t.quantity) || 0));
+        }
+        const outward = [...held.entries()]
+            .filter(([, quantity]) => quantity > 0)
+            .map(([productId, quantity]) => ({ productId, quantity }));
+        if (outward.length === 0) return { applied: 0, skipped: 0, movements: [] };
+
+        return await module.exports.applyMovements('in', outward, {
+            referenceType: `${referenceType}_reversal`,
+            referenceId,
             ...transactionData
         }, transaction);
-
-        return { previousStock, newStock: newStockValue, quantity };
     },
 
     // Set minimum stock level
     setMinStockLevel: async (productId, minStockLevel) => {
+        // lastUpdated moves too: the level decides low-stock status, which the alert feed tracks
         return await DAO.stock.upsertStock(productId, {
-            minStockLevel
+            minStockLevel,
+            lastUpdated: new Date()
         });
     },
 
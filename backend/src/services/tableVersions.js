@@ -0,0 +1,80 @@
+/**
+ * Per-table change counters for conditional GETs
+ *
+ * Every insert, update, delete or truncate on a versioned table bumps that
+ * table's "<table>_version_seq" from a statement-level trigger. Sequences are
+ * not transactional and take no row locks, so concurrent bills never queue on
+ * a counter; reading one is a single-page lookup.
+ *
+ * Because nextval() is visible before the writer commits, a counter alone
+ * could name data a reader cannot see yet. The trigger therefore also takes a
+ * shared transaction-level advisory lock on the table's key before bumping,
+ * held until the writer commits. validator() reads the counters first and then
+ * tries those keys exclusively; if any is held, a write to one of its tables
+ * is in flight and it returns null — the response simply goes out without an
+ * ETag. Writes to other tables (audit logs, idempotency keys …) never count.
+ */
+
+const db = require('../models');
+
+const TABLES = ['orders', 'orderItems', 'payments', 'customers', 'suppliers', 'products', 'purchaseBills'];
+
+const sequenceName = (table) => `${table}_version_seq`;
+
+// Advisory lock keys: (hashtext('table_version'), hashtext(<table>))
+const LOCK_NAMESPACE = "hashtext('table_version')";
+const lockKey = (tableSql) => `${LOCK_NAMESPACE}, hashtext(${tableSql})`;
+
+/**
+ * Install the counters and triggers. Idempotent — run by the migration and
+ * again after sync() on a fresh database.
+ */
+async function install(sequelize = db.sequelize) {
+    await sequelize.query(`
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock_shared(${lockKey('TG_TABLE_NAME')});
+            PERFORM nextval(quote_ident(TG_TABLE_NAME || '_version_seq'));
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    `);
+    for (const table of TABLES) {
+        await sequelize.query(`CREATE SEQUENCE IF NOT EXISTS "${sequenceName(table)}"`);
+        await sequelize.query(`DROP TRIGGER IF EXISTS "${table}_version_bump" ON "${table}"`);
+        await sequelize.query(`
+            CREATE TRIGGER "${table}_version_bump"
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "${table}"
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        `);
+    }
+}
+
+/**
+ * Validator for a response built from `tables`, or null when a write may be
+ * in flight (the response must not be cached under the current counters).
+ * @param {string[]} tables - subset of TABLES
+ * @returns {Promise<string|null>} e.g. "orders:812,orderItems:3377"
+ */
+async function validator(tables) {
+    const [counters] = await db.sequelize.query(
+        `SELECT ${tables.map((t, i) => `(SELECT last_value FROM "${sequenceName(t)}") AS v${i}`).join(', ')}`,
+        { type: db.sequelize.QueryTypes.SELECT }
+    );
+    // Separate statement, after the counters were read: a writer that bumped one
+    // still holds its table's shared key until it commits. The exclusive try-lock
+    // is released when this statement ends; two readers colliding here only
+    // costs one of them its ETag.
+    const [{ quiet }] = await db.sequelize.query(
+        `SELECT ${tables.map(t => `pg_try_advisory_xact_lock(${lockKey(`'${t}'`)})`).join(' AND ')} AS quiet`,
+        { type: db.sequelize.QueryTypes.SELECT }
+    );
+    if (!quiet) return null;
+    return tables.map((t, i) => `${t}:${counters[`v${i}`]}`).join(',');
+}
+
+module.exports = {
+    TABLES,
+    install,
+    validator
+};
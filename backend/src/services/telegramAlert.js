@@ -141,6 +141,22 @@ function alertPaymentToggle(details) {
     sendTelegram(msg).catch(e => console.error('[TELEGRAM] Alert failed:', e.message));
 }
 
+function alertBulkImport(details) {
+    const { imported, totalBills, totalValue, firstInvoice, lastInvoice, customersCreated, linkSuggestions, user } = details;
+    const msg = [
+        `📥 <b>PAST SALES IMPORTED</b>`,
+        ``,
+        `<b>Bills:</b> ${imported} of ${totalBills}`,
+        `<b>Value:</b> ₹${(totalValue || 0).toLocaleString('en-IN')}`,
+        imported > 0 ? `<b>Invoices:</b> ${esc(firstInvoice)} → ${esc(lastInvoice)}` : '',
+        customersCreated ? `<b>New customers:</b> ${customersCreated}` : '',
+        linkSuggestions?.length ? `⚠️ <b>Not linked (name matches, mobile differs):</b> ${linkSuggestions.length}` : '',
+        `<b>By:</b> ${esc(user) || 'Unknown'}`,
+        `<b>Time:</b> ${new Date().toLocaleString('en-IN', { timeZone: 'Asia/Kolkata' })}`
+    ].filter(Boolean).join('\n');
+    sendTelegram(msg).catch(e => console.error('[TELEGRAM] Alert failed:', e.message));
+}
+
 function alertUnusedWeight(details) {
     const { weight, userId, timestamp } = details;
     const msg = [
@@ -398,232 +414,19 @@ async function sendDailySummary() {
 /**
  * Send complete bill audit report to Telegram.
  * Mirrors the /bill-audit UI — both "Item Deletions" and "Weight Fetches" tabs.
- * Splits into multiple messages if needed (Telegram 4096 char limit).
+ * The report itself is built by services/auditReport.js; this packs it into
+ * as few messages as the Telegram 4096 char limit allows.
  * 
  * @param {Object} options - { startDate, endDate } (defaults to today)
  */
 async function sendFullAuditReport(options = {}) {
     try {
-        const { Op } = require('sequelize');
-        const startDate = options.startDate ? new Date(options.startDate) : new Date(new Date().setHours(0, 0, 0, 0));
-        const endDate = options.endDate ? new Date(new Date(options.endDate).setHours(23, 59, 59, 999)) : new Date(new Date().setHours(23, 59, 59, 999));
-        const dateRange = { [Op.gte]: startDate, [Op.lte]: endDate };
-        const dateLabel = startDate.toLocaleDateString('en-IN', { day: '2-digit', month: 'short', year: 'numeric', timeZone: 'Asia/Kolkata' });
-
-        const messages = [];
-
-        // ═══════════════════════════════════════════════
-        // PART 1: ITEM DELETIONS TAB
-        // ═══════════════════════════════════════════════
-        let auditLogs = [];
-        try {
-            auditLogs = await db.billAuditLog.findAll({
-                where: { createdAt: dateRange },
-                order: [['createdAt', 'DESC']]
-            });
-        } catch (e) { /* table may not exist */ }
-
-        const itemRemovals = auditLogs.filter(l => l.eventType === 'ITEM_REMOVED');
-        const billClears = auditLogs.filter(l => l.eventType === 'BILL_CLEARED');
-        const billDeletes = auditLogs.filter(l => l.eventType === 'BILL_DELETED');
-        const totalDeletedValue = auditLogs.reduce((s, l) => s + (Number(l.totalPrice) || 0), 0);
-
-        const fmt = (v) => `₹${(Number(v) || 0).toLocaleString('en-IN')}`;
-        const timeStr = (d) => new Date(d).toLocaleString('en-IN', { 
-            hour: '2-digit', minute: '2-digit', second: '2-digit', 
-            hour12: true, timeZone: 'Asia/Kolkata' 
-        });
-
-        // Header message
-        let header = [
-            `📊 <b>COMPLETE BILL AUDIT REPORT</b>`,
-            `📅 ${dateLabel}`,
-            ``,
-            `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            `📋 <b>TAB 1: ITEM DELETIONS</b>`,
-            `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            ``,
-            `<b>Summary:</b>`,
-            `• Item Removals: <b>${itemRemovals.length}</b>`,
-            `• Bill Clears: <b>${billClears.length}</b>`,
-            `• Bill Deletes: <b>${billDeletes.length}</b>`,
-            `• Total Deleted Value: <b>${fmt(totalDeletedValue)}</b>`,
-        ];
-
-        if (itemRemovals.length === 0 && billClears.length === 0 && billDeletes.length === 0) {
-            header.push('', '<i>No deletion events recorded.</i>');
-        }
-
-        messages.push(header.join('\n'));
-
-        // Item removal details (batched to fit Telegram limit)
-        if (itemRemovals.length > 0) {
-            let batch = [``, `<b>🚨 Item Removals (${itemRemovals.length}):</b>`, ``];
-
-            for (let i = 0; i < itemRemovals.length; i++) {
-                const log = itemRemovals[i];
-                const isScale = log.deviceInfo?.includes('WEIGHTED');
-                const entry = [
-                    `<b>${i + 1}.</b> ${esc(log.productName)}`,
-                    `   Qty: ${log.quantity || '-'} | Price: ${fmt(log.price)} | Value: <b>${fmt(log.totalPrice)}</b>`,
-                    `   Type: ${isScale ? '⚖️ Scale' : '✏️ Manual'} | By: ${esc(log.userName) || '?'}`,
-                    `   Time: ${timeStr(log.createdAt)}`,
-                    log.invoiceContext ? `   Invoice: <code>${esc(log.invoiceContext)}</code>` : '',
-                    log.customerName ? `   Customer: ${esc(log.customerName)}` : '',
-                    ``
-                ].filter(Boolean).join('\n');
-
-                if ((batch.join('\n') + entry).length > 3800) {
-                    messages.push(batch.join('\n'));
-                    batch = [`<b>...continued:</b>`, ``];
-                }
-                batch.push(entry);
-            }
-            if (batch.length > 2) messages.push(batch.join('\n'));
-        }
-
-        // Bill clears
-        if (billClears.length > 0) {
-            let batch = [`<b>🧹 Bill Clears (${billClears.length}):</b>`, ``];
-            for (const log of billClears) {
-                batch.push(`• ${esc(log.productName)} — ${fmt(log.totalPrice)} | By: ${esc(log.userName)} | ${timeStr(log.createdAt)}`);
-            }
-            messages.push(batch.join('\n'));
-        }
-
-        // Bill deletes
-        if (billDeletes.length > 0) {
-            let batch = [`<b>🗑️ Bill Deletes (${billDeletes.length}):</b>`, ``];
-            for (const log of billDeletes) {
-                batch.push([
-                    `• ${esc(log.productName) || 'Bill'} — <b>${fmt(log.totalPrice)}</b>`,
-                    `  By: ${esc(log.userName)} | ${timeStr(log.createdAt)}`,
-                    log.invoiceContext ? `  Invoice: <code>${esc(log.invoiceContext)}</code>` : '',
-                    ``
-                ].filter(Boolean).join('\n'));
-            }
-            messages.push(batch.join('\n'));
-        }
-
-        // ═══════════════════════════════════════════════
-        // PART 2: WEIGHT FETCHES TAB
-        // ═══════════════════════════════════════════════
-        let weightLogs = [];
-        try {
-            weightLogs = await db.weightLog.findAll({
-                where: { createdAt: dateRange },
-                order: [['createdAt', 'DESC']]
-            });
-        } catch (e) { /* table may not exist */ }
-
-        const consumedWeights = weightLogs.filter(w => w.consumed);
-        const unmatchedWeights = weightLogs.filter(w => !w.consumed);
-        const totalUnmatchedKg = unmatchedWeights.reduce((s, w) => s + (Number(w.weight) || 0), 0);
-
-        let weightMsg = [
-            `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            `⚖️ <b>TAB 2: WEIGHT FETCHES</b>`,
-            `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            ``,
-            `<b>Summary:</b>`,
-            `• Total Fetches: <b>${weightLogs.length}</b>`,
-            `• Added to Bill: <b>${consumedWeights.length}</b>`,
-            `• NOT Added to Bill: <b>${unmatchedWeights.length}</b>${unmatchedWeights.length > 0 ? ' ⚠️' : ''}`,
-            `• Unmatched Weight: <b>${totalUnmatchedKg.toFixed(2)} kg</b>`,
-        ];
-
-        if (weightLogs.length === 0) {
-            weightMsg.push('', '<i>No weight readings recorded.</i>');
-        }
-
-        if (unmatchedWeights.length > 0) {
-            weightMsg.push('', `<b>⚠️ Unmatched Weights (${unmatchedWeights.length}):</b>`, ``);
-            for (const w of unmatchedWeights.slice(0, 20)) {
-                weightMsg.push(`• <b>${Number(w.weight).toFixed(3)} kg</b> — ${timeStr(w.createdAt)} — By: ${esc(w.userName) || '?'}`);
-            }
-            if (unmatchedWeights.length > 20) {
-                weightMsg.push(`<i>...and ${unmatchedWeights.length - 20} more</i>`);
-            }
-        }
-
-        if (consumedWeights.length > 0) {
-            weightMsg.push('', `<b>✅ Added to Bill (${consumedWeights.length}):</b>`, ``);
-            for (const w of consumedWeights.slice(0, 15)) {
-                weightMsg.push(`• ${Number(w.weight).toFixed(3)} kg → ${esc(w.orderNumber) || '?'} | ${timeStr(w.createdAt)}`);
-            }
-            if (consumedWeights.length > 15) {
-                weightMsg.push(`<i>...and ${consumedWeights.length - 15} more</i>`);
-            }
-        }
-
-        messages.push(weightMsg.join('\n'));
-
-        // ═══════════════════════════════════════════════
-        // PART 3: PAYMENT TOGGLES
-        // ═══════════════════════════════════════════════
-        let toggleCount = 0;
-        try {
-            toggleCount = await db.journalBatch.count({
-                where: { referenceType: 'PAYMENT_TOGGLE', createdAt: dateRange }
-            });
-        } catch (e) { /* ok */ }
-
-        if (toggleCount > 0) {
-            let toggleMsg = [
-                ``,
-                `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-                `💱 <b>PAYMENT TOGGLES: ${toggleCount}</b>`,
-                `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            ];
-
-            try {
-                const toggleBatches = await db.journalBatch.findAll({
-                    where: { referenceType: 'PAYMENT_TOGGLE', createdAt: dateRange },
-                    order: [['createdAt', 'DESC']],
-                    limit: 20
-                });
-                for (const b of toggleBatches) {
-                    toggleMsg.push(`• ${esc((b.description || 'Toggle').substring(0, 80))} — ₹${b.totalDebit}`);
-                }
-            } catch (e) { /* ok */ }
-
-            messages.push(toggleMsg.join('\n'));
-        }
-
-        // ═══════════════════════════════════════════════
-        // FOOTER
-        // ═══════════════════════════════════════════════
-        const redFlags = [];
-        if (itemRemovals.length > 3) redFlags.push(`${itemRemovals.length} items deleted`);
-        if (billDeletes.length > 0) redFlags.push(`${billDeletes.length} bills deleted`);
-        if (unmatchedWeights.length > 2) redFlags.push(`${unmatchedWeights.length} unused weights`);
-        if (toggleCount > 4) redFlags.push(`${toggleCount} payment toggles`);
-
-        const alertLevel = redFlags.length >= 3 ? '🔴 HIGH RISK' :
-                          redFlags.length >= 1 ? '🟡 NEEDS ATTENTION' : '🟢 ALL CLEAR';
-
-        let footer = [
-            `━━━━━━━━━━━━━━━━━━━━━━━━━━`,
-            `<b>Overall: ${alertLevel}</b>`,
-        ];
-        if (redFlags.length > 0) {
-            footer.push('Red flags: ' + redFlags.map(f => esc(f)).join(', '));
-        }
-        footer.push(`<i>Report generated at ${new Date().toLocaleString('en-IN', { timeZone: 'Asia/Kolkata' })}</i>`);
-
-        messages.push(footer.join('\n'));
-
-        // Send all messages sequentially
-        for (const msg of messages) {
-            if (msg.trim()) {
-                await sendTelegram(msg);
-                // Small delay between messages to avoid rate limiting
-                await new Promise(r => setTimeout(r, 300));
-            }
-        }
+        // Lazy require — auditReport depends on this module
+        const auditReport = require('./auditReport');
+        const result = await auditReport.generateFullAuditReport(options, auditReport.telegramSink());
 
-        console.log(`[TELEGRAM] Full audit report sent (${messages.length} messages)`);
-        return { sent: true, messageCount: messages.length, alertLevel };
+        console.log(`[TELEGRAM] Full audit report sent (${result.messageCount} messages)`);
+        return { sent: true, messageCount: result.messageCount, alertLevel: result.alertLevel };
 
     } catch (error) {
         console.error('[TELEGRAM] Failed to send full audit report:', error.message);
@@ -639,6 +442,7 @@ module.exports = {
     alertPaymentToggle,
     alertUnusedWeight,
     alertOrderCreated,
+    alertBulkImport,
     sendDailySummary,
     sendFullAuditReport
 };
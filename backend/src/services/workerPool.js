@@ -0,0 +1,116 @@
+/**
+ * Worker Thread Pool
+ *
+ * Runs CPU-heavy formatting (CSV exports, GST export, party statements, audit
+ * report rendering) off the event loop so a large export does not stall bill
+ * creation in the same process. Tasks live in workers/tasks.js.
+ *
+ *   await runTask('csv', { headers, rows }, { size: rows.length })
+ *
+ * Inputs smaller than WORKER_POOL_THRESHOLD (default 2000 rows) run inline —
+ * copying the payload to a worker costs more than formatting it. Threads are
+ * started lazily, up to WORKER_POOL_SIZE (default: CPUs − 1, max 4; 1 per
+ * process in cluster mode), and jobs beyond that queue.
+ */
+
+const os = require('os');
+const path = require('path');
+const { Worker } = require('worker_threads');
+const tasks = require('../workers/tasks');
+const { isClustered } = require('../cluster');
+
+const WORKER_FILE = path.join(__dirname, '../workers/taskWorker.js');
+const THRESHOLD = Number(process.env.WORKER_POOL_THRESHOLD) || 2000;
+const POOL_SIZE = Number(process.env.WORKER_POOL_SIZE)
+    || (isClustered() ? 1 : Math.max(1, Math.min(4, os.cpus().length - 1)));
+
+const workers = [];     // { worker, job }
+const queue = [];       // jobs waiting for a free worker
+let nextJobId = 1;
+
+function spawnWorker() {
+    const entry = { worker: new Worker(WORKER_FILE), job: null };
+
+    entry.worker.on('message', ({ id, result, error }) => {
+        const job = entry.job;
+        if (!job || job.id !== id) return;
+        entry.job = null;
+        entry.worker.unref();
+        if (error) job.reject(new Error(error));
+        else job.resolve(result);
+        dispatch();
+    });
+
+    // A crashed worker fails its job and is replaced on the next dispatch
+    const fail = (err) => {
+        const index = workers.indexOf(entry);
+        if (index !== -1) workers.splice(index, 1);
+        if (entry.job) {
+            entry.job.reject(err instanceof Error ? err : new Error(`worker exited with code ${err}`));
+            entry.job = null;
+        }
+        dispatch();
+    };
+    entry.worker.on('error', fail);
+    entry.worker.on('exit', (code) => fail(code));
+
+    // Idle threads must not keep the process (or a script) alive
+    entry.worker.unref();
+    workers.push(entry);
+    return entry;
+}
+
+function dispatch() {
+    while (queue.length > 0) {
+        let entry = workers.find(w => !w.job);
+        if (!entry && workers.length < POOL_SIZE) entry = spawnWorker();
+        if (!entry) return;
+
+        const job = queue.shift();
+        entry.job = job;
+        entry.worker.ref();
+        entry.worker.postMessage({ id: job.id, name: job.name, payload: job.payload });
+    }
+}
+
+/**
+ * Run a task from workers/tasks.js.
+ * @param {string} name - Task name, e.g. 'csv'
+ * @param {Object} payload - Structured-cloneable input
+ * @param {Object} options - { size } row/item count; below the threshold the task runs inline
+ * @returns {Promise<*>} Task result
+ */
+function runTask(name, payload, { size } = {}) {
+    if (typeof tasks[name] !== 'function') {
+        return Promise.reject(new Error(`Unknown worker task: ${name}`));
+    }
+    if (size !== undefined && size < THRESHOLD) {
+        try {
+            return Promise.resolve(tasks[name](payload));
+        } catch (error) {
+            return Promise.reject(error);
+        }
+    }
+    return new Promise((resolve, reject) => {
+        queue.push({ id: nextJobId++, name, payload, resolve, reject });
+        dispatch();
+    });
+}
+
+/**
+ * Pool state, for diagnostics: { size, threads, busy, queued, threshold }
+ */
+function stats() {
+    return {
+        size: POOL_SIZE,
+        threads: workers.length,
+        busy: workers.filter(w => w.job).length,
+        queued: queue.length,
+        threshold: THRESHOLD
+    };
+}
+
+module.exports = {
+    runTask,
+    stats
+};
@@ -0,0 +1,49 @@
+/**
+ * Concurrency Utility Module
+ *
+ * Small helpers for running async work with bounded parallelism so that
+ * independent queries can overlap without exhausting the Sequelize pool.
+ */
+
+/**
+ * Map `items` through an async `worker` with at most `limit` calls in flight.
+ * Results are returned in input order; the first rejection is propagated.
+ * @param {Array} items - Inputs to process
+ * @param {number} limit - Maximum number of concurrent worker calls
+ * @param {Function} worker - async (item, index) => result
+ * @returns {Promise<Array>} Results in the same order as `items`
+ */
+async function mapWithConcurrency(items, limit, worker) {
+    const results = new Array(items.length);
+    const poolSize = Math.max(1, Math.min(Number(limit) || 1, items.length));
+    let next = 0;
+
+    const runners = Array.from({ length: poolSize }, async () => {
+        while (next < items.length) {
+            const index = next++;
+            results[index] = await worker(items[index], index);
+        }
+    });
+
+    await Promise.all(runners);
+    return results;
+}
+
+/**
+ * Split an array into consecutive chunks of at most `size` elements.
+ * @param {Array} items - Array to split
+ * @param {number} size - Chunk size
+ * @returns {Array<Array>} Chunks
+ */
+function chunk(items, size) {
+    const chunks = [];
+    for (let i = 0; i < items.length; i += size) {
+        chunks.push(items.slice(i, i + size));
+    }
+    return chunks;
+}
+
+module.exports = {
+    mapWithConcurrency,
+    chunk
+};
@@ -0,0 +1,111 @@
+/**
+ * CSV Utility Module
+ *
+ * Minimal RFC 4180 parser for uploaded spreadsheets (bulk imports), and the
+ * serialiser used by CSV exports.
+ * Handles quoted fields, escaped quotes, embedded newlines, CRLF and a UTF-8 BOM.
+ */
+
+/**
+ * Parse CSV text into an array of rows (arrays of strings).
+ * @param {string} text - Raw CSV content
+ * @returns {Array<Array<string>>} Rows
+ */
+function parseRows(text) {
+    const rows = [];
+    let row = [];
+    let field = '';
+    let inQuotes = false;
+    const src = text.charCodeAt(0) === 0xFEFF ? text.slice(1) : text;
+
+    for (let i = 0; i < src.length; i++) {
+        const ch = src[i];
+        if (inQuotes) {
+            if (ch === '"') {
+                if (src[i + 1] === '"') {
+                    field += '"';
+                    i++;
+                } else {
+                    inQuotes = false;
+                }
+            } else {
+                field += ch;
+            }
+        } else if (ch === '"') {
+            inQuotes = true;
+        } else if (ch === ',') {
+            row.push(field);
+            field = '';
+        } else if (ch === '\n' || ch === '\r') {
+            if (ch === '\r' && src[i + 1] === '\n') i++;
+            row.push(field);
+            rows.push(row);
+            row = [];
+            field = '';
+        } else {
+            field += ch;
+        }
+    }
+    if (field !== '' || row.length > 0) {
+        row.push(field);
+        rows.push(row);
+    }
+
+    // Drop blank lines
+    return rows.filter(r => r.some(cell => cell.trim() !== ''));
+}
+
+/**
+ * Parse CSV text with a header row into objects keyed by header name.
+ * Header names and values are trimmed; empty cells become undefined.
+ * @param {string} text - Raw CSV content
+ * @returns {Array<Object>} One object per data row, with `_row` (1-based row number, header = 1)
+ */
+function parseCSV(text) {
+    const rows = parseRows(String(text || ''));
+    if (rows.length === 0) return [];
+
+    const headers = rows[0].map(h => h.trim());
+    return rows.slice(1).map((cells, index) => {
+        const obj = { _row: index + 2 };
+        headers.forEach((header, col) => {
+            const value = cells[col] !== undefined ? cells[col].trim() : '';
+            obj[header] = value === '' ? undefined : value;
+        });
+        return obj;
+    });
+}
+
+/**
+ * Serialise a header row and data rows to CSV text.
+ * By default a cell is quoted only when it contains a comma, quote or newline;
+ * `quoteAll` quotes every cell (GST export format).
+ * @param {Array<string>} headers
+ * @param {Array<Array>} rows
+ * @param {Object} options - { quoteAll: false }
+ * @returns {string}
+ */
+function toCSV(headers, rows, { quoteAll = false } = {}) {
+    const cellToCSV = quoteAll
+        ? (cell) => `"${String(cell).replace(/"/g, '""')}"`
+        : (cell) => {
+            if (cell === null || cell === undefined) return '';
+            const cellStr = String(cell);
+            if (cellStr.includes(',') || cellStr.includes('"') || cellStr.includes('\n')) {
+                return `"${cellStr.replace(/"/g, '""')}"`;
+            }
+            return cellStr;
+        };
+    const lines = new Array(rows.length + 1);
+    lines[0] = headers.join(',');
+    for (let i = 0; i < rows.length; i++) {
+        lines[i + 1] = rows[i].map(cellToCSV).join(',');
+    }
+    return lines.join('\n');
+}
+
+module.exports = {
+    parseRows,
+    parseCSV,
+    toCSV
+};
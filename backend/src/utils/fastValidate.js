@@ -0,0 +1,66 @@
+/**
+ * Fast-path Validation Helpers
+ *
+ * Plain-JS checks mirroring a small subset of Joi rules, for hot endpoints
+ * where full schema interpretation dominates request cost.
+ *
+ * A fast validator must only ever ACCEPT input that the Joi schema would
+ * accept unchanged. For anything else it returns NO_MATCH and the caller
+ * falls back to the compiled Joi schema — so error messages stay identical.
+ */
+
+const NO_MATCH = Symbol('fastValidate.noMatch');
+
+/**
+ * True for `{}`-style objects (what JSON bodies parse to).
+ */
+const isPlainObject = (value) => {
+    if (value === null || typeof value !== 'object' || Array.isArray(value)) return false;
+    const proto = Object.getPrototypeOf(value);
+    return proto === Object.prototype || proto === null;
+};
+
+/**
+ * True if every own key of `obj` is in the `allowed` Set.
+ */
+const hasOnlyKeys = (obj, allowed) => {
+    const keys = Object.keys(obj);
+    for (let i = 0; i < keys.length; i++) {
+        if (!allowed.has(keys[i])) return false;
+    }
+    return true;
+};
+
+/**
+ * Joi.string().trim() — only already-trimmed strings take the fast path,
+ * so the value never needs converting.
+ * @param {*} value
+ * @param {boolean} allowEmpty - schema has .allow("")
+ */
+const isCleanString = (value, allowEmpty = false) => {
+    return typeof value === 'string' && value.trim() === value && (allowEmpty || value !== '');
+};
+
+const GUID_RE = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+/**
+ * Joi.string().guid() — canonical dashed form only; braces and other
+ * spellings Joi also accepts take the slow path.
+ */
+const isGuid = (value) => typeof value === 'string' && GUID_RE.test(value);
+
+/**
+ * Joi.number() — finite, safe-range numbers only (no string conversion).
+ */
+const isSafeNumber = (value) => {
+    return typeof value === 'number' && Number.isFinite(value) && Math.abs(value) <= Number.MAX_SAFE_INTEGER;
+};
+
+module.exports = {
+    NO_MATCH,
+    isPlainObject,
+    hasOnlyKeys,
+    isCleanString,
+    isGuid,
+    isSafeNumber
+};
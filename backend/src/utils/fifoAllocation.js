@@ -0,0 +1,97 @@
+/**
+ * FIFO Allocation Engine
+ *
+ * Pure functions for bill-wise receipt allocation, shared by explicit
+ * allocation, undo of auto-reconciliation, FIFO reconstruction and bulk
+ * receipt import. Callers load invoices, receipts and existing allocations
+ * with one query each and hand plain arrays to this module — nothing here
+ * touches the database or mutates its inputs.
+ *
+ * All arithmetic is done in integer paise (see utils/money.js).
+ */
+
+const Money = require('./money');
+
+/**
+ * Allocate receipts to open invoices, oldest invoice first, in O(n + m).
+ * Both arrays must already be sorted oldest first.
+ *
+ * @param {Array<{id, open: number}>} invoices - `open` = amount still due (rupees)
+ * @param {Array<{id, amount: number}>} receipts - `amount` = amount available to allocate (rupees)
+ * @returns {{
+ *   allocations: Array<{paymentId, orderId, amount: number}>,
+ *   invoiceOpen: number[],   // remaining due per invoice, same order as input
+ *   receiptUnused: number[]  // unallocated amount per receipt, same order as input
+ * }}
+ */
+function allocateFifo(invoices, receipts) {
+    const allocations = [];
+    const invoiceOpen = invoices.map(inv => Math.max(0, Money.toPaise(inv.open)));
+    const receiptUnused = receipts.map(r => Math.max(0, Money.toPaise(r.amount)));
+
+    let i = 0;
+    for (let r = 0; r < receipts.length; r++) {
+        while (receiptUnused[r] > 0 && i < invoices.length) {
+            if (invoiceOpen[i] === 0) {
+                i++;
+                continue;
+            }
+            const amount = Math.min(receiptUnused[r], invoiceOpen[i]);
+            allocations.push({ paymentId: receipts[r].id, orderId: invoices[i].id, amount: Money.toRupees(amount) });
+            receiptUnused[r] -= amount;
+            invoiceOpen[i] -= amount;
+        }
+    }
+
+    return {
+        allocations,
+        invoiceOpen: invoiceOpen.map(Money.toRupees),
+        receiptUnused: receiptUnused.map(Money.toRupees)
+    };
+}
+
+/**
+ * Sum allocation amounts by a key ('orderId' or 'paymentId').
+ * @param {Array<{amount}>} allocations
+ * @param {string} key
+ * @returns {Map<string, number>} key → total (rupees)
+ */
+function sumAllocations(allocations, key) {
+    const paise = new Map();
+    for (const a of allocations) {
+        paise.set(a[key], (paise.get(a[key]) || 0) + Money.toPaise(a.amount));
+    }
+    const totals = new Map();
+    for (const [k, v] of paise) totals.set(k, Money.toRupees(v));
+    return totals;
+}
+
+/**
+ * Derive an invoice's cached payment fields from the amount paid against it.
+ *
+ * @param {number} total - Invoice total
+ * @param {number} paid - Amount settled so far
+ * @param {Object} options - { tolerance: 0 } rupees treated as fully paid / unpaid
+ * @returns {{ paidAmount: number, dueAmount: number, paymentStatus: string }}
+ */
+function paymentState(total, paid, { tolerance = 0 } = {}) {
+    const totalPaise = Money.toPaise(total);
+    const paidPaise = Math.max(0, Money.toPaise(paid));
+    const tolerancePaise = Money.toPaise(tolerance);
+
+    let paymentStatus = 'unpaid';
+    if (paidPaise >= totalPaise - tolerancePaise) paymentStatus = 'paid';
+    else if (paidPaise > tolerancePaise) paymentStatus = 'partial';
+
+    return {
+        paidAmount: Money.toRupees(paidPaise),
+        dueAmount: Money.toRupees(Math.max(0, totalPaise - paidPaise)),
+        paymentStatus
+    };
+}
+
+module.exports = {
+    allocateFifo,
+    sumAllocations,
+    paymentState
+};
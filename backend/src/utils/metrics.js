@@ -0,0 +1,218 @@
+/**
+ * In-process metrics registry with Prometheus text exposition
+ *
+ *   • http_request_duration_seconds   histogram per method/route/status class
+ *   • http_request_db_seconds         DB time spent by each request, per route
+ *   • db_query_duration_seconds       every SQL statement (Sequelize benchmark timing)
+ *   • db_slow_queries_total           statements slower than SLOW_QUERY_MS (also logged)
+ *   • nodejs_eventloop_lag_seconds    event-loop delay quantiles since the last scrape
+ *   • process heap / rss gauges, plus collectors registered by other modules
+ *
+ * Recording is a Map lookup and a bucket increment, so it stays on in
+ * production. The request context (DB time and query count of the current
+ * request) travels with AsyncLocalStorage.
+ *
+ * Each process keeps its own registry — in cluster mode a scrape sees the
+ * worker that answered it, labelled with its pid.
+ */
+
+const crypto = require('crypto');
+const { AsyncLocalStorage } = require('async_hooks');
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+const LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const SLOW_QUERY_MS = Number(process.env.SLOW_QUERY_MS) || 200;
+
+const requestContext = new AsyncLocalStorage();
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+function formatLabels(labels) {
+    const parts = Object.entries(labels).map(([k, v]) => `${k}="${escapeLabel(v)}"`);
+    return parts.length ? `{${parts.join(',')}}` : '';
+}
+
+class Histogram {
+    constructor(name, help, buckets = LATENCY_BUCKETS) {
+        this.name = name;
+        this.help = help;
+        this.buckets = buckets;
+        this.series = new Map();
+    }
+
+    observe(labels, value) {
+        const key = Object.values(labels).join('\u0000');
+        let series = this.series.get(key);
+        if (!series) {
+            series = { labels, counts: new Array(this.buckets.length + 1).fill(0), sum: 0, count: 0 };
+            this.series.set(key, series);
+        }
+        let i = 0;
+        while (i < this.buckets.length && value > this.buckets[i]) i++;
+        series.counts[i]++;
+        series.sum += value;
+        series.count++;
+    }
+
+    render() {
+        const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`];
+        for (const { labels, counts, sum, count } of this.series.values()) {
+            let cumulative = 0;
+            this.buckets.forEach((le, i) => {
+                cumulative += counts[i];
+                lines.push(`${this.name}_bucket${formatLabels({ ...labels, le })} ${cumulative}`);
+            });
+            lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`);
+            lines.push(`${this.name}_sum${formatLabels(labels)} ${sum}`);
+            lines.push(`${this.name}_count${formatLabels(labels)} ${count}`);
+        }
+        return lines;
+    }
+}
+
+class Counter {
+    constructor(name, help) {
+        this.name = name;
+        this.help = help;
+        this.series = new Map();
+    }
+
+    inc(labels = {}, value = 1) {
+        const key = Object.values(labels).join('\u0000');
+        const series = this.series.get(key);
+        if (series) series.value += value;
+        else this.series.set(key, { labels, value });
+    }
+
+    render() {
+        const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} counter`];
+        for (const { labels, value } of this.series.values()) {
+            lines.push(`${this.name}${formatLabels(labels)} ${value}`);
+        }
+        return lines;
+    }
+}
+
+const httpDuration = new Histogram('http_request_duration_seconds', 'HTTP request latency by route');
+const httpDbTime = new Histogram('http_request_db_seconds', 'Database time spent per HTTP request by route');
+const dbDuration = new Histogram('db_query_duration_seconds', 'SQL statement duration');
+const slowQueries = new Counter('db_slow_queries_total', `SQL statements slower than ${SLOW_QUERY_MS}ms`);
+
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 10 });
+eventLoopDelay.enable();
+
+// Extra gauges: name → { help, collect() => [{ labels, value }] }
+const collectors = new Map();
+
+/**
+ * Normalise SQL to a fingerprint: literals, numbers and IN-lists become `?`.
+ * @returns {Object} { text, id } — id is a short stable hash of text
+ */
+function fingerprint(sql) {
+    const text = sql
+        .replace(/^Executed \([^)]*\):\s*/, '')
+        .replace(/'(?:[^']|'')*'/g, '?')
+        .replace(/\$\d+/g, '?')
+        .replace(/\b\d+(\.\d+)?\b/g, '?')
+        .replace(/\(\s*\?(\s*,\s*\?)*\s*\)/g, '(?)')
+        .replace(/\s+/g, ' ')
+        .trim();
+    return { text, id: crypto.createHash('md5').update(text).digest('hex').slice(0, 12) };
+}
+
+/**
+ * Sequelize `logging` callback (with `benchmark: true`): (sql, ms).
+ */
+function recordQuery(sql, ms) {
+    if (typeof ms !== 'number') return;
+    dbDuration.observe({}, ms / 1000);
+
+    const ctx = requestContext.getStore();
+    if (ctx) {
+        ctx.dbMs += ms;
+        ctx.queries++;
+        if (ctx.onQuery) ctx.onQuery(sql); // query budget (middleware/queryBudget.js)
+    }
+
+    if (ms >= SLOW_QUERY_MS) {
+        const { text, id } = fingerprint(sql);
+        slowQueries.inc();
+        console.warn(`[SLOW QUERY] ${ms}ms fp=${id}${ctx ? ` ${ctx.method} ${ctx.path}` : ''} — ${text.slice(0, 500)}`);
+    }
+}
+
+/**
+ * Run `fn` with a fresh request context.
+ */
+function runWithContext(ctx, fn) {
+    return requestContext.run(ctx, fn);
+}
+
+const currentContext = () => requestContext.getStore();
+
+/**
+ * Record a finished HTTP request.
+ */
+function recordRequest({ method, route, status, seconds, dbSeconds }) {
+    const labels = { method, route, status: `${Math.floor(status / 100)}xx` };
+    httpDuration.observe(labels, seconds);
+    httpDbTime.observe({ method, route }, dbSeconds);
+}
+
+/**
+ * Register a gauge rendered at scrape time.
+ * @param {string} name
+ * @param {string} help
+ * @param {Function} collect - () => [{ labels, value }]
+ */
+function registerGauge(name, help, collect) {
+    collectors.set(name, { help, collect });
+}
+
+function gauge(name, help, samples) {
+    return [
+        `# HELP ${name} ${help}`,
+        `# TYPE ${name} gauge`,
+        ...samples.map(({ labels = {}, value }) => `${name}${formatLabels(labels)} ${value}`)
+    ];
+}
+
+/**
+ * Prometheus text exposition of every metric.
+ */
+function render() {
+    const memory = process.memoryUsage();
+    const lag = (q) => eventLoopDelay.percentile(q) / 1e9;
+    const lines = [
+        ...httpDuration.render(),
+        ...httpDbTime.render(),
+        ...dbDuration.render(),
+        ...slowQueries.render(),
+        ...gauge('nodejs_eventloop_lag_seconds', 'Event-loop delay since the last scrape', [
+            { labels: { quantile: '0.5' }, value: lag(50) },
+            { labels: { quantile: '0.99' }, value: lag(99) },
+            { labels: { quantile: '1' }, value: eventLoopDelay.max / 1e9 }
+        ]),
+        ...gauge('nodejs_heap_used_bytes', 'V8 heap used', [{ value: memory.heapUsed }]),
+        ...gauge('nodejs_heap_total_bytes', 'V8 heap allocated', [{ value: memory.heapTotal }]),
+        ...gauge('process_resident_memory_bytes', 'Resident set size', [{ value: memory.rss }]),
+        ...gauge('process_uptime_seconds', 'Process uptime', [{ value: process.uptime() }]),
+        ...gauge('process_info', 'Process identity', [{ labels: { pid: process.pid }, value: 1 }])
+    ];
+    eventLoopDelay.reset();
+
+    for (const [name, { help, collect }] of collectors) {
+        lines.push(...gauge(name, help, collect()));
+    }
+    return lines.join('\n') + '\n';
+}
+
+module.exports = {
+    recordQuery,
+    recordRequest,
+    runWithContext,
+    currentContext,
+    registerGauge,
+    fingerprint,
+    render
+};
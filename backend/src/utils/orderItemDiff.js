@@ -0,0 +1,130 @@
+/**
+ * Order Item Diff Engine
+ *
+ * Compares the lines an edit submits against the lines stored for the order
+ * and sorts them into inserted / updated / deleted / unchanged, so the edit
+ * can be written with one multi-row upsert and one delete however many lines
+ * the bill has. Pure — the caller loads the stored lines and applies the
+ * result (dao/orderItems.js applyItemDiff).
+ *
+ * Submitted lines:
+ *   with an id     an existing line; fields left out keep their stored value
+ *   without an id  a new line
+ * Stored lines missing from the submission are deleted.
+ */
+
+const uuidv4 = require('uuid/v4');
+const Money = require('./money');
+
+const EDITABLE_FIELDS = ['productId', 'name', 'altName', 'quantity', 'productPrice', 'totalPrice', 'type', 'sortOrder'];
+const NUMERIC_FIELDS = new Set(['quantity', 'productPrice', 'totalPrice', 'sortOrder']);
+
+const sameValue = (field, a, b) => (NUMERIC_FIELDS.has(field)
+    ? Number(a) === Number(b)
+    : (a ?? null) === (b ?? null));
+
+const pickEditable = (item) => ({
+    productId: item.productId || null,
+    name: item.name,
+    altName: item.altName ?? null,
+    quantity: item.quantity,
+    productPrice: item.productPrice,
+    totalPrice: item.totalPrice,
+    type: item.type,
+    sortOrder: item.sortOrder
+});
+
+/**
+ * @param {Array<Object>} stored - the order's current lines (plain objects with id)
+ * @param {Array<Object>} submitted - the full list of lines after the edit
+ * @returns {{
+ *   inserted: Object[],    // new lines, ids assigned
+ *   updated: Object[],     // existing lines whose fields changed (merged with stored values)
+ *   deleted: string[],     // ids of stored lines not submitted
+ *   unchanged: Object[],
+ *   unknownIds: string[],  // submitted ids that are not lines of this order (or repeat)
+ *   items: Object[],       // every line after the edit, by sortOrder
+ *   subTotal: number       // sum of totalPrice after the edit, in rupees
+ * }}
+ */
+function diffOrderItems(stored, submitted) {
+    const storedById = new Map(stored.map(item => [item.id, item]));
+    const seen = new Set();
+    const inserted = [];
+    const updated = [];
+    const unchanged = [];
+    const unknownIds = [];
+
+    submitted.forEach((item, index) => {
+        if (!item.id) {
+            inserted.push({ ...pickEditable(item), id: uuidv4(), sortOrder: item.sortOrder ?? index });
+            return;
+        }
+        const current = storedById.get(item.id);
+        if (!current || seen.has(item.id)) {
+            unknownIds.push(item.id);
+            return;
+        }
+        seen.add(item.id);
+
+        const next = pickEditable(current);
+        EDITABLE_FIELDS.forEach((field) => {
+            if (item[field] !== undefined) next[field] = item[field];
+        });
+        next.productId = next.productId || null;
+        next.id = current.id;
+        const changed = EDITABLE_FIELDS.some(field => !sameValue(field, next[field], current[field]));
+        (changed ? updated : unchanged).push(next);
+    });
+
+    const deleted = stored.filter(item => !seen.has(item.id)).map(item => item.id);
+    const items = [...unchanged, ...updated, ...inserted].sort((a, b) => a.sortOrder - b.sortOrder);
+
+    return {
+        inserted,
+        updated,
+        deleted,
+        unchanged,
+        unknownIds,
+        items,
+        subTotal: Money.add(...items.map(item => item.totalPrice))
+    };
+}
+
+/**
+ * Net change in quantity sold per product made by an edit (positive: more
+ * stock leaves, negative: stock comes back). A stored line without a
+ * productId — saved before lines kept it — is taken to be the product it is
+ * submitted with.
+ * @param {Array<Object>} stored - the order's lines before the edit
+ * @param {Object} diff - diffOrderItems(stored, submitted)
+ * @returns {Array<{productId: string, quantity: number}>} non-zero changes
+ */
+function stockChanges(stored, diff) {
+    const storedById = new Map(stored.map(item => [item.id, item]));
+    const totals = new Map();
+    const add = (productId, quantity) => {
+        if (!productId) return;
+        totals.set(productId, (totals.get(productId) || 0) + (Number(quantity) || 0));
+    };
+
+    diff.inserted.forEach(item => add(item.productId, item.quantity));
+    diff.updated.forEach((item) => {
+        const current = storedById.get(item.id);
+        add(current.productId || item.productId, -current.quantity);
+        add(item.productId, item.quantity);
+    });
+    diff.deleted.forEach((id) => {
+        const current = storedById.get(id);
+        add(current.productId, -current.quantity);
+    });
+
+    return [...totals.entries()]
+        .map(([productId, quantity]) => ({ productId, quantity: Math.round(quantity * 1000) / 1000 }))
+        .filter(change => change.quantity !== 0);
+}
+
+module.exports = {
+    diffOrderItems,
+    stockChanges
+};
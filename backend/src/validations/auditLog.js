@@ -0,0 +1,48 @@
+const Joi = require('joi');
+
+// Keyset page: `before`/`beforeId` are the cursor returned with the previous page
+const TIMESTAMP = /^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d{1,6})?([+-]\d{2}(:?\d{2})?|Z)?$/;
+const pageKeys = {
+    limit: Joi.number().integer().min(1).max(500).optional().default(100),
+    before: Joi.string().trim().regex(TIMESTAMP, 'timestamp').optional(),
+    beforeId: Joi.string().uuid().optional()
+};
+
+module.exports = {
+    validateListAuditLogs: (data) => {
+        const schema = Joi.object().keys({
+            userId: Joi.string().uuid().optional(),
+            action: Joi.string().trim().optional(),
+            entityType: Joi.string().trim().optional(),
+            entityId: Joi.string().trim().optional(),
+            startDate: Joi.string().trim().optional(),
+            endDate: Joi.string().trim().optional(),
+            ...pageKeys
+        });
+        return Joi.validate(data, schema, { convert: true });
+    },
+
+    validateAuditTrail: (data) => {
+        const schema = Joi.object().keys({
+            action: Joi.string().trim().allow('').optional(),
+            entityType: Joi.string().trim().allow('').optional(),
+            entityId: Joi.string().trim().allow('').optional(),
+            userName: Joi.string().trim().allow('').optional(),
+            search: Joi.string().trim().allow('').optional(),
+            from: Joi.string().trim().regex(/^\d{4}-\d{2}-\d{2}$/, 'date').allow('').optional(),
+            to: Joi.string().trim().regex(/^\d{4}-\d{2}-\d{2}$/, 'date').allow('').optional(),
+            ...pageKeys,
+            limit: Joi.number().integer().min(1).max(500).optional().default(200)
+        });
+        // Older clients still send page=; unknown parameters were always ignored here
+        return Joi.validate(data, schema, { convert: true, stripUnknown: true });
+    },
+
+    validateAuditPage: (data) => {
+        const schema = Joi.object().keys({
+            days: Joi.number().integer().min(1).optional(),
+            ...pageKeys
+        });
+        return Joi.validate(data, schema, { convert: true });
+    }
+};
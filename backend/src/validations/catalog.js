@@ -0,0 +1,10 @@
+const Joi = require('joi');
+
+module.exports = {
+    validateCatalogQuery: (data) => {
+        const schema = Joi.object().keys({
+            since: Joi.string().regex(/^\d{1,17}$/, 'version').optional()
+        });
+        return Joi.validate(data, schema, { convert: true });
+    }
+};
@@ -35,5 +35,12 @@ module.exports = {
             offset: Joi.number().optional()
         });
         return Joi.validate(customerObj, schema);
+    },
+
+    validateListWithBalanceObj: (query) => {
+        const schema = Joi.object().keys({
+            customerId: Joi.string().uuid().optional()
+        });
+        return Joi.validate(query, schema, { allowUnknown: true });
     }
 };
@@ -0,0 +1,17 @@
+const Joi = require('joi');
+
+module.exports = {
+    validateRunBackup: (data) => {
+        const schema = Joi.object().keys({
+            type: Joi.string().valid('full', 'incremental', 'auto').default('auto')
+        });
+        return Joi.validate(data, schema, { convert: true });
+    },
+
+    validateRestoreBenchmark: (data) => {
+        const schema = Joi.object().keys({
+            jobs: Joi.number().integer().min(1).max(16)
+        });
+        return Joi.validate(data, schema, { convert: true });
+    }
+};
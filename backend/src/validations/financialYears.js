@@ -0,0 +1,13 @@
+const Joi = require('joi');
+
+const LABEL = /^\d{4}-\d{2}$/;
+
+module.exports = {
+    validateCloseYear: (data) => {
+        const schema = Joi.object().keys({
+            label: Joi.string().regex(LABEL, 'YYYY-YY').required(),
+            dryRun: Joi.boolean().default(false)
+        });
+        return Joi.validate(data, schema, { convert: true });
+    }
+};
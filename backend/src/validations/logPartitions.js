@@ -0,0 +1,23 @@
+const Joi = require('joi');
+
+const MONTH = /^\d{4}-(0[1-9]|1[0-2])$/;
+const DAY = /^\d{4}-\d{2}-\d{2}$/;
+
+module.exports = {
+    validateMonthParams: (data) => {
+        const schema = Joi.object().keys({
+            table: Joi.string().valid('audit_logs', 'bill_audit_logs', 'weight_logs').required(),
+            month: Joi.string().regex(MONTH, 'YYYY-MM').required()
+        });
+        return Joi.validate(data, schema, { convert: true });
+    },
+
+    validateExplainRange: (data) => {
+        const schema = Joi.object().keys({
+            table: Joi.string().valid('audit_logs', 'bill_audit_logs', 'weight_logs').required(),
+            from: Joi.string().regex(DAY, 'YYYY-MM-DD').required(),
+            to: Joi.string().regex(DAY, 'YYYY-MM-DD').required()
+        });
+        return Joi.validate(data, schema, { convert: true });
+    }
+};
@@ -1,49 +1,171 @@
 const Joi = require('joi');
 const Enums = require('../enums');
+const { NO_MATCH, isPlainObject, hasOnlyKeys, isCleanString, isGuid, isSafeNumber } = require('../utils/fastValidate');
+
+// Schemas are compiled once at load time, not on every request
+const orderItemSchema = Joi.object().keys({
+    productId: Joi.string().trim().guid().allow(null, "").optional(), // Allow null for direct entries
+    name: Joi.string().trim().required(),
+    altName: Joi.string().trim().allow("").optional(),
+    quantity: Joi.number().greater(0).required(),
+    productPrice: Joi.number().greater(0).required(),
+    totalPrice: Joi.number().greater(0).required(),
+    type: Joi.string().trim().valid(Object.values(Enums.product)).required(),
+    sortOrder: Joi.number().integer().min(0).optional().default(0)
+});
+
+const createOrderSchema = Joi.object().keys({
+    orderNumber: Joi.string().trim().optional(), // Now optional - generated server-side
+    orderDate: Joi.string().trim().required(),
+    customerName: Joi.string().trim().allow("").optional(),
+    customerMobile: Joi.string().trim().allow("").optional(),
+    subTotal: Joi.number().greater(0).required(),
+    total: Joi.number().greater(0).required(),
+    tax: Joi.number().greater(-1).optional().default(0), // Optional, defaults to 0
+    taxPercent: Joi.number().greater(-1).optional().default(0), // Optional, defaults to 0
+    paidAmount: Joi.number().greater(-1).optional(),
+    dueAmount: Joi.number().greater(-1).optional(),
+    paymentStatus: Joi.string().trim().valid('paid', 'partial', 'unpaid').optional(),
+    notes: Joi.string().trim().allow("").optional(), // Allow notes field
+    paymentMode: Joi.string().trim().valid('CASH', 'CREDIT').optional(), // Set by backend
+    orderItems: Joi.array().items(orderItemSchema).required()
+});
+
+// Lines submitted with an order edit. A line with an id is an existing line and
+// may omit fields (they keep their stored value); a line without one is new.
+// No defaults here — a default would overwrite the stored value.
+const requiredForNewLine = (schema) => schema.when('id', { is: Joi.exist(), then: Joi.optional(), otherwise: Joi.required() });
+const updateOrderItemSchema = Joi.object().keys({
+    id: Joi.string().trim().guid().optional(),
+    productId: Joi.string().trim().guid().allow(null, "").optional(),
+    name: requiredForNewLine(Joi.string().trim()),
+    altName: Joi.string().trim().allow("", null).optional(),
+    quantity: requiredForNewLine(Joi.number().greater(0)),
+    productPrice: requiredForNewLine(Joi.number().greater(0)),
+    totalPrice: requiredForNewLine(Joi.number().greater(0)),
+    type: requiredForNewLine(Joi.string().trim().valid(Object.values(Enums.product))),
+    sortOrder: Joi.number().integer().min(0).optional()
+});
+const updateOrderItemsSchema = Joi.array().items(updateOrderItemSchema).min(1);
+
+// Offline outbox batch — each bill's order is validated on its own, so one
+// bad bill is reported instead of rejecting the whole batch
+const SYNC_BATCH_LIMIT = 50;
+const syncOrdersSchema = Joi.object().keys({
+    bills: Joi.array().items(Joi.object().keys({
+        idempotencyKey: Joi.string().trim().max(255).required(),
+        queuedAt: Joi.string().trim().optional(),
+        order: Joi.object().required()
+    })).min(1).max(SYNC_BATCH_LIMIT).required()
+});
+
+const listOrdersSchema = Joi.object().keys({
+    q: Joi.string().trim().allow("").optional(),
+    date: Joi.string().trim().allow("").optional(),
+    startDate: Joi.string().trim().allow("").optional(),
+    endDate: Joi.string().trim().allow("").optional(),
+    limit: Joi.number().optional(),
+    offset: Joi.number().optional(),
+    _t: Joi.number().optional() // Cache-busting timestamp
+});
+
+// ─── Fast path for POS order creation ────────────────────────────
+// Mirrors createOrderSchema for well-formed payloads only. Anything the fast
+// path is unsure about returns NO_MATCH and goes through Joi instead.
+
+const ORDER_KEYS = new Set([
+    'orderNumber', 'orderDate', 'customerName', 'customerMobile', 'subTotal', 'total', 'tax', 'taxPercent',
+    'paidAmount', 'dueAmount', 'paymentStatus', 'notes', 'paymentMode', 'orderItems'
+]);
+const ORDER_ITEM_KEYS = new Set([
+    'productId', 'name', 'altName', 'quantity', 'productPrice', 'totalPrice', 'type', 'sortOrder'
+]);
+const PRODUCT_TYPES = new Set(Object.values(Enums.product));
+const PAYMENT_STATUSES = new Set(['paid', 'partial', 'unpaid']);
+const PAYMENT_MODES = new Set(['CASH', 'CREDIT']);
+
+const isOptional = (value, check) => value === undefined || check(value);
+const positive = (v) => isSafeNumber(v) && v > 0;
+const nonNegative = (v) => isSafeNumber(v) && v > -1;
+
+const fastValidateOrderItem = (item) => {
+    if (!isPlainObject(item) || !hasOnlyKeys(item, ORDER_ITEM_KEYS)) return NO_MATCH;
+    if (
+        !isOptional(item.productId, v => v === null || v === '' || isGuid(v)) ||
+        !isCleanString(item.name) ||
+        !isOptional(item.altName, v => isCleanString(v, true)) ||
+        !positive(item.quantity) ||
+        !positive(item.productPrice) ||
+        !positive(item.totalPrice) ||
+        !PRODUCT_TYPES.has(item.type) ||
+        !isOptional(item.sortOrder, v => isSafeNumber(v) && Number.isInteger(v) && v >= 0)
+    ) {
+        return NO_MATCH;
+    }
+    return item.sortOrder === undefined ? { ...item, sortOrder: 0 } : { ...item };
+};
+
+const fastValidateCreateOrderObj = (orderObj) => {
+    if (!isPlainObject(orderObj) || !hasOnlyKeys(orderObj, ORDER_KEYS)) return NO_MATCH;
+    if (
+        !isOptional(orderObj.orderNumber, v => isCleanString(v)) ||
+        !isCleanString(orderObj.orderDate) ||
+        !isOptional(orderObj.customerName, v => isCleanString(v, true)) ||
+        !isOptional(orderObj.customerMobile, v => isCleanString(v, true)) ||
+        !positive(orderObj.subTotal) ||
+        !positive(orderObj.total) ||
+        !isOptional(orderObj.tax, nonNegative) ||
+        !isOptional(orderObj.taxPercent, nonNegative) ||
+        !isOptional(orderObj.paidAmount, nonNegative) ||
+        !isOptional(orderObj.dueAmount, nonNegative) ||
+        !isOptional(orderObj.paymentStatus, v => PAYMENT_STATUSES.has(v)) ||
+        !isOptional(orderObj.notes, v => isCleanString(v, true)) ||
+        !isOptional(orderObj.paymentMode, v => PAYMENT_MODES.has(v)) ||
+        !Array.isArray(orderObj.orderItems)
+    ) {
+        return NO_MATCH;
+    }
+
+    const orderItems = new Array(orderObj.orderItems.length);
+    for (let i = 0; i < orderItems.length; i++) {
+        const item = fastValidateOrderItem(orderObj.orderItems[i]);
+        if (item === NO_MATCH) return NO_MATCH;
+        orderItems[i] = item;
+    }
+
+    return {
+        ...orderObj,
+        tax: orderObj.tax === undefined ? 0 : orderObj.tax,
+        taxPercent: orderObj.taxPercent === undefined ? 0 : orderObj.taxPercent,
+        orderItems
+    };
+};
 
 module.exports = {
-    validateCreateOrderObj: (orderObj) => {
-        
-        const orderItems = Joi.object().keys({
-            productId: Joi.string().trim().allow(null, "").optional(), // Allow null for direct entries
-            name: Joi.string().trim().required(),
-            altName: Joi.string().trim().allow("").optional(),
-            quantity: Joi.number().greater(0).required(),
-            productPrice: Joi.number().greater(0).required(),
-            totalPrice: Joi.number().greater(0).required(),
-            type: Joi.string().trim().valid(Object.values(Enums.product)).required(),
-            sortOrder: Joi.number().integer().min(0).optional().default(0)
-        });
-        
-        const schema = Joi.object().keys({
-            orderNumber: Joi.string().trim().optional(), // Now optional - generated server-side
-            orderDate: Joi.string().trim().required(),
-            customerName: Joi.string().trim().allow("").optional(),
-            customerMobile: Joi.string().trim().allow("").optional(),
-            subTotal: Joi.number().greater(0).required(),
-            total: Joi.number().greater(0).required(),
-            tax: Joi.number().greater(-1).optional().default(0), // Optional, defaults to 0
-            taxPercent: Joi.number().greater(-1).optional().default(0), // Optional, defaults to 0
-            paidAmount: Joi.number().greater(-1).optional(),
-            dueAmount: Joi.number().greater(-1).optional(),
-            paymentStatus: Joi.string().trim().valid('paid', 'partial', 'unpaid').optional(),
-            notes: Joi.string().trim().allow("").optional(), // Allow notes field
-            paymentMode: Joi.string().trim().valid('CASH', 'CREDIT').optional(), // Set by backend
-            orderItems: Joi.array().items(orderItems).required()
-        });
-        return Joi.validate(orderObj, schema, { convert: true });
+    /**
+     * Validate a create-order payload. Well-formed POS payloads take the fast
+     * path; everything else (including every invalid payload) is validated by
+     * the compiled Joi schema, so errors are unchanged.
+     * @param {Object} orderObj
+     * @param {Object} options - { fastPath: true }
+     */
+    validateCreateOrderObj: (orderObj, { fastPath = true } = {}) => {
+        if (fastPath) {
+            const value = fastValidateCreateOrderObj(orderObj);
+            if (value !== NO_MATCH) return { error: null, value };
+        }
+        return Joi.validate(orderObj, createOrderSchema, { convert: true });
     },
-    
+
+    validateUpdateOrderItems: (orderItems) => {
+        return Joi.validate(orderItems, updateOrderItemsSchema, { convert: true });
+    },
+
+    validateSyncOrdersObj: (syncObj) => {
+        return Joi.validate(syncObj, syncOrdersSchema, { convert: true });
+    },
+
     validateListOrdersObj: (orderObj) => {
-        const schema = Joi.object().keys({
-            q: Joi.string().trim().allow("").optional(),
-            date: Joi.string().trim().allow("").optional(),
-            startDate: Joi.string().trim().allow("").optional(),
-            endDate: Joi.string().trim().allow("").optional(),
-            limit: Joi.number().optional(),
-            offset: Joi.number().optional(),
-            _t: Joi.number().optional() // Cache-busting timestamp
-        });
-        return Joi.validate(orderObj, schema, { convert: true });
+        return Joi.validate(orderObj, listOrdersSchema, { convert: true });
     },
 };
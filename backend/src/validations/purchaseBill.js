@@ -5,6 +5,7 @@ module.exports = {
     validateCreatePurchaseBillObj: (purchaseObj) => {
         
         const purchaseItems = Joi.object().keys({
+            productId: Joi.string().trim().allow(null, '').optional(), // catalogue product: stock in
             name: Joi.string().trim().required(),
             quantity: Joi.number().greater(0).required(),
             price: Joi.number().greater(0).required(),
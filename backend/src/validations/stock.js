@@ -41,6 +41,15 @@ module.exports = {
         return Joi.validate(data, schema, { convert: true });
     },
 
+    validateLowStockFeed: (data) => {
+        const schema = Joi.object().keys({
+            since: Joi.string().optional(),
+            afterId: Joi.string().uuid().optional(),
+            limit: Joi.number().integer().min(1).max(500).optional().default(100)
+        });
+        return Joi.validate(data, schema, { convert: true });
+    },
+
     validateListTransactions: (data) => {
         const schema = Joi.object().keys({
             productId: Joi.string().uuid().optional(),
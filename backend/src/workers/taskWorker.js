@@ -0,0 +1,17 @@
+/**
+ * Worker thread entry point for services/workerPool.js.
+ * Receives { id, name, payload }, runs tasks[name](payload) and replies with
+ * { id, result } or { id, error }.
+ */
+
+const { parentPort } = require('worker_threads');
+const tasks = require('./tasks');
+
+parentPort.on('message', ({ id, name, payload }) => {
+    try {
+        const result = tasks[name](payload);
+        parentPort.postMessage({ id, result });
+    } catch (error) {
+        parentPort.postMessage({ id, error: error.message });
+    }
+});
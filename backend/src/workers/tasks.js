@@ -0,0 +1,183 @@
+/**
+ * Worker Pool Tasks
+ *
+ * Pure, CPU-bound formatting functions that can run either inline or inside a
+ * worker thread (see services/workerPool.js). Every task takes one plain,
+ * structured-cloneable payload and returns a plain value.
+ *
+ * Nothing here may require models, Sequelize or any module with side effects
+ * at load time — this file is loaded by every worker thread.
+ */
+
+const { toCSV } = require('../utils/csv');
+
+// GST rate constants (5% total = 2.5% CGST + 2.5% SGST)
+const GST_RATE = 0.05;
+const CGST_RATE = 2.5;
+const SGST_RATE = 2.5;
+
+const TELEGRAM_MESSAGE_LIMIT = 3800;
+
+/**
+ * CSV export.
+ * @param {Object} payload - { headers, rows, quoteAll }
+ * @returns {string}
+ */
+function csv({ headers, rows, quoteAll = false }) {
+    return toCSV(headers, rows, { quoteAll });
+}
+
+/**
+ * GST export for the CA — one row per invoice line, every cell quoted.
+ * @param {Object} payload - { orders, useAdjusted }
+ * @returns {string}
+ */
+function gstExportCsv({ orders, useAdjusted }) {
+    const headers = [
+        'Invoice Number',
+        'Invoice Date',
+        'Customer Name',
+        'Customer GSTIN',
+        'Place of Supply',
+        'HSN Code',
+        'Product Name',
+        'Rate',          // Product Price (adjusted if applicable)
+        'Weight',        // Quantity (adjusted if applicable)
+        'Unit',
+        'Taxable Value',
+        'CGST Rate',
+        'CGST Amount',
+        'SGST Rate',
+        'SGST Amount',
+        'Total Tax',
+        'Amount',
+        'Invoice Total'
+    ];
+
+    const rows = [];
+
+    for (const order of orders) {
+        // Use adjusted items if available, otherwise original
+        const items = useAdjusted && order.adjustedItems
+            ? order.adjustedItems
+            : order.orderItems || [];
+
+        for (const item of items) {
+            const lineTotal = Number(item.totalPrice || 0);
+
+            // Use pre-calculated GST values from frontend if available
+            let baseAmount, cgstAmount, sgstAmount;
+            if (item.baseAmount && item.cgstAmount && item.sgstAmount) {
+                baseAmount = Number(item.baseAmount);
+                cgstAmount = Number(item.cgstAmount);
+                sgstAmount = Number(item.sgstAmount);
+            } else {
+                // Calculate GST (price is inclusive, so extract base)
+                baseAmount = lineTotal / (1 + GST_RATE);
+                cgstAmount = baseAmount * (CGST_RATE / 100);
+                sgstAmount = baseAmount * (SGST_RATE / 100);
+            }
+
+            const totalTax = cgstAmount + sgstAmount;
+
+            rows.push([
+                order.orderNumber || '',
+                order.orderDate || '',
+                order.customerName || 'Walk-in Customer',
+                order.customerGstin || 'URP',
+                order.placeOfSupply || '27-Maharashtra',
+                '7323',
+                item.name || '',
+                item.productPrice,                    // Rate (final price)
+                Number(item.quantity).toFixed(3),     // Weight (final quantity)
+                item.type === 'weighted' ? 'KG' : 'PCS',
+                baseAmount.toFixed(2),
+                CGST_RATE.toFixed(2),
+                cgstAmount.toFixed(2),
+                SGST_RATE.toFixed(2),
+                sgstAmount.toFixed(2),
+                totalTax.toFixed(2),
+                lineTotal.toFixed(2),
+                Number(order.total || 0).toFixed(2)
+            ]);
+        }
+    }
+
+    return toCSV(headers, rows, { quoteAll: true });
+}
+
+/**
+ * Party statement — sort transactions by date and compute the running balance.
+ * Suppliers run credit − debit from their opening balance; customers run
+ * debit − credit from zero.
+ * @param {Object} payload - { transactions, partyType, openingBalance }
+ * @returns {Object} { transactions, currentBalance }
+ */
+function partyStatement({ transactions, partyType, openingBalance = 0 }) {
+    transactions.sort((a, b) => new Date(a.date) - new Date(b.date));
+
+    let balance = partyType === 'supplier' ? openingBalance : 0;
+    transactions.forEach(txn => {
+        balance = (partyType === 'supplier') ? balance + txn.credit - txn.debit : balance + txn.debit - txn.credit;
+        txn.balance = balance;
+    });
+
+    return { transactions, currentBalance: balance };
+}
+
+/**
+ * Pack audit report blocks into Telegram-sized messages, one chunk of the
+ * report at a time. Every section starts a new block group; a section that
+ * overflows continues with a "...continued" header. A chunk that `continues`
+ * the previous chunk's section carries on where it left off.
+ * @param {Object} payload - { sections: [{ blocks, continues }], limit, carry }
+ *   carry: the unfinished last message returned by the previous chunk
+ * @returns {{ messages: Array<string>, carry: string }} complete messages, and
+ *   the unfinished one to pass to the next chunk (send it after the last)
+ */
+function auditMessages({ sections, limit = TELEGRAM_MESSAGE_LIMIT, carry = '' }) {
+    const messages = [];
+    let current = carry;
+
+    for (const section of sections) {
+        section.blocks.forEach((block, i) => {
+            const piece = current ? `\n${block}` : block;
+            if (current && (current.length + piece.length) > limit) {
+                if (current.trim()) messages.push(current);
+                current = (i > 0 || section.continues) ? `<b>...continued:</b>\n\n${block}` : block;
+            } else {
+                current += piece;
+            }
+        });
+    }
+    return { messages, carry: current };
+}
+
+/**
+ * Render one chunk of the audit report as document text. Sections are
+ * separated by a blank line; a chunk that `continues` a section follows it
+ * on the next line. The HTML page wrapper is written by the sink.
+ * @param {Object} payload - { sections: [{ blocks, continues }], format: 'text'|'html', first }
+ *   first: this is the first chunk of the document (no leading separator)
+ * @returns {string}
+ */
+function auditDocument({ sections, format = 'text', first = false }) {
+    const body = sections.map((s, i) => {
+        const separator = (first && i === 0) ? '' : (s.continues ? '\n' : '\n\n');
+        return separator + s.blocks.join('\n');
+    }).join('');
+    if (format === 'html') return body;
+    return body
+        .replace(/<[^>]+>/g, '')
+        .replace(/&lt;/g, '<')
+        .replace(/&gt;/g, '>')
+        .replace(/&amp;/g, '&');
+}
+
+module.exports = {
+    csv,
+    gstExportCsv,
+    partyStatement,
+    auditMessages,
+    auditDocument
+};
@@ -6,6 +6,8 @@ async function syncDatabase() {
     console.log('🔄 Synchronizing database models...\n');
     
     // Sync all models with alter: true to update existing tables
+    // (models are lazy — construct them all first)
+    db.loadAllModels();
     await db.sequelize.sync({ alter: true });
     
     console.log('\n✅ Database synchronized successfully!');
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Load & Latency Harness for the POS hot paths
+
+Drives a mixed workload against a running backend with asyncio + httpx and
+reports throughput and latency percentiles per operation. Results can be
+saved as a named baseline and later compared against it, failing on
+regressions.
+
+Operations:
+1. create_bill     - POST /api/orders (1-8 line items, cash or credit)
+2. toggle_payment  - PATCH /api/orders/:id/payment-status on a bill created in this run
+3. receipt         - POST /api/payments against a credit bill created in this run
+4. day_start       - GET /api/dashboard/summary/realtime/:date + /summary/date/:date
+5. export          - GET /api/export/tally/sales
+
+Requires: pip install httpx
+
+Usage (from backend/):
+    python tests/load_harness.py --concurrency 20 --duration 30
+    python tests/load_harness.py --mix counter --save-baseline local
+    python tests/load_harness.py --mix counter --compare local     # exit 1 on regression
+
+Uses the same login as the API tests (REACT_APP_BACKEND_URL, admin user).
+Creates TEST_Load_* bills on the target — point it at a local backend.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001').rstrip('/')
+if BASE_URL.endswith('/api'):
+    BASE_URL = BASE_URL[:-4]
+USERNAME = os.environ.get('LOAD_USER', 'admin')
+PASSWORD = os.environ.get('LOAD_PASSWORD', 'yttriumR')
+BASELINE_DIR = Path(__file__).parent / 'load_baselines'
+
+# Relative weights per operation
+MIXES = {
+    'pos': {'create_bill': 50, 'toggle_payment': 15, 'receipt': 15, 'day_start': 15, 'export': 5},
+    'counter': {'create_bill': 80, 'day_start': 20},
+    'backoffice': {'receipt': 30, 'day_start': 30, 'export': 40},
+}
+
+PRODUCTS = [
+    ('Steel Tope', 'weighted', 420.0),
+    ('Kadai 12in', 'non-weighted', 650.0),
+    ('Patila Set', 'non-weighted', 1850.0),
+    ('Steel Thali', 'weighted', 380.0),
+    ('Pressure Cooker 5L', 'non-weighted', 2400.0),
+    ('Spoon Set', 'non-weighted', 240.0),
+]
+
+
+def today():
+    return datetime.now().strftime('%d-%m-%Y')
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p))
+    return sorted_values[index]
+
+
+class LoadSession:
+    """Shared state for one run: HTTP client, bills created so far, results."""
+
+    def __init__(self, client, seed):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.bills = deque(maxlen=500)         # (order, is_credit)
+        self.latencies = defaultdict(list)     # op -> [ms]
+        self.errors = defaultdict(int)         # op -> count
+        self.error_samples = {}                # op -> first error text
+
+    async def request(self, method, path, **kwargs):
+        response = await self.client.request(method, f"{BASE_URL}{path}", **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+
+async def login(client):
+    response = await client.post(f"{BASE_URL}/api/auth/login", json={"username": USERNAME, "password": PASSWORD})
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    return data.get('data', {}).get('token') or data.get('token')
+
+
+# ─── Operations ──────────────────────────────────────────────────
+
+async def create_bill(s):
+    items = []
+    for _ in range(s.rng.randint(1, 8)):
+        name, kind, price = s.rng.choice(PRODUCTS)
+        quantity = round(s.rng.uniform(0.25, 3.0), 3) if kind == 'weighted' else s.rng.randint(1, 4)
+        items.append({
+            "name": name,
+            "type": kind,
+            "quantity": quantity,
+            "productPrice": price,
+            "totalPrice": round(quantity * price, 2),
+        })
+    total = round(sum(i["totalPrice"] for i in items), 2)
+    is_credit = s.rng.random() < 0.4
+    suffix = uuid.uuid4().hex[:8]
+    order = {
+        "orderDate": today(),
+        "customerName": f"TEST_Load_{s.rng.randint(1, 200)}" if is_credit else "",
+        "customerMobile": f"97{s.rng.randint(10000000, 10000199)}" if is_credit else "",
+        "subTotal": total,
+        "total": total,
+        "tax": 0,
+        "taxPercent": 0,
+        "paidAmount": 0 if is_credit else total,
+        "orderItems": items,
+        "notes": f"load-{suffix}",
+    }
+    response = await s.request('POST', '/api/orders', json=order)
+    s.bills.append((response.json()["data"], is_credit))
+
+
+async def toggle_payment(s):
+    order, _ = s.rng.choice(s.bills)
+    new_status = 'unpaid' if order.get("paymentStatus") == 'paid' else 'paid'
+    response = await s.request('PATCH', f"/api/orders/{order['id']}/payment-status", json={
+        "newStatus": new_status,
+        "customerName": order.get("customerName") or "TEST_Load_Walkin",
+        "customerMobile": order.get("customerMobile") or "",
+        "changedBy": "load-harness",
+    })
+    order["paymentStatus"] = response.json().get("data", {}).get("paymentStatus", new_status)
+
+
+async def receipt(s):
+    credit = [o for o, is_credit in s.bills if is_credit and o.get("customerId")]
+    if not credit:
+        return await create_bill(s)
+    order = s.rng.choice(credit)
+    await s.request('POST', '/api/payments', json={
+        "paymentDate": today(),
+        "partyName": order["customerName"],
+        "partyType": "customer",
+        "partyId": order["customerId"],
+        "amount": round(max(1.0, float(order["total"]) * s.rng.uniform(0.1, 0.5)), 2),
+        "referenceType": "order",
+        "referenceId": order["id"],
+    })
+
+
+async def day_start(s):
+    await asyncio.gather(
+        s.request('GET', f"/api/dashboard/summary/realtime/{today()}"),
+        s.request('GET', f"/api/dashboard/summary/date/{today()}"),
+    )
+
+
+async def export(s):
+    await s.request('GET', '/api/export/tally/sales')
+
+
+OPERATIONS = {
+    'create_bill': create_bill,
+    'toggle_payment': toggle_payment,
+    'receipt': receipt,
+    'day_start': day_start,
+    'export': export,
+}
+NEEDS_BILLS = {'toggle_payment', 'receipt'}
+
+
+# ─── Runner ──────────────────────────────────────────────────────
+
+async def worker(s, mix, deadline):
+    names = list(mix.keys())
+    weights = list(mix.values())
+    while time.monotonic() < deadline:
+        name = s.rng.choices(names, weights)[0]
+        if name in NEEDS_BILLS and not s.bills:
+            name = 'create_bill'
+        start = time.perf_counter()
+        try:
+            await OPERATIONS[name](s)
+            s.latencies[name].append((time.perf_counter() - start) * 1000)
+        except Exception as error:  # noqa: BLE001 - every failure counts as an error sample
+            s.errors[name] += 1
+            s.error_samples.setdefault(name, str(error))
+
+
+async def run_load(concurrency=10, duration=20, mix='pos', seed=20261019, warmup=3):
+    """Run the workload and return a summary dict (see summarise)."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        token = await login(client)
+        client.headers.update({"Authorization": f"Bearer {token}"})
+        s = LoadSession(client, seed)
+
+        if warmup > 0:
+            await asyncio.gather(*(worker(s, MIXES[mix], time.monotonic() + warmup) for _ in range(min(concurrency, 4))))
+            s.latencies.clear()
+            s.errors.clear()
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(s, MIXES[mix], started + duration) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return summarise(s, elapsed, concurrency, mix)
+
+
+def summarise(s, elapsed, concurrency, mix):
+    ops = {}
+    total = 0
+    for name in sorted(set(s.latencies) | set(s.errors)):
+        values = sorted(s.latencies.get(name, []))
+        total += len(values)
+        ops[name] = {
+            "count": len(values),
+            "errors": s.errors.get(name, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50": round(percentile(values, 0.50), 1),
+            "p95": round(percentile(values, 0.95), 1),
+            "p99": round(percentile(values, 0.99), 1),
+            "max": round(values[-1], 1) if values else 0.0,
+        }
+    return {
+        "meta": {
+            "target": BASE_URL,
+            "mix": mix,
+            "concurrency": concurrency,
+            "duration": round(elapsed, 1),
+            "recordedAt": datetime.now().isoformat(timespec='seconds'),
+        },
+        "throughput": round(total / elapsed, 2),
+        "ops": ops,
+        "errorSamples": s.error_samples,
+    }
+
+
+def print_summary(summary):
+    meta = summary["meta"]
+    print(f"\n{meta['mix']} mix, {meta['concurrency']} concurrent, {meta['duration']}s against {meta['target']}")
+    print(f"{'operation':<16}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, op in summary["ops"].items():
+        print(f"{name:<16}{op['count']:>8}{op['errors']:>8}{op['rps']:>9}{op['p50']:>9}{op['p95']:>9}{op['p99']:>9}{op['max']:>9}")
+    print(f"total throughput: {summary['throughput']} ops/s")
+    for name, sample in summary["errorSamples"].items():
+        print(f"  first {name} error: {sample}")
+
+
+# ─── Baselines ───────────────────────────────────────────────────
+
+def baseline_path(name):
+    return BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(summary, name):
+    BASELINE_DIR.mkdir(exist_ok=True)
+    baseline_path(name).write_text(json.dumps(summary, indent=2) + "\n")
+    print(f"Baseline saved: {baseline_path(name)}")
+
+
+def compare(summary, baseline, tolerance=0.2, noise_ms=5.0):
+    """
+    Regressions against a baseline: p95 up by more than `tolerance` (and by more
+    than `noise_ms`), throughput down by more than `tolerance`, or new errors.
+    Returns a list of human-readable problems (empty = pass).
+    """
+    problems = []
+    for name, base in baseline["ops"].items():
+        current = summary["ops"].get(name)
+        if current is None:
+            problems.append(f"{name}: not exercised in this run")
+            continue
+        if current["p95"] > base["p95"] * (1 + tolerance) and current["p95"] - base["p95"] > noise_ms:
+            problems.append(f"{name}: p95 {current['p95']}ms vs baseline {base['p95']}ms")
+        if base["rps"] > 0 and current["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {current['rps']} req/s vs baseline {base['rps']} req/s")
+        if current["errors"] > base["errors"]:
+            problems.append(f"{name}: {current['errors']} errors vs baseline {base['errors']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=int, default=20, help='seconds')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='pos')
+    parser.add_argument('--seed', type=int, default=20261019)
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95/throughput drift (0.2 = 20%%)')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args.concurrency, args.duration, args.mix, args.seed))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+    if args.save_baseline:
+        save_baseline(summary, args.save_baseline)
+
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text())
+        problems = compare(summary, baseline, args.tolerance)
+        if problems:
+            print("\nREGRESSION against baseline '%s':" % args.compare)
+            for problem in problems:
+                print(f"  ✗ {problem}")
+            sys.exit(1)
+        print(f"\n✓ Within {int(args.tolerance * 100)}% of baseline '{args.compare}'")
+
+
+if __name__ == '__main__':
+    main()
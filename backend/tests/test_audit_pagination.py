@@ -0,0 +1,85 @@
+"""
+Audit Log Pagination Tests
+
+Tests for:
+1. GET /api/audit-trail pages with a keyset cursor, without repeats or gaps
+2. Only the first page carries summary counts
+3. GET /api/dashboard/audit-logs and entity history page the same way
+4. User activity summary is grouped server-side
+5. Malformed cursors are rejected
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def get(auth_headers, path, **params):
+    response = requests.get(f"{BASE_URL}/api{path}", params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+class TestAuditPagination:
+
+    def test_trail_pages_follow_cursor(self, auth_headers):
+        everything = get(auth_headers, "/audit-trail", limit=30)["rows"]
+        first = get(auth_headers, "/audit-trail", limit=10)
+        assert first["summary"] is not None
+        if not first["hasMore"]:
+            pytest.skip("fewer than 10 audit rows")
+
+        second = get(auth_headers, "/audit-trail", limit=10, **first["cursor"])
+        assert second["summary"] is None
+        ids = [r["id"] for r in first["rows"] + second["rows"]]
+        assert len(set(ids)) == len(ids)
+        assert ids == [r["id"] for r in everything][:len(ids)]
+        print(f"PASS: two keyset pages match the first {len(ids)} rows of one long page")
+
+    def test_audit_logs_newest_first(self, auth_headers):
+        page = get(auth_headers, "/dashboard/audit-logs", limit=20)
+        stamps = [r["createdAt"] for r in page["rows"]]
+        assert stamps == sorted(stamps, reverse=True)
+        assert "count" not in page
+        print(f"PASS: {len(stamps)} audit logs newest first, no full count")
+
+    def test_entity_history_pages(self, auth_headers):
+        logs = get(auth_headers, "/dashboard/audit-logs", limit=1, entityType="ORDER")["rows"]
+        if not logs or not logs[0].get("entityId"):
+            pytest.skip("no order audit logs")
+        history = get(auth_headers, f"/dashboard/audit-logs/entity/ORDER/{logs[0]['entityId']}", limit=5)
+        assert 1 <= len(history["rows"]) <= 5
+        assert all(r["entityId"] == logs[0]["entityId"] for r in history["rows"])
+        print(f"PASS: entity history page of {len(history['rows'])}")
+
+    def test_user_activity_grouped(self, auth_headers):
+        me = requests.get(f"{BASE_URL}/api/auth/me", headers=auth_headers)
+        if me.status_code != 200:
+            pytest.skip("no /auth/me")
+        body = me.json().get("data", {})
+        user_id = body.get("id") or body.get("user", {}).get("id")
+        activity = get(auth_headers, f"/dashboard/audit-logs/user/{user_id}", days=30)
+        assert activity["total"] == sum(activity["byAction"].values())
+        assert activity["total"] == sum(activity["byEntityType"].values())
+        assert len(activity["recentActions"]) <= 20
+        print(f"PASS: {activity['total']} actions grouped by action and entity type")
+
+    def test_bad_cursor_rejected(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/audit-trail", params={"before": "yesterday"}, headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: malformed cursor rejected")
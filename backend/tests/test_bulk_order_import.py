@@ -0,0 +1,140 @@
+"""
+Bulk Past-Sales Import Tests
+
+Tests for:
+1. POST /api/orders/bulk - CSV body grouped by billRef
+2. POST /api/orders/bulk - JSON { bills: [...] }
+3. All-or-nothing validation (one bad bill -> nothing imported)
+4. Auth and future-date rejection
+5. Same name with a different mobile is not linked — reported as a link suggestion
+"""
+
+import pytest
+import requests
+import os
+import time
+from datetime import date, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+YESTERDAY = (date.today() - timedelta(days=1)).strftime('%d-%m-%Y')
+TOMORROW = (date.today() + timedelta(days=1)).strftime('%d-%m-%Y')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_bill(total=200, paid=0, order_date=YESTERDAY):
+    return {
+        "orderDate": order_date,
+        "customerName": "TEST_Bulk Import Customer",
+        "paidAmount": paid,
+        "orderItems": [
+            {"name": "TEST_Item", "quantity": 2, "productPrice": total / 2, "totalPrice": total, "type": "non-weighted"}
+        ]
+    }
+
+
+class TestBulkImportValidation:
+    """Requests that must not write anything"""
+
+    def test_requires_auth(self):
+        response = requests.post(f"{BASE_URL}/api/orders/bulk", json={"bills": [make_bill()]})
+        assert response.status_code == 401
+        print("PASS: Bulk import requires authentication")
+
+    def test_empty_body_rejected(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders/bulk", json={}, headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: Empty import rejected")
+
+    def test_one_bad_bill_rejects_all(self, auth_headers):
+        bad = make_bill()
+        bad["orderItems"][0]["quantity"] = 0
+        before = requests.get(f"{BASE_URL}/api/dashboard/invoice-sequence", headers=auth_headers)
+
+        response = requests.post(f"{BASE_URL}/api/orders/bulk",
+                                 json={"bills": [make_bill(), bad]}, headers=auth_headers)
+        assert response.status_code == 400
+        data = response.json()["data"]
+        assert data["errorCount"] == 1
+        assert data["errors"][0]["billRef"] == "#2"
+
+        after = requests.get(f"{BASE_URL}/api/dashboard/invoice-sequence", headers=auth_headers)
+        if before.status_code == 200 and after.status_code == 200:
+            assert before.json() == after.json(), "Invoice sequence must not advance on a rejected import"
+        print("PASS: Invalid bill rejects the whole import")
+
+    def test_future_date_rejected(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders/bulk",
+                                 json={"bills": [make_bill(order_date=TOMORROW)]}, headers=auth_headers)
+        assert response.status_code == 400
+        assert "future" in response.json()["data"]["errors"][0]["message"]
+        print("PASS: Future-dated bill rejected")
+
+
+class TestBulkImport:
+    """Successful imports"""
+
+    def test_json_import(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders/bulk",
+                                 json={"bills": [make_bill(200, 200), make_bill(300, 0)]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["imported"] == 2
+        assert data["totalValue"] == 500
+        assert data["linkSuggestions"] == []
+        assert data["firstInvoice"].startswith("INV/")
+        print(f"PASS: JSON import {data['firstInvoice']} -> {data['lastInvoice']}")
+
+    def test_csv_import_groups_items_by_bill_ref(self, auth_headers):
+        csv = "\n".join([
+            "billRef,orderDate,customerName,paidAmount,name,quantity,productPrice,totalPrice,type",
+            f"A1,{YESTERDAY},TEST_Bulk Import Customer,0,TEST_Item 1,1,100,100,non-weighted",
+            f"A1,{YESTERDAY},TEST_Bulk Import Customer,0,TEST_Item 2,2,50,100,non-weighted",
+            f"A2,{YESTERDAY},,150,TEST_Item 3,3,50,150,non-weighted",
+        ])
+        response = requests.post(f"{BASE_URL}/api/orders/bulk", data=csv,
+                                 headers={**auth_headers, "Content-Type": "text/csv"})
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["imported"] == 2
+        assert data["itemCount"] == 3
+        assert data["totalValue"] == 350
+
+        order = requests.get(f"{BASE_URL}/api/orders", params={"q": data["firstInvoice"]}, headers=auth_headers)
+        if order.status_code == 200:
+            rows = order.json().get("data", {}).get("rows", [])
+            match = [r for r in rows if r.get("orderNumber") == data["firstInvoice"]]
+            if match:
+                assert match[0]["orderDate"] == YESTERDAY
+                assert match[0]["paymentStatus"] == "unpaid"
+        print("PASS: CSV import grouped items by billRef")
+
+    def test_name_match_with_other_mobile_not_linked(self, auth_headers):
+        name = f"TEST_Bulk Namesake {int(time.time())}"
+        first = {**make_bill(100, 0), "customerName": name, "customerMobile": "9000000001"}
+        response = requests.post(f"{BASE_URL}/api/orders/bulk", json={"bills": [first]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["customersCreated"] == 1
+
+        other = {**make_bill(100, 0), "customerName": name, "customerMobile": "9000000002"}
+        response = requests.post(f"{BASE_URL}/api/orders/bulk", json={"bills": [other]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["imported"] == 1
+        assert data["customersMatched"] == 0 and data["customersCreated"] == 0
+        assert len(data["linkSuggestions"]) == 1
+        suggestion = data["linkSuggestions"][0]
+        assert suggestion["mobile"] == "9000000002"
+        assert suggestion["linkSuggestion"]["mobile"] == "9000000001"
+        print(f"PASS: {name} with another mobile left unlinked, suggested {suggestion['linkSuggestion']['customerId']}")
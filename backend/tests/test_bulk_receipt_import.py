@@ -0,0 +1,119 @@
+"""
+Bulk Receipt Import Tests
+
+Tests for:
+1. POST /api/payments/bulk - CSV (bank statement) and JSON { receipts: [...] }
+2. FIFO allocation against the customer's open invoices (oldest first)
+3. allocate=none records receipts On Account
+4. All-or-nothing validation
+"""
+
+import pytest
+import requests
+import os
+import time
+from datetime import date, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+YESTERDAY = (date.today() - timedelta(days=1)).strftime('%d-%m-%Y')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def import_unpaid_bills(headers, customer, totals):
+    bills = [{
+        "orderDate": YESTERDAY,
+        "customerName": customer,
+        "paidAmount": 0,
+        "orderItems": [{"name": "TEST_Item", "quantity": 1, "productPrice": t, "totalPrice": t, "type": "non-weighted"}]
+    } for t in totals]
+    response = requests.post(f"{BASE_URL}/api/orders/bulk", json={"bills": bills}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+class TestBulkReceiptValidation:
+
+    def test_requires_auth(self):
+        response = requests.post(f"{BASE_URL}/api/payments/bulk", json={"receipts": []})
+        assert response.status_code == 401
+        print("PASS: Bulk receipt import requires authentication")
+
+    def test_invalid_allocate_mode(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/payments/bulk", params={"allocate": "lifo"},
+                                 json={"receipts": [{"paymentDate": YESTERDAY, "partyName": "X", "amount": 1}]},
+                                 headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: Unknown allocation mode rejected")
+
+    def test_one_bad_receipt_rejects_all(self, auth_headers):
+        receipts = [
+            {"paymentDate": YESTERDAY, "partyName": "TEST_Receipt Import", "amount": 100},
+            {"paymentDate": YESTERDAY, "partyName": "TEST_Receipt Import", "amount": -5},
+        ]
+        response = requests.post(f"{BASE_URL}/api/payments/bulk", json={"receipts": receipts}, headers=auth_headers)
+        assert response.status_code == 400
+        data = response.json()["data"]
+        assert data["errorCount"] == 1
+        assert data["errors"][0]["ref"] == "#2"
+        print("PASS: Invalid receipt rejects the whole import")
+
+
+class TestBulkReceiptImport:
+
+    def test_fifo_allocates_oldest_first(self, auth_headers):
+        customer = f"TEST_FIFO Import {int(time.time())}"
+        import_unpaid_bills(auth_headers, customer, [100, 200])
+
+        csv = "\n".join([
+            "paymentDate,partyName,amount,referenceNumber",
+            f"{YESTERDAY},{customer},150,UTR1",
+        ])
+        response = requests.post(f"{BASE_URL}/api/payments/bulk", params={"allocate": "fifo"}, data=csv,
+                                 headers={**auth_headers, "Content-Type": "text/csv"})
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["imported"] == 1
+        assert data["allocationCount"] == 2
+        assert data["allocatedAmount"] == 150
+        assert data["invoicesSettled"] == 1
+        assert data["onAccountAmount"] == 0
+        print("PASS: ₹150 receipt settled the ₹100 bill and part-paid the ₹200 bill")
+
+    def test_overpayment_goes_on_account(self, auth_headers):
+        customer = f"TEST_FIFO Advance {int(time.time())}"
+        import_unpaid_bills(auth_headers, customer, [100])
+
+        response = requests.post(f"{BASE_URL}/api/payments/bulk",
+                                 json={"receipts": [{"paymentDate": YESTERDAY, "partyName": customer, "amount": 250}]},
+                                 headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["allocatedAmount"] == 100
+        assert data["onAccountAmount"] == 150
+        print("PASS: Excess receipt left On Account")
+
+    def test_allocate_none(self, auth_headers):
+        customer = f"TEST_No Alloc {int(time.time())}"
+        import_unpaid_bills(auth_headers, customer, [100])
+
+        response = requests.post(f"{BASE_URL}/api/payments/bulk",
+                                 json={"allocate": "none",
+                                       "receipts": [{"paymentDate": YESTERDAY, "partyName": customer, "amount": 100}]},
+                                 headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["allocationCount"] == 0
+        assert data["onAccountAmount"] == 100
+        print("PASS: allocate=none records receipt On Account")
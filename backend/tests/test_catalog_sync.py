@@ -0,0 +1,108 @@
+"""
+Catalogue Delta Sync Tests
+
+Tests for:
+1. GET /api/catalog/products returns a full snapshot with a version
+2. Asking again with the same version and ETag returns 304
+3. ?since=<version> returns new rows and deleted ids only
+4. Customer catalogue behaves the same
+5. The POS due for one customer matches the computed balance in the full list
+"""
+
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def catalog(auth_headers, name, since=None, etag=None):
+    headers = {**auth_headers, **({"If-None-Match": etag} if etag else {})}
+    params = {"since": since} if since else {}
+    return requests.get(f"{BASE_URL}/api/catalog/{name}", params=params, headers=headers)
+
+
+class TestCatalogSync:
+
+    def test_snapshot_then_not_modified(self, auth_headers):
+        first = catalog(auth_headers, "products")
+        assert first.status_code == 200, first.text
+        data = first.json()["data"]
+        assert data["full"] is True
+        assert data["deletes"] == []
+        assert int(data["version"]) > 0
+        assert first.headers.get("ETag")
+
+        again = catalog(auth_headers, "products", since=data["version"], etag=None)
+        assert again.status_code == 200
+        etag = again.headers["ETag"]
+        cached = catalog(auth_headers, "products", since=data["version"], etag=etag)
+        assert cached.status_code == 304
+        assert cached.content == b""
+        print(f"PASS: snapshot of {len(data['upserts'])} products, unchanged catalogue answered 304")
+
+    def test_delta_has_changes_and_deletes(self, auth_headers):
+        version = catalog(auth_headers, "products").json()["data"]["version"]
+
+        name = f"TEST_Catalog_{str(uuid.uuid4())[:8]}"
+        response = requests.post(f"{BASE_URL}/api/products", json={
+            "name": name, "pricePerKg": 120, "type": "weighted"
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        product_id = response.json()["data"]["id"]
+
+        delta = catalog(auth_headers, "products", since=version).json()["data"]
+        assert delta["full"] is False
+        assert int(delta["version"]) > int(version)
+        assert product_id in [p["id"] for p in delta["upserts"]]
+
+        response = requests.delete(f"{BASE_URL}/api/products/{product_id}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        delta = catalog(auth_headers, "products", since=delta["version"]).json()["data"]
+        assert product_id in delta["deletes"]
+        print("PASS: delta carried the new product, then its deletion")
+
+    def test_customer_catalog(self, auth_headers):
+        data = catalog(auth_headers, "customers").json()["data"]
+        assert data["full"] is True
+        for row in data["upserts"][:5]:
+            assert {"id", "name", "mobile", "currentBalance", "updatedAt"} <= set(row)
+        print(f"PASS: customer catalogue snapshot of {len(data['upserts'])} rows")
+
+    def test_invalid_version_rejected(self, auth_headers):
+        assert catalog(auth_headers, "products", since="yesterday").status_code == 400
+        print("PASS: non-numeric version rejected")
+
+    def test_single_customer_due_matches_list(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/customers/with-balance", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        rows = response.json()["data"]["rows"]
+        if not rows:
+            pytest.skip("no customers")
+        customer = max(rows, key=lambda r: float(r["balance"]))
+
+        response = requests.get(f"{BASE_URL}/api/customers/with-balance",
+                                params={"customerId": customer["id"]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        single = response.json()["data"]["rows"]
+        assert [r["id"] for r in single] == [customer["id"]]
+        assert float(single[0]["balance"]) == float(customer["balance"])
+
+        response = requests.get(f"{BASE_URL}/api/customers/with-balance",
+                                params={"customerId": "not-a-uuid"}, headers=auth_headers)
+        assert response.status_code == 400
+        print(f"PASS: due for {customer['name']} is the computed balance {customer['balance']}")
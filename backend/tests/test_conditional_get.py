@@ -0,0 +1,81 @@
+"""
+Conditional GET Tests
+
+Tests for:
+1. List endpoints send an ETag and answer a matching If-None-Match with 304
+2. A write to a table the list reads from changes the ETag
+3. Writes to unrelated tables leave the ETag alone
+"""
+
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def get(auth_headers, path, etag=None):
+    headers = {**auth_headers, **({"If-None-Match": etag} if etag else {})}
+    return requests.get(f"{BASE_URL}/api{path}", headers=headers)
+
+
+def create_product(auth_headers):
+    response = requests.post(f"{BASE_URL}/api/products", json={
+        "name": f"TEST_Etag_{str(uuid.uuid4())[:8]}", "pricePerKg": 90, "type": "weighted"
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["id"]
+
+
+class TestConditionalGet:
+
+    @pytest.mark.parametrize("path", ["/products", "/customers", "/suppliers", "/payments", "/orders"])
+    def test_unchanged_list_answers_304(self, auth_headers, path):
+        first = get(auth_headers, path)
+        assert first.status_code == 200, first.text
+        etag = first.headers.get("ETag")
+        assert etag and etag.startswith('W/"')
+        assert "no-cache" in first.headers.get("Cache-Control", "")
+
+        cached = get(auth_headers, path, etag=etag)
+        assert cached.status_code == 304
+        assert cached.content == b""
+        print(f"PASS: GET {path} revalidated with 304")
+
+    def test_write_changes_etag(self, auth_headers):
+        etag = get(auth_headers, "/products").headers["ETag"]
+        product_id = create_product(auth_headers)
+
+        after = get(auth_headers, "/products", etag=etag)
+        assert after.status_code == 200
+        assert after.headers["ETag"] != etag
+        requests.delete(f"{BASE_URL}/api/products/{product_id}", headers=auth_headers)
+        print("PASS: new product invalidated the products ETag")
+
+    def test_unrelated_write_keeps_etag(self, auth_headers):
+        etag = get(auth_headers, "/suppliers").headers["ETag"]
+        product_id = create_product(auth_headers)
+
+        assert get(auth_headers, "/suppliers", etag=etag).status_code == 304
+        requests.delete(f"{BASE_URL}/api/products/{product_id}", headers=auth_headers)
+        print("PASS: product write left the suppliers ETag valid")
+
+    def test_query_string_is_part_of_etag(self, auth_headers):
+        a = get(auth_headers, "/orders?limit=5").headers["ETag"]
+        b = get(auth_headers, "/orders?limit=6").headers["ETag"]
+        assert a != b
+        print("PASS: different filters get different ETags")
@@ -0,0 +1,84 @@
+"""
+Database Backup Tests
+
+Tests for:
+1. GET /api/data-audit/backup streams a compressed dump as an attachment
+2. GET /api/data-audit/backups lists stored backups and the WAL archiving state
+3. POST /api/data-audit/backups takes a backup whose checksums then verify
+4. Unknown backup ids and invalid backup types are refused
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestDbBackup:
+
+    def test_download_is_compressed(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/data-audit/backup", headers=auth_headers, timeout=120)
+        assert response.status_code == 200, response.text
+        disposition = response.headers["Content-Disposition"]
+        if disposition.rstrip('"').endswith(".dump"):
+            assert response.content[:5] == b"PGDMP"
+        else:
+            assert disposition.rstrip('"').endswith(".sql.gz")
+            assert response.content[:2] == b"\x1f\x8b"
+        print(f"PASS: downloaded {len(response.content)} compressed bytes ({disposition})")
+
+    def test_list_backups(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/data-audit/backups", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert isinstance(data["walArchiving"], bool)
+        for backup in data["backups"]:
+            assert backup["type"] in ("full", "incremental")
+            assert "files" not in backup and backup["fileCount"] >= 0
+        print(f"PASS: {len(data['backups'])} stored backups, WAL archiving {data['walArchiving']}")
+
+    def test_backup_then_verify(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/data-audit/backups", json={"type": "auto"},
+                                 headers=auth_headers, timeout=600)
+        if response.status_code in (409, 503):
+            pytest.skip(response.json()["message"])
+        assert response.status_code == 200, response.text
+        backup = response.json()["data"]
+        assert backup["bytes"] > 0
+        if backup["type"] == "full":
+            assert backup["format"] == "directory" and backup["compression"] in ("zstd", "gzip")
+
+        response = requests.post(f"{BASE_URL}/api/data-audit/backups/{backup['id']}/verify", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        result = response.json()["data"]
+        assert result["ok"] is True, result["problems"]
+        assert result["filesChecked"] == backup["fileCount"]
+        print(f"PASS: {backup['type']} backup {backup['id']} verified ({result['filesChecked']} files)")
+
+    def test_refused_requests(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/data-audit/backups", json={"type": "weekly"}, headers=auth_headers)
+        assert response.status_code == 400
+
+        response = requests.post(f"{BASE_URL}/api/data-audit/backups/full_19990101T000000/verify", headers=auth_headers)
+        assert response.status_code == 404
+
+        response = requests.post(f"{BASE_URL}/api/data-audit/backups/full_19990101T000000/restore-benchmark", headers=auth_headers)
+        assert response.status_code == 404
+
+        response = requests.get(f"{BASE_URL}/api/data-audit/backup", params={"id": "nope"}, headers=auth_headers)
+        assert response.status_code == 404
+        print("PASS: invalid type and unknown backup ids refused")
@@ -0,0 +1,142 @@
+#!/usr/bin/env node
+/**
+ * Property-based tests for the FIFO allocation engine (utils/fifoAllocation.js)
+ *
+ * Pure in-memory tests — no server or database needed:
+ *   node tests/test_fifo_allocation.js [cases]
+ *
+ * For thousands of random invoice/receipt sets (seeded, reproducible) checks:
+ *   1. No invoice is allocated more than it owes
+ *   2. No receipt is allocated more than its amount
+ *   3. Allocated total = min(total open, total receipts)   (nothing left on the table)
+ *   4. FIFO order — an invoice only receives money once every older invoice is settled
+ *   5. Remaining balances returned by the engine match the allocations
+ *   6. Same result as the original nested-loop allocator
+ *   7. Inputs are not mutated
+ */
+
+const assert = require('assert');
+const { allocateFifo, sumAllocations, paymentState } = require('../src/utils/fifoAllocation');
+
+const CASES = Number(process.argv[2]) || 5000;
+
+// Deterministic random for reproducibility
+let seed = 20261019;
+function seededRandom() {
+    const x = Math.sin(seed++) * 10000;
+    return x - Math.floor(x);
+}
+
+function randomInt(min, max) {
+    return Math.floor(seededRandom() * (max - min + 1)) + min;
+}
+
+function randomAmount() {
+    // Mix of round amounts, paise amounts and zeros
+    const kind = randomInt(0, 9);
+    if (kind === 0) return 0;
+    if (kind < 4) return randomInt(1, 50) * 100;
+    return randomInt(1, 500000) / 100;
+}
+
+const paise = (rupees) => Math.round(rupees * 100);
+
+/** The allocator that reconstructFifo used before the engine, in paise. */
+function referenceAllocate(invoices, receipts) {
+    const allocations = [];
+    const remaining = receipts.map(r => paise(r.amount));
+    for (const invoice of invoices) {
+        let open = paise(invoice.open);
+        if (open <= 0) continue;
+        for (let r = 0; r < receipts.length; r++) {
+            if (remaining[r] <= 0) continue;
+            const amount = Math.min(remaining[r], open);
+            allocations.push({ paymentId: receipts[r].id, orderId: invoice.id, amount: amount / 100 });
+            remaining[r] -= amount;
+            open -= amount;
+            if (open <= 0) break;
+        }
+    }
+    return allocations;
+}
+
+const sortKey = (a) => `${a.paymentId}|${a.orderId}`;
+
+function checkCase(invoices, receipts) {
+    const invoicesBefore = JSON.stringify(invoices);
+    const receiptsBefore = JSON.stringify(receipts);
+
+    const result = allocateFifo(invoices, receipts);
+    const perInvoice = sumAllocations(result.allocations, 'orderId');
+    const perReceipt = sumAllocations(result.allocations, 'paymentId');
+
+    // 1 & 5
+    invoices.forEach((inv, i) => {
+        const allocated = paise(perInvoice.get(inv.id) || 0);
+        assert(allocated <= paise(inv.open), `invoice ${inv.id} over-allocated`);
+        assert.strictEqual(paise(result.invoiceOpen[i]), paise(inv.open) - allocated, `invoice ${inv.id} remaining mismatch`);
+    });
+
+    // 2 & 5
+    receipts.forEach((r, i) => {
+        const allocated = paise(perReceipt.get(r.id) || 0);
+        assert(allocated <= paise(r.amount), `receipt ${r.id} over-used`);
+        assert.strictEqual(paise(result.receiptUnused[i]), paise(r.amount) - allocated, `receipt ${r.id} unused mismatch`);
+    });
+
+    // 3
+    const totalOpen = invoices.reduce((s, inv) => s + paise(inv.open), 0);
+    const totalReceipts = receipts.reduce((s, r) => s + paise(r.amount), 0);
+    const totalAllocated = result.allocations.reduce((s, a) => s + paise(a.amount), 0);
+    assert.strictEqual(totalAllocated, Math.min(totalOpen, totalReceipts), 'allocated total');
+
+    // 4
+    let sawUnsettled = false;
+    for (let i = 0; i < invoices.length; i++) {
+        if (sawUnsettled) assert.strictEqual(paise(perInvoice.get(invoices[i].id) || 0), 0, 'FIFO order violated');
+        if (result.invoiceOpen[i] > 0) sawUnsettled = true;
+    }
+    assert(result.allocations.every(a => a.amount > 0), 'zero allocation emitted');
+
+    // 6
+    const reference = referenceAllocate(invoices, receipts);
+    assert.deepStrictEqual(
+        result.allocations.map(a => ({ ...a })).sort((x, y) => sortKey(x).localeCompare(sortKey(y))),
+        reference.sort((x, y) => sortKey(x).localeCompare(sortKey(y))),
+        'differs from reference allocator'
+    );
+
+    // 7
+    assert.strictEqual(JSON.stringify(invoices), invoicesBefore, 'invoices mutated');
+    assert.strictEqual(JSON.stringify(receipts), receiptsBefore, 'receipts mutated');
+}
+
+function testPaymentState() {
+    assert.deepStrictEqual(paymentState(100, 0), { paidAmount: 0, dueAmount: 100, paymentStatus: 'unpaid' });
+    assert.deepStrictEqual(paymentState(100, 40), { paidAmount: 40, dueAmount: 60, paymentStatus: 'partial' });
+    assert.deepStrictEqual(paymentState(100, 100), { paidAmount: 100, dueAmount: 0, paymentStatus: 'paid' });
+    assert.deepStrictEqual(paymentState(0.3, 0.1 + 0.2), { paidAmount: 0.3, dueAmount: 0, paymentStatus: 'paid' });
+    assert.strictEqual(paymentState(100, 99.6, { tolerance: 0.5 }).paymentStatus, 'paid');
+    assert.strictEqual(paymentState(100, 0.4, { tolerance: 0.5 }).paymentStatus, 'unpaid');
+    console.log('  ✓ PASS: paymentState thresholds');
+}
+
+function main() {
+    console.log(`FIFO allocation engine — ${CASES} random cases`);
+    testPaymentState();
+
+    for (let c = 0; c < CASES; c++) {
+        const invoices = Array.from({ length: randomInt(0, 30) }, (_, i) => ({ id: `inv-${i}`, open: randomAmount() }));
+        const receipts = Array.from({ length: randomInt(0, 30) }, (_, i) => ({ id: `rcpt-${i}`, amount: randomAmount() }));
+        try {
+            checkCase(invoices, receipts);
+        } catch (error) {
+            console.error(`  ✗ FAIL (case ${c}): ${error.message}`);
+            console.error(JSON.stringify({ invoices, receipts }));
+            process.exit(1);
+        }
+    }
+    console.log(`  ✓ PASS: ${CASES} cases — bounds, conservation, FIFO order, reference equivalence, no mutation`);
+}
+
+main();
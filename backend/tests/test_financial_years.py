@@ -0,0 +1,122 @@
+"""
+Financial-Year Close Tests
+
+Tests for:
+1. GET /api/ledger/financial-years reports the current year and the next one to close
+2. Closing the current year, a malformed label or a year out of order is refused
+3. A dry-run close previews the carry-forward and archive counts and changes nothing
+4. Reports and statements reaching back before any close still answer
+5. Customer detail, GST summary and Tally exports read closed years, and the
+   customer-detail balance matches the with-balance list
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def years(auth_headers):
+    response = requests.get(f"{BASE_URL}/api/ledger/financial-years", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def close(auth_headers, label, dry_run=True):
+    params = {"dryRun": "true"} if dry_run else {}
+    return requests.post(f"{BASE_URL}/api/ledger/financial-years/{label}/close", params=params, headers=auth_headers)
+
+
+class TestFinancialYears:
+
+    def test_list_years(self, auth_headers):
+        data = years(auth_headers)
+        assert data["current"][:4].isdigit() and len(data["current"]) == 7
+        assert isinstance(data["closed"], list)
+        closed = [y["label"] for y in data["closed"]]
+        assert data["current"] not in closed
+        print(f"PASS: current {data['current']}, next to close {data['nextToClose']}, closed {closed}")
+
+    def test_refused_closes(self, auth_headers):
+        current = years(auth_headers)["current"]
+        response = close(auth_headers, current)
+        assert response.status_code == 400
+        assert "has not ended" in response.json()["message"]
+
+        assert close(auth_headers, "2024-26").status_code == 400
+        assert close(auth_headers, "last-year").status_code == 400
+
+        # A year long before any data is never the next one to close
+        response = close(auth_headers, "1999-00")
+        assert response.status_code == 409, response.text
+        print("PASS: current year, malformed label and out-of-order year refused")
+
+    def test_dry_run_changes_nothing(self, auth_headers):
+        before = years(auth_headers)
+        label = before["nextToClose"]
+        if not label or label == before["current"]:
+            pytest.skip("no ended financial year left to close")
+
+        response = close(auth_headers, label)
+        assert response.status_code == 200, response.text
+        preview = response.json()["data"]
+        assert preview["dryRun"] is True
+        assert preview["financialYear"] == label
+        assert set(preview["archived"]) == {
+            "orders", "orderItems", "payments", "receipt_allocations", "journal_batches", "ledger_entries"
+        }
+        if preview["openingBatch"]:
+            assert preview["openingBatch"]["batchNumber"].startswith("JV-OPN-")
+            assert preview["openingAccounts"] >= 2
+
+        after = years(auth_headers)
+        assert after["closed"] == before["closed"]
+        assert after["nextToClose"] == label
+        print(f"PASS: preview of {label} archived {preview['archived']} and was rolled back")
+
+    def test_reports_reaching_into_closed_years(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/ledger/reports/trial-balance",
+                                params={"asOfDate": "2000-03-31"}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+        accounts = requests.get(f"{BASE_URL}/api/ledger/accounts", headers=auth_headers).json()["data"]
+        cash = next(a for a in accounts if a["code"] == "1100")
+        response = requests.get(f"{BASE_URL}/api/ledger/accounts/{cash['id']}/ledger",
+                                params={"fromDate": "2000-04-01"}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+        response = requests.get(f"{BASE_URL}/api/customers/with-balance", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        print("PASS: as-of trial balance, account ledger and party balances answer across years")
+
+    def test_detail_and_exports_across_years(self, auth_headers):
+        listed = requests.get(f"{BASE_URL}/api/customers/with-balance", headers=auth_headers).json()["data"]["rows"]
+        for customer in listed[:5]:
+            response = requests.get(f"{BASE_URL}/api/customers/{customer['id']}/transactions", headers=auth_headers)
+            assert response.status_code == 200, response.text
+            detail = response.json()["data"]
+            assert abs(float(detail["balance"]) - float(customer["balance"])) < 0.01, \
+                f"{customer['name']}: detail {detail['balance']} vs list {customer['balance']}"
+
+        span = {"startDate": "2000-04-01", "endDate": "2099-03-31"}
+        response = requests.get(f"{BASE_URL}/api/gst-export/summary", params=span, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        for kind in ("sales", "payments"):
+            response = requests.get(f"{BASE_URL}/api/export/tally/{kind}", params=span, headers=auth_headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["Content-Type"].startswith("text/csv")
+        print(f"PASS: {min(len(listed), 5)} customer balances agree; GST summary and Tally exports answer across years")
@@ -0,0 +1,64 @@
+"""
+Full Bill Audit Report Tests
+
+Tests for:
+1. GET /api/audit/full-report - downloads the report as a single document
+2. GET /api/audit/full-report?format=html - HTML variant
+3. Admin-only access
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestFullAuditReportDownload:
+    """GET /api/audit/full-report tests"""
+
+    def test_requires_auth(self):
+        response = requests.get(f"{BASE_URL}/api/audit/full-report")
+        assert response.status_code == 401
+        print("PASS: Report download requires authentication")
+
+    def test_text_report_is_attachment(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/audit/full-report", headers=auth_headers)
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        assert response.headers['Content-Type'].startswith('text/plain')
+        assert 'attachment' in response.headers.get('Content-Disposition', '')
+        body = response.text
+        assert 'COMPLETE BILL AUDIT REPORT' in body
+        assert 'TAB 2: WEIGHT FETCHES' in body
+        assert 'Overall:' in body
+        assert '<b>' not in body, "Plain-text report should not contain Telegram markup"
+        print("PASS: Text report downloaded as attachment")
+
+    def test_html_report(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/audit/full-report",
+                                params={"format": "html"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/html')
+        assert '<b>COMPLETE BILL AUDIT REPORT</b>' in response.text
+        print("PASS: HTML report downloaded")
+
+    def test_date_range(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/audit/full-report",
+                                params={"startDate": "2026-01-01", "endDate": "2026-01-31"},
+                                headers=auth_headers)
+        assert response.status_code == 200
+        assert 'bill-audit-report-2026-01-01' in response.headers.get('Content-Disposition', '')
+        print("PASS: Date range respected in filename")
@@ -0,0 +1,72 @@
+"""
+HTTP Pipeline Tests
+
+Tests for:
+1. API responses are compressed (gzip / br) when the client accepts it
+2. Per-route body limits - POS routes reject oversized bodies with 413
+3. Unknown /api routes return a JSON 404
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestCompression:
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br"])
+    def test_api_json_compressed(self, auth_headers, encoding):
+        response = requests.get(f"{BASE_URL}/api/products",
+                                headers={**auth_headers, "Accept-Encoding": encoding}, stream=True)
+        assert response.status_code == 200
+        raw = response.raw.read()
+        if len(raw) >= 1024:
+            assert response.headers.get("Content-Encoding") == encoding
+        print(f"PASS: /api/products sent as {response.headers.get('Content-Encoding', 'identity')} ({len(raw)} bytes)")
+
+    def test_identity_when_not_accepted(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/products",
+                                headers={**auth_headers, "Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        print("PASS: Uncompressed response when client does not accept compression")
+
+
+class TestBodyLimits:
+
+    def test_pos_route_rejects_oversized_body(self, auth_headers):
+        big = {"orderItems": [{"name": "X" * 1000, "quantity": 1, "productPrice": 1, "totalPrice": 1}] * 1000}
+        response = requests.post(f"{BASE_URL}/api/orders", json=big, headers=auth_headers)
+        assert response.status_code == 413
+        assert "too large" in response.json()["message"]
+        print("PASS: 1 MB body rejected on POST /api/orders")
+
+    def test_malformed_json(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders", data="{not json",
+                                 headers={**auth_headers, "Content-Type": "application/json"})
+        assert response.status_code == 400
+        print("PASS: Malformed JSON rejected with 400")
+
+
+class TestApiNotFound:
+
+    def test_unknown_api_route(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/no-such-route", headers=auth_headers)
+        assert response.status_code == 404
+        assert response.json()["status"] == 404
+        print("PASS: Unknown API route returns JSON 404")
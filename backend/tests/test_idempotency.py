@@ -0,0 +1,118 @@
+"""
+Idempotency-Key Tests
+
+Tests for:
+1. POST /api/orders retried with the same key returns the first bill, once
+2. Same key with a different body is rejected with 422
+3. POST /api/payments retried with the same key returns the same receipt
+4. Requests without the header are unaffected
+"""
+
+import pytest
+import requests
+import os
+import uuid
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def order_payload(suffix, total=500):
+    return {
+        "orderDate": datetime.now().strftime("%d-%m-%Y"),
+        "customerName": f"TEST_Idem_{suffix}",
+        "customerMobile": f"97770{suffix[:5]}",
+        "total": total,
+        "subTotal": total,
+        "tax": 0,
+        "taxPercent": 0,
+        "paidAmount": 0,
+        "orderItems": [
+            {"name": "Idempotent Item", "quantity": 1, "productPrice": total, "totalPrice": total, "type": "non-weighted"}
+        ]
+    }
+
+
+class TestOrderIdempotency:
+
+    def test_retry_returns_same_order(self, auth_headers):
+        suffix = str(uuid.uuid4())[:8]
+        headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+        payload = order_payload(suffix)
+
+        first = requests.post(f"{BASE_URL}/api/orders", json=payload, headers=headers)
+        assert first.status_code == 200, first.text
+        retry = requests.post(f"{BASE_URL}/api/orders", json=payload, headers=headers)
+        assert retry.status_code == 200, retry.text
+
+        assert retry.headers.get("Idempotent-Replayed") == "true"
+        assert retry.json()["data"]["id"] == first.json()["data"]["id"]
+        assert retry.json()["data"]["orderNumber"] == first.json()["data"]["orderNumber"]
+
+        listing = requests.get(f"{BASE_URL}/api/orders", params={"customerName": f"TEST_Idem_{suffix}"},
+                               headers=auth_headers)
+        if listing.status_code == 200:
+            rows = [o for o in listing.json()["data"]["rows"] if o["customerName"] == f"TEST_Idem_{suffix}"]
+            assert len(rows) <= 1
+        print(f"PASS: Retry replayed {first.json()['data']['orderNumber']} without a second invoice")
+
+    def test_key_reuse_with_different_body(self, auth_headers):
+        suffix = str(uuid.uuid4())[:8]
+        headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+
+        first = requests.post(f"{BASE_URL}/api/orders", json=order_payload(suffix), headers=headers)
+        assert first.status_code == 200, first.text
+        changed = requests.post(f"{BASE_URL}/api/orders", json=order_payload(suffix, total=600), headers=headers)
+        assert changed.status_code == 422
+        print("PASS: Key reused with a different bill rejected with 422")
+
+    def test_without_key_creates_each_time(self, auth_headers):
+        suffix = str(uuid.uuid4())[:8]
+        payload = order_payload(suffix)
+        first = requests.post(f"{BASE_URL}/api/orders", json=payload, headers=auth_headers)
+        second = requests.post(f"{BASE_URL}/api/orders", json=payload, headers=auth_headers)
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["data"]["id"] != second.json()["data"]["id"]
+        assert "Idempotent-Replayed" not in second.headers
+        print("PASS: Requests without Idempotency-Key are not deduplicated")
+
+
+class TestPaymentIdempotency:
+
+    def test_retry_records_one_receipt(self, auth_headers):
+        suffix = str(uuid.uuid4())[:8]
+        order = requests.post(f"{BASE_URL}/api/orders", json=order_payload(suffix, total=2000), headers=auth_headers)
+        assert order.status_code == 200, order.text
+        order = order.json()["data"]
+
+        headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+        payload = {
+            "paymentDate": datetime.now().strftime("%d-%m-%Y"),
+            "partyName": order["customerName"],
+            "partyType": "customer",
+            "partyId": order.get("customerId"),
+            "amount": 700,
+            "referenceType": "order",
+            "referenceId": order["id"]
+        }
+        first = requests.post(f"{BASE_URL}/api/payments", json=payload, headers=headers)
+        assert first.status_code == 200, first.text
+        retry = requests.post(f"{BASE_URL}/api/payments", json=payload, headers=headers)
+        assert retry.status_code == 200, retry.text
+        assert retry.headers.get("Idempotent-Replayed") == "true"
+        assert retry.json()["data"]["id"] == first.json()["data"]["id"]
+        assert retry.json()["data"]["paymentNumber"] == first.json()["data"]["paymentNumber"]
+        print(f"PASS: Receipt retry replayed {first.json()['data']['paymentNumber']} — recorded once")
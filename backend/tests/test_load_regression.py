@@ -0,0 +1,79 @@
+"""
+Load Regression Tests
+
+Short runs of tests/load_harness.py against the backend under test.
+Skipped unless LOAD_TEST=1 (they create bills and take ~30s):
+
+    LOAD_TEST=1 LOAD_BASELINE=local pytest tests/test_load_regression.py -s
+
+Tests for:
+1. Baseline comparison logic (no server needed)
+2. Mixed POS workload completes without errors
+3. No regression against the saved baseline named by LOAD_BASELINE
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+load_harness = pytest.importorskip("load_harness", reason="run from backend/ with httpx installed")
+
+LOAD_TEST = os.environ.get("LOAD_TEST") == "1"
+BASELINE = os.environ.get("LOAD_BASELINE")
+
+
+def op(p95, rps, errors=0):
+    return {"count": 100, "errors": errors, "rps": rps, "p50": p95 / 2, "p95": p95, "p99": p95 * 1.5, "max": p95 * 2}
+
+
+class TestBaselineComparison:
+
+    def test_within_tolerance(self):
+        baseline = {"ops": {"create_bill": op(40, 50)}}
+        current = {"ops": {"create_bill": op(45, 48)}}
+        assert load_harness.compare(current, baseline) == []
+        print("PASS: Small drift is within tolerance")
+
+    def test_latency_regression(self):
+        baseline = {"ops": {"create_bill": op(40, 50)}}
+        current = {"ops": {"create_bill": op(80, 50)}}
+        assert any("p95" in p for p in load_harness.compare(current, baseline))
+        print("PASS: p95 regression detected")
+
+    def test_throughput_and_error_regression(self):
+        baseline = {"ops": {"day_start": op(20, 100)}}
+        current = {"ops": {"day_start": op(20, 50, errors=3)}}
+        problems = load_harness.compare(current, baseline)
+        assert any("req/s" in p for p in problems)
+        assert any("errors" in p for p in problems)
+        print("PASS: Throughput drop and new errors detected")
+
+    def test_noise_floor(self):
+        baseline = {"ops": {"export": op(2, 10)}}
+        current = {"ops": {"export": op(4, 10)}}
+        assert load_harness.compare(current, baseline) == []
+        print("PASS: Millisecond-level jitter ignored")
+
+
+@pytest.mark.skipif(not LOAD_TEST, reason="set LOAD_TEST=1 to run load tests")
+class TestLoad:
+
+    def test_pos_mix_no_errors(self):
+        summary = asyncio.run(load_harness.run_load(concurrency=8, duration=15, mix="pos", warmup=2))
+        load_harness.print_summary(summary)
+        assert summary["throughput"] > 0
+        for name, result in summary["ops"].items():
+            assert result["errors"] == 0, f"{name}: {summary['errorSamples'].get(name)}"
+        print("PASS: Mixed POS workload ran without errors")
+
+    @pytest.mark.skipif(not BASELINE, reason="set LOAD_BASELINE=<name> to compare")
+    def test_no_regression_against_baseline(self):
+        baseline = json.loads(load_harness.baseline_path(BASELINE).read_text())
+        meta = baseline["meta"]
+        summary = asyncio.run(load_harness.run_load(meta["concurrency"], int(meta["duration"]), meta["mix"]))
+        load_harness.print_summary(summary)
+        problems = load_harness.compare(summary, baseline)
+        assert problems == [], "\n".join(problems)
+        print(f"PASS: Within tolerance of baseline '{BASELINE}'")
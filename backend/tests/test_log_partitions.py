@@ -0,0 +1,101 @@
+"""
+Log Partitioning Tests
+
+Tests for:
+1. audit_logs, bill_audit_logs and weight_logs are partitioned by month, with months ahead prepared
+2. EXPLAIN of a date-bounded query scans only the matching monthly partitions
+3. Maintenance runs on demand and reports per table
+4. Restoring a month with no archive is a 404
+5. Rows from before partitioning are moved by a backfill job per table, not by the migration
+"""
+
+import pytest
+import requests
+import os
+from datetime import date
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+TABLES = ["audit_logs", "bill_audit_logs", "weight_logs"]
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def month_start(offset=0):
+    today = date.today()
+    index = today.year * 12 + today.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def monthly(names):
+    return sorted(n for n in names if not n.endswith("_default"))
+
+
+class TestLogPartitions:
+
+    def test_tables_partitioned_with_months_ahead(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/audit/partitions", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        status = {t["table"]: t for t in response.json()["data"]}
+        for table in TABLES:
+            assert status[table]["partitioned"] is True
+            months = {p["month"] for p in status[table]["partitions"]}
+            for offset in range(status[table]["monthsAhead"] + 1):
+                assert month_start(offset).strftime("%Y-%m") in months
+        print(f"PASS: {', '.join(TABLES)} partitioned by month")
+
+    @pytest.mark.parametrize("table", TABLES)
+    def test_date_range_prunes_partitions(self, auth_headers, table):
+        this_month = month_start()
+        params = {"from": this_month.isoformat(), "to": month_start(1).isoformat()}
+        response = requests.get(f"{BASE_URL}/api/audit/partitions/{table}/explain", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        scanned = monthly(response.json()["data"]["partitionsScanned"])
+        assert scanned == [f"{table}_p{this_month.strftime('%Y%m')}"], scanned
+
+        params = {"from": month_start(-1).isoformat(), "to": month_start(1).isoformat()}
+        scanned = monthly(requests.get(f"{BASE_URL}/api/audit/partitions/{table}/explain",
+                                       params=params, headers=auth_headers).json()["data"]["partitionsScanned"])
+        assert len(scanned) <= 2
+        print(f"PASS: {table} one-month range scans {scanned[-1]} only")
+
+    def test_maintenance_on_demand(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/audit/partitions/maintain", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        report = {r["table"]: r for r in response.json()["data"]}
+        assert set(report) == set(TABLES)
+        for entry in report.values():
+            assert "table is not partitioned" not in entry["errors"]
+        print("PASS: maintenance ran for every log table")
+
+    def test_restore_without_archive(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/audit/partitions/audit_logs/1999-01/restore", headers=auth_headers)
+        assert response.status_code == 404
+        response = requests.post(f"{BASE_URL}/api/audit/partitions/orders/2026-01/restore", headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: restore validates table and month")
+
+    def test_history_moved_by_backfill_jobs(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/dashboard/migrations", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        jobs = {j["name"]: j for j in response.json()["data"]["backfills"]}
+        for table in TABLES:
+            assert f"partition-{table}" in jobs
+
+        status = {t["table"]: t for t in requests.get(f"{BASE_URL}/api/audit/partitions",
+                                                      headers=auth_headers).json()["data"]}
+        for table in TABLES:
+            assert isinstance(status[table]["historyMoving"], bool)
+            if jobs[f"partition-{table}"]["status"] == "completed":
+                assert status[table]["historyMoving"] is False
+        print("PASS: partition backfill jobs registered; history tables gone once they complete")
@@ -0,0 +1,71 @@
+"""
+Metrics Endpoint Tests
+
+Tests for:
+1. GET /api/metrics - Prometheus text format, admins (or the scrape token) only
+2. Per-route latency and DB-time histograms are recorded under route patterns
+3. Event-loop lag and heap gauges are present
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def scrape(auth_headers):
+    headers = {"Authorization": f"Bearer {METRICS_TOKEN}"} if METRICS_TOKEN else auth_headers
+    response = requests.get(f"{BASE_URL}/api/metrics", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["Content-Type"].startswith("text/plain")
+    return response.text
+
+
+class TestMetrics:
+
+    def test_prometheus_format(self, auth_headers):
+        text = scrape(auth_headers)
+        for line in text.strip().split("\n"):
+            assert line.startswith("#") or " " in line, f"bad line: {line}"
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        print("PASS: /api/metrics serves Prometheus text format")
+
+    def test_route_histograms(self, auth_headers):
+        requests.get(f"{BASE_URL}/api/products", headers=auth_headers)
+        text = scrape(auth_headers)
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/products",status="2xx"}' in text
+        assert 'http_request_db_seconds_count{method="GET",route="/api/products"}' in text
+        print("PASS: Latency and DB-time histograms recorded per route pattern")
+
+    def test_route_pattern_not_raw_path(self, auth_headers):
+        requests.get(f"{BASE_URL}/api/orders/00000000-0000-0000-0000-000000000000", headers=auth_headers)
+        text = scrape(auth_headers)
+        assert "00000000-0000-0000-0000-000000000000" not in text
+        assert 'route="/api/orders/:orderId"' in text
+        print("PASS: IDs are not used as label values")
+
+    def test_runtime_gauges(self, auth_headers):
+        text = scrape(auth_headers)
+        for name in ("nodejs_eventloop_lag_seconds", "nodejs_heap_used_bytes", "db_query_duration_seconds_count"):
+            assert name in text
+        print("PASS: Event-loop lag, heap and DB query metrics present")
+
+    def test_anonymous_refused(self):
+        response = requests.get(f"{BASE_URL}/api/metrics")
+        assert response.status_code == 401
+        print("PASS: /api/metrics refuses anonymous requests")
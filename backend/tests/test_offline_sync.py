@@ -0,0 +1,116 @@
+"""
+Offline Outbox Sync Tests
+
+Tests for:
+1. POST /api/orders/sync creates each queued bill once, in order
+2. Re-sending a synced batch replays the same invoices
+3. A bill whose live POST /api/orders already landed is replayed, not duplicated
+4. Conflicting and invalid bills are reported per bill without blocking the batch
+5. A batch larger than the single-bill body limit is not refused as too large
+"""
+
+import pytest
+import requests
+import os
+import uuid
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def order_payload(total=300):
+    return {
+        "orderDate": datetime.now().strftime("%d-%m-%Y"),
+        "customerName": "",
+        "customerMobile": "",
+        "total": total,
+        "subTotal": total,
+        "tax": 0,
+        "taxPercent": 0,
+        "paidAmount": total,
+        "orderItems": [
+            {"name": "Outbox Item", "quantity": 1, "productPrice": total, "totalPrice": total, "type": "non-weighted"}
+        ]
+    }
+
+
+def queued(order):
+    return {"idempotencyKey": str(uuid.uuid4()), "queuedAt": datetime.now().isoformat(), "order": order}
+
+
+def sync(auth_headers, bills):
+    response = requests.post(f"{BASE_URL}/api/orders/sync", json={"bills": bills}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+class TestOfflineSync:
+
+    def test_batch_created_then_replayed(self, auth_headers):
+        bills = [queued(order_payload(300 + i)) for i in range(3)]
+        first = sync(auth_headers, bills)
+        assert [r["status"] for r in first["results"]] == ["created"] * 3
+        assert first["summary"] == {"created": 3}
+        numbers = [r["order"]["orderNumber"] for r in first["results"]]
+        assert len(set(numbers)) == 3
+
+        again = sync(auth_headers, bills)
+        assert [r["status"] for r in again["results"]] == ["replayed"] * 3
+        assert [r["order"]["orderNumber"] for r in again["results"]] == numbers
+        print(f"PASS: 3 bills created once ({', '.join(numbers)}) and replayed on resend")
+
+    def test_live_attempt_that_landed_is_replayed(self, auth_headers):
+        bill = queued(order_payload(450))
+        live = requests.post(f"{BASE_URL}/api/orders", json=bill["order"],
+                             headers={**auth_headers, "Idempotency-Key": bill["idempotencyKey"]})
+        assert live.status_code == 200, live.text
+
+        result = sync(auth_headers, [bill])["results"][0]
+        assert result["status"] == "replayed"
+        assert result["order"]["id"] == live.json()["data"]["id"]
+        print(f"PASS: queued copy of {result['order']['orderNumber']} replayed, not invoiced twice")
+
+    def test_conflicts_reported_per_bill(self, auth_headers):
+        good = queued(order_payload(310))
+        reused = queued(order_payload(320))
+        sync(auth_headers, [reused])
+        changed = {**reused, "order": order_payload(999)}
+        invalid = queued({**order_payload(330), "orderItems": []})
+        invalid["order"]["total"] = -1
+
+        data = sync(auth_headers, [changed, invalid, good])
+        statuses = {r["idempotencyKey"]: r["status"] for r in data["results"]}
+        assert statuses[changed["idempotencyKey"]] == "conflict"
+        assert statuses[invalid["idempotencyKey"]] == "invalid"
+        assert statuses[good["idempotencyKey"]] == "created"
+        assert data["summary"] == {"conflict": 1, "invalid": 1, "created": 1}
+        print("PASS: conflict and invalid bills reported, good bill still created")
+
+    def test_envelope_validation(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders/sync", json={"bills": []}, headers=auth_headers)
+        assert response.status_code == 400
+        response = requests.post(f"{BASE_URL}/api/orders/sync",
+                                 json={"bills": [queued(order_payload()) for _ in range(51)]}, headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: empty and oversized batches rejected")
+
+    def test_large_batch_within_body_limit(self, auth_headers):
+        # ~700kb — over the 512kb single-bill limit, well under the batch limit
+        bills = [{"idempotencyKey": str(uuid.uuid4()), "queuedAt": datetime.now().isoformat(),
+                  "order": {"padding": "x" * 350000}} for _ in range(2)]
+        response = requests.post(f"{BASE_URL}/api/orders/sync", json={"bills": bills}, headers=auth_headers)
+        assert response.status_code != 413, response.text
+        print(f"PASS: ~700kb outbox batch accepted by the body parser ({response.status_code})")
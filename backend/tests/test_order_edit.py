@@ -0,0 +1,119 @@
+"""
+Order Edit (Item Diff) Tests
+
+Tests for:
+1. PUT /api/orders/:id adds, changes and removes lines in one edit
+2. Lines not belonging to the order are rejected
+3. Edits that change the invoice subtotal are rejected
+4. The number of SQL statements does not grow with the number of lines
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def line(name, amount):
+    return {"name": name, "quantity": 1, "productPrice": amount, "totalPrice": amount, "type": "non-weighted"}
+
+
+def create_order(auth_headers, count=3, amount=100):
+    total = count * amount
+    response = requests.post(f"{BASE_URL}/api/orders", json={
+        "orderDate": datetime.now().strftime("%d-%m-%Y"),
+        "customerName": "",
+        "customerMobile": "",
+        "total": total,
+        "subTotal": total,
+        "tax": 0,
+        "taxPercent": 0,
+        "paidAmount": total,
+        "orderItems": [line(f"Edit Item {i}", amount) for i in range(count)]
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def edit(auth_headers, order_id, items):
+    return requests.put(f"{BASE_URL}/api/orders/{order_id}", json={"orderItems": items}, headers=auth_headers)
+
+
+def stored_items(auth_headers, order_id):
+    response = requests.get(f"{BASE_URL}/api/orders/{order_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["orderItems"]
+
+
+class TestOrderEdit:
+
+    def test_add_change_remove_in_one_edit(self, auth_headers):
+        order = create_order(auth_headers)
+        first, second, third = stored_items(auth_headers, order["id"])
+
+        # Split the second line in two, drop the third, keep the subtotal at 300
+        response = edit(auth_headers, order["id"], [
+            {"id": first["id"]},
+            {"id": second["id"], "name": "Edit Item 1a", "totalPrice": 150, "productPrice": 150},
+            line("Edit Item 1b", 50),
+        ])
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        assert data["subTotal"] == 300
+        assert len(data["orderItems"]) == 3
+
+        items = stored_items(auth_headers, order["id"])
+        assert [i["name"] for i in items] == ["Edit Item 0", "Edit Item 1a", "Edit Item 1b"]
+        assert third["id"] not in [i["id"] for i in items]
+        assert sum(i["totalPrice"] for i in items) == 300
+        print("PASS: one edit added, changed and removed lines")
+
+    def test_foreign_line_rejected(self, auth_headers):
+        order = create_order(auth_headers)
+        other = create_order(auth_headers)
+        foreign = stored_items(auth_headers, other["id"])[0]
+        items = stored_items(auth_headers, order["id"])
+
+        response = edit(auth_headers, order["id"], [{"id": i["id"]} for i in items[:-1]] + [{"id": foreign["id"]}])
+        assert response.status_code == 400
+        assert foreign["id"] in response.json()["message"]
+        assert len(stored_items(auth_headers, other["id"])) == 3
+        print("PASS: line from another order rejected")
+
+    def test_subtotal_change_rejected(self, auth_headers):
+        order = create_order(auth_headers)
+        items = stored_items(auth_headers, order["id"])
+
+        response = edit(auth_headers, order["id"], [{"id": i["id"]} for i in items] + [line("Extra", 10)])
+        assert response.status_code == 400
+        assert len(stored_items(auth_headers, order["id"])) == 3
+        print("PASS: edit that would change the invoice amount rejected")
+
+    def test_statement_count_flat_in_line_count(self, auth_headers):
+        counts = []
+        for count in (2, 20):
+            order = create_order(auth_headers, count=count, amount=10)
+            items = stored_items(auth_headers, order["id"])
+            response = edit(auth_headers, order["id"],
+                            [{"id": i["id"], "name": f"{i['name']} (edited)"} for i in items])
+            assert response.status_code == 200, response.text
+            if "X-Query-Count" not in response.headers:
+                pytest.skip("query budget headers disabled")
+            counts.append(int(response.headers["X-Query-Count"]))
+        assert counts[0] == counts[1], counts
+        print(f"PASS: editing 2 or 20 lines issued {counts[0]} statements")
@@ -0,0 +1,103 @@
+"""
+Query Budget Tests
+
+Reads the X-Query-* headers set by middleware/queryBudget.js (QUERY_BUDGET=warn
+or strict on the backend under test) and fails when a hot path issues more
+queries than its budget or repeats one statement shape (N+1).
+
+Tests for:
+1. POST /api/orders - bill creation
+2. POST /api/payments - receipt against a bill
+3. GET /api/customers/:id/transactions
+4. GET /api/reports/party-statement/customer/:id
+"""
+
+import pytest
+import requests
+import os
+import uuid
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+N1_THRESHOLD = int(os.environ.get('QUERY_N1_THRESHOLD', '10'))
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def assert_within_budget(response, label):
+    if "X-Query-Count" not in response.headers:
+        pytest.skip("Backend runs with QUERY_BUDGET=off")
+    count = int(response.headers["X-Query-Count"])
+    budget = int(response.headers["X-Query-Budget"])
+    repeats = int(response.headers["X-Query-Repeats"])
+    assert count <= budget, f"{label}: {count} queries, budget {budget}"
+    assert repeats < N1_THRESHOLD, f"{label}: one statement shape repeated {repeats} times (N+1)"
+    print(f"PASS: {label} — {count}/{budget} queries, max repeat {repeats}, {response.headers['X-DB-Time-Ms']}ms DB")
+
+
+@pytest.fixture(scope="module")
+def credit_bill(auth_headers):
+    suffix = str(uuid.uuid4())[:8]
+    order_data = {
+        "orderDate": datetime.now().strftime("%d-%m-%Y"),
+        "customerName": f"TEST_Budget_{suffix}",
+        "customerMobile": f"98880{suffix[:5]}",
+        "total": 3000,
+        "subTotal": 3000,
+        "tax": 0,
+        "taxPercent": 0,
+        "paidAmount": 0,
+        "orderItems": [
+            {"name": f"Budget Item {i}", "quantity": 1, "productPrice": 300, "totalPrice": 300, "type": "non-weighted"}
+            for i in range(10)
+        ]
+    }
+    response = requests.post(f"{BASE_URL}/api/orders", json=order_data, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+class TestQueryBudget:
+
+    def test_create_order(self, credit_bill):
+        # 10 line items must not mean 10 item INSERTs
+        assert_within_budget(credit_bill, "POST /api/orders (10 items)")
+
+    def test_create_payment(self, auth_headers, credit_bill):
+        order = credit_bill.json()["data"]
+        response = requests.post(f"{BASE_URL}/api/payments", json={
+            "paymentDate": datetime.now().strftime("%d-%m-%Y"),
+            "partyName": order["customerName"],
+            "partyType": "customer",
+            "partyId": order.get("customerId"),
+            "amount": 1000,
+            "referenceType": "order",
+            "referenceId": order["id"]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert_within_budget(response, "POST /api/payments")
+
+    def test_customer_transactions(self, auth_headers, credit_bill):
+        customer_id = credit_bill.json()["data"].get("customerId")
+        if not customer_id:
+            pytest.skip("Order was not linked to a customer")
+        response = requests.get(f"{BASE_URL}/api/customers/{customer_id}/transactions", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert_within_budget(response, "GET /api/customers/:customerId/transactions")
+
+    def test_party_statement(self, auth_headers, credit_bill):
+        mobile = credit_bill.json()["data"]["customerMobile"]
+        response = requests.get(f"{BASE_URL}/api/reports/party-statement/customer/{mobile}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert_within_budget(response, "GET /api/reports/party-statement")
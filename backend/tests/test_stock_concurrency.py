@@ -0,0 +1,180 @@
+"""
+Stock Concurrency Tests
+
+Tests for:
+1. Concurrent stock-out on one product loses no updates
+2. A bill with catalogue items deducts stock once per product, in one movement
+3. Deleting the bill puts the stock back
+4. Editing a bill's quantities moves stock by the difference; a later delete restores the rest
+5. Deleting an oversold bill restores the stock it found, not the quantity sold
+6. A bill line with a productId that is not a UUID is rejected with 400
+"""
+
+import pytest
+import requests
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+WORKERS = 10
+OPS_PER_WORKER = 5
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def tracked_product(auth_headers, initial_stock):
+    response = requests.post(f"{BASE_URL}/api/products", json={
+        "name": f"TEST_Stock_{str(uuid.uuid4())[:8]}",
+        "pricePerKg": 200,
+        "type": "weighted"
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    product_id = response.json()["data"]["id"]
+    response = requests.post(f"{BASE_URL}/api/stocks/initialize", json={
+        "productId": product_id, "initialStock": initial_stock
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return product_id
+
+
+def stock_of(auth_headers, product_id):
+    response = requests.get(f"{BASE_URL}/api/stocks/product/{product_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return float(response.json()["data"]["currentStock"])
+
+
+class TestStockConcurrency:
+
+    def test_concurrent_stock_out(self, auth_headers):
+        product_id = tracked_product(auth_headers, 1000)
+
+        def remove(_):
+            for _ in range(OPS_PER_WORKER):
+                response = requests.post(f"{BASE_URL}/api/stocks/out", json={
+                    "productId": product_id, "type": "out", "quantity": 1
+                }, headers=auth_headers)
+                assert response.status_code == 200, response.text
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(remove, range(WORKERS)))
+
+        expected = 1000 - WORKERS * OPS_PER_WORKER
+        assert stock_of(auth_headers, product_id) == expected
+        print(f"PASS: {WORKERS * OPS_PER_WORKER} concurrent stock-outs, stock {expected} — no lost updates")
+
+    def test_bill_deducts_and_delete_restores(self, auth_headers):
+        product_id = tracked_product(auth_headers, 100)
+        response = requests.post(f"{BASE_URL}/api/orders", json={
+            "orderDate": datetime.now().strftime("%d-%m-%Y"),
+            "customerName": f"TEST_StockBill_{str(uuid.uuid4())[:8]}",
+            "total": 700,
+            "subTotal": 700,
+            "tax": 0,
+            "taxPercent": 0,
+            "paidAmount": 700,
+            "orderItems": [
+                {"productId": product_id, "name": "Stock Item", "quantity": 1.5, "productPrice": 200, "totalPrice": 300, "type": "weighted"},
+                {"productId": product_id, "name": "Stock Item", "quantity": 2, "productPrice": 200, "totalPrice": 400, "type": "weighted"}
+            ]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        order_id = response.json()["data"]["id"]
+        assert stock_of(auth_headers, product_id) == 96.5
+
+        movements = requests.get(f"{BASE_URL}/api/stocks/transactions", params={"productId": product_id, "type": "out"},
+                                 headers=auth_headers)
+        if movements.status_code == 200:
+            assert movements.json()["data"]["count"] == 1
+
+        response = requests.delete(f"{BASE_URL}/api/orders/{order_id}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert stock_of(auth_headers, product_id) == 100
+        print("PASS: Bill deducted 3.5 in one movement; delete restored it")
+
+    def test_edit_moves_stock_and_delete_restores(self, auth_headers):
+        product_id = tracked_product(auth_headers, 100)
+        response = requests.post(f"{BASE_URL}/api/orders", json={
+            "orderDate": datetime.now().strftime("%d-%m-%Y"),
+            "customerName": f"TEST_StockEdit_{str(uuid.uuid4())[:8]}",
+            "total": 400,
+            "subTotal": 400,
+            "tax": 0,
+            "taxPercent": 0,
+            "paidAmount": 400,
+            "orderItems": [
+                {"productId": product_id, "name": "Stock Item", "quantity": 2, "productPrice": 200, "totalPrice": 400, "type": "weighted"}
+            ]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        order_id = response.json()["data"]["id"]
+        assert stock_of(auth_headers, product_id) == 98
+
+        line = requests.get(f"{BASE_URL}/api/orders/{order_id}", headers=auth_headers).json()["data"]["orderItems"][0]
+        response = requests.put(f"{BASE_URL}/api/orders/{order_id}", json={
+            "orderItems": [{"id": line["id"], "quantity": 4, "productPrice": 100}]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert stock_of(auth_headers, product_id) == 96
+
+        response = requests.put(f"{BASE_URL}/api/orders/{order_id}", json={
+            "orderItems": [{"id": line["id"], "quantity": 1, "productPrice": 400}]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert stock_of(auth_headers, product_id) == 99
+
+        response = requests.delete(f"{BASE_URL}/api/orders/{order_id}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert stock_of(auth_headers, product_id) == 100
+        print("PASS: Edits moved stock by the quantity change; delete restored the rest")
+
+    def test_delete_after_oversell_restores_what_was_there(self, auth_headers):
+        product_id = tracked_product(auth_headers, 3)
+        response = requests.post(f"{BASE_URL}/api/orders", json={
+            "orderDate": datetime.now().strftime("%d-%m-%Y"),
+            "customerName": f"TEST_Oversell_{str(uuid.uuid4())[:8]}",
+            "total": 2000,
+            "subTotal": 2000,
+            "tax": 0,
+            "taxPercent": 0,
+            "paidAmount": 2000,
+            "orderItems": [
+                {"productId": product_id, "name": "Stock Item", "quantity": 10, "productPrice": 200, "totalPrice": 2000, "type": "weighted"}
+            ]
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        order_id = response.json()["data"]["id"]
+        assert stock_of(auth_headers, product_id) == 0
+
+        response = requests.delete(f"{BASE_URL}/api/orders/{order_id}", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert stock_of(auth_headers, product_id) == 3
+        print("PASS: Oversold bill logged 3 out; delete restored 3, not 10")
+
+    def test_non_uuid_product_id_rejected(self, auth_headers):
+        response = requests.post(f"{BASE_URL}/api/orders", json={
+            "orderDate": datetime.now().strftime("%d-%m-%Y"),
+            "customerName": f"TEST_BadProduct_{str(uuid.uuid4())[:8]}",
+            "total": 200,
+            "subTotal": 200,
+            "tax": 0,
+            "taxPercent": 0,
+            "paidAmount": 200,
+            "orderItems": [
+                {"productId": "local-42", "name": "Stock Item", "quantity": 1, "productPrice": 200, "totalPrice": 200, "type": "weighted"}
+            ]
+        }, headers=auth_headers)
+        assert response.status_code == 400, response.text
+        print("PASS: Non-UUID productId answered 400, not 500")
@@ -0,0 +1,120 @@
+"""
+Stock Summary and Low-Stock Feed Tests
+
+Tests for:
+1. Summary returns counts only, consistent with the low-stock list
+2. Low-stock list is filtered in SQL, so its count matches its rows
+3. Alert feed returns only rows changed after the cursor, flagged low or cleared
+"""
+
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    """Return headers with admin auth token"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "username": "admin",
+        "password": "yttriumR"
+    })
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    data = response.json()
+    token = data.get('data', {}).get('token') or data.get('token')
+    return {"Authorization": f"Bearer {token}"}
+
+
+def tracked_product(auth_headers, initial_stock, min_level):
+    response = requests.post(f"{BASE_URL}/api/products", json={
+        "name": f"TEST_LowStock_{str(uuid.uuid4())[:8]}",
+        "pricePerKg": 200,
+        "type": "weighted"
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    product_id = response.json()["data"]["id"]
+    response = requests.post(f"{BASE_URL}/api/stocks/initialize", json={
+        "productId": product_id, "initialStock": initial_stock, "minStockLevel": min_level
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return product_id
+
+
+def read_feed(auth_headers, cursor=None):
+    """Drain the feed from `cursor`; returns (rows, next cursor)"""
+    rows = []
+    params = {"limit": 200}
+    if cursor and cursor.get("since"):
+        params.update({k: v for k, v in cursor.items() if v})
+    while True:
+        response = requests.get(f"{BASE_URL}/api/stocks/low-stock/feed", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        rows.extend(data["rows"])
+        params.update({k: v for k, v in data["cursor"].items() if v})
+        if not data["hasMore"]:
+            return rows, data["cursor"]
+
+
+class TestStockSummary:
+
+    def test_summary_is_counts_only(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/stocks/summary", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        summary = response.json()["data"]
+        assert "stocks" not in summary
+        for key in ("totalProducts", "lowStockCount", "outOfStockCount"):
+            assert isinstance(summary[key], int)
+        assert summary["outOfStockCount"] <= summary["totalProducts"]
+        print(f"PASS: summary {summary}")
+
+    def test_low_stock_list_matches_summary(self, auth_headers):
+        tracked_product(auth_headers, 2, 10)
+        summary = requests.get(f"{BASE_URL}/api/stocks/summary", headers=auth_headers).json()["data"]
+
+        response = requests.get(f"{BASE_URL}/api/stocks/low-stock", params={"limit": 5}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        page = response.json()["data"]
+        assert page["count"] == summary["lowStockCount"]
+        assert 0 < len(page["rows"]) <= 5
+        assert all(row["currentStock"] <= row["minStockLevel"] for row in page["rows"])
+        levels = [row["currentStock"] for row in page["rows"]]
+        assert levels == sorted(levels)
+
+        legacy = requests.get(f"{BASE_URL}/api/stocks", params={"lowStockOnly": "true", "limit": 5}, headers=auth_headers)
+        assert legacy.json()["data"]["count"] == summary["lowStockCount"]
+        print(f"PASS: low-stock list count {page['count']} matches summary")
+
+    def test_feed_is_incremental(self, auth_headers):
+        _, cursor = read_feed(auth_headers)
+        assert cursor["since"]
+
+        low = tracked_product(auth_headers, 1, 5)
+        healthy = tracked_product(auth_headers, 50, 5)
+        rows, cursor = read_feed(auth_headers, cursor)
+        by_product = {row["productId"]: row for row in rows}
+        assert by_product[low]["isLowStock"] is True
+        assert by_product[healthy]["isLowStock"] is False
+
+        # Restocking clears the alert; nothing else is replayed
+        response = requests.post(f"{BASE_URL}/api/stocks/in", json={
+            "productId": low, "type": "in", "quantity": 20
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        rows, cursor = read_feed(auth_headers, cursor)
+        changed = [row for row in rows if row["productId"] in (low, healthy)]
+        assert [row["productId"] for row in changed] == [low]
+        assert changed[0]["isLowStock"] is False
+
+        rows, _ = read_feed(auth_headers, cursor)
+        assert all(row["productId"] not in (low, healthy) for row in rows)
+        print("PASS: feed returns only changes after the cursor")
+
+    def test_feed_rejects_bad_cursor(self, auth_headers):
+        response = requests.get(f"{BASE_URL}/api/stocks/low-stock/feed",
+                                params={"afterId": "not-a-uuid"}, headers=auth_headers)
+        assert response.status_code == 400
+        print("PASS: invalid feed cursor rejected")
@@ -5,7 +5,7 @@ import {
     InputLabel, Grid, IconButton, Tooltip, Dialog, DialogTitle, DialogContent,
     DialogActions, Button, Alert, Tabs, Tab
 } from '@mui/material';
-import { Visibility, Warning, Delete, RemoveCircle, HighlightOff, Refresh, Scale, FitnessCenter, Telegram } from '@mui/icons-material';
+import { Visibility, Warning, Delete, RemoveCircle, HighlightOff, Refresh, Scale, FitnessCenter, Telegram, Download } from '@mui/icons-material';
 import axios from 'axios';
 import moment from 'moment';
 
@@ -36,6 +36,25 @@ export const BillAuditLogs = () => {
         }
     };
 
+    const downloadReport = async () => {
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.get('/api/audit/full-report', {
+                params: { format: 'html' },
+                headers: { Authorization: `Bearer ${token}` },
+                responseType: 'blob'
+            });
+            const url = window.URL.createObjectURL(res.data);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = `bill-audit-report-${moment().format('YYYY-MM-DD')}.html`;
+            link.click();
+            window.URL.revokeObjectURL(url);
+        } catch (e) {
+            alert('Failed to download: ' + (e.response?.data?.message || e.message));
+        }
+    };
+
     return (
         <Box data-testid="bill-audit-logs" sx={{ maxWidth: 1200, mx: 'auto' }}>
             <Box sx={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', mb: 1 }}>
@@ -45,18 +64,30 @@ export const BillAuditLogs = () => {
                         Track deletions, weight fetches, and suspicious activity
                     </Typography>
                 </Box>
-                <Button
-                    data-testid="send-telegram-report"
-                    variant="contained"
-                    startIcon={sending ? null : <Telegram />}
-                    onClick={sendToTelegram}
-                    disabled={sending}
-                    color={sent ? 'success' : 'primary'}
-                    size="small"
-                    sx={{ textTransform: 'none', minWidth: 180 }}
-                >
-                    {sending ? 'Sending...' : sent ? 'Sent to Telegram!' : 'Send Report to Telegram'}
-                </Button>
+                <Box sx={{ display: 'flex', gap: 1 }}>
+                    <Button
+                        data-testid="download-audit-report"
+                        variant="outlined"
+                        startIcon={<Download />}
+                        onClick={downloadReport}
+                        size="small"
+                        sx={{ textTransform: 'none' }}
+                    >
+                        Download Report
+                    </Button>
+                    <Button
+                        data-testid="send-telegram-report"
+                        variant="contained"
+                        startIcon={sending ? null : <Telegram />}
+                        onClick={sendToTelegram}
+                        disabled={sending}
+                        color={sent ? 'success' : 'primary'}
+                        size="small"
+                        sx={{ textTransform: 'none', minWidth: 180 }}
+                    >
+                        {sending ? 'Sending...' : sent ? 'Sent to Telegram!' : 'Send Report to Telegram'}
+                    </Button>
+                </Box>
             </Box>
             <Tabs value={activeTab} onChange={(_, v) => setActiveTab(v)} sx={{ mb: 2, borderBottom: 1, borderColor: 'divider' }}>
                 <Tab label="Item Deletions" icon={<Delete fontSize="small" />} iconPosition="start" />
@@ -256,6 +256,30 @@ const LedgerModule = () => {
         }
     };
 
+    // Audit Trail: first page (cursor null) replaces the table, later pages append
+    const loadAuditTrail = async (cursor = null) => {
+        setAuditLoading(true);
+        setError(null);
+        try {
+            const params = new URLSearchParams();
+            Object.entries(auditFilters).forEach(([k, v]) => { if (v) params.append(k, v); });
+            params.append('limit', '200');
+            if (cursor) {
+                params.append('before', cursor.before);
+                params.append('beforeId', cursor.beforeId);
+            }
+            const resp = await axios.get(`/api/audit-trail?${params}`, getAuthHeader());
+            const page = resp.data.data;
+            setAuditData(prev => (cursor && prev
+                ? { ...prev, rows: [...prev.rows, ...page.rows], cursor: page.cursor, hasMore: page.hasMore }
+                : page));
+        } catch (err) {
+            setError('Failed to fetch audit trail: ' + (err.response?.data?.message || err.message));
+        } finally {
+            setAuditLoading(false);
+        }
+    };
+
     // Forensic Audit: Scan
     const runForensicScan = async () => {
         try {
@@ -972,7 +996,7 @@ const LedgerModule = () => {
                                         const link = document.createElement('a');
                                         link.href = url;
                                         const disposition = response.headers['content-disposition'];
-                                        const filename = disposition ? disposition.split('filename=')[1]?.replace(/"/g, '') : 'backup.sql';
+                                        const filename = disposition ? disposition.split('filename=')[1]?.replace(/"/g, '') : 'backup.dump';
                                         link.setAttribute('download', filename);
                                         document.body.appendChild(link);
                                         link.click();
@@ -2435,21 +2459,7 @@ const LedgerModule = () => {
                         <Button variant="contained" size="small" data-testid="audit-fetch-btn"
                             startIcon={auditLoading ? <CircularProgress size={14} color="inherit" /> : <Assessment />}
                             disabled={auditLoading}
-                            onClick={async () => {
-                                setAuditLoading(true);
-                                setError(null);
-                                try {
-                                    const params = new URLSearchParams();
-                                    Object.entries(auditFilters).forEach(([k, v]) => { if (v) params.append(k, v); });
-                                    params.append('limit', '200');
-                                    const resp = await axios.get(`/api/audit-trail?${params}`, getAuthHeader());
-                                    setAuditData(resp.data.data);
-                                } catch (err) {
-                                    setError('Failed to fetch audit trail: ' + (err.response?.data?.message || err.message));
-                                } finally {
-                                    setAuditLoading(false);
-                                }
-                            }}
+                            onClick={() => loadAuditTrail()}
                             sx={{ bgcolor: '#1565c0' }}>
                             {auditLoading ? 'Loading...' : 'Fetch Trail'}
                         </Button>
@@ -2464,7 +2474,8 @@ const LedgerModule = () => {
                                     color={s.action === 'DELETE' ? 'error' : s.action === 'CREATE' ? 'success' : 'default'}
                                     onClick={() => setAuditFilters(f => ({ ...f, action: s.action, entityType: s.entityType }))} />
                             ))}
-                            <Chip size="small" label={`Total: ${auditData.total}`} color="primary" />
+                            <Chip size="small" color="primary"
+                                label={auditData.summarySince ? `Total since ${auditData.summarySince}: ${auditData.total}` : `Total: ${auditData.total}`} />
                         </Box>
                     )}
 
@@ -2536,6 +2547,16 @@ const LedgerModule = () => {
                         </TableContainer>
                     )}
 
+                    {auditData?.hasMore && (
+                        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 1 }}>
+                            <Button size="small" variant="outlined" data-testid="audit-load-more"
+                                disabled={auditLoading}
+                                onClick={() => loadAuditTrail(auditData.cursor)}>
+                                {auditLoading ? 'Loading...' : `Load more (showing ${auditData.rows.length})`}
+                            </Button>
+                        </Box>
+                    )}
+
                     {auditData && auditData.rows?.length === 0 && (
                         <Alert severity="info" sx={{ mt: 2 }}>No audit logs found for the selected filters.</Alert>
                     )}
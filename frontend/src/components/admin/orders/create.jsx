@@ -20,7 +20,8 @@ import {
   Switch,
   FormControlLabel,
   Alert,
-  Chip
+  Chip,
+  createFilterOptions
 } from '@mui/material';
 import { CreateProduct } from '../products/create';
 import pdfMake from 'pdfmake/build/pdfmake';
@@ -31,7 +32,11 @@ import { ProductType } from '../../../enums/product';
 import { useAuth } from '../../../context/AuthContext';
 import { api } from '../../../store/api'; // RTK Query API for cache invalidation
 import axios from 'axios';
+import { v4 as uuidv4 } from 'uuid';
 import { sendInvoiceViaWhatsApp } from '../../../utils/whatsapp';
+import outboxDB from '../../../utils/outboxDB';
+import { queueBill, startOutboxSync } from '../../../utils/outboxSync';
+import { loadCatalog, syncCatalog } from '../../../utils/catalogCache';
 import PriceKeypad from './PriceKeypad';
 
 /* -------------------------
@@ -91,17 +96,13 @@ const addToTodayGrandTotal=(amt)=>{ const t=getTodayStr(); const d=getStoredDayT
 const subtractFromTodayGrandTotal=(amt)=>{ const t=getTodayStr(); const d=getStoredDayTotal(); const base=(d&&d.date===t)?Number(d.total||0):0; const total=Math.max(0,base-Number(amt||0)); setStoredDayTotal({date:t,total}); try{window.dispatchEvent(new CustomEvent('DAY_TOTAL_UPDATED',{detail:total}))}catch{}; return total; };
 const msToNextMidnight=()=>{ const now=new Date(); const next=new Date(now.getFullYear(),now.getMonth(),now.getDate()+1,0,0,0,0); return next.getTime()-now.getTime(); };
 
-const PENDING_INVOICES_KEY = 'pendingInvoices_v1';
-// eslint-disable-next-line no-unused-vars
-const savePendingInvoice = (payload) => {
-  try {
-    const cur = JSON.parse(localStorage.getItem(PENDING_INVOICES_KEY) || '[]');
-    cur.push({ payload, ts: new Date().toISOString() });
-    localStorage.setItem(PENDING_INVOICES_KEY, JSON.stringify(cur));
-  } catch (e) {
-    console.warn('savePendingInvoice failed', e);
-  }
-};
+// Customer picker: match name or mobile locally, render at most 50 matches
+// however large the cached catalogue is
+const customerFilter = createFilterOptions({ limit: 50, stringify: (c) => `${c.name} ${c.mobile}` });
+
+// Past this the bill goes to the offline outbox (utils/outboxSync.js) instead
+// of keeping the cashier waiting; the outbox sends it with the same Idempotency-Key
+const ONLINE_SAVE_TIMEOUT_MS = 4000;
 
 // Classify quick tags for your quick select
 const classifyQuickTag = (raw) => {
@@ -268,39 +269,51 @@ export const CreateOrder = () => {
   // Local state for customers fetched from API
   const [customers, setCustomers] = useState([]);
   
-  // Fetch customers from database on mount
+  // Customers come from the IndexedDB catalogue, then only server-side changes
+  // are applied (on mount and when the window regains focus) — no full
+  // customer download, and picker search runs against the local copy
   useEffect(() => {
-    const fetchCustomers = async () => {
-      try {
-        const token = localStorage.getItem('token');
-        const { data } = await axios.get('/api/customers/with-balance', {
-          headers: { Authorization: `Bearer ${token}` }
-        });
-        setCustomers(data.data?.rows || []);
-      } catch (error) {
-        console.error('Error fetching customers:', error);
-        // Fallback to basic customers endpoint
+    let cancelled = false;
+    const show = (list) => { if (!cancelled && list) setCustomers(list); };
+    const sync = () => syncCatalog('customers').then(show).catch((error) => {
+      console.error('Error syncing customers:', error);
+    });
+
+    loadCatalog('customers')
+      .then(show)
+      .then(sync)
+      .catch(async (error) => {
+        console.error('Customer catalogue unavailable:', error);
+        // No IndexedDB: fall back to the basic customers endpoint
         try {
           const token = localStorage.getItem('token');
           const { data } = await axios.get('/api/customers', {
             headers: { Authorization: `Bearer ${token}` }
           });
-          setCustomers(data.data?.rows || data.rows || []);
+          show(data.data?.rows || data.rows || []);
         } catch (e) {
           console.error('Fallback error:', e);
         }
-      }
+      });
+    window.addEventListener('focus', sync);
+    return () => {
+      cancelled = true;
+      window.removeEventListener('focus', sync);
     };
-    fetchCustomers();
   }, []);
 
+  // Dues computed the way the ledger and statements compute them (opening +
+  // sales − receipts), fetched for the selected customer only — the stored
+  // currentBalance on catalogue rows can drift, so it is never shown
+  const [dueByCustomer, setDueByCustomer] = useState({});
+
   const customerOptions = useMemo(() => customers.map((c) => ({
     ...c,
     label: `${c?.name || 'Customer'}${c?.mobile ? ` (${c.mobile})` : ''}`,
     name: c?.name || '',
     mobile: c?.mobile || '',
-    balance: Number(c?.balance) || Number(c?.currentBalance) || 0,
-  })), [customers]);
+    balance: dueByCustomer[c?.id] || 0,
+  })), [customers, dueByCustomer]);
 
   const productOptions = useMemo(() => (
     Object.keys(rows || {})?.map(id => ({
@@ -341,6 +354,9 @@ export const CreateOrder = () => {
   const [lastSubmitError, setLastSubmitError] = useState(null);
   const [lastSubmitResponse, setLastSubmitResponse] = useState(null);
   const [lastInvoiceTotal, setLastInvoiceTotal] = useState(null);
+
+  // Offline outbox: bills queued while the server was slow or unreachable
+  const [outboxCounts, setOutboxCounts] = useState({ queued: 0, conflict: 0 });
   
   // Post-submit WhatsApp dialog
   const [whatsAppDialog, setWhatsAppDialog] = useState({ open: false, order: null });
@@ -389,6 +405,28 @@ export const CreateOrder = () => {
     setDailyHistory(computeDailyTotalsFromInvoices(inv));
   }, []);
 
+  // Background outbox sync while the POS is open
+  useEffect(() => {
+    const refreshCounts = () => outboxDB.counts().then(setOutboxCounts).catch(() => {});
+    const onSynced = () => {
+      dispatch(api.util.invalidateTags([
+        { type: 'Orders', id: 'LIST' },
+        { type: 'Receivables', id: 'LIST' },
+        { type: 'Dashboard', id: 'TODAY' }
+      ]));
+      refreshHistory();
+    };
+    window.addEventListener('OUTBOX_UPDATED', refreshCounts);
+    window.addEventListener('OUTBOX_SYNCED', onSynced);
+    refreshCounts();
+    const stopSync = startOutboxSync();
+    return () => {
+      stopSync();
+      window.removeEventListener('OUTBOX_UPDATED', refreshCounts);
+      window.removeEventListener('OUTBOX_SYNCED', onSynced);
+    };
+  }, [dispatch, refreshHistory]);
+
 
   const printPdf = useCallback(() => {
     try {
@@ -439,7 +477,29 @@ export const CreateOrder = () => {
   }), []);
   
   const [orderProps, setOrderProps] = useState(initialOrderProps);
-  
+
+  const selectedCustomerId = orderProps.customer?.id;
+
+  useEffect(() => {
+    if (!selectedCustomerId) return undefined;
+    let cancelled = false;
+    const token = localStorage.getItem('token');
+    axios.get('/api/customers/with-balance', {
+      params: { customerId: selectedCustomerId },
+      headers: { Authorization: `Bearer ${token}` }
+    })
+      .then(({ data }) => {
+        const row = data.data?.rows?.[0];
+        if (!cancelled && row) {
+          setDueByCustomer(prev => ({ ...prev, [selectedCustomerId]: Number(row.balance) || 0 }));
+        }
+      })
+      .catch((error) => console.error('Error fetching customer due:', error));
+    return () => { cancelled = true; };
+  }, [selectedCustomerId]);
+
+  const selectedCustomerDue = selectedCustomerId ? (dueByCustomer[selectedCustomerId] || 0) : 0;
+
   // Update orderDate to today whenever the component becomes visible/focused
   useEffect(() => {
     const updateDateIfNeeded = () => {
@@ -474,6 +534,9 @@ export const CreateOrder = () => {
   // eslint-disable-next-line no-unused-vars
   const [todayGrandTotal, setTodayGrandTotal] = useState(getTodayGrandTotal());
   const [isSubmitting, setIsSubmitting] = useState(false); // Prevent double submission
+  // Idempotency-Key of the bill being submitted — kept until the server confirms it,
+  // so a retry after a dropped response cannot create a second invoice
+  const idempotencyKeyRef = useRef(null);
 
   const [selectedProduct, setSelectedProduct] = useState(null);
   const [inputValue, setInputValue] = useState('');
@@ -1375,7 +1438,21 @@ export const CreateOrder = () => {
     }
   }, [generatePdf]);
 
-  // MAIN createOrder — now ONLINE-first (server)
+  // Clear the form for the next bill (after a save or after queuing offline)
+  const resetForNextBill = () => {
+    setOrderProps(initialOrderProps);
+    formik.resetForm();
+    setLocalPriceValue('');
+    setFetchedViaScale(false);
+    // NOTE: Keep recentlyDeleted visible after submit so user can verify deleted items
+    // It will be cleared when the first item is added to the next invoice
+    setSelectedHistoryDate('');
+    setIsCreditSale(false); // Reset credit sale toggle
+    setSelectedProduct(null); // Reset selected product
+    setInputValue(''); // Reset input value
+  };
+
+  // MAIN createOrder — ONLINE-first (server), offline outbox when the server is slow or unreachable
   const createOrder = async () => {
     // Prevent double submission
     if (isSubmitting) {
@@ -1424,8 +1501,39 @@ export const CreateOrder = () => {
       // SANITIZE before save (pass isCreditSale for payment status)
       const sanitized = sanitizeOrderForServer(orderProps, isCreditSale);
 
-      // ONLINE SAVE (Server)
-      const savedOrder = await dispatch(createOrderAction(sanitized));
+      // ONLINE SAVE (Server) — bounded wait, then the outbox takes over
+      if (!idempotencyKeyRef.current) idempotencyKeyRef.current = uuidv4();
+      const savedOrder = navigator.onLine === false
+        ? { networkError: true }
+        : await dispatch(createOrderAction(sanitized, idempotencyKeyRef.current, { timeout: ONLINE_SAVE_TIMEOUT_MS }));
+      if (savedOrder?.networkError) {
+        // Same key: if the timed-out request did land, the sync replays it instead of invoicing twice
+        await queueBill(idempotencyKeyRef.current, sanitized);
+        idempotencyKeyRef.current = null;
+        setLastSubmitResponse({
+          stage: "queued_offline",
+          note: "Server slow or unreachable — bill queued and will sync automatically",
+          total: sanitized.total,
+          timestamp: new Date().toISOString(),
+        });
+        let queuedPdfUrl = '';
+        try {
+          queuedPdfUrl = await generatePdf({ ...orderProps, orderNumber: 'PENDING SYNC' });
+        } catch (e) {
+          console.error('PDF generation error:', e);
+        }
+        setArchivedOrderProps({ ...sanitized, orderNumber: 'PENDING SYNC' });
+        setArchivedPdfUrl(queuedPdfUrl || pdfUrl || "");
+        setLastInvoiceTotal(sanitized.total);
+        resetForNextBill();
+        return;
+      }
+      if (!savedOrder?.id) {
+        // Not confirmed (error or lost response) — keep the bill and its key so Create retries safely
+        setLastSubmitError({ type: "server", message: "Order was not confirmed by the server — press Create again to retry" });
+        return;
+      }
+      idempotencyKeyRef.current = null;
 
       // Invalidate RTK Query cache to refresh orders list
       dispatch(api.util.invalidateTags([
@@ -1488,16 +1596,7 @@ export const CreateOrder = () => {
         }
       });
 
-      setOrderProps(initialOrderProps);
-      formik.resetForm();
-      setLocalPriceValue('');
-      setFetchedViaScale(false);
-      // NOTE: Keep recentlyDeleted visible after submit so user can verify deleted items
-      // It will be cleared when the first item is added to the next invoice
-      setSelectedHistoryDate('');
-      setIsCreditSale(false); // Reset credit sale toggle
-      setSelectedProduct(null); // Reset selected product
-      setInputValue(''); // Reset input value
+      resetForNextBill();
       // Note: Keep archivedOrderProps/archivedPdfUrl to show the just-submitted order's PDF
       // User can start adding new items while viewing the submitted PDF
     } catch (err) {
@@ -1837,6 +1936,7 @@ export const CreateOrder = () => {
                 <Autocomplete
                   size="small"
                   options={customerOptions}
+                  filterOptions={customerFilter}
                   value={orderProps.customer || null}
                   onChange={(_, val) => {
                     // Auto-fill customerName and customerMobile when a customer is selected
@@ -1891,13 +1991,13 @@ export const CreateOrder = () => {
                 />
                 
                 {/* Show customer due amount alert when customer is selected */}
-                {orderProps.customer && (orderProps.customer.balance || 0) > 0 && (
+                {orderProps.customer && selectedCustomerDue > 0 && (
                   <Alert 
                     severity="warning" 
                     sx={{ mt: 1 }}
                     icon={<Info />}
                   >
-                    <strong>{orderProps.customer.name}</strong> has outstanding due: <strong style={{ color: '#d32f2f' }}>₹{(orderProps.customer.balance || 0).toLocaleString('en-IN')}</strong>
+                    <strong>{orderProps.customer.name}</strong> has outstanding due: <strong style={{ color: '#d32f2f' }}>₹{selectedCustomerDue.toLocaleString('en-IN')}</strong>
                   </Alert>
                 )}
               </Grid>
@@ -2152,6 +2252,16 @@ export const CreateOrder = () => {
                   Add Product
                 </Button>
 
+                {(outboxCounts.queued > 0 || outboxCounts.conflict > 0) && (
+                  <Box sx={{ mt: 1, display: 'flex', gap: 1 }}>
+                    {outboxCounts.queued > 0 && (
+                      <Chip size="small" color="warning" label={`${outboxCounts.queued} bill(s) waiting to sync`} />
+                    )}
+                    {outboxCounts.conflict > 0 && (
+                      <Chip size="small" color="error" label={`${outboxCounts.conflict} bill(s) rejected by server — check with admin`} />
+                    )}
+                  </Box>
+                )}
                 {lastSubmitError && (
                   <Box sx={{ mt: 1, p: 1, border: '1px dashed red', backgroundColor: '#fff0f0' }}>
                     <Typography variant="caption" color="error">Last submit error:</Typography>
@@ -1,14 +1,16 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { Box, Button, Card, CardContent, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Dialog, DialogTitle, DialogContent, DialogActions, Typography, TextField, Select, MenuItem, FormControl, InputLabel, Chip } from '@mui/material';
 import { listPayments, createPayment } from '../../../services/tally';
 import { listSuppliers } from '../../../services/supplier';
 import { listPurchases } from '../../../services/tally';
 import moment from 'moment';
+import { v4 as uuidv4 } from 'uuid';
 
 export const ListPayments = () => {
     const [payments, setPayments] = useState([]);
     const [loading, setLoading] = useState(false);
     const [openDialog, setOpenDialog] = useState(false);
+    const idempotencyKeyRef = useRef(null);
     const [suppliers, setSuppliers] = useState([]);
     const [purchases, setPurchases] = useState([]);
     const [formData, setFormData] = useState({
@@ -60,6 +62,8 @@ export const ListPayments = () => {
     }, []);
 
     const handleOpenDialog = () => {
+        // One key per recorded payment: resubmitting the dialog cannot record it twice
+        idempotencyKeyRef.current = uuidv4();
         setFormData({
             paymentDate: moment().format('YYYY-MM-DD'),
             partyId: '',
@@ -115,7 +119,7 @@ export const ListPayments = () => {
         }
 
         try {
-            await createPayment(formData);
+            await createPayment(formData, idempotencyKeyRef.current);
             handleCloseDialog();
             fetchPayments();
         } catch (error) {
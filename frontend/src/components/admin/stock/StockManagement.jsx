@@ -4,7 +4,7 @@ import {
     TableContainer, TableHead, TableRow, Button, Dialog, DialogTitle,
     DialogContent, DialogActions, TextField, IconButton, Tooltip, Chip,
     CircularProgress, Paper, Grid, Alert, Tabs, Tab, Autocomplete,
-    FormControl, InputLabel, Select, MenuItem
+    FormControl, InputLabel, Select, MenuItem, FormControlLabel, Switch
 } from '@mui/material';
 import {
     Add, Remove, Refresh, Inventory, Warning, TrendingUp,
@@ -19,6 +19,7 @@ export const StockManagement = () => {
     const [transactions, setTransactions] = useState([]);
     const [products, setProducts] = useState([]);
     const [loading, setLoading] = useState(false);
+    const [lowStockOnly, setLowStockOnly] = useState(false);
     const [summary, setSummary] = useState({
         totalProducts: 0,
         lowStockCount: 0,
@@ -48,7 +49,8 @@ export const StockManagement = () => {
         try {
             setLoading(true);
             const token = localStorage.getItem('token');
-            const { data } = await axios.get('/api/stocks', {
+            // Low-stock filtering happens in SQL, so the list stays paginated
+            const { data } = await axios.get(lowStockOnly ? '/api/stocks/low-stock' : '/api/stocks', {
                 headers: { Authorization: `Bearer ${token}` }
             });
             setStocks(data.data?.rows || []);
@@ -57,7 +59,7 @@ export const StockManagement = () => {
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [lowStockOnly]);
 
     // Fetch stock summary
     const fetchSummary = useCallback(async () => {
@@ -237,7 +239,7 @@ export const StockManagement = () => {
                             <Box>
                                 <Typography variant="body2" color="text.secondary">Total Products</Typography>
                                 <Typography variant="h4" color="primary" fontWeight="bold">
-                                    {summary.totalProducts || stocks.length}
+                                    {summary.totalProducts || 0}
                                 </Typography>
                             </Box>
                         </Box>
@@ -282,14 +284,26 @@ export const StockManagement = () => {
                     <CardContent>
                         <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 2 }}>
                             <Typography variant="h6">Current Stock Levels</Typography>
-                            <Button
-                                variant="outlined"
-                                size="small"
-                                startIcon={<Add />}
-                                onClick={() => openDialog('init')}
-                            >
-                                Initialize New Product Stock
-                            </Button>
+                            <Box sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
+                                <FormControlLabel
+                                    control={
+                                        <Switch
+                                            size="small"
+                                            checked={lowStockOnly}
+                                            onChange={(e) => setLowStockOnly(e.target.checked)}
+                                        />
+                                    }
+                                    label="Low stock only"
+                                />
+                                <Button
+                                    variant="outlined"
+                                    size="small"
+                                    startIcon={<Add />}
+                                    onClick={() => openDialog('init')}
+                                >
+                                    Initialize New Product Stock
+                                </Button>
+                            </Box>
                         </Box>
 
                         {loading ? (
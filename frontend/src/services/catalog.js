@@ -0,0 +1,22 @@
+
+import axios from "axios";
+
+// Versioned catalogue fetch. `since`/`etag` come from the cached copy; the
+// server answers 304 (no body) when nothing changed since that version.
+export const getCatalog = async (name, { since, etag } = {}) => {
+    try{
+        const response = await axios.get(`/api/catalog/${name}`, {
+            params: since ? { since } : {},
+            headers: {
+              'Content-Type': 'application/json',
+              ...(etag && { 'If-None-Match': etag })
+            },
+            validateStatus: (status) => status === 200 || status === 304
+        });
+        return response;
+    }
+    catch(error){
+        console.log(error);
+        throw error;
+    }
+}
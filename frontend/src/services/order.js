@@ -23,9 +23,29 @@ export const listOrders = async (filters) => {
     }
 }
 
-export const createOrder = async (payload) => {
+// idempotencyKey: reuse the same key when resending the same bill — the
+// server replays the first response instead of creating a second invoice
+// timeout (ms): give up waiting so the POS can queue the bill instead
+export const createOrder = async (payload, idempotencyKey, { timeout } = {}) => {
     try{
         const response = await axios.post('/api/orders', payload, {
+            headers: {
+              'Content-Type': 'application/json',
+              ...(idempotencyKey && { 'Idempotency-Key': idempotencyKey })
+            },
+            ...(timeout && { timeout })
+        });
+        return response;
+    }
+    catch(error){
+        throw error;
+    }
+}
+
+// Send queued offline bills: bills = [{ idempotencyKey, queuedAt, order }]
+export const syncOrders = async (bills) => {
+    try{
+        const response = await axios.post('/api/orders/sync', { bills }, {
             headers: {
               'Content-Type': 'application/json'
             }
@@ -58,11 +58,12 @@ export const listPayments = async (filters) => {
     }
 }
 
-export const createPayment = async (payload) => {
+export const createPayment = async (payload, idempotencyKey) => {
     try {
         const { data } = await axios.post('/api/payments', payload, {
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                ...(idempotencyKey && { 'Idempotency-Key': idempotencyKey })
             }
         });
         return data;
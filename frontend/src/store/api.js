@@ -5,6 +5,9 @@ export const api = createApi({
     reducerPath: 'api',
     baseQuery: fetchBaseQuery({ 
         baseUrl: '/api',
+        // List endpoints send weak ETags; always revalidate so an unchanged list
+        // comes back as a 304 and fetch serves the browser's copy
+        cache: 'no-cache',
         prepareHeaders: (headers) => {
             const token = localStorage.getItem('token');
             if (token) {
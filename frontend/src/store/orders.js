@@ -49,11 +49,11 @@ export const listOrdersAction = (payload) => {
     }
 }
 
-export const createOrderAction = (payload) => {
+export const createOrderAction = (payload, idempotencyKey, options) => {
     return async(dispatch) => {
         try{
             dispatch(startLoading());
-            const { data: { data }} = await createOrder(payload);
+            const { data: { data }} = await createOrder(payload, idempotencyKey, options);
             dispatch(setNotification({ open: true, severity: 'success', message: 'Order created successfully'}));
             dispatch(stopLoading());
             
@@ -72,6 +72,8 @@ export const createOrderAction = (payload) => {
         catch(error){
             console.log(error);
             dispatch(stopLoading());
+            // No response at all (offline / timed out): the caller may queue the bill
+            if (!error.response) return { networkError: true };
             dispatch(setNotification({ open: true, severity: 'error', message: 'Something went wrong, please try again!'}));
             return {};
         }
@@ -2,6 +2,7 @@
 import { createSlice } from '@reduxjs/toolkit';
 import { setNotification, startLoading, stopLoading } from "./application"
 import { addProduct, updateProduct, listProducts, deleteProduct } from '../services/product';
+import { loadCatalog, syncCatalog } from '../utils/catalogCache';
 
 
 const initialState = {
@@ -27,8 +28,30 @@ const { setProducts } = productSlice.actions;
 export default productSlice;
 
 
+const toProductsState = (products) => {
+    const rows = {};
+    products.forEach(productObj => rows[productObj.id] = productObj);
+    return { count: products.length, rows };
+}
+
+// Products come from the IndexedDB catalogue first, then only what changed on
+// the server is applied — the POS does not wait on a full product download
 export const listProductsAction = () => {
     return async(dispatch) => {
+        let cached = [];
+        try{
+            cached = await loadCatalog('products');
+            if (cached.length) dispatch(setProducts(toProductsState(cached)));
+            const synced = await syncCatalog('products');
+            if (synced) dispatch(setProducts(toProductsState(synced)));
+            return;
+        }
+        catch(error){
+            console.log(error);
+            // Offline with a warm cache: keep showing it
+            if (cached.length) return;
+        }
+        // No IndexedDB (private mode) or no catalogue endpoint: plain fetch
         try{
             dispatch(startLoading());
             const products = await listProducts({});
@@ -0,0 +1,50 @@
+/**
+ * IndexedDB cache of the product and customer catalogues, kept current with
+ * delta sync against GET /api/catalog/<name>?since=<version>.
+ *
+ * Screens render from the cache immediately (loadCatalog) and then apply
+ * whatever changed on the server (syncCatalog) — usually a 304 or a handful
+ * of rows, so load time does not grow with the catalogue.
+ */
+
+import { openDatabase, transact } from './idb';
+import { getCatalog } from '../services/catalog';
+
+const DB_NAME = 'pos_catalog';
+const DB_VERSION = 1;
+export const CATALOGS = ['products', 'customers'];
+const META = 'meta';
+
+const connect = () => openDatabase(DB_NAME, DB_VERSION, (db) => {
+    CATALOGS.forEach(name => db.createObjectStore(name, { keyPath: 'id' }));
+    db.createObjectStore(META, { keyPath: 'name' });
+});
+
+// Every cached row of a catalogue
+export const loadCatalog = (name) => transact(connect(), [name], 'readonly', tx => tx.objectStore(name).getAll());
+
+const inFlight = {};
+
+/**
+ * Fetch changes since the cached version and apply them in one transaction.
+ * @returns {Promise<Array|null>} the updated rows, or null when nothing changed
+ */
+export const syncCatalog = (name) => {
+    if (inFlight[name]) return inFlight[name];
+    inFlight[name] = (async () => {
+        const meta = await transact(connect(), [META], 'readonly', tx => tx.objectStore(META).get(name));
+        const response = await getCatalog(name, { since: meta?.version, etag: meta?.etag });
+        if (response.status === 304) return null;
+
+        const { version, full, upserts, deletes } = response.data.data;
+        await transact(connect(), [name, META], 'readwrite', (tx) => {
+            const store = tx.objectStore(name);
+            if (full) store.clear();
+            deletes.forEach(id => store.delete(id));
+            upserts.forEach(row => store.put(row));
+            tx.objectStore(META).put({ name, version, etag: response.headers.etag || null, syncedAt: new Date().toISOString() });
+        });
+        return loadCatalog(name);
+    })().finally(() => { delete inFlight[name]; });
+    return inFlight[name];
+};
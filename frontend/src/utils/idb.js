@@ -0,0 +1,39 @@
+/**
+ * Minimal promise wrapper over IndexedDB, shared by the POS outbox and the
+ * catalogue cache. No dependency — the raw API is small enough for our needs.
+ */
+
+const connections = {};
+
+// Open (and upgrade) a database once per page; a failed open is retried next call
+export const openDatabase = (name, version, upgrade) => {
+    if (connections[name]) return connections[name];
+    const connection = new Promise((resolve, reject) => {
+        if (typeof indexedDB === 'undefined') {
+            reject(new Error('IndexedDB is not available'));
+            return;
+        }
+        const request = indexedDB.open(name, version);
+        request.onupgradeneeded = () => upgrade(request.result);
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+    connections[name] = connection;
+    connection.catch(() => { delete connections[name]; });
+    return connection;
+};
+
+// Run `work(tx)` in one transaction over `storeNames`; resolves once it commits,
+// with the result of the request `work` returns (if any)
+export const transact = async (connection, storeNames, mode, work) => {
+    const db = await connection;
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(storeNames, mode);
+        let result;
+        tx.oncomplete = () => resolve(result);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+        const request = work(tx);
+        if (request) request.onsuccess = () => { result = request.result; };
+    });
+};
@@ -0,0 +1,79 @@
+/**
+ * IndexedDB outbox for POS bills that could not be confirmed by the server.
+ *
+ * One record per bill, keyed by its Idempotency-Key, so re-queuing the same
+ * bill overwrites instead of duplicating. Writes are single-record puts —
+ * nothing re-serialises the whole queue the way localStorage arrays do.
+ *
+ * Record: { idempotencyKey, order, queuedAt, attempts, status, lastError, result }
+ *   status  'queued'   waiting to be sent
+ *           'conflict' the server refused it (invalid bill or reused key) — needs a person
+ */
+
+import { openDatabase, transact } from './idb';
+
+const DB_NAME = 'pos_outbox';
+const DB_VERSION = 1;
+const STORE = 'bills';
+
+const connect = () => openDatabase(DB_NAME, DB_VERSION, (db) => {
+    const store = db.createObjectStore(STORE, { keyPath: 'idempotencyKey' });
+    store.createIndex('queuedAt', 'queuedAt');
+});
+
+const withStore = (mode, work) => transact(connect(), [STORE], mode, tx => work(tx.objectStore(STORE)));
+
+const notify = () => {
+    try { window.dispatchEvent(new CustomEvent('OUTBOX_UPDATED')); } catch {}
+};
+
+const outboxDB = {
+    // Queue a bill; resolves once it is durably stored
+    enqueue: async (idempotencyKey, order) => {
+        await withStore('readwrite', store => store.put({
+            idempotencyKey,
+            order,
+            queuedAt: new Date().toISOString(),
+            attempts: 0,
+            status: 'queued',
+            lastError: null,
+            result: null
+        }));
+        notify();
+    },
+
+    // Oldest first, so bills are invoiced in the order they were made
+    list: async ({ status, limit } = {}) => {
+        const rows = await withStore('readonly', store => store.index('queuedAt').getAll());
+        const filtered = status ? rows.filter(r => r.status === status) : rows;
+        return limit ? filtered.slice(0, limit) : filtered;
+    },
+
+    // Merge `changes` into each record, keyed by idempotencyKey; missing keys are ignored
+    update: async (changesByKey) => {
+        await withStore('readwrite', store => {
+            Object.entries(changesByKey).forEach(([key, changes]) => {
+                const request = store.get(key);
+                request.onsuccess = () => {
+                    if (request.result) store.put({ ...request.result, ...changes });
+                };
+            });
+        });
+        notify();
+    },
+
+    remove: async (keys) => {
+        await withStore('readwrite', store => { keys.forEach(key => store.delete(key)); });
+        notify();
+    },
+
+    counts: async () => {
+        const rows = await withStore('readonly', store => store.getAll());
+        return {
+            queued: rows.filter(r => r.status === 'queued').length,
+            conflict: rows.filter(r => r.status === 'conflict').length
+        };
+    }
+};
+
+export default outboxDB;
@@ -0,0 +1,116 @@
+/**
+ * Background sync for the POS outbox (utils/outboxDB.js).
+ *
+ * Queued bills go to POST /api/orders/sync in batches, oldest first, each
+ * with the Idempotency-Key it was first tried with — a bill whose live
+ * attempt did reach the server comes back `replayed`, never duplicated.
+ *
+ *   created / replayed  removed from the outbox
+ *   conflict / invalid  kept, marked 'conflict' for someone to review
+ *   pending / failed    kept queued, retried on the next flush
+ *
+ * A batch refused as too large (413) is split in half and sent again; a
+ * single bill that is still too large is marked 'conflict'.
+ *
+ * Flushes run on start, every RETRY_INTERVAL_MS, when the browser comes back
+ * online and whenever a bill is queued. Only one flush runs at a time.
+ */
+
+import outboxDB from './outboxDB';
+import { syncOrders } from '../services/order';
+
+const BATCH_SIZE = 25;
+const RETRY_INTERVAL_MS = 15000;
+
+const DONE = new Set(['created', 'replayed']);
+const NEEDS_REVIEW = new Set(['conflict', 'invalid']);
+
+let flushing = null;
+
+const emit = (name, detail) => {
+    try { window.dispatchEvent(new CustomEvent(name, { detail })); } catch {}
+};
+
+const sendBatches = async () => {
+    const synced = [];
+    let batchSize = BATCH_SIZE;
+    for (;;) {
+        const batch = await outboxDB.list({ status: 'queued', limit: batchSize });
+        if (batch.length === 0) break;
+
+        let results;
+        try {
+            const { data: { data } } = await syncOrders(batch.map(({ idempotencyKey, queuedAt, order }) => ({
+                idempotencyKey, queuedAt, order
+            })));
+            results = data.results;
+        } catch (error) {
+            const status = error.response?.status;
+            if (status === 413 && batch.length > 1) {
+                batchSize = Math.ceil(batch.length / 2);
+                continue;
+            }
+            const message = error.response?.data?.message || error.message;
+            // 400, or 413 for a single bill: retrying it unchanged cannot help
+            const changes = Object.fromEntries(batch.map(b => [b.idempotencyKey, status === 400 || status === 413
+                ? { status: 'conflict', lastError: message }
+                : { attempts: b.attempts + 1, lastError: message }]));
+            await outboxDB.update(changes);
+            break;
+        }
+
+        const done = results.filter(r => DONE.has(r.status));
+        const changes = {};
+        results.forEach((r) => {
+            if (NEEDS_REVIEW.has(r.status)) {
+                changes[r.idempotencyKey] = { status: 'conflict', lastError: r.message, result: r };
+            } else if (!DONE.has(r.status)) {
+                const bill = batch.find(b => b.idempotencyKey === r.idempotencyKey);
+                changes[r.idempotencyKey] = { attempts: (bill?.attempts || 0) + 1, lastError: r.message };
+            }
+        });
+        if (done.length) await outboxDB.remove(done.map(r => r.idempotencyKey));
+        if (Object.keys(changes).length) await outboxDB.update(changes);
+        synced.push(...results);
+
+        // Something still needs retrying — leave it for the next flush instead of spinning
+        if (results.some(r => !DONE.has(r.status) && !NEEDS_REVIEW.has(r.status))) break;
+    }
+    return synced;
+};
+
+// Send everything queued; resolves with this flush's per-bill results
+export const flushOutbox = () => {
+    if (flushing) return flushing;
+    if (typeof navigator !== 'undefined' && navigator.onLine === false) return Promise.resolve([]);
+
+    flushing = sendBatches()
+        .then((results) => {
+            if (results.length) emit('OUTBOX_SYNCED', results);
+            return results;
+        })
+        .catch((error) => {
+            console.warn('Outbox sync failed', error);
+            return [];
+        })
+        .finally(() => { flushing = null; });
+    return flushing;
+};
+
+// Queue a bill and try to send it in the background — never awaits the network
+export const queueBill = async (idempotencyKey, order) => {
+    await outboxDB.enqueue(idempotencyKey, order);
+    flushOutbox();
+};
+
+// Start background flushing; returns a stop function (for useEffect cleanup)
+export const startOutboxSync = () => {
+    const onOnline = () => flushOutbox();
+    window.addEventListener('online', onOnline);
+    const timer = setInterval(flushOutbox, RETRY_INTERVAL_MS);
+    flushOutbox();
+    return () => {
+        clearInterval(timer);
+        window.removeEventListener('online', onOnline);
+    };
+};